@@ -0,0 +1,333 @@
+"""
+Noah Actuator Sizing Tool - Arrow / Parquet Interchange
+Catalog tables and sizing results as Arrow IPC or Parquet files (needs pyarrow)
+
+Usage:
+    python arrow_io.py catalog catalog_parquet/                       # create_workbook.py data
+    python arrow_io.py catalog catalog_arrow/ --source NoahSizing.xlsm --format arrow
+    python arrow_io.py results NoahSizing.xlsm results.parquet        # ValveList inputs + results
+
+Catalog: one file per DB_* sheet (DB_Models.parquet, ...) in a directory,
+columns named like the sheet header. A catalog directory can be passed to
+catalog.load_catalog() / sizing_cli.py --catalog.
+
+Results: the 12 ValveList input columns and the 13 result columns. Empty
+result cells ("") are stored as nulls and read back as "".
+
+Arrow IPC files are written uncompressed by default so reads are memory-mapped
+without copying; Parquet files are zstd-compressed for the smallest size.
+"""
+
+import gc
+import os
+import sys
+import argparse
+from contextlib import contextmanager
+from dataclasses import fields
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from catalog import DB_SHEET_NAMES, to_float, to_str, read_tables, generate_tables
+from create_workbook import VALVELIST_INPUT_HEADERS, VALVELIST_RESULT_HEADERS
+from valvelist_io import ValveLine, OUTPUT_HEADERS, NUMBER_COLUMNS, detect_format, iter_xlsx_results
+
+FORMATS = ("parquet", "arrow")
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+BATCH_ROWS = 65536              # rows per record batch / Parquet row group
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow/Parquet files (pip install pyarrow)")
+
+
+@contextmanager
+def _gc_paused():
+    # Building 100k+ row objects triggers repeated cyclic GC passes over them
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _format_of(path, fmt=None):
+    fmt = fmt or detect_format(path, default="")
+    if fmt not in FORMATS:
+        raise ValueError("Not an Arrow/Parquet file: %s" % path)
+    return fmt
+
+
+# ============================================
+# Column Conversion
+# ============================================
+
+def _text_column(values):
+    try:
+        return pa.array(values, type=pa.string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([v if v is None or type(v) is str else to_str(v) for v in values],
+                        type=pa.string())
+
+
+def _number_column(values):
+    """float64 array; "" (empty ValveList cell) is stored as null"""
+    try:
+        return pa.array(values, type=pa.float64())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None or v == "" else to_float(v) for v in values],
+                        type=pa.float64())
+
+
+def _catalog_column(values):
+    """Arrow array for one DB sheet column: int64, float64 or string
+
+    Columns mixing numbers and text are stored as text; the catalog converts
+    cell values with GetCellDouble/CStr rules either way.
+    """
+    present = [v for v in values if v is not None]
+    if present and all(type(v) is int for v in present):
+        return pa.array(values, type=pa.int64())
+    if present and all(type(v) in (int, float) for v in present):
+        return pa.array([None if v is None else float(v) for v in values], type=pa.float64())
+    return _text_column(values)
+
+
+def _column_names(header, width):
+    names = []
+    for i in range(width):
+        name = header[i] if i < len(header) else ""
+        if not name or name in names:
+            name = "Column%d" % (i + 1)
+        names.append(name)
+    return names
+
+
+# ============================================
+# File Access
+# ============================================
+
+def write_table(table, path, fmt=None, compression=None):
+    """Write a pyarrow Table (Parquet default: zstd, Arrow IPC default: none)"""
+    _require_pyarrow()
+    fmt = _format_of(path, fmt)
+    if fmt == "parquet":
+        pq.write_table(table, path, compression=compression or "zstd", row_group_size=BATCH_ROWS)
+        return
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_file(path, table.schema, options=options) as writer:
+        writer.write_table(table, max_chunksize=BATCH_ROWS)
+
+
+def read_table(path, fmt=None):
+    """Read a pyarrow Table (Arrow IPC files are memory-mapped)"""
+    _require_pyarrow()
+    fmt = _format_of(path, fmt)
+    if fmt == "parquet":
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _table_rows(table, names):
+    """Row tuples of the given columns (bulk column conversion, then zip)"""
+    columns = [table.column(n).to_pylist() for n in names]
+    return list(zip(*columns))
+
+
+# ============================================
+# Catalog Tables
+# ============================================
+
+def catalog_table(rows, header):
+    """pyarrow Table for one DB_* sheet: rows without header, header cell values"""
+    _require_pyarrow()
+    width = max([len(header)] + [len(r) for r in rows])
+    names = _column_names(header, width)
+    padded = [tuple(r) + (None,) * (width - len(r)) for r in rows]
+    columns = list(zip(*padded)) if padded else [()] * width
+    return pa.table([_catalog_column(list(c)) for c in columns], names=names)
+
+
+def write_catalog(out_dir, tables, headers, fmt="parquet", compression=None):
+    """Write {sheet name: rows} as one file per sheet; returns the written paths"""
+    _require_pyarrow()
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name in DB_SHEET_NAMES:
+        if name not in tables:
+            continue
+        path = os.path.join(out_dir, name + EXTENSIONS[fmt])
+        write_table(catalog_table(tables[name], headers.get(name, [])), path, fmt, compression)
+        written.append(path)
+    return written
+
+
+def read_catalog_tables(in_dir, headers=None):
+    """Read a catalog directory as {sheet name: [row tuples]} (catalog.Catalog input)
+
+    headers: optional dict that receives {sheet name: column names}
+    """
+    tables = {}
+    for name in DB_SHEET_NAMES:
+        for fmt in FORMATS:
+            path = os.path.join(in_dir, name + EXTENSIONS[fmt])
+            if os.path.exists(path):
+                table = read_table(path, fmt)
+                with _gc_paused():
+                    tables[name] = _table_rows(table, table.column_names)
+                if headers is not None:
+                    headers[name] = list(table.column_names)
+                break
+    if not tables:
+        raise ValueError("%s has no DB_*.parquet / DB_*.arrow files" % in_dir)
+    return tables
+
+
+# ============================================
+# Sizing Results
+# ============================================
+
+def _results_schema(extra_headers=()):
+    # Extra columns (e.g. MARGIN_HEADERS) are numeric
+    numeric = NUMBER_COLUMNS.union(extra_headers)
+    return pa.schema([(h, pa.float64() if h in numeric else pa.string())
+                      for h in OUTPUT_HEADERS + list(extra_headers)])
+
+
+def results_table(pairs, extra_headers=()):
+    """pyarrow Table from (ValveLine, 13 result values [+ extra values]) pairs"""
+    _require_pyarrow()
+    schema = _results_schema(extra_headers)
+    n_results = len(VALVELIST_RESULT_HEADERS) + len(extra_headers)
+    with _gc_paused():
+        columns = [[getattr(line, f.name) for line, _ in pairs] for f in fields(ValveLine)]
+        columns += [[row[i] for _, row in pairs] for i in range(n_results)]
+    arrays = [_number_column(values) if field.type == pa.float64() else _text_column(values)
+              for field, values in zip(schema, columns)]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def write_results(path, pairs, fmt=None, compression=None):
+    write_table(results_table(pairs), path, fmt, compression)
+
+
+def _check_columns(table, names, path):
+    missing = [n for n in names if n not in table.column_names]
+    if missing:
+        raise ValueError("%s is missing columns: %s" % (path, ", ".join(missing)))
+
+
+def read_results_table(path, fmt=None):
+    """Results as a pyarrow Table (no conversion to Python objects, for analytics)"""
+    table = read_table(path, fmt)
+    _check_columns(table, OUTPUT_HEADERS, path)
+    return table.select(OUTPUT_HEADERS)
+
+
+def read_results(path, fmt=None):
+    """List of (ValveLine, 13 result values); null result cells become "" """
+    table = read_results_table(path, fmt)
+    with _gc_paused():
+        lines = [ValveLine(*row) for row in _table_rows(table, VALVELIST_INPUT_HEADERS)]
+        results = []
+        for header in VALVELIST_RESULT_HEADERS:
+            column = table.column(header)
+            if header not in NUMBER_COLUMNS:
+                results.append(column.fill_null("").to_pylist())
+            elif column.null_count:
+                results.append(["" if v is None else v for v in column.to_pylist()])
+            else:
+                results.append(column.to_pylist())
+        return list(zip(lines, map(list, zip(*results))))
+
+
+def iter_arrow_lines(path, fmt=None):
+    """Yield ValveLine for each row with a Line No. (input columns only)"""
+    table = read_table(path, fmt)
+    _check_columns(table, VALVELIST_INPUT_HEADERS, path)
+    for batch in table.select(VALVELIST_INPUT_HEADERS).to_batches():
+        columns = [c.to_pylist() for c in batch.columns]
+        for row in zip(*columns):
+            line = ValveLine(*row)
+            if to_str(line.line_no).strip() != "":
+                yield line
+
+
+class ArrowResultWriter:
+    """Stream results into an Arrow IPC or Parquet file (sizing_cli.py writer)
+
+    Rows are buffered and written in batches of BATCH_ROWS; close() writes the rest.
+    """
+
+    def __init__(self, path, fmt=None, compression=None, extra_headers=()):
+        _require_pyarrow()
+        self.fmt = _format_of(path, fmt)
+        self.extra_headers = list(extra_headers)
+        self.schema = _results_schema(self.extra_headers)
+        self.pending = []
+        if self.fmt == "parquet":
+            self.writer = pq.ParquetWriter(path, self.schema, compression=compression or "zstd")
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema,
+                                          options=pa.ipc.IpcWriteOptions(compression=compression))
+
+    def write(self, line, result_row):
+        self.pending.append((line, result_row))
+
+    def _write_pending(self):
+        if self.pending:
+            self.writer.write_table(results_table(self.pending, self.extra_headers))
+            self.pending = []
+
+    def flush(self):
+        if len(self.pending) >= BATCH_ROWS:
+            self._write_pending()
+
+    def close(self):
+        self._write_pending()
+        self.writer.close()
+
+
+# ============================================
+# Main
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export catalog tables or sizing results to Arrow/Parquet")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_cat = sub.add_parser("catalog", help="DB_* sheets -> one file per sheet")
+    p_cat.add_argument("output_dir")
+    p_cat.add_argument("--source", help="Workbook with DB_* sheets (default: create_workbook.py data)")
+    p_cat.add_argument("--format", choices=FORMATS, default="parquet")
+
+    p_res = sub.add_parser("results", help="ValveList inputs + results -> one file")
+    p_res.add_argument("workbook", help="Sized NoahSizing.xlsx / .xlsm")
+    p_res.add_argument("output", help="results.parquet or results.arrow")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "catalog":
+            headers = {}
+            tables = read_tables(args.source, headers=headers) if args.source else generate_tables(headers)
+            for path in write_catalog(args.output_dir, tables, headers, args.format):
+                print("Wrote: %s" % path)
+        else:
+            pairs = list(iter_xlsx_results(args.workbook))
+            write_results(args.output, pairs)
+            print("Wrote: %s (%d lines)" % (args.output, len(pairs)))
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
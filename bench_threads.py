@@ -0,0 +1,93 @@
+"""
+Noah Actuator Sizing Tool - Threaded Sizing Benchmark
+Speedup curve of the sizing_batch.py thread pool against the per-line engine and worker processes
+
+Usage:
+    python bench_threads.py big_project.csv                             # threads 1,2,4,8
+    python bench_threads.py big_project.csv --threads 1,2,4 --jobs 2,4 > bench_output.txt
+    python bench_threads.py lines.csv --catalog catalog.db --repeat 3
+
+The lines are read into memory first, so every run times sizing only
+(catalog load and process start-up included, output excluded). Each run's
+result rows are hashed and must equal the per-line baseline; a differing
+run is reported as MISMATCH and the exit code is 1.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+
+from sizing_cli import CHUNK_SIZE, iter_results
+from sizing_settings import load_settings
+from valvelist_io import iter_lines
+
+
+def _int_list(text):
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+def timed_run(lines, catalog_path, settings, chunk_size, jobs=1, threads=None):
+    """(seconds, digest of all result rows)"""
+    digest = hashlib.sha256()
+    start = time.perf_counter()
+    for _, rows in iter_results(iter(lines), catalog_path, settings, jobs, chunk_size, threads=threads):
+        for row in rows:
+            digest.update(repr(row).encode("utf-8"))
+    return time.perf_counter() - start, digest.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark threaded batch sizing")
+    parser.add_argument("input", help="ValveList workbook, CSV, JSONL or Arrow/Parquet file")
+    parser.add_argument("--settings", help="Workbook (Settings sheet) or JSON file with settings")
+    parser.add_argument("--catalog", help="Workbook, catalog directory or SQLite database (default: create_workbook.py data)")
+    parser.add_argument("--threads", default="1,2,4,8", help="Thread counts (default 1,2,4,8)")
+    parser.add_argument("--jobs", default="", help="Worker process counts to compare (default none)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lines per task")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per configuration (best time is kept)")
+    args = parser.parse_args(argv)
+
+    try:
+        settings = load_settings(args.settings)
+        lines = list(iter_lines(args.input))
+        thread_counts, job_counts = _int_list(args.threads), _int_list(args.jobs)
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+
+    runs = [("per-line", 1, dict())]
+    runs += [("processes", n, dict(jobs=n)) for n in job_counts]
+    runs += [("threads", n, dict(threads=n)) for n in thread_counts]
+    print("%d lines, chunk size %d, %d CPUs" % (len(lines), args.chunk_size, os.cpu_count() or 1))
+    print("%-10s %7s %9s %11s %8s %8s" % ("mode", "workers", "seconds", "lines/s", "speedup", "scaling"))
+
+    baseline = digest0 = single_thread = None
+    failed = False
+    for mode, workers, kwargs in runs:
+        try:
+            results = [timed_run(lines, args.catalog, settings, args.chunk_size, **kwargs)
+                       for _ in range(max(args.repeat, 1))]
+        except (ImportError, OSError, ValueError) as e:
+            print("Error: %s" % e, file=sys.stderr)
+            return 1
+        seconds = min(t for t, _ in results)
+        digests = {d for _, d in results}
+        if baseline is None:
+            baseline, digest0 = seconds, digests.pop()
+            digests = {digest0}
+        if mode == "threads" and single_thread is None:
+            single_thread = seconds
+        match = digests == {digest0}
+        failed = failed or not match
+        # speedup: against the per-line engine; scaling: against one thread of the batch kernel
+        scaling = "%8.2f" % (single_thread / seconds) if mode == "threads" else "%8s" % "-"
+        print("%-10s %7d %9.2f %11.0f %8.2f %s%s" % (
+            mode, workers, seconds, len(lines) / seconds if seconds else 0.0, baseline / seconds,
+            scaling, "" if match else "  MISMATCH"), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Noah Actuator Sizing Tool - Parallel Workbook Generator
+Builds every sheet of NoahSizing.xlsx in a separate process and assembles the
+xlsx package from the finished sheet parts
+
+Each worker runs the normal create_workbook.py setup function for one sheet on
+its own one-sheet Workbook, so the output matches create_workbook() while the
+build time is bounded by the largest sheet (DB_Models / DB_PowerOptions /
+DB_ElectricalData) instead of the sum of all sheets. Catalog variants
+(per-customer price lists, restricted model ranges) are built in the same
+process pool, so a bulk run keeps every core busy.
+
+Usage:
+    python build_parallel.py                              # NoahSizing.xlsx
+    python build_parallel.py --variants variants.json --jobs 8
+
+variants.json:
+    [
+        {"name": "CustomerA", "output": "NoahSizing_CustomerA.xlsx",
+         "series": ["NA", "SA", "SR"], "price_factor": 1.12},
+        {"name": "Distributor", "price_factor": 0.9}
+    ]
+
+A variant without "output" is written to NoahSizing_<name>.xlsx, or
+NoahSizing_<n>.xlsx (n = position in the list from 1) without a name.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+
+from create_workbook import (create_styles, setup_settings_sheet, setup_valvelist_sheet,
+                             setup_configuration_sheet, setup_datasheet_template, DB_SHEETS,
+                             db_range_name)
+from xlsx_package import (read_package, write_package, workbook_sheets, shared_strings,
+                          iter_sheet_rows, sheet_extent, range_ref, set_defined_names,
+                          StyleSheet, transplant_sheet)
+
+# Sheet order and visibility as in create_workbook()
+FRONT_SHEETS = ["Settings", "ValveList", "Configuration"]
+SHEET_ORDER = FRONT_SHEETS + [name for name, _ in DB_SHEETS] + ["Template_Datasheet"]
+
+# Largest sheets first so the pool never waits on a big sheet started last
+BUILD_PRIORITY = ["DB_PowerOptions", "DB_ElectricalData", "DB_Models", "ValveList"]
+
+# Columns scaled by a variant's price_factor
+PRICE_COLUMNS = ("BasePrice", "PriceAdder", "Price")
+
+# Sheets whose rows belong to an actuator model (filtered by a variant's series)
+MODEL_SHEETS = ("DB_Models", "DB_PowerOptions", "DB_EnclosureOptions", "DB_ElectricalData")
+
+CT_WORKSHEET = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+REL_WORKSHEET = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"
+
+
+# ============================================
+# Sheet Workers
+# ============================================
+
+def setup_sheet(ws, name):
+    """Run the create_workbook.py setup function for one sheet"""
+    header_font, header_fill, header_font_white, thin_border = create_styles()
+
+    if name == "Settings":
+        setup_settings_sheet(ws, header_font, thin_border)
+    elif name == "ValveList":
+        setup_valvelist_sheet(ws, header_font_white, header_fill, thin_border)
+    elif name == "Configuration":
+        setup_configuration_sheet(ws, header_font_white, header_fill, thin_border)
+    elif name == "Template_Datasheet":
+        setup_datasheet_template(ws, header_font, thin_border)
+    else:
+        dict(DB_SHEETS)[name](ws, header_font_white, header_fill, thin_border)
+
+
+def apply_variant(ws, name, variant):
+    """Restrict model rows and scale prices of a DB sheet for a catalog variant
+
+    variant keys (all optional):
+    - series: list of series to keep (NA, SA, SR, MA, MS, NL)
+    - price_factor: multiplier for BasePrice / PriceAdder / Price columns
+    """
+    if not variant or not name.startswith("DB_"):
+        return
+
+    headers = [c.value for c in ws[1]]
+    series = variant.get("series")
+    factor = variant.get("price_factor", 1)
+
+    if series and name in MODEL_SHEETS:
+        keep = set(series)
+        if name == "DB_Models":
+            col = headers.index("Series") + 1
+
+            def series_of(row):
+                return ws.cell(row=row, column=col).value
+        else:
+            # Option tables only carry the model name; every Noah model name
+            # starts with its two-letter series code (NA006, SA005L, MS01, ...)
+            col = headers.index("Model") + 1
+
+            def series_of(row):
+                return str(ws.cell(row=row, column=col).value or "")[:2]
+
+        drop = [r for r in range(2, ws.max_row + 1) if series_of(r) not in keep]
+        # Delete bottom-up in contiguous blocks (delete_rows shifts everything below)
+        while drop:
+            end = drop.pop()
+            start = end
+            while drop and drop[-1] == start - 1:
+                start = drop.pop()
+            ws.delete_rows(start, end - start + 1)
+
+    if factor != 1:
+        for header in PRICE_COLUMNS:
+            if header not in headers:
+                continue
+            col = headers.index(header) + 1
+            for r in range(2, ws.max_row + 1):
+                cell = ws.cell(row=r, column=col)
+                if isinstance(cell.value, (int, float)):
+                    cell.value = round(cell.value * factor)
+
+
+def build_sheet_part(task):
+    """Worker: build one sheet (optionally for a variant) as a one-sheet xlsx"""
+    name, variant = task
+    wb = Workbook()
+    ws = wb.active
+    ws.title = name
+    setup_sheet(ws, name)
+    apply_variant(ws, name, variant)
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+# ============================================
+# Package Assembly
+# ============================================
+
+def assemble_workbook(sheet_packages, dest):
+    """Assemble one workbook from one-sheet packages
+
+    sheet_packages: [(sheet name, state, xlsx bytes), ...] in workbook order.
+    The first package provides theme, document properties and the base
+    styles; the other sheets have their styles merged into it.
+    """
+    base = read_package(sheet_packages[0][2])
+    styles = StyleSheet(base["xl/styles.xml"])
+
+    parts = {}
+    sheet_entries = []
+    rels = []
+    overrides = []
+    range_names = {}
+
+    for i, (name, state, data) in enumerate(sheet_packages, 1):
+        pkg = base if i == 1 else read_package(data)
+        src_part = workbook_sheets(pkg)[0][2]
+        xml = pkg[src_part]
+        if name.startswith("DB_"):
+            # After apply_variant, so a restricted variant gets its own row count
+            last_row, last_col = sheet_extent(iter_sheet_rows(xml, shared_strings(pkg)))
+            range_names[db_range_name(name)] = range_ref(name, last_row, last_col)
+        if i > 1:
+            xml = transplant_sheet(xml, StyleSheet(pkg["xl/styles.xml"]), styles,
+                                   src_strings=shared_strings(pkg))
+            # Only the first sheet may be selected, otherwise Excel groups the tabs
+            xml = re.sub(rb'\s+tabSelected="1"', b"", xml)
+
+        part = "xl/worksheets/sheet%d.xml" % i
+        parts[part] = xml
+        sheet_entries.append('<sheet name="%s" sheetId="%d" state="%s" r:id="rId%d"/>' % (name, i, state, i))
+        rels.append('<Relationship Id="rId%d" Type="%s" Target="/%s"/>' % (i, REL_WORKSHEET, part))
+        overrides.append('<Override PartName="/%s" ContentType="%s"/>' % (part, CT_WORKSHEET))
+
+    n = len(sheet_packages)
+    rels.append('<Relationship Id="rId%d" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                'relationships/styles" Target="styles.xml"/>' % (n + 1))
+    rels.append('<Relationship Id="rId%d" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+                'relationships/theme" Target="theme/theme1.xml"/>' % (n + 2))
+
+    parts["xl/workbook.xml"] = set_defined_names((
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<workbookPr/><bookViews><workbookView activeTab="0"/></bookViews>'
+        '<sheets>%s</sheets><calcPr calcId="124519" fullCalcOnLoad="1"/></workbook>'
+        % "".join(sheet_entries)).encode("utf-8"), range_names)
+    parts["xl/_rels/workbook.xml.rels"] = (
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">%s'
+        '</Relationships>' % "".join(rels)).encode("utf-8")
+    parts["xl/styles.xml"] = styles.to_bytes()
+    for name in ("_rels/.rels", "docProps/app.xml", "docProps/core.xml", "xl/theme/theme1.xml"):
+        parts[name] = base[name]
+
+    # Content types: keep the base defaults/overrides, replace worksheet overrides
+    ct = base["[Content_Types].xml"].decode("utf-8")
+    ct = re.sub(r'<Override PartName="/xl/worksheets/[^"]*"[^>]*/>', "", ct)
+    ct = ct.replace("</Types>", "".join(overrides) + "</Types>")
+    parts["[Content_Types].xml"] = ct.encode("utf-8")
+
+    write_package(parts, dest)
+
+
+def sheet_state(name):
+    return "visible" if name in FRONT_SHEETS else "hidden"
+
+
+def build_workbooks(variants, jobs=None):
+    """Build one workbook per variant, all sheets of all variants in one pool
+
+    variants: list of dicts with at least "output" (see apply_variant for the
+    other keys). Returns {output path: seconds from start to file written}.
+    Raises ValueError when two variants write the same file.
+    """
+    seen = set()
+    for variant in variants:
+        path = os.path.normcase(os.path.abspath(variant["output"]))
+        if path in seen:
+            raise ValueError("Duplicate variant output: %s" % variant["output"])
+        seen.add(path)
+
+    tasks = []
+    for v_idx, variant in enumerate(variants):
+        for name in SHEET_ORDER:
+            tasks.append((v_idx, name))
+    tasks.sort(key=lambda t: BUILD_PRIORITY.index(t[1]) if t[1] in BUILD_PRIORITY else len(BUILD_PRIORITY))
+
+    start = time.perf_counter()
+    built = {}
+    if jobs == 1:
+        for v_idx, name in tasks:
+            built[(v_idx, name)] = build_sheet_part((name, variants[v_idx]))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {(v_idx, name): pool.submit(build_sheet_part, (name, variants[v_idx]))
+                       for v_idx, name in tasks}
+            for key, future in futures.items():
+                built[key] = future.result()
+
+    timings = {}
+    for v_idx, variant in enumerate(variants):
+        sheet_packages = [(name, sheet_state(name), built[(v_idx, name)]) for name in SHEET_ORDER]
+        assemble_workbook(sheet_packages, variant["output"])
+        timings[variant["output"]] = time.perf_counter() - start
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build NoahSizing workbooks with one process per sheet")
+    parser.add_argument("--variants", help="JSON file with a list of catalog variants")
+    parser.add_argument("--output", default="NoahSizing.xlsx", help="Output file when no variants are given")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: CPU count, 1 = serial)")
+    args = parser.parse_args(argv)
+
+    if args.variants:
+        with open(args.variants, encoding="utf-8") as f:
+            variants = json.load(f)
+        for i, v in enumerate(variants, 1):
+            v.setdefault("output", "NoahSizing_%s.xlsx" % v.get("name", i))
+    else:
+        variants = [{"output": args.output}]
+
+    try:
+        timings = build_workbooks(variants, args.jobs)
+    except ValueError as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    for path, seconds in timings.items():
+        print("%s created (%.2fs)" % (path, seconds))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
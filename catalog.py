@@ -0,0 +1,693 @@
+"""
+Noah Actuator Sizing Tool - Catalog Tables
+Python records for the DB_* sheets (same fields as the VBA types in modHelpers)
+
+The catalog is read either from a workbook (NoahSizing.xlsx / .xlsm, streamed
+with xlsx_package) or generated in memory with the create_workbook.py setup
+functions. Cell values are converted the way the VBA helpers do it
+(GetCellDouble, GetCellInt, CStr), so the Python engine sees the same numbers.
+"""
+
+import os
+from dataclasses import dataclass
+
+from openpyxl import Workbook
+
+from create_workbook import create_styles, DB_SHEETS
+from xlsx_package import read_package, workbook_sheets, shared_strings, iter_sheet_rows
+
+DB_SHEET_NAMES = [name for name, _ in DB_SHEETS]
+
+
+# ============================================
+# Cell Value Conversion (modHelpers equivalents)
+# ============================================
+
+def to_float(value):
+    """GetCellDouble: numbers and numeric text, everything else is 0"""
+    if value is None or isinstance(value, bool):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return 0.0
+
+
+def to_int(value):
+    """GetCellInt: CInt rounding (half to even), non-numeric is 0"""
+    return int(round(to_float(value)))
+
+
+def to_str(value):
+    """CStr: empty for blank cells, whole numbers without ".0" """
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# ============================================
+# Records
+# ============================================
+
+@dataclass
+class ModelRecord:
+    """DB_Models row (flat structure - each Model x Freq x kW/RPM is a row)"""
+    model: str
+    series: str               # MA, MS, NA, SA, SR, NL
+    act_type: str             # Multi-turn, Part-turn, Linear
+    motor_power_kw: float     # MA series only (0 if N/A)
+    control_type: str         # SA series only (ONOFF, PCU, SCP)
+    phase: int                # MS series only (1 or 3), other series = 0
+    freq: int                 # 50 or 60 Hz
+    rpm: float                # Multi-turn only
+    torque: float             # Nm (Linear uses 0)
+    thrust: float             # kN (Multi-turn, Linear)
+    op_time: float            # Part-turn only (90 degree operation time)
+    duty_cycle: str
+    output_flange: str
+    max_stem_dim: float
+    weight: float
+    base_price: float
+    speed: float              # mm/sec (Linear only)
+    stroke: float             # mm (Linear only)
+
+    @classmethod
+    def from_row(cls, row):
+        row = list(row) + [None] * (18 - len(row))
+        return cls(
+            model=to_str(row[0]), series=to_str(row[1]), act_type=to_str(row[2]),
+            motor_power_kw=to_float(row[3]), control_type=to_str(row[4]),
+            phase=to_int(row[5]), freq=to_int(row[6]), rpm=to_float(row[7]),
+            torque=to_float(row[8]), thrust=to_float(row[9]), op_time=to_float(row[10]),
+            duty_cycle=to_str(row[11]), output_flange=to_str(row[12]),
+            max_stem_dim=to_float(row[13]), weight=to_float(row[14]),
+            base_price=to_float(row[15]), speed=to_float(row[16]), stroke=to_float(row[17]))
+
+
+@dataclass
+class GearboxRecord:
+    """DB_Gearboxes row"""
+    model: str
+    ratio: float
+    input_torque_max: float
+    output_torque_max: float
+    efficiency: float
+    input_flange: str
+    output_flange: str
+    max_stem_dim: float
+    weight: float
+    price: float
+
+    @classmethod
+    def from_row(cls, row):
+        row = list(row) + [None] * (10 - len(row))
+        return cls(
+            model=to_str(row[0]), ratio=to_float(row[1]),
+            input_torque_max=to_float(row[2]), output_torque_max=to_float(row[3]),
+            efficiency=to_float(row[4]), input_flange=to_str(row[5]),
+            output_flange=to_str(row[6]), max_stem_dim=to_float(row[7]),
+            weight=to_float(row[8]), price=to_float(row[9]))
+
+
+@dataclass
+class ActuatorRecord:
+    """Resolved actuator (DB_Models row joined with power and enclosure options)"""
+    model: str
+    series: str
+    act_type: str
+    motor_power_kw: float
+    torque: float
+    thrust: float
+    rpm: float
+    op_time: float
+    speed: float
+    stroke: float
+    voltage: int
+    phase: int
+    freq: int
+    enclosure: str
+    output_flange: str
+    max_stem_dim: float
+    weight: float
+    price: float              # BasePrice + PowerAdder + EnclosureAdder
+    row: int = 0              # index into Catalog.models
+
+
+@dataclass
+class CatalogEdit:
+    """One single-row edit applied to a Catalog (what SizingEngine.edit() refreshes)
+
+    kind "model" / "gearbox": row with the old and new record (None = inserted / deleted);
+    "power": model and (Voltage, Phase, Freq) with the old and new PriceAdder;
+    "enclosure": model whose DB_EnclosureOptions rows changed.
+    """
+    kind: str
+    row: int = -1
+    old: object = None
+    new: object = None
+    model: str = ""
+    bus: tuple = ()
+
+
+# Catalog methods SizingEngine.edit() accepts
+CATALOG_EDITS = ["insert_model", "update_model", "delete_model", "set_power_option", "delete_power_option",
+                 "set_enclosure_option", "delete_enclosure_option", "insert_gearbox", "update_gearbox",
+                 "delete_gearbox"]
+
+
+# ============================================
+# Catalog
+# ============================================
+
+def _power_key(r):
+    r = list(r) + [None] * 4
+    return to_str(r[0]), to_int(r[1]), to_int(r[2]), to_int(r[3])
+
+
+def _enclosure_key(r):
+    r = list(r) + [None] * 2
+    return to_str(r[0]), to_str(r[1])
+
+
+class Catalog:
+    """All DB_* tables of one catalog version
+
+    tables: {sheet name: [row tuples without the header row]}
+
+    Single-row edits (insert_model, set_power_option, delete_gearbox, ...)
+    keep the tables and records in step. Deleted model and gearbox rows stay
+    as None in models / gearboxes, so row numbers (and the engine indexes
+    keyed by them) never shift; inserts are appended like a new sheet row.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.revision = 0           # number of edits applied
+
+        # Blank model rows are skipped by every VBA loop (Trim$(m.Model) = "")
+        self.models = []
+        self._model_table = []      # model row -> DB_Models table index
+        for index, r in enumerate(tables.get("DB_Models", [])):
+            m = ModelRecord.from_row(r)
+            if m.model.strip():
+                self.models.append(m)
+                self._model_table.append(index)
+        self._model_count = len(self.models)
+
+        # HasPowerOption / HasEnclosureOption / GetCouplingLimits return the first matching row
+        self.power_options = {}
+        for r in tables.get("DB_PowerOptions", []):
+            self.power_options.setdefault(_power_key(r), to_float((list(r) + [None] * 5)[4]))
+
+        self.enclosure_options = {}
+        for r in tables.get("DB_EnclosureOptions", []):
+            r = list(r) + [None] * 3
+            self.enclosure_options.setdefault(to_str(r[0]), []).append((to_str(r[1]), to_float(r[2])))
+
+        # All rows are kept: "DB_Gearboxes is empty" depends on the row count, not validity
+        self.gearboxes = [GearboxRecord.from_row(r) for r in tables.get("DB_Gearboxes", [])]
+        self._gearbox_table = list(range(len(self.gearboxes)))
+
+        self.couplings = {}
+        for r in tables.get("DB_Couplings", []):
+            r = list(r) + [None] * 3
+            self.couplings.setdefault(to_str(r[0]), (to_float(r[1]), to_float(r[2])))
+
+        self.options = {}
+        for r in tables.get("DB_Options", []):
+            r = list(r) + [None] * 3
+            self.options.setdefault(to_str(r[0]), (to_str(r[1]), to_float(r[2])))
+
+    # -------- engine access paths (catalog_sqlite.SqliteCatalog answers these with SQL) --------
+
+    def has_sheet(self, name):
+        return name in self.tables
+
+    def has_gearbox_data(self):
+        """False when DB_Gearboxes has no named row ("DB_Gearboxes is empty")"""
+        return any(gb is not None and gb.model.strip() for gb in self.gearboxes)
+
+    def model_count(self):
+        return self._model_count
+
+    def model_rows(self, act_type=None, model_range="All", freq=None, phase=None, min_torque=None):
+        """(row, ModelRecord) in sheet order matching the coarse model filters
+
+        phase: keep rows with Phase 0 (not phase dependent) or this phase
+        """
+        return [(row, m) for row, m in enumerate(self.models)
+                if m is not None and model_row_matches(m, act_type, model_range, freq, phase, min_torque)]
+
+    def valid_gearboxes(self):
+        """(row, GearboxRecord) with a model and Ratio > 0, by InputFlange, Ratio, row"""
+        valid = [(row, gb) for row, gb in enumerate(self.gearboxes) if gearbox_is_valid(gb)]
+        valid.sort(key=lambda t: (t[1].input_flange, t[1].ratio, t[0]))
+        return valid
+
+    def gearbox(self, row):
+        return self.gearboxes[row]
+
+    def power_adder(self, model, voltage, phase, freq):
+        """HasPowerOption: price adder, or None if the combination does not exist"""
+        return self.power_options.get((model, voltage, phase, freq))
+
+    def enclosure_option(self, model, setting_enclosure):
+        """HasEnclosureOption: (actual enclosure, price adder) or None"""
+        for enclosure, adder in self.enclosure_options.get(model, ()):
+            if match_enclosure(enclosure, setting_enclosure):
+                return enclosure, adder
+        return None
+
+    def coupling_limits(self, coupling_type):
+        """GetCouplingLimits: (min, max) or None for an unknown type"""
+        return self.couplings.get(coupling_type)
+
+    def model_filters(self):
+        """ModelFilterBitmaps over model_rows()"""
+        return ModelFilterBitmaps(
+            self.model_rows(), self.power_options,
+            [(model, enclosure) for model, options in self.enclosure_options.items()
+             for enclosure, _ in options])
+
+    # -------- single-row edits (SizingEngine.edit() also updates the engine indexes) --------
+
+    def _sheet_rows(self, sheet):
+        rows = self.tables.get(sheet)
+        if rows is None:
+            raise ValueError("%s sheet not found." % sheet)
+        if not isinstance(rows, list):
+            rows = self.tables[sheet] = list(rows)
+        return rows
+
+    def _edited(self, edit):
+        self.revision += 1
+        return edit
+
+    def _live(self, records, row, sheet):
+        if not 0 <= row < len(records) or records[row] is None:
+            raise ValueError("%s row %s not found" % (sheet, row))
+        return records[row]
+
+    def insert_model(self, values):
+        """Append a DB_Models row (sheet column order); returns the CatalogEdit"""
+        m = ModelRecord.from_row(values)
+        if not m.model.strip():
+            raise ValueError("DB_Models row needs a Model")
+        rows = self._sheet_rows("DB_Models")
+        rows.append(tuple(values))
+        self.models.append(m)
+        self._model_table.append(len(rows) - 1)
+        self._model_count += 1
+        return self._edited(CatalogEdit("model", len(self.models) - 1, None, m))
+
+    def update_model(self, row, values):
+        old = self._live(self.models, row, "DB_Models")
+        m = ModelRecord.from_row(values)
+        if not m.model.strip():
+            raise ValueError("DB_Models row needs a Model")
+        self._sheet_rows("DB_Models")[self._model_table[row]] = tuple(values)
+        self.models[row] = m
+        return self._edited(CatalogEdit("model", row, old, m))
+
+    def delete_model(self, row):
+        old = self._live(self.models, row, "DB_Models")
+        index = self._model_table[row]
+        del self._sheet_rows("DB_Models")[index]
+        self.models[row] = None
+        self._model_table[row] = None
+        for later in range(row + 1, len(self._model_table)):
+            if self._model_table[later] is not None:
+                self._model_table[later] -= 1
+        self._model_count -= 1
+        return self._edited(CatalogEdit("model", row, old, None))
+
+    def set_power_option(self, model, voltage, phase, freq, price_adder):
+        """Add a DB_PowerOptions row, or change the PriceAdder HasPowerOption reads"""
+        key = _power_key((model, voltage, phase, freq))
+        rows = self._sheet_rows("DB_PowerOptions")
+        old = self.power_options.get(key)
+        if old is None:
+            rows.append(key + (price_adder,))
+        else:
+            index = next(i for i, r in enumerate(rows) if r and to_str(r[0]) == key[0] and _power_key(r) == key)
+            rows[index] = key + (price_adder,) + tuple(rows[index][5:])
+        self.power_options[key] = to_float(price_adder)
+        return self._edited(CatalogEdit("power", old=old, new=self.power_options[key],
+                                        model=key[0], bus=key[1:]))
+
+    def delete_power_option(self, model, voltage, phase, freq):
+        """Remove every DB_PowerOptions row of the key"""
+        key = _power_key((model, voltage, phase, freq))
+        if key not in self.power_options:
+            raise ValueError("DB_PowerOptions %s %d/%d/%d not found" % key)
+        rows = self._sheet_rows("DB_PowerOptions")
+        rows[:] = [r for r in rows if not (r and to_str(r[0]) == key[0] and _power_key(r) == key)]
+        old = self.power_options.pop(key)
+        return self._edited(CatalogEdit("power", old=old, model=key[0], bus=key[1:]))
+
+    def set_enclosure_option(self, model, enclosure, price_adder):
+        """Add a DB_EnclosureOptions row, or change the PriceAdder of the model's first such row"""
+        key = _enclosure_key((model, enclosure))
+        rows = self._sheet_rows("DB_EnclosureOptions")
+        options = self.enclosure_options.setdefault(key[0], [])
+        position = next((i for i, (e, _) in enumerate(options) if e == key[1]), None)
+        if position is None:
+            rows.append(key + (price_adder,))
+            options.append((key[1], to_float(price_adder)))
+        else:
+            index = next(i for i, r in enumerate(rows) if _enclosure_key(r) == key)
+            rows[index] = key + (price_adder,) + tuple(rows[index][3:])
+            options[position] = (key[1], to_float(price_adder))
+        return self._edited(CatalogEdit("enclosure", model=key[0]))
+
+    def delete_enclosure_option(self, model, enclosure):
+        """Remove every DB_EnclosureOptions row of the model and enclosure"""
+        key = _enclosure_key((model, enclosure))
+        options = [option for option in self.enclosure_options.get(key[0], []) if option[0] != key[1]]
+        if len(options) == len(self.enclosure_options.get(key[0], [])):
+            raise ValueError("DB_EnclosureOptions %s %s not found" % key)
+        rows = self._sheet_rows("DB_EnclosureOptions")
+        rows[:] = [r for r in rows if _enclosure_key(r) != key]
+        if options:
+            self.enclosure_options[key[0]] = options
+        else:
+            del self.enclosure_options[key[0]]
+        return self._edited(CatalogEdit("enclosure", model=key[0]))
+
+    def insert_gearbox(self, values):
+        """Append a DB_Gearboxes row (sheet column order)"""
+        gb = GearboxRecord.from_row(values)
+        rows = self._sheet_rows("DB_Gearboxes")
+        rows.append(tuple(values))
+        self.gearboxes.append(gb)
+        self._gearbox_table.append(len(rows) - 1)
+        return self._edited(CatalogEdit("gearbox", len(self.gearboxes) - 1, None, gb))
+
+    def update_gearbox(self, row, values):
+        old = self._live(self.gearboxes, row, "DB_Gearboxes")
+        gb = GearboxRecord.from_row(values)
+        self._sheet_rows("DB_Gearboxes")[self._gearbox_table[row]] = tuple(values)
+        self.gearboxes[row] = gb
+        return self._edited(CatalogEdit("gearbox", row, old, gb))
+
+    def delete_gearbox(self, row):
+        old = self._live(self.gearboxes, row, "DB_Gearboxes")
+        del self._sheet_rows("DB_Gearboxes")[self._gearbox_table[row]]
+        self.gearboxes[row] = None
+        self._gearbox_table[row] = None
+        for later in range(row + 1, len(self._gearbox_table)):
+            if self._gearbox_table[later] is not None:
+                self._gearbox_table[later] -= 1
+        return self._edited(CatalogEdit("gearbox", row, old, None))
+
+
+# ============================================
+# Model Filter Bitmaps
+# ============================================
+
+def _set_bits(index, key, bits):
+    index[key] = index.get(key, 0) | bits
+
+
+def _clear_bits(index, key, bits):
+    """Inverse of _set_bits; keys without bits are dropped (as if never set)"""
+    mask = index.get(key, 0) & ~bits
+    if mask:
+        index[key] = mask
+    else:
+        index.pop(key, None)
+
+
+def bitmap_rows(mask):
+    """Row numbers of the set bits, ascending"""
+    rows = []
+    while mask:
+        low = mask & -mask
+        rows.append(low.bit_length() - 1)
+        mask ^= low
+    return rows
+
+
+class ModelFilterBitmaps:
+    """Model row bitmaps (bit n = model row n) for the checks that depend only
+    on Settings values and the catalog
+
+    One bitmap per value: ActType, Series, Freq, Phase, DutyCycle S2/S4, SA
+    ControlType, power option (Voltage, Phase, Freq) and enclosure setting.
+    PassesModelFilters (without the per-line thrust check) and ResolveActuator
+    availability for a Settings profile are then ANDs of a few bitmaps.
+
+    set_row / add_power_key / remove_power_key / set_enclosures update the
+    bitmaps for one catalog edit (Catalog.insert_model, ...).
+    """
+
+    def __init__(self, model_rows, power_keys, enclosures):
+        """model_rows: (row, ModelRecord); power_keys: (Model, Voltage, Phase, Freq);
+        enclosures: (Model, Enclosure) rows of DB_EnclosureOptions"""
+        self.all = 0
+        self.act_type = {}
+        self.series = {}
+        self.freq = {}
+        self.phase = {}             # 0 = not phase dependent (any phase)
+        self.duty = {"S2": 0, "S4": 0}
+        self.sa = 0
+        self.control = {}           # SA rows by ControlType
+        self.by_model = {}
+        for row, m in model_rows:
+            self._add_row(1 << row, m)
+
+        self.power = {}
+        self.bus_models = {}        # (Voltage, Phase, Freq) -> models with a power option
+        for model, voltage, phase, freq in power_keys:
+            _set_bits(self.power, (voltage, phase, freq), self.by_model.get(model, 0))
+            self.bus_models.setdefault((voltage, phase, freq), set()).add(model)
+        # "" = any enclosure option (MatchEnclosure is True for other settings)
+        self.enclosure = {"": 0, "Waterproof": 0, "Explosionproof": 0}
+        self.model_enclosures = {}
+        for model, enclosure in enclosures:
+            bits = self.by_model.get(model, 0)
+            self.model_enclosures.setdefault(model, []).append(enclosure)
+            for setting in self.enclosure:
+                if match_enclosure(enclosure, setting):
+                    self.enclosure[setting] |= bits
+        self._profiles = {}
+
+    def _add_row(self, bit, m):
+        self.all |= bit
+        _set_bits(self.act_type, m.act_type, bit)
+        _set_bits(self.series, m.series, bit)
+        _set_bits(self.freq, m.freq, bit)
+        _set_bits(self.phase, m.phase if m.phase > 0 else 0, bit)
+        for code in self.duty:
+            if code in m.duty_cycle:
+                self.duty[code] |= bit
+        if m.series == "SA":
+            self.sa |= bit
+            _set_bits(self.control, m.control_type, bit)
+        _set_bits(self.by_model, m.model, bit)
+
+    def _power_bits(self, bits, model, present):
+        """Set (present) or clear bits in the power bitmaps of model's buses"""
+        for bus, models in self.bus_models.items():
+            if model in models:
+                self.power[bus] = self.power[bus] | bits if present else self.power[bus] & ~bits
+
+    def _enclosure_bits(self, bits, model, present):
+        for enclosure in self.model_enclosures.get(model, ()):
+            for setting in self.enclosure:
+                if match_enclosure(enclosure, setting):
+                    self.enclosure[setting] = (self.enclosure[setting] | bits if present
+                                               else self.enclosure[setting] & ~bits)
+
+    # -------- incremental updates --------
+
+    def set_row(self, row, old, new):
+        """Model row changed from ModelRecord old to new (None = not in the catalog)"""
+        bit = 1 << row
+        if old is not None:
+            self.all &= ~bit
+            _clear_bits(self.act_type, old.act_type, bit)
+            _clear_bits(self.series, old.series, bit)
+            _clear_bits(self.freq, old.freq, bit)
+            _clear_bits(self.phase, old.phase if old.phase > 0 else 0, bit)
+            for code in self.duty:
+                self.duty[code] &= ~bit
+            self.sa &= ~bit
+            if old.series == "SA":
+                _clear_bits(self.control, old.control_type, bit)
+            _clear_bits(self.by_model, old.model, bit)
+            self._power_bits(bit, old.model, False)
+            self._enclosure_bits(bit, old.model, False)
+        if new is not None:
+            self._add_row(bit, new)
+            self._power_bits(bit, new.model, True)
+            self._enclosure_bits(bit, new.model, True)
+        self._profiles.clear()
+
+    def add_power_key(self, model, bus):
+        self.bus_models.setdefault(bus, set()).add(model)
+        _set_bits(self.power, bus, self.by_model.get(model, 0))
+
+    def remove_power_key(self, model, bus):
+        models = self.bus_models[bus]
+        models.discard(model)
+        if models:
+            self.power[bus] &= ~self.by_model.get(model, 0)
+        else:
+            del self.bus_models[bus]
+            del self.power[bus]
+
+    def set_enclosures(self, model, enclosures):
+        """DB_EnclosureOptions enclosures of model changed"""
+        bits = self.by_model.get(model, 0)
+        self._enclosure_bits(bits, model, False)
+        if enclosures:
+            self.model_enclosures[model] = list(enclosures)
+        else:
+            self.model_enclosures.pop(model, None)
+        self._enclosure_bits(bits, model, True)
+
+    def type_range_mask(self, act_type, model_range="All"):
+        """ActType + MatchModelRange"""
+        mask = self.act_type.get(act_type, 0)
+        if model_range not in ("All", ""):
+            mask &= self.series.get(model_range, 0)
+        return mask
+
+    def profile_mask(self, s):
+        """PassesModelFilters checks except ActType and thrust, cached per Settings profile"""
+        key = (s.model_range, s.frequency, s.phase, s.failsafe, s.duty_cycle, s.operation_mode)
+        mask = self._profiles.get(key)
+        if mask is None:
+            mask = self.all
+            if s.model_range not in ("All", ""):
+                mask &= self.series.get(s.model_range, 0)
+            mask &= self.freq.get(s.frequency, 0)
+            mask &= self.phase.get(0, 0) | (self.phase.get(s.phase, 0) if s.phase > 0 else 0)
+            if "SR" in s.failsafe:
+                mask &= self.series.get("SR", 0)
+            if s.duty_cycle != "Any":
+                if "S2" in s.duty_cycle:
+                    mask &= self.duty["S2"]
+                elif "S4" in s.duty_cycle:
+                    mask &= self.duty["S4"]
+            # Operation Mode applies to SA rows only
+            if s.operation_mode == "On-Off":
+                mask &= (self.all & ~self.sa) | self.control.get("ONOFF", 0)
+            elif "High-Speed" in s.operation_mode:
+                mask &= (self.all & ~self.sa) | self.control.get("SCP", 0)
+            elif s.operation_mode == "Modulating":
+                mask &= self.all & ~self.control.get("ONOFF", 0)
+            self._profiles[key] = mask
+        return mask
+
+    def settings_mask(self, s):
+        """Rows passing PassesModelFilters(m, s, 0); ActType picks one of the type bitmaps"""
+        return self.act_type.get(s.actuator_type, 0) & self.profile_mask(s)
+
+    def power_mask(self, s):
+        """Rows with a DB_PowerOptions row for the Settings bus (HasPowerOption)"""
+        return self.power.get((s.voltage, s.phase, s.frequency), 0)
+
+    def resolvable_mask(self, s):
+        """Rows ResolveActuator accepts: power option and a matching enclosure option"""
+        enclosure = s.enclosure if s.enclosure in ("Waterproof", "Explosionproof") else ""
+        return self.power_mask(s) & self.enclosure[enclosure]
+
+
+def model_row_matches(m, act_type=None, model_range="All", freq=None, phase=None, min_torque=None):
+    """Catalog.model_rows() filter of one ModelRecord"""
+    if act_type is not None and m.act_type != act_type:
+        return False
+    if not match_model_range(m.series, model_range):
+        return False
+    if freq is not None and m.freq != freq:
+        return False
+    if phase is not None and m.phase > 0 and m.phase != phase:
+        return False
+    if min_torque is not None and m.torque < min_torque:
+        return False
+    return True
+
+
+def gearbox_is_valid(gb):
+    """Gearbox rows the engine can use: a Model and Ratio > 0"""
+    return gb is not None and bool(gb.model.strip()) and gb.ratio > 0
+
+
+def match_enclosure(db_enclosure, setting_enclosure):
+    """MatchEnclosure: Waterproof = IP67/IP68, Explosionproof = Exd/Exde/Ex"""
+    if setting_enclosure == "Waterproof":
+        return "ip" in db_enclosure.lower()
+    if setting_enclosure == "Explosionproof":
+        return "ex" in db_enclosure.lower()
+    return True
+
+
+def match_model_range(db_series, setting_model_range):
+    """MatchModelRange: "All" (or empty) means no filtering"""
+    if setting_model_range in ("All", ""):
+        return True
+    return db_series == setting_model_range
+
+
+# ============================================
+# Loading
+# ============================================
+
+def read_tables(path, sheet_names=DB_SHEET_NAMES, headers=None):
+    """Read sheets of a workbook file as {sheet name: [row tuples without header]}
+
+    headers: optional dict that receives {sheet name: header row}
+    """
+    parts = read_package(path)
+    strings = shared_strings(parts)
+    wanted = set(sheet_names)
+    tables = {}
+    for name, _, part in workbook_sheets(parts):
+        if name not in wanted or part not in parts:
+            continue
+        rows = []
+        for rownum, values in iter_sheet_rows(parts[part], strings):
+            if rownum > 1:
+                rows.append(tuple(values))
+            elif headers is not None:
+                headers[name] = [to_str(v) for v in values]
+        tables[name] = rows
+    return tables
+
+
+def generate_tables(headers=None):
+    """Build the DB_* tables with the create_workbook.py setup functions (no file)
+
+    headers: optional dict that receives {sheet name: header row}
+    """
+    header_font, header_fill, header_font_white, thin_border = create_styles()
+    wb = Workbook()
+    tables = {}
+    for name, setup in DB_SHEETS:
+        ws = wb.create_sheet(name)
+        setup(ws, header_font_white, header_fill, thin_border)
+        if headers is not None:
+            headers[name] = [to_str(c.value) for c in ws[1]]
+        tables[name] = [tuple(r) for r in ws.iter_rows(min_row=2, values_only=True)]
+    return tables
+
+
+def load_catalog(path=None):
+    """Load the catalog from a workbook, an Arrow/Parquet catalog directory
+    (arrow_io.py), a SQLite database (catalog_sqlite.py), or generate it when
+    path is None"""
+    if path is None:
+        return Catalog(generate_tables())
+    if path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+        from catalog_sqlite import SqliteCatalog
+        return SqliteCatalog(path)
+    if os.path.isdir(path):
+        from arrow_io import read_catalog_tables
+        return Catalog(read_catalog_tables(path))
+    return Catalog(read_tables(path))
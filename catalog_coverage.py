@@ -0,0 +1,347 @@
+"""
+Noah Actuator Sizing Tool - Coverage Map
+Feasibility and cheapest price of the catalog over a grid of requirements (needs numpy)
+
+Usage:
+    python catalog_coverage.py                                                 # summary per bus x enclosure
+    python catalog_coverage.py --bus 380/3/50 --enclosure Explosionproof -o surface.csv --gaps gaps.csv
+    python catalog_coverage.py --price-list customer_a.json -o surface_a.csv   # prices of one customer
+    python catalog_coverage.py --catalog NoahSizing.xlsm --settings NoahSizing.xlsm \\
+        --torque 10:50000:500:log --op-time 10:600:40:log --turns 1:200:25:log --stem 0,40,60,80
+
+A profile is the Settings (--settings, create_workbook.py defaults otherwise)
+with one bus (Voltage / Phase / Freq) and one Enclosure: every --bus and
+--enclosure given, by default every bus of DB_PowerOptions x both Enclosure
+settings. The grid is the product of the requirement axes, in ValveList
+input units (Settings torque / thrust unit, safety factor applied like
+SizeLine):
+
+    --torque    Torque            (not checked for Linear; axis reduced to 0)
+    --thrust    Thrust
+    --op-time   Op.Time(sec)      0 = no Op. Time requirement
+    --turns     Lift / Pitch      (Multi-turn only)
+    --stem      Coupling dimension checked against MaxStemDim (0 = none)
+
+Axis: "a:b:n" (n values from a to b), "a:b:n:log" (geometric) or "v1,v2,...".
+
+Evaluation per (profile, stem, turns, thrust): the direct and single-stage
+gearbox combinations of SizingEngine.combinations() are sorted in the
+FindBestActuator order, the Op. Time window of every grid column is checked
+for all combinations at once, and a running maximum of the torque capacity
+down the sorted list turns "cheapest combination with capacity >= torque"
+into one binary search per column. The result is the same pick as sizing a
+line with those values (two-stage trains are not considered).
+
+Outputs:
+    -o       surface: one row per profile and grid point (Feasible, Price, Model, Gearbox)
+    --gaps   gap regions: runs of consecutive infeasible torque values per grid column
+    stdout   feasible share and gap region count per profile
+"""
+
+import csv
+import sys
+import time
+import argparse
+from dataclasses import dataclass, replace
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from catalog import load_catalog
+from price_overlay import load_price_overlay
+from sizing_engine import (SizingEngine, convert_torque_to_nm, convert_thrust_to_kn,
+                           split_combination_id)
+from sizing_settings import load_settings
+
+AXIS_DEFAULTS = {
+    "torque": "10:100000:400:log",
+    "thrust": "0",
+    "op_time": "0,15,30,60,120,240",
+    "turns": "1,5,10,25,50",
+    "stem": "0",
+}
+ACTUATOR_TYPES = ["Multi-turn", "Part-turn", "Linear"]
+PROFILE_HEADERS = ["Voltage", "Phase", "Freq", "Enclosure"]
+SURFACE_HEADERS = PROFILE_HEADERS + ["StemDim", "Turns", "Thrust", "OpTime", "Torque",
+                                     "Feasible", "Price", "Model", "Gearbox"]
+GAP_HEADERS = PROFILE_HEADERS + ["StemDim", "Turns", "Thrust", "OpTime",
+                                 "TorqueFrom", "TorqueTo", "Points"]
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for coverage maps (pip install numpy)")
+
+
+@dataclass
+class CoverageSlice:
+    """Torque x Op. Time surface of one profile at one (stem, turns, thrust) point"""
+    profile: tuple               # (voltage, phase, freq, enclosure)
+    stem_dim: float
+    turns: float
+    thrust: float
+    op_times: object             # numpy array (columns)
+    torques: object              # numpy array (rows)
+    price: object                # float array (torques x op_times), nan = infeasible
+    pick: object                 # int array, index into labels (len(labels) - 1 = none)
+    labels: list                 # (model, gearbox) per combination, ("", "") last
+
+    def feasible(self):
+        return ~np.isnan(self.price)
+
+
+# ============================================
+# Grid
+# ============================================
+
+def parse_axis(text):
+    """Sorted unique axis values of "a:b:n", "a:b:n:log" or "v1,v2,..." """
+    _require_numpy()
+    text = text.strip()
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) not in (3, 4) or (len(parts) == 4 and parts[3] != "log"):
+            raise ValueError("Invalid axis: %s (use a:b:n, a:b:n:log or v1,v2,...)" % text)
+        start, stop, count = float(parts[0]), float(parts[1]), int(parts[2])
+        if count < 1:
+            raise ValueError("Invalid axis: %s (n must be >= 1)" % text)
+        if len(parts) == 4:
+            if start <= 0 or stop <= 0:
+                raise ValueError("Invalid axis: %s (log axis needs values > 0)" % text)
+            values = np.geomspace(start, stop, count)
+        else:
+            values = np.linspace(start, stop, count)
+    else:
+        try:
+            values = np.array([float(v) for v in text.split(",") if v.strip()])
+        except ValueError:
+            raise ValueError("Invalid axis: %s (use a:b:n, a:b:n:log or v1,v2,...)" % text)
+        if not len(values):
+            raise ValueError("Empty axis: %s" % text)
+    return np.unique(values)
+
+
+def parse_bus(text):
+    """(voltage, phase, freq) of "380/3/50" """
+    try:
+        voltage, phase, freq = (int(v) for v in text.split("/"))
+    except ValueError:
+        raise ValueError("Invalid bus: %s (use Voltage/Phase/Freq, e.g. 380/3/50)" % text)
+    return voltage, phase, freq
+
+
+def profiles(engine, buses=None, enclosures=None):
+    """(voltage, phase, freq, enclosure) for each bus x enclosure
+
+    Defaults: every (Voltage, Phase, Freq) of DB_PowerOptions and both
+    Enclosure settings.
+    """
+    buses = buses or sorted(engine.filters.power)
+    enclosures = enclosures or [e for e in engine.filters.enclosure if e]
+    return [bus + (enclosure,) for bus in buses for enclosure in enclosures]
+
+
+def profile_settings(settings, profile):
+    voltage, phase, freq, enclosure = profile
+    return replace(settings, voltage=voltage, phase=phase, frequency=freq, enclosure=enclosure)
+
+
+# ============================================
+# Evaluation
+# ============================================
+
+def op_time_fits(calc_op_times, op_times, min_pct, max_pct):
+    """CheckOpTimeRange of every combination (rows) against every Op. Time (columns)"""
+    min_times = op_times * (1 + min_pct / 100)
+    max_times = op_times * (1 + max_pct / 100)
+    low = np.minimum(min_times, max_times)
+    high = np.maximum(min_times, max_times)
+    calc = calc_op_times[:, None]
+    return (op_times <= 0) | ((low <= calc) & (calc <= high))
+
+
+def ranked_combinations(engine, s, stem_dim, turns):
+    """SizingEngine.combinations() in FindBestActuator order"""
+    return sorted(engine.combinations(stem_dim, turns, s), key=lambda c: c[0])
+
+
+def combination_labels(engine, s, combos):
+    """(model, gearbox) of each combination ("" = direct)"""
+    resolved = engine.resolved(s)
+    labels = []
+    for c in combos:
+        act_row, gb_row = split_combination_id(c[4])
+        labels.append((resolved[act_row].model,
+                       "" if gb_row is None else engine.catalog.gearbox(gb_row).model))
+    return labels
+
+
+def surface(engine, s, stem_dim, turns, req_thrust, torques_nm, op_times, combos=None):
+    """(price, pick, labels) of the cheapest combination per (torque, Op. Time)
+
+    torques_nm / req_thrust include the safety factor. price is nan and pick
+    is len(labels) - 1 where nothing fits. combos: ranked_combinations() of
+    (stem_dim, turns) when already computed.
+    """
+    if combos is None:
+        combos = ranked_combinations(engine, s, stem_dim, turns)
+    if req_thrust > 0:
+        combos = [c for c in combos if c[2] >= req_thrust]
+    labels = combination_labels(engine, s, combos) + [("", "")]
+
+    n = len(combos)
+    prices = np.array([c[0][0] for c in combos] + [np.nan])
+    caps = np.array([c[1] for c in combos], dtype=float)
+    calc = np.array([c[3] for c in combos], dtype=float)
+
+    # Capacity of the best-ranked combination so far that fits each column;
+    # the first row whose running maximum reaches a torque is the pick
+    fits = op_time_fits(calc, op_times, s.op_time_min_pct, s.op_time_max_pct)
+    running = np.where(fits, caps[:, None], -np.inf)
+    np.maximum.accumulate(running, axis=0, out=running)
+    pick = np.full((len(torques_nm), len(op_times)), n, dtype=np.intp)
+    if n:
+        for j in range(len(op_times)):
+            pick[:, j] = np.searchsorted(running[:, j], torques_nm, side="left")
+    if s.actuator_type != "Linear":
+        pick[torques_nm <= 0, :] = n            # "No torque specified"
+    elif req_thrust <= 0:
+        pick[:] = n                             # "No thrust specified for Linear actuator"
+    return prices[pick], pick, labels
+
+
+def coverage_map(engine, settings, profile_list, torque, thrust, op_time, turns, stem):
+    """Yield CoverageSlice per profile, stem, turns and thrust value (axes in input units)"""
+    _require_numpy()
+    act_type = settings.actuator_type
+    if act_type == "Linear":
+        torque = np.zeros(1)
+    if act_type != "Multi-turn":
+        turns = np.zeros(1)
+    torques_nm = np.array([convert_torque_to_nm(v, settings.torque_unit) * settings.safety_factor
+                           for v in torque])
+    for profile in profile_list:
+        s = profile_settings(settings, profile)
+        for stem_dim in stem:
+            for turn in turns:
+                for value in thrust:
+                    req_thrust = convert_thrust_to_kn(value, s.thrust_unit) * s.safety_factor
+                    price, pick, labels = surface(engine, s, stem_dim, turn, req_thrust, torques_nm, op_time)
+                    yield CoverageSlice(profile, float(stem_dim), float(turn), float(value),
+                                        op_time, torque, price, pick, labels)
+
+
+def gap_regions(cov):
+    """(op time, torque from, torque to, points) for each run of infeasible torques"""
+    blocked = ~cov.feasible().T                 # op times x torques
+    padded = np.zeros((blocked.shape[0], blocked.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = blocked
+    step = np.diff(padded, axis=1)
+    cols, starts = np.nonzero(step == 1)
+    _, ends = np.nonzero(step == -1)            # same column order as the starts
+    return [(cov.op_times[j], cov.torques[a], cov.torques[b - 1], b - a)
+            for j, a, b in zip(cols.tolist(), starts.tolist(), ends.tolist())]
+
+
+# ============================================
+# Output
+# ============================================
+
+def _value(v):
+    return int(v) if float(v).is_integer() else round(float(v), 6)
+
+
+def surface_rows(cov):
+    """SURFACE_HEADERS rows of a slice, torque fastest"""
+    head = list(cov.profile) + [_value(cov.stem_dim), _value(cov.turns), _value(cov.thrust)]
+    torques = [_value(v) for v in cov.torques]
+    labels = cov.labels
+    for j, op in enumerate(cov.op_times):
+        op = _value(op)
+        for torque, price, pick in zip(torques, cov.price[:, j].tolist(), cov.pick[:, j].tolist()):
+            if price == price:
+                yield head + [op, torque, 1, price] + list(labels[pick])
+            else:
+                yield head + [op, torque, 0, "", "", ""]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catalog coverage over a grid of requirements")
+    parser.add_argument("--settings", help="Workbook (Settings sheet) or JSON file (default: create_workbook.py defaults)")
+    parser.add_argument("--catalog", help="Workbook, catalog directory or SQLite database (default: create_workbook.py data)")
+    parser.add_argument("--price-list", help="Customer price list JSON applied over the catalog prices")
+    parser.add_argument("--actuator-type", choices=ACTUATOR_TYPES, help="Override the Settings Actuator Type")
+    parser.add_argument("--bus", action="append", help="Voltage/Phase/Freq, repeatable (default: every bus of DB_PowerOptions)")
+    parser.add_argument("--enclosure", action="append", choices=["Waterproof", "Explosionproof"],
+                        help="Repeatable (default: both)")
+    for name, default in AXIS_DEFAULTS.items():
+        parser.add_argument("--" + name.replace("_", "-"), default=default,
+                            help="Axis (default %s)" % default.replace("%", "%%"))
+    parser.add_argument("-o", "--output", help="Surface CSV, one row per profile and grid point")
+    parser.add_argument("--gaps", help="Gap region CSV")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    surface_file = gap_file = None
+    try:
+        _require_numpy()
+        axes = {name: parse_axis(getattr(args, name)) for name in AXIS_DEFAULTS}
+        buses = [parse_bus(b) for b in args.bus] if args.bus else None
+        settings = load_settings(args.settings)
+        if args.actuator_type:
+            settings.actuator_type = args.actuator_type
+        if settings.actuator_type not in ACTUATOR_TYPES:
+            raise ValueError("Actuator type is not selected.")
+        engine = SizingEngine(load_catalog(args.catalog))
+        if args.price_list:
+            overlay = load_price_overlay(args.price_list)
+            for entry in overlay.unknown_entries(engine.catalog):
+                print("Price list entry not in the catalog: %s" % entry, file=sys.stderr)
+            engine = engine.with_prices(overlay)
+        profile_list = profiles(engine, buses, args.enclosure)
+
+        if args.output:
+            surface_file = open(args.output, "w", newline="", encoding="utf-8")
+            surface_writer = csv.writer(surface_file)
+            surface_writer.writerow(SURFACE_HEADERS)
+        if args.gaps:
+            gap_file = open(args.gaps, "w", newline="", encoding="utf-8")
+            gap_writer = csv.writer(gap_file)
+            gap_writer.writerow(GAP_HEADERS)
+
+        totals = {}                             # profile -> [points, feasible, gap regions]
+        for cov in coverage_map(engine, settings, profile_list, **axes):
+            regions = gap_regions(cov)
+            total = totals.setdefault(cov.profile, [0, 0, 0])
+            total[0] += cov.price.size
+            total[1] += int(cov.feasible().sum())
+            total[2] += len(regions)
+            if surface_file:
+                surface_writer.writerows(surface_rows(cov))
+            if gap_file:
+                head = list(cov.profile) + [_value(cov.stem_dim), _value(cov.turns), _value(cov.thrust)]
+                gap_writer.writerows(head + [_value(op), _value(a), _value(b), points]
+                                     for op, a, b, points in regions)
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    finally:
+        for f in (surface_file, gap_file):
+            if f is not None:
+                f.close()
+
+    points = 0
+    for (voltage, phase, freq, enclosure), (count, feasible, regions) in totals.items():
+        points += count
+        print("%dV %dph %dHz %-14s %9d / %d feasible (%5.1f%%), %d gap regions" % (
+            voltage, phase, freq, enclosure, feasible, count, 100.0 * feasible / count if count else 0.0,
+            regions))
+    print("%s: %d profiles, %d points in %.1fs" % (settings.actuator_type, len(totals), points,
+                                                   time.perf_counter() - start), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
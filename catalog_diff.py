@@ -0,0 +1,473 @@
+"""
+Noah Actuator Sizing Tool - Catalog Diff
+Table changes between two catalog versions and the requirements whose selection they change (needs numpy)
+
+Usage:
+    python catalog_diff.py NoahSizing.xlsm                             # vs create_workbook.py data
+    python catalog_diff.py release_v3.xlsm release_v4.xlsm --bus 380/3/50 -o impact.csv
+    python catalog_diff.py old.db new.db --tables table_changes.csv --actuator-type Part-turn \\
+        --torque 10:50000:500:log --op-time 0,15,30,60 --stem 0,40,60
+
+Both versions are any load_catalog() source (workbook, Arrow / Parquet
+directory, SQLite database); without NEW the create_workbook.py data is the
+new version.
+
+Table diff: rows of every DB_* sheet are matched by their key columns
+(DB_Models Model, DB_PowerOptions Model / Voltage / Phase / Freq, ...) and
+compared after the engine conversion of each column, so a workbook and a
+SQLite build of the same data are equal. Duplicate keys are matched by
+occurrence, like valvelist_diff.py. Changed sheet order of a keyed row is
+reported as "reordered" (it can change first-match lookups and tie-breaks).
+
+Impact analysis over the catalog_coverage.py requirement grid (same profiles,
+axes and Settings; single-stage gearboxes), pruned in three steps:
+
+    profile   skipped when no changed model resolves in it in either version
+              and no gearbox change can reach it (no gearbox candidates)
+    slice     per (profile, stem, turns, thrust) the ranked combinations of
+              both versions are compared; identical lists give identical
+              picks everywhere, so the slice is not evaluated
+    region    only torques up to the largest capacity of a changed
+              combination and Op. Time columns where one of them fits are
+              evaluated; outside that, both versions pick among the same
+              unchanged combinations
+
+DB_ElectricalData and DB_Options do not take part in sizing; DB_Couplings
+changes are listed but not evaluated (the grid gives stem dimensions
+directly).
+
+Outputs:
+    -o        impact regions: runs of consecutive torque values with the same change
+              (infeasible / feasible / model / price) and the old and new pick
+    --tables  table changes: one row per added / removed / reordered row and changed cell
+    stdout    change counts per sheet, changed points per profile, evaluated share of the grid
+"""
+
+import os
+import csv
+import sys
+import time
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from catalog import Catalog, DB_SHEET_NAMES, read_tables, generate_tables
+from catalog_sqlite import SCHEMAS, SqliteCatalog
+from catalog_coverage import (AXIS_DEFAULTS, ACTUATOR_TYPES, PROFILE_HEADERS, parse_axis, parse_bus, profiles,
+                              profile_settings, op_time_fits, ranked_combinations, combination_labels,
+                              surface, _value)
+from sizing_engine import SizingEngine, convert_torque_to_nm, convert_thrust_to_kn
+from sizing_settings import load_settings
+from valvelist_diff import normalize
+
+# Key columns per sheet (leading columns of the sheet)
+KEY_COLUMNS = {
+    "DB_Models": 1,
+    "DB_PowerOptions": 4,
+    "DB_EnclosureOptions": 2,
+    "DB_ElectricalData": 4,
+    "DB_Gearboxes": 1,
+    "DB_Couplings": 1,
+    "DB_Options": 1,
+}
+# Sheets whose rows are looked up by Model when an actuator is resolved
+MODEL_SHEETS = ["DB_Models", "DB_PowerOptions", "DB_EnclosureOptions"]
+
+TABLE_HEADERS = ["Sheet", "Key", "Change", "Column", "Old", "New"]
+IMPACT_HEADERS = PROFILE_HEADERS + ["StemDim", "Turns", "Thrust", "OpTime", "TorqueFrom", "TorqueTo",
+                                    "Points", "Change", "Old Model", "Old Gearbox", "Old Price",
+                                    "New Model", "New Gearbox", "New Price"]
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for catalog impact analysis (pip install numpy)")
+
+
+@dataclass
+class TableDiff:
+    """Keyed row changes of one DB_* sheet"""
+    sheet: str
+    columns: list
+    added: list = field(default_factory=list)        # keys
+    removed: list = field(default_factory=list)
+    changed: list = field(default_factory=list)      # (key, column, old, new)
+    reordered: bool = False
+
+    def changed_keys(self):
+        return {key for key, _, _, _ in self.changed}
+
+    def is_empty(self):
+        return not (self.added or self.removed or self.changed or self.reordered)
+
+
+# ============================================
+# Table Diff
+# ============================================
+
+def load_tables(path=None):
+    """({sheet: [row tuples]}, {sheet: column names}) of a load_catalog() source"""
+    headers = {}
+    if path is None:
+        tables = generate_tables(headers)
+    elif path.lower().endswith((".db", ".sqlite", ".sqlite3")):
+        tables = SqliteCatalog(path).read_tables()
+        headers = {sheet: [name for name, _ in SCHEMAS[sheet]] for sheet in tables}
+    elif os.path.isdir(path):
+        from arrow_io import read_catalog_tables
+        tables = read_catalog_tables(path, headers)
+    else:
+        tables = read_tables(path, headers=headers)
+    return tables, headers
+
+
+def _normalized_rows(sheet, rows):
+    """Rows as comparison text after the engine conversion of each column (blank rows dropped)"""
+    schema = SCHEMAS.get(sheet, [])
+    result = []
+    for row in rows:
+        values = list(row) + [None] * (len(schema) - len(row))
+        text = tuple(normalize(schema[i][1](v) if i < len(schema) and schema[i][1] else v)
+                     for i, v in enumerate(values))
+        if any(text):
+            result.append(text)
+    return result
+
+
+def _keyed(rows, key_len):
+    """[(key, occurrence, row)] in sheet order"""
+    seen = Counter()
+    keyed = []
+    for row in rows:
+        key = row[:key_len]
+        keyed.append((key, seen[key], row))
+        seen[key] += 1
+    return keyed
+
+
+def diff_table(sheet, old_rows, new_rows, columns=None):
+    key_len = KEY_COLUMNS.get(sheet, 1)
+    old = _keyed(_normalized_rows(sheet, old_rows), key_len)
+    new = _keyed(_normalized_rows(sheet, new_rows), key_len)
+    width = max([len(row) for _, _, row in old + new] + [len(columns or [])])
+    columns = list(columns or []) + ["Col%d" % (i + 1) for i in range(len(columns or []), width)]
+    diff = TableDiff(sheet, columns)
+
+    old_index = {(key, n): row for key, n, row in old}
+    new_index = {(key, n): row for key, n, row in new}
+    diff.removed = [key for key, n, _ in old if (key, n) not in new_index]
+    diff.added = [key for key, n, _ in new if (key, n) not in old_index]
+    for key, n, row in new:
+        before = old_index.get((key, n))
+        if before is None or before == row:
+            continue
+        for i, (a, b) in enumerate(zip(before + ("",) * (width - len(before)), row + ("",) * (width - len(row)))):
+            if a != b:
+                diff.changed.append((key, columns[i], a, b))
+    diff.reordered = ([(key, n) for key, n, _ in old if (key, n) in new_index] !=
+                      [(key, n) for key, n, _ in new if (key, n) in old_index])
+    return diff
+
+
+def diff_tables(old_tables, new_tables, headers=None):
+    """TableDiff per DB_* sheet present in either version"""
+    headers = headers or {}
+    return [diff_table(sheet, old_tables.get(sheet, []), new_tables.get(sheet, []), headers.get(sheet))
+            for sheet in DB_SHEET_NAMES if sheet in old_tables or sheet in new_tables]
+
+
+def table_rows(diff):
+    """TABLE_HEADERS rows of a TableDiff"""
+    for key in diff.removed:
+        yield [diff.sheet, "/".join(key), "removed", "", "", ""]
+    for key in diff.added:
+        yield [diff.sheet, "/".join(key), "added", "", "", ""]
+    for key, column, old, new in diff.changed:
+        yield [diff.sheet, "/".join(key), "changed", column, old, new]
+    if diff.reordered:
+        yield [diff.sheet, "", "reordered", "", "", ""]
+
+
+# ============================================
+# Impact Analysis
+# ============================================
+
+@dataclass
+class CatalogChange:
+    """What the table diff can reach in the sizing engine"""
+    models: set                  # model names with a changed resolve input
+    all_models: bool             # a model sheet was reordered: every model counts as changed
+    gearboxes: bool              # DB_Gearboxes changed
+
+    def is_empty(self):
+        return not (self.models or self.all_models or self.gearboxes)
+
+
+def catalog_change(diffs):
+    models = set()
+    all_models = gearboxes = False
+    for diff in diffs:
+        if diff.sheet in MODEL_SHEETS:
+            models.update(key[0] for key in diff.added + diff.removed + list(diff.changed_keys()))
+            all_models = all_models or diff.reordered
+        elif diff.sheet == "DB_Gearboxes":
+            gearboxes = not diff.is_empty()
+    return CatalogChange(models, all_models, gearboxes)
+
+
+def profile_affected(engines, s, change):
+    """False when neither version can size differently under profile settings s"""
+    for engine in engines:
+        acts = [act for act in engine.resolved(s).values() if act is not None]
+        if acts and change.all_models:
+            return True
+        if any(act.model in change.models for act in acts):
+            return True
+        if change.gearboxes and engine.has_gearbox_sheet and engine.gearbox_candidates(s):
+            return True
+    return False
+
+
+def _entries(engine, s, combos):
+    """Comparable (label, price, torque cap, thrust cap, calc Op. Time) per ranked combination"""
+    return [(label, float(c[0][0]), float(c[1]), float(c[2]), float(c[3]))
+            for label, c in zip(combination_labels(engine, s, combos), combos)]
+
+
+def _unchanged_order(entries, common):
+    left = Counter(common)
+    order = []
+    for entry in entries:
+        if left[entry]:
+            left[entry] -= 1
+            order.append(entry)
+    return order
+
+
+def changed_region(old_entries, new_entries, torques_nm, op_times, s):
+    """(torque rows, Op. Time columns) that can differ between the versions
+
+    None = identical picks everywhere. Rows are a prefix of the torque axis.
+    """
+    old_count, new_count = Counter(old_entries), Counter(new_entries)
+    common = old_count & new_count
+    changed = list((old_count - common) + (new_count - common))
+    if _unchanged_order(old_entries, common) != _unchanged_order(new_entries, common):
+        return len(torques_nm), np.arange(len(op_times))       # tie order of unchanged rows moved
+    if not changed:
+        return None
+    calc = np.array([e[4] for e in changed], dtype=float)
+    cols = np.nonzero(op_time_fits(calc, op_times, s.op_time_min_pct, s.op_time_max_pct).any(axis=0))[0]
+    rows = int(np.searchsorted(torques_nm, max(e[2] for e in changed), side="right"))
+    if not len(cols) or not rows:
+        return None
+    return rows, cols
+
+
+def _change_kind(old_price, new_price, old_label, new_label):
+    if old_price != old_price:
+        return "feasible"
+    if new_price != new_price:
+        return "infeasible"
+    if old_label != new_label:
+        return "model"
+    return "price"
+
+
+def _pick(price, label):
+    if price != price:
+        return ["", "", ""]
+    return list(label) + [_value(price)]
+
+
+def _runs(states):
+    """(first, last, state) of each run of equal states (None = no change)"""
+    run = None
+    for i, state in enumerate(states):
+        if run is not None and state == run[2]:
+            run[1] = i
+            continue
+        if run is not None:
+            yield tuple(run)
+        run = [i, i, state] if state is not None else None
+    if run is not None:
+        yield tuple(run)
+
+
+def compare_region(torques, op_times, old, new):
+    """(op time, torque from, torque to, points, change, old pick, new pick) per run of equal changes
+
+    old / new: surface() results over the same torques x op_times.
+    """
+    old_price, old_pick, old_labels = old
+    new_price, new_pick, new_labels = new
+    ids = {}
+    old_ids = np.array([ids.setdefault(label, len(ids)) for label in old_labels])[old_pick]
+    new_ids = np.array([ids.setdefault(label, len(ids)) for label in new_labels])[new_pick]
+    names = list(ids)
+    old_nan, new_nan = np.isnan(old_price), np.isnan(new_price)
+    differs = (old_nan != new_nan) | (~old_nan & ((old_price != new_price) | (old_ids != new_ids)))
+    for j in np.nonzero(differs.any(axis=0))[0].tolist():
+        states = []
+        for i in range(len(torques)):
+            if not differs[i, j]:
+                states.append(None)
+                continue
+            before, after = float(old_price[i, j]), float(new_price[i, j])
+            old_label, new_label = names[old_ids[i, j]], names[new_ids[i, j]]
+            states.append((_change_kind(before, after, old_label, new_label),
+                           tuple(_pick(before, old_label)), tuple(_pick(after, new_label))))
+        for first, last, (kind, before, after) in _runs(states):
+            yield op_times[j], torques[first], torques[last], last - first + 1, kind, list(before), list(after)
+
+
+def impact_regions(old_engine, new_engine, settings, profile_list, change, stats,
+                   torque, thrust, op_time, turns, stem):
+    """Yield (profile, stem, turns, thrust, region) for every changed run of the grid
+
+    stats receives the counts of the pruning steps (grid points, evaluated points, ...).
+    """
+    _require_numpy()
+    act_type = settings.actuator_type
+    if act_type == "Linear":
+        torque = np.zeros(1)
+    if act_type != "Multi-turn":
+        turns = np.zeros(1)
+    torques_nm = np.array([convert_torque_to_nm(v, settings.torque_unit) * settings.safety_factor
+                           for v in torque])
+    slice_points = len(torque) * len(op_time)
+    slices = len(stem) * len(turns) * len(thrust)
+    for key in ("profiles", "skipped_profiles", "slices", "skipped_slices", "points", "evaluated"):
+        stats.setdefault(key, 0)
+
+    for profile in profile_list:
+        s = profile_settings(settings, profile)
+        stats["profiles"] += 1
+        stats["slices"] += slices
+        stats["points"] += slices * slice_points
+        if not profile_affected((old_engine, new_engine), s, change):
+            stats["skipped_profiles"] += 1
+            stats["skipped_slices"] += slices
+            continue
+        for stem_dim in stem:
+            for turn in turns:
+                old_combos = ranked_combinations(old_engine, s, stem_dim, turn)
+                new_combos = ranked_combinations(new_engine, s, stem_dim, turn)
+                old_all, new_all = _entries(old_engine, s, old_combos), _entries(new_engine, s, new_combos)
+                for value in thrust:
+                    req_thrust = convert_thrust_to_kn(value, s.thrust_unit) * s.safety_factor
+                    old_entries, new_entries = old_all, new_all
+                    if req_thrust > 0:
+                        old_entries = [e for e in old_all if e[3] >= req_thrust]
+                        new_entries = [e for e in new_all if e[3] >= req_thrust]
+                    region = changed_region(old_entries, new_entries, torques_nm, op_time, s)
+                    if region is None:
+                        stats["skipped_slices"] += 1
+                        continue
+                    rows, cols = region
+                    sub_nm, sub_op = torques_nm[:rows], op_time[cols]
+                    stats["evaluated"] += rows * len(cols)
+                    old = surface(old_engine, s, stem_dim, turn, req_thrust, sub_nm, sub_op, old_combos)
+                    new = surface(new_engine, s, stem_dim, turn, req_thrust, sub_nm, sub_op, new_combos)
+                    for region_row in compare_region(torque[:rows], sub_op, old, new):
+                        yield profile, float(stem_dim), float(turn), float(value), region_row
+
+
+# ============================================
+# Main
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff two catalog versions and the requirements they size differently")
+    parser.add_argument("old", help="Old catalog: workbook, catalog directory or SQLite database")
+    parser.add_argument("new", nargs="?", help="New catalog (default: create_workbook.py data)")
+    parser.add_argument("--settings", help="Workbook (Settings sheet) or JSON file (default: create_workbook.py defaults)")
+    parser.add_argument("--actuator-type", choices=ACTUATOR_TYPES, help="Override the Settings Actuator Type")
+    parser.add_argument("--bus", action="append", help="Voltage/Phase/Freq, repeatable (default: every bus of both versions)")
+    parser.add_argument("--enclosure", action="append", choices=["Waterproof", "Explosionproof"],
+                        help="Repeatable (default: both)")
+    for name, default in AXIS_DEFAULTS.items():
+        parser.add_argument("--" + name.replace("_", "-"), default=default,
+                            help="Axis (default %s)" % default.replace("%", "%%"))
+    parser.add_argument("-o", "--output", help="Impact region CSV")
+    parser.add_argument("--tables", help="Table change CSV")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    output = None
+    stats = {}
+    changed_points = {}                         # profile -> changed grid points
+    try:
+        _require_numpy()
+        axes = {name: parse_axis(getattr(args, name)) for name in AXIS_DEFAULTS}
+        buses = [parse_bus(b) for b in args.bus] if args.bus else None
+        settings = load_settings(args.settings)
+        if args.actuator_type:
+            settings.actuator_type = args.actuator_type
+        if settings.actuator_type not in ACTUATOR_TYPES:
+            raise ValueError("Actuator type is not selected.")
+
+        old_tables, old_headers = load_tables(args.old)
+        new_tables, new_headers = load_tables(args.new)
+        diffs = diff_tables(old_tables, new_tables, dict(old_headers, **new_headers))
+        if args.tables:
+            with open(args.tables, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(TABLE_HEADERS)
+                for diff in diffs:
+                    writer.writerows(table_rows(diff))
+        for diff in diffs:
+            if diff.is_empty():
+                continue
+            columns = sorted({column for _, column, _, _ in diff.changed}, key=diff.columns.index)
+            print("%-20s %d added, %d removed, %d changed cells%s%s" % (
+                diff.sheet, len(diff.added), len(diff.removed), len(diff.changed),
+                " (%s)" % ", ".join(columns) if columns else "", ", reordered" if diff.reordered else ""))
+            if diff.sheet in ("DB_ElectricalData", "DB_Options", "DB_Couplings"):
+                print("%-20s not evaluated (%s)" % ("", "stem dimensions are grid values"
+                      if diff.sheet == "DB_Couplings" else "not used for selection"))
+
+        old_engine = SizingEngine(Catalog(old_tables))
+        new_engine = SizingEngine(Catalog(new_tables))
+        profile_list = profiles(old_engine, buses, args.enclosure)
+        profile_list += [p for p in profiles(new_engine, buses, args.enclosure) if p not in profile_list]
+
+        if args.output:
+            output = open(args.output, "w", newline="", encoding="utf-8")
+            writer = csv.writer(output)
+            writer.writerow(IMPACT_HEADERS)
+        change = catalog_change(diffs)
+        for profile, stem_dim, turn, value, region in impact_regions(
+                old_engine, new_engine, settings, profile_list, change, stats, **axes):
+            op, first, last, points, kind, before, after = region
+            counts = changed_points.setdefault(profile, Counter())
+            counts[kind] += points
+            if output:
+                writer.writerow(list(profile) + [_value(stem_dim), _value(turn), _value(value), _value(op),
+                                                 _value(first), _value(last), points, kind] + before + after)
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    finally:
+        if output is not None:
+            output.close()
+
+    for (voltage, phase, freq, enclosure), counts in changed_points.items():
+        print("%dV %dph %dHz %-14s %9d changed points (%s)" % (
+            voltage, phase, freq, enclosure, sum(counts.values()),
+            ", ".join("%s %d" % item for item in sorted(counts.items()))))
+    points = stats.get("points", 0)
+    print("%s: %d / %d profiles, %d / %d slices, %d / %d points evaluated (%.2f%%) in %.1fs" % (
+        settings.actuator_type, stats["profiles"] - stats["skipped_profiles"], stats["profiles"],
+        stats["slices"] - stats["skipped_slices"], stats["slices"], stats["evaluated"], points,
+        100.0 * stats["evaluated"] / points if points else 0.0, time.perf_counter() - start), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
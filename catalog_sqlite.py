@@ -0,0 +1,353 @@
+"""
+Noah Actuator Sizing Tool - SQLite Catalog
+DB_* tables in an embedded SQLite file, queried by the sizing engine through indexes
+
+Usage:
+    python catalog_sqlite.py build catalog.db                          # create_workbook.py data
+    python catalog_sqlite.py build catalog.db --source NoahSizing.xlsm
+    python catalog_sqlite.py update catalog.db DB_Gearboxes --where Model=SB-VS10 --set Price=220
+    python sizing_cli.py lines.csv --catalog catalog.db
+
+The tables keep the sheet names and header names and add a "row" column
+(sheet order, used for the VBA tie-breaks). Engine columns are stored already
+converted (GetCellDouble / GetCellInt / CStr), so SQL filters compare the
+same values the VBA loops do. Indexes follow the engine access paths:
+
+    DB_Models            (ActType, Freq, Torque_Nm)        model filters
+    DB_PowerOptions      (Model, Voltage, Phase, Freq)     HasPowerOption (covering)
+    DB_EnclosureOptions  (Model, Enclosure)                HasEnclosureOption (covering)
+    DB_Gearboxes         (InputFlange, Ratio)              ratio index per flange
+"""
+
+import os
+import sys
+import sqlite3
+import argparse
+
+from catalog import (Catalog, ModelRecord, GearboxRecord, ModelFilterBitmaps, DB_SHEET_NAMES,
+                     match_enclosure, to_float, to_int, to_str, read_tables, generate_tables)
+
+# Column converters per sheet (None = cell value stored as is)
+SCHEMAS = {
+    "DB_Models": [
+        ("Model", to_str), ("Series", to_str), ("ActType", to_str), ("MotorPower_kW", to_float),
+        ("ControlType", to_str), ("Phase", to_int), ("Freq", to_int), ("RPM", to_float),
+        ("Torque_Nm", to_float), ("Thrust_kN", to_float), ("OpTime_sec", to_float),
+        ("DutyCycle", to_str), ("OutputFlange", to_str), ("MaxStemDim_mm", to_float),
+        ("Weight_kg", to_float), ("BasePrice", to_float), ("Speed_mm_sec", to_float),
+        ("Stroke_mm", to_float)],
+    "DB_PowerOptions": [
+        ("Model", to_str), ("Voltage", to_int), ("Phase", to_int), ("Freq", to_int),
+        ("PriceAdder", to_float)],
+    "DB_EnclosureOptions": [("Model", to_str), ("Enclosure", to_str), ("PriceAdder", to_float)],
+    "DB_ElectricalData": [
+        ("Model", None), ("Voltage", None), ("Phase", None), ("Freq", None),
+        ("StartingCurrent_A", None), ("StartingPF", None), ("RatedCurrent_A", None),
+        ("AvgCurrent_A", None), ("AvgPF", None), ("AvgPower_kW", None), ("MotorPoles", None)],
+    "DB_Gearboxes": [
+        ("Model", to_str), ("Ratio", to_float), ("InputTorqueMax", to_float),
+        ("OutputTorqueMax", to_float), ("Efficiency", to_float), ("InputFlange", to_str),
+        ("OutputFlange", to_str), ("MaxStemDim_mm", to_float), ("Weight_kg", to_float),
+        ("Price", to_float)],
+    "DB_Couplings": [("CouplingType", to_str), ("MinDimension_mm", to_float), ("MaxDimension_mm", to_float)],
+    "DB_Options": [("Code", to_str), ("Description", to_str), ("Price", to_float)],
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_models_type_freq_torque ON DB_Models (ActType, Freq, Torque_Nm)",
+    "CREATE INDEX IF NOT EXISTS idx_power_options ON DB_PowerOptions (Model, Voltage, Phase, Freq, PriceAdder)",
+    "CREATE INDEX IF NOT EXISTS idx_enclosure_options ON DB_EnclosureOptions (Model, Enclosure, PriceAdder)",
+    "CREATE INDEX IF NOT EXISTS idx_gearboxes_flange_ratio ON DB_Gearboxes (InputFlange, Ratio)",
+]
+
+
+def _quote(name):
+    return '"%s"' % name.replace('"', '""')
+
+
+def _columns(sheet):
+    return [name for name, _ in SCHEMAS[sheet]]
+
+
+def _convert_row(sheet, values):
+    values = list(values) + [None] * (len(SCHEMAS[sheet]) - len(values))
+    return [conv(v) if conv else v for (_, conv), v in zip(SCHEMAS[sheet], values)]
+
+
+# ============================================
+# Build / Update
+# ============================================
+
+def write_sheet(conn, sheet, rows):
+    """(Re)create one DB_* table from sheet rows (without header)"""
+    if sheet == "DB_Models":
+        # Blank model rows are skipped by every VBA loop; row = index among the rest
+        rows = [r for r in rows if to_str(r[0] if r else None).strip()]
+    columns = _columns(sheet)
+    conn.execute("DROP TABLE IF EXISTS %s" % _quote(sheet))
+    conn.execute("CREATE TABLE %s (row INTEGER PRIMARY KEY, %s)" % (
+        _quote(sheet), ", ".join(_quote(c) for c in columns)))
+    conn.executemany("INSERT INTO %s VALUES (?, %s)" % (_quote(sheet), ", ".join("?" * len(columns))),
+                     ([row] + _convert_row(sheet, values) for row, values in enumerate(rows)))
+
+
+def build_database(path, tables):
+    """Write {sheet name: rows} into a new SQLite file (replaces an existing one)"""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            for sheet in DB_SHEET_NAMES:
+                if sheet in tables:
+                    write_sheet(conn, sheet, tables[sheet])
+            for statement in INDEXES:
+                if statement.split(" ON ")[1].split()[0] in tables:
+                    conn.execute(statement)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def update_rows(path, sheet, where, values):
+    """UPDATE sheet SET values WHERE where (both {column: value}); returns the row count
+
+    Values are converted like the build. Changing the DB_Models or
+    DB_Gearboxes row order is not possible this way, so the row numbers the
+    tie-breaks and sizing_store.py use stay valid.
+    """
+    if sheet not in SCHEMAS:
+        raise ValueError("Unknown sheet: %s" % sheet)
+    converters = dict(SCHEMAS[sheet])
+    for column in list(where) + list(values):
+        if column not in converters:
+            raise ValueError("%s has no column %s" % (sheet, column))
+    if not values:
+        raise ValueError("Nothing to update")
+
+    def convert(column, value):
+        conv = converters[column]
+        return conv(value) if conv else value
+
+    sql = "UPDATE %s SET %s" % (_quote(sheet), ", ".join("%s = ?" % _quote(c) for c in values))
+    params = [convert(c, v) for c, v in values.items()]
+    if where:
+        sql += " WHERE " + " AND ".join("%s = ?" % _quote(c) for c in where)
+        params += [convert(c, v) for c, v in where.items()]
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            return conn.execute(sql, params).rowcount
+    finally:
+        conn.close()
+
+
+# ============================================
+# Catalog Backend
+# ============================================
+
+class SqliteCatalog:
+    """Catalog answering the engine access paths with SQL (see catalog.Catalog)
+
+    Whole-table attributes (models, gearboxes, tables, ...) are loaded into an
+    in-memory Catalog on first use, for tools that need every row.
+    """
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise OSError("Catalog database not found: %s" % path)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.sheets = {name for (name,) in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self._memory = None
+        self._gearboxes = {}
+
+    def _query(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    # -------- engine access paths --------
+
+    def has_sheet(self, name):
+        return name in self.sheets
+
+    def has_gearbox_data(self):
+        if not self.has_sheet("DB_Gearboxes"):
+            return False
+        return any(model.strip() for (model,) in self._query("SELECT Model FROM DB_Gearboxes WHERE Model <> ''"))
+
+    def model_count(self):
+        if not self.has_sheet("DB_Models"):
+            return 0
+        return self._query("SELECT COUNT(*) FROM DB_Models")[0][0]
+
+    def model_rows(self, act_type=None, model_range="All", freq=None, phase=None, min_torque=None):
+        """(row, ModelRecord) in sheet order matching the coarse model filters"""
+        if not self.has_sheet("DB_Models"):
+            return []
+        conditions, params = [], []
+        if act_type is not None:
+            conditions.append("ActType = ?")
+            params.append(act_type)
+        if model_range not in ("All", ""):
+            conditions.append("Series = ?")
+            params.append(model_range)
+        if freq is not None:
+            conditions.append("Freq = ?")
+            params.append(freq)
+        if phase is not None:
+            conditions.append("(Phase <= 0 OR Phase = ?)")
+            params.append(phase)
+        if min_torque is not None:
+            conditions.append("Torque_Nm >= ?")
+            params.append(min_torque)
+        sql = "SELECT * FROM DB_Models"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return [(r[0], ModelRecord.from_row(r[1:])) for r in self._query(sql + " ORDER BY row", params)]
+
+    def valid_gearboxes(self):
+        """(row, GearboxRecord) with a model and Ratio > 0, by InputFlange, Ratio, row"""
+        if not self.has_sheet("DB_Gearboxes"):
+            return []
+        rows = self._query("SELECT * FROM DB_Gearboxes WHERE Ratio > 0 ORDER BY InputFlange, Ratio, row")
+        valid = [(r[0], GearboxRecord.from_row(r[1:])) for r in rows]
+        valid = [(row, gb) for row, gb in valid if gb.model.strip()]
+        self._gearboxes.update(valid)
+        return valid
+
+    def gearbox(self, row):
+        gb = self._gearboxes.get(row)
+        if gb is None:
+            r = self._query("SELECT * FROM DB_Gearboxes WHERE row = ?", (row,))[0]
+            gb = self._gearboxes[row] = GearboxRecord.from_row(r[1:])
+        return gb
+
+    def power_adder(self, model, voltage, phase, freq):
+        """HasPowerOption: price adder, or None if the combination does not exist"""
+        if not self.has_sheet("DB_PowerOptions"):
+            return None
+        rows = self._query("SELECT PriceAdder FROM DB_PowerOptions WHERE Model = ? AND Voltage = ? "
+                           "AND Phase = ? AND Freq = ? ORDER BY row LIMIT 1", (model, voltage, phase, freq))
+        return rows[0][0] if rows else None
+
+    def enclosure_option(self, model, setting_enclosure):
+        """HasEnclosureOption: (actual enclosure, price adder) or None"""
+        if not self.has_sheet("DB_EnclosureOptions"):
+            return None
+        for enclosure, adder in self._query("SELECT Enclosure, PriceAdder FROM DB_EnclosureOptions "
+                                            "WHERE Model = ? ORDER BY row", (model,)):
+            if match_enclosure(enclosure, setting_enclosure):
+                return enclosure, adder
+        return None
+
+    def coupling_limits(self, coupling_type):
+        """GetCouplingLimits: (min, max) or None for an unknown type"""
+        if not self.has_sheet("DB_Couplings"):
+            return None
+        rows = self._query("SELECT MinDimension_mm, MaxDimension_mm FROM DB_Couplings "
+                           "WHERE CouplingType = ? ORDER BY row LIMIT 1", (coupling_type,))
+        return tuple(rows[0]) if rows else None
+
+    def model_filters(self):
+        """ModelFilterBitmaps from DB_Models and the option key columns only"""
+        power = enclosures = []
+        if self.has_sheet("DB_PowerOptions"):
+            power = self._query("SELECT Model, Voltage, Phase, Freq FROM DB_PowerOptions")
+        if self.has_sheet("DB_EnclosureOptions"):
+            enclosures = self._query("SELECT Model, Enclosure FROM DB_EnclosureOptions")
+        return ModelFilterBitmaps(
+            self.model_rows(), [(to_str(m), to_int(v), to_int(p), to_int(f)) for m, v, p, f in power],
+            [(to_str(m), to_str(e)) for m, e in enclosures])
+
+    # -------- whole tables --------
+
+    def read_tables(self):
+        """{sheet name: [row tuples]} in sheet order (converted values)"""
+        return {sheet: [tuple(r) for r in self._query("SELECT %s FROM %s ORDER BY row" % (
+                    ", ".join(_quote(c) for c in _columns(sheet)), _quote(sheet)))]
+                for sheet in DB_SHEET_NAMES if sheet in self.sheets}
+
+    def in_memory(self):
+        if self._memory is None:
+            self._memory = Catalog(self.read_tables())
+        return self._memory
+
+    @property
+    def tables(self):
+        return self.in_memory().tables
+
+    @property
+    def models(self):
+        return self.in_memory().models
+
+    @property
+    def gearboxes(self):
+        return self.in_memory().gearboxes
+
+    @property
+    def power_options(self):
+        return self.in_memory().power_options
+
+    @property
+    def enclosure_options(self):
+        return self.in_memory().enclosure_options
+
+    @property
+    def couplings(self):
+        return self.in_memory().couplings
+
+    @property
+    def options(self):
+        return self.in_memory().options
+
+
+# ============================================
+# Main
+# ============================================
+
+def _assignments(items, option):
+    values = {}
+    for item in items or []:
+        if "=" not in item:
+            raise ValueError("%s expects Column=Value, got %s" % (option, item))
+        column, value = item.split("=", 1)
+        values[column.strip()] = value
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite catalog for the sizing tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Create the database from a workbook or create_workbook.py data")
+    p_build.add_argument("database")
+    p_build.add_argument("--source", help="Workbook with DB_* sheets (default: create_workbook.py data)")
+
+    p_update = sub.add_parser("update", help="Change values in place (e.g. prices)")
+    p_update.add_argument("database")
+    p_update.add_argument("sheet", choices=sorted(SCHEMAS))
+    p_update.add_argument("--where", nargs="*", metavar="COLUMN=VALUE", help="Row selection (AND)")
+    p_update.add_argument("--set", nargs="+", required=True, metavar="COLUMN=VALUE", dest="values")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            tables = read_tables(args.source) if args.source else generate_tables()
+            build_database(args.database, tables)
+            print("Wrote: %s (%s)" % (args.database, ", ".join(
+                "%s %d" % (name, len(tables[name])) for name in DB_SHEET_NAMES if name in tables)))
+        else:
+            if not os.path.exists(args.database):
+                raise OSError("Catalog database not found: %s" % args.database)
+            count = update_rows(args.database, args.sheet, _assignments(args.where, "--where"),
+                                _assignments(args.values, "--set"))
+            print("Updated %d row(s) in %s" % (count, args.sheet))
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Noah Actuator Sizing Tool - Configuration
+Options pricing of a whole project and bulk fill of the Configuration sheet
+
+Usage:
+    python configuration.py fill NoahSizing.xlsm                       # like "To Configuration"
+    python configuration.py fill NoahSizing.xlsm --results results.csv --keep-options -o quote.xlsm
+    python configuration.py price NoahSizing.xlsm -o prices.csv        # Unit / Total per line
+
+fill copies every sized line (Model not blank) into the Configuration
+sheet with the defaults of btn_ToConfiguration (options No, Painting None,
+Qty 1) and the same Unit / Total formulas. The sheet is rebuilt with
+create_workbook.setup_configuration_sheet() and transplanted into the file
+at the zip-part level (like refresh_catalog.py), so VBA, buttons and the
+other sheets are untouched; Excel recalculates the formulas on open.
+--keep-options keeps the option, painting and quantity selections of lines
+already in the sheet (matched by Tag).
+
+price evaluates the Unit formula for every line in one pass per column:
+
+    Unit  = Base + sum(DB_Options price of each option set to "Yes")
+                 + DB_Options price of the Painting code
+    Total = Unit x Qty
+
+Prices are looked up like VLOOKUP(code, DB_Options!A:C, 3, FALSE): first
+row of a code, case-insensitive, missing codes (e.g. "None") cost 0.
+"""
+
+import io
+import os
+import csv
+import sys
+import argparse
+from dataclasses import dataclass, astuple
+
+from openpyxl import Workbook
+
+from catalog import load_catalog, to_float, to_str
+from create_workbook import (create_styles, setup_configuration_sheet, CONFIG_HEADERS,
+                             CONFIG_OPTION_CODES, VALVELIST_RESULT_HEADERS)
+from valvelist_io import iter_line_results
+from xlsx_package import (read_package, write_package, workbook_sheets, shared_strings,
+                          iter_sheet_rows, sheet_pr, StyleSheet, transplant_sheet,
+                          column_letter, cell_xml, merge_rows, set_full_calc_on_load)
+
+CONFIG_SHEET = "Configuration"
+PRICE_HEADERS = ["Line", "Tag", "Model", "Unit", "Qty", "Total"]
+# Column A text of the footer rows that older workbooks keep below the lines
+CONFIG_FOOTER_MARKERS = ("Grand Total:", "Option Prices (Reference):")
+
+_MODEL = VALVELIST_RESULT_HEADERS.index("Model")
+_GEARBOX = VALVELIST_RESULT_HEADERS.index("Gearbox")
+_PRICE = VALVELIST_RESULT_HEADERS.index("Price")
+
+
+@dataclass
+class ConfigLine:
+    """One Configuration row, columns A-L (Unit / Total are formulas)"""
+    line_no: object = None
+    tag: object = None
+    model: object = None
+    gearbox: object = None
+    base_price: object = None
+    htr: object = "No"
+    mod: object = "No"
+    pos: object = "No"
+    lmt: object = "No"
+    exd: object = "No"
+    painting: object = "None"
+    qty: object = 1
+
+    def values(self):
+        return list(astuple(self))
+
+    def selections(self):
+        """Option, painting and quantity cells (F-L)"""
+        return self.values()[5:]
+
+
+# Column index of each Yes/No option in ConfigLine.values()
+_OPTION_COLUMNS = [(CONFIG_HEADERS.index(name), code) for name, code in CONFIG_OPTION_CODES]
+_PAINTING = CONFIG_HEADERS.index("Painting")
+_BASE = CONFIG_HEADERS.index("Base")
+_QTY = CONFIG_HEADERS.index("Qty")
+
+
+# ============================================
+# Lines
+# ============================================
+
+def _number_cell(value):
+    """Numeric text (CSV / JSONL inputs) as a number, as the ValveList cell holds it"""
+    if type(value) is not str:
+        return value
+    if value == "":
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def lines_from_results(pairs):
+    """ConfigLine with default options for each sized (ValveLine, 13 result values) pair"""
+    lines = []
+    for line, results in pairs:
+        if to_str(results[_MODEL]).strip():
+            lines.append(ConfigLine(_number_cell(line.line_no), line.tag or None, results[_MODEL],
+                                    results[_GEARBOX] or None, _number_cell(results[_PRICE])))
+    return lines
+
+
+def read_configuration(path):
+    """ConfigLine for each row of the line block (row 2 down to the first blank Line)
+
+    Workbooks generated before the Grand Total moved to Q1 have a footer
+    below the lines ("Grand Total:" in A55, the option price reference from
+    A57); reading stops there as well.
+    """
+    parts = read_package(path)
+    sheets = {name: part for name, _, part in workbook_sheets(parts)}
+    if CONFIG_SHEET not in sheets:
+        raise ValueError("%s has no %s sheet" % (path, CONFIG_SHEET))
+    lines = []
+    width = len(CONFIG_HEADERS) - 2
+    expected = 2
+    for rownum, values in iter_sheet_rows(parts[sheets[CONFIG_SHEET]], shared_strings(parts)):
+        if rownum < 2:
+            continue
+        values = (list(values) + [None] * width)[:width]
+        first = to_str(values[0]).strip()
+        if rownum != expected or not first or first in CONFIG_FOOTER_MARKERS:
+            break
+        lines.append(ConfigLine(*values))
+        expected += 1
+    return lines
+
+
+def keep_selections(lines, previous):
+    """Copy option / painting / qty cells of previous lines with the same Tag"""
+    by_tag = {}
+    for old in previous:
+        by_tag.setdefault(to_str(old.tag).strip(), old)
+    for line in lines:
+        old = by_tag.get(to_str(line.tag).strip())
+        if old is not None:
+            (line.htr, line.mod, line.pos, line.lmt, line.exd,
+             line.painting, line.qty) = old.selections()
+    return lines
+
+
+# ============================================
+# Pricing
+# ============================================
+
+def option_prices(catalog):
+    """{code (upper case): price} of DB_Options; the first row of a code wins"""
+    prices = {}
+    for code, (_, price) in catalog.options.items():
+        prices.setdefault(code.strip().upper(), price)
+    return prices
+
+
+def price_configuration(lines, catalog):
+    """(unit prices, totals, grand total) of ConfigLines, one pass per column"""
+    prices = option_prices(catalog)
+    rows = [line.values() for line in lines]
+    units = [to_float(r[_BASE]) for r in rows]
+    for col, code in _OPTION_COLUMNS:
+        price = prices.get(code.upper(), 0.0)
+        if price:
+            units = [u + price if to_str(r[col]).strip().lower() == "yes" else u
+                     for u, r in zip(units, rows)]
+    painting = [prices.get(to_str(r[_PAINTING]).strip().upper(), 0.0) for r in rows]
+    units = [u + p for u, p in zip(units, painting)]
+    totals = [u * to_float(r[_QTY]) for u, r in zip(units, rows)]
+    return units, totals, sum(totals)
+
+
+# ============================================
+# Workbook Output
+# ============================================
+
+def configuration_sheet_xml(lines):
+    """(sheet part, StyleSheet, shared strings) of a Configuration sheet holding lines
+
+    openpyxl builds the header, validations and price reference; the data rows
+    are written as sheet XML in one pass (per-cell styling through openpyxl
+    is the slow part for tens of thousands of lines).
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = CONFIG_SHEET
+    header_font, header_fill, header_font_white, thin_border = create_styles()
+    setup_configuration_sheet(ws, header_font_white, header_fill, thin_border)
+    # Bordered placeholder in A2: gives the cell format index of data cells
+    template = ws.cell(row=2, column=1)
+    template.border = thin_border
+    xf = template.style_id
+
+    buf = io.BytesIO()
+    wb.save(buf)
+    parts = read_package(buf.getvalue())
+    part = workbook_sheets(parts)[0][2]
+
+    # Cell references and the Unit / Total formulas of btn_ToConfiguration,
+    # with the row number left as a %(row)d placeholder
+    col = {h: column_letter(i) + "%(row)d" for i, h in enumerate(CONFIG_HEADERS, 1)}
+    unit = "=" + col["Base"]
+    for name, code in CONFIG_OPTION_CODES:
+        unit += '+IF(%s="Yes",IFERROR(VLOOKUP("%s",DB_Options!A:C,3,FALSE),0),0)' % (col[name], code)
+    unit += "+IFERROR(VLOOKUP(%s,DB_Options!A:C,3,FALSE),0)" % col["Painting"]
+    total = "=%s*%s" % (col["Unit"], col["Qty"])
+    refs = [col[h] for h in CONFIG_HEADERS]
+
+    rows = {}
+    for row, line in enumerate(lines, 2):
+        n = {"row": row}
+        values = line.values() + [unit % n, total % n]
+        rows[row] = [cell_xml(ref % n, value, xf) for ref, value in zip(refs, values)]
+
+    sheet_xml = merge_rows(parts[part], rows)
+    return sheet_xml, StyleSheet(parts["xl/styles.xml"]), shared_strings(parts)
+
+
+def write_configuration(path, lines, output=None):
+    """Replace the Configuration sheet of a workbook with lines (atomic write)"""
+    parts = read_package(path)
+    sheets = {name: part for name, _, part in workbook_sheets(parts)}
+    part = sheets.get(CONFIG_SHEET)
+    if part is None or part not in parts:
+        raise ValueError("%s has no %s sheet" % (path, CONFIG_SHEET))
+
+    sheet_xml, src_styles, src_strings = configuration_sheet_xml(lines)
+    styles = StyleSheet(parts["xl/styles.xml"])
+    parts[part] = transplant_sheet(sheet_xml, src_styles, styles, src_strings=src_strings,
+                                   keep_sheet_pr=sheet_pr(parts[part]))
+    parts["xl/styles.xml"] = styles.to_bytes()
+    # Formulas are written without cached values
+    parts["xl/workbook.xml"] = set_full_calc_on_load(parts["xl/workbook.xml"])
+
+    dest = output or path
+    tmp = dest + ".tmp"
+    write_package(parts, tmp)
+    os.replace(tmp, dest)
+
+
+# ============================================
+# Main
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill or price the Configuration sheet")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_fill = sub.add_parser("fill", help="Copy sized lines into the Configuration sheet")
+    p_fill.add_argument("workbook", help="NoahSizing.xlsm to update")
+    p_fill.add_argument("--results", help="Sized ValveList to copy (default: the workbook's ValveList)")
+    p_fill.add_argument("--keep-options", action="store_true",
+                        help="Keep option / painting / qty selections of lines with the same Tag")
+    p_fill.add_argument("-o", "--output", help="Write a copy instead of updating in place")
+    p_price = sub.add_parser("price", help="Unit and total price of every Configuration line")
+    p_price.add_argument("workbook", help="Workbook with a filled Configuration sheet")
+    p_price.add_argument("--catalog", help="Workbook, catalog directory or SQLite database "
+                                           "(default: the workbook's DB_Options)")
+    p_price.add_argument("-o", "--output", help="CSV file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "fill":
+            lines = lines_from_results(iter_line_results(args.results or args.workbook))
+            if args.keep_options:
+                keep_selections(lines, read_configuration(args.workbook))
+            write_configuration(args.workbook, lines, args.output)
+            print("%d lines copied to %s" % (len(lines), args.output or args.workbook))
+        else:
+            lines = read_configuration(args.workbook)
+            units, totals, grand_total = price_configuration(
+                lines, load_catalog(args.catalog or args.workbook))
+            out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+            try:
+                writer = csv.writer(out)
+                writer.writerow(PRICE_HEADERS)
+                for line, unit, total in zip(lines, units, totals):
+                    writer.writerow([line.line_no, line.tag, line.model, round(unit, 2),
+                                     line.qty, round(total, 2)])
+                writer.writerow(["Grand Total", "", "", "", "", round(grand_total, 2)])
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,94 @@ from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.utils import get_column_letter
+from openpyxl.workbook.defined_name import DefinedName
+
+from xlsx_package import range_ref
+
+# ValveList columns (row 3 header), shared with the Python sizing tools
+# Input columns (Line No. added as first column)
+# Lift (mm): valve stem travel distance
+# Pitch (mm): thread pitch, Turns = Lift / Pitch for Multi-turn
+VALVELIST_INPUT_HEADERS = ["Line No.", "Tag", "ValveType", "Size", "Class", "Torque", "Thrust",
+                           "CouplingType", "CouplingDim", "Lift(mm)", "Pitch(mm)", "Op.Time(sec)"]
+
+# Result columns (ActualSF, MaxStemDim, kW added)
+VALVELIST_RESULT_HEADERS = ["Model", "Gearbox", "RPM", "Ratio", "OutputFlange", "CalcTorque",
+                            "CalcThrust", "CalcOpTime", "ActualSF", "MaxStemDim", "kW", "Price", "Status"]
+
+
+# Configuration sheet (one row per sized line, see btn_ToConfiguration / configuration.py)
+CONFIG_HEADERS = ["Line", "Tag", "Model", "Gearbox", "Base", "HTR", "MOD", "POS", "LMT", "EXD",
+                  "Painting", "Qty", "Unit", "Total"]
+# Yes/No option columns and their DB_Options codes
+CONFIG_OPTION_CODES = [("HTR", "OPT-HTR"), ("MOD", "OPT-MOD"), ("POS", "OPT-POS"),
+                       ("LMT", "OPT-LMT"), ("EXD", "OPT-EXD")]
+CONFIG_PAINTING_CODES = ["None", "PAINT-EP", "PAINT-PU", "PAINT-SPEC"]
+CONFIG_OPTION_REFERENCE = [("OPT-HTR", "HTR - Space Heater"), ("OPT-MOD", "MOD - Modulating Control"),
+                           ("OPT-POS", "POS - Position Transmitter"), ("OPT-LMT", "LMT - Limit Switch"),
+                           ("OPT-EXD", "EXD - Explosionproof Upgrade"), ("PAINT-EP", "Epoxy Coating"),
+                           ("PAINT-PU", "Polyurethane Coating"), ("PAINT-SPEC", "Special Coating")]
+CONFIG_LAST_ROW = 1048576       # Excel sheet limit
+
+# Template_Datasheet: rows 1-5 logo/header, then one (Item, Units) row per entry
+# from row 6; each line fills one column from C (ExportDatasheet / datasheet_html.py).
+# ("", "") rows are spacers, DATASHEET_SECTIONS rows are bold section headers.
+DATASHEET_HEADER_ROWS = 5
+DATASHEET_ROWS = [
+    ("Item", "Units"),
+    ("Line Number", ""),
+    ("Tag Number", ""),
+    ("Quantity", "Each"),
+    ("", ""),
+    ("Valve Requirements", "Units"),
+    ("Type", ""),
+    ("Size", ""),
+    ("Class", ""),
+    ("Torque", "Nm"),
+    ("Thrust", "kN"),
+    ("Coupling Type", ""),
+    ("Coupling Dimension", "mm"),
+    ("Turns", ""),
+    ("Operating Time", "secs"),
+    ("", ""),
+    ("Equipment Offered", "Units"),
+    ("Actuator", ""),
+    ("Actuator Speed", "rpm"),
+    ("Motor Power", "kW"),
+    ("Secondary Gearbox", ""),
+    ("Gearbox Ratio", ""),
+    ("Output Flange", ""),
+    ("Actuator Weight", "kg"),
+    ("Gearbox Weight", "kg"),
+    ("Combination Weight", "kg"),
+    ("", ""),
+    ("Actuator Performance", "Units"),
+    ("Torque", "Nm"),
+    ("Thrust", "kN"),
+    ("Output Speed", "rpm"),
+    ("Operating Time", "secs"),
+    ("", ""),
+    ("Safety Factors", ""),
+    ("Requested - Torque", ""),
+    ("Requested - Thrust", ""),
+    ("Calculated - Torque", ""),
+    ("Calculated - Thrust", ""),
+    ("", ""),
+    ("Electrical Data", ""),
+    ("Voltage", "V"),
+    ("Phase", "Ø"),
+    ("Frequency", "Hz"),
+    ("Starting current", "A"),
+    ("Starting power factor", ""),
+    ("Rated load current", "A"),
+    ("Current at average load", "A"),
+    ("Power factor at average load", ""),
+    ("Motor power at average load", "kW"),
+    ("Number of poles of motor", ""),
+]
+DATASHEET_SECTIONS = ["Valve Requirements", "Equipment Offered", "Actuator Performance",
+                      "Safety Factors", "Electrical Data"]
+
 
 def create_workbook():
     wb = Workbook()
@@ -31,15 +119,7 @@ def create_workbook():
     ws_datasheet = wb.create_sheet("Template_Datasheet")
 
     # Styles
-    header_font = Font(bold=True, size=11)
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font_white = Font(bold=True, size=11, color="FFFFFF")
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    header_font, header_fill, header_font_white, thin_border = create_styles()
 
     # ==================== Settings Sheet ====================
     setup_settings_sheet(ws_settings, header_font, thin_border)
@@ -78,12 +158,52 @@ def create_workbook():
     ws_options.sheet_state = 'hidden'
     ws_datasheet.sheet_state = 'hidden'
 
+    # One workbook-level name per DB sheet (modCache.bas reads each in a single Range.Value)
+    add_db_range_names(wb)
+
     # Set active sheet to Settings
     wb.active = ws_settings
 
     return wb
 
 
+def create_styles():
+    """Create the shared header/border styles used by all sheet setup functions
+
+    Returns (header_font, header_fill, header_font_white, thin_border)
+    """
+    header_font = Font(bold=True, size=11)
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_font_white = Font(bold=True, size=11, color="FFFFFF")
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    return header_font, header_fill, header_font_white, thin_border
+
+
+def sort_on_key(data, col=0):
+    """Sort DB rows on their lookup key column (Model, CouplingType, Code)
+
+    The sort is stable, so rows sharing a key keep their catalog order and
+    the first-match lookups (HasPowerOption, HasEnclosureOption, ...) still
+    return the same row. DB_Models and DB_Gearboxes are not sorted: the
+    sizing tie-breaks follow their sheet row order.
+    """
+    return sorted(data, key=lambda row: str(row[col]))
+
+
+def add_db_range_names(wb):
+    """Define tbl_<sheet> over the header and data block of every DB_* sheet"""
+    for name, _ in DB_SHEETS:
+        ws = wb[name]
+        range_name = db_range_name(name)
+        wb.defined_names[range_name] = DefinedName(
+            range_name, attr_text=range_ref(name, ws.max_row, ws.max_column))
+
+
 def setup_settings_sheet(ws, header_font, border):
     """Setup Settings sheet with input fields and dropdowns"""
 
@@ -153,15 +273,8 @@ def setup_valvelist_sheet(ws, header_font, header_fill, border):
     - Result columns: Green header (#548235), Light green data (#E2EFDA)
     """
 
-    # Input columns (Line No. added as first column)
-    # Lift (mm): valve stem travel distance
-    # Pitch (mm): thread pitch, Turns = Lift / Pitch for Multi-turn
-    input_headers = ["Line No.", "Tag", "ValveType", "Size", "Class", "Torque", "Thrust",
-                     "CouplingType", "CouplingDim", "Lift(mm)", "Pitch(mm)", "Op.Time(sec)"]
-
-    # Result columns (ActualSF, MaxStemDim, kW added)
-    result_headers = ["Model", "Gearbox", "RPM", "Ratio", "OutputFlange", "CalcTorque",
-                      "CalcThrust", "CalcOpTime", "ActualSF", "MaxStemDim", "kW", "Price", "Status"]
+    input_headers = VALVELIST_INPUT_HEADERS
+    result_headers = VALVELIST_RESULT_HEADERS
 
     all_headers = input_headers + result_headers
     input_count = len(input_headers)
@@ -243,6 +356,8 @@ def setup_configuration_sheet(ws, header_font, header_fill, border):
     
     Structure:
     Line | Tag | Model | Gearbox | Base | HTR | MOD | POS | LMT | EXD | Painting | Qty | Unit | Total
+
+    Grand Total in Q1, option price reference (from DB_Options) from P3 down
     """
     
     # Column widths
@@ -266,60 +381,44 @@ def setup_configuration_sheet(ws, header_font, header_fill, border):
         ws.column_dimensions[col].width = width
 
     # Headers
-    headers = [
-        "Line", "Tag", "Model", "Gearbox", "Base",
-        "HTR", "MOD", "POS", "LMT", "EXD",
-        "Painting", "Qty", "Unit", "Total"
-    ]
-    for col, header in enumerate(headers, 1):
+    for col, header in enumerate(CONFIG_HEADERS, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = header_font
         cell.fill = header_fill
         cell.border = border
         cell.alignment = Alignment(horizontal='center')
 
-    # Yes/No dropdown for option columns (F-J)
+    # Yes/No dropdown for option columns (F-J), Painting dropdown (K).
+    # Whole columns: btn_ToConfiguration / configuration.py write any number of lines
     yesno_list = "Yes,No"
     dv_yesno = DataValidation(type="list", formula1=f'"{yesno_list}"', allow_blank=False)
     dv_yesno.error = "Please select Yes or No"
     dv_yesno.errorTitle = "Invalid Input"
     ws.add_data_validation(dv_yesno)
-    dv_yesno.add('F2:J100')
+    dv_yesno.add(f'F2:J{CONFIG_LAST_ROW}')
 
-    # Painting dropdown (K)
-    paint_list = "None,PAINT-EP,PAINT-PU,PAINT-SPEC"
+    paint_list = ",".join(CONFIG_PAINTING_CODES)
     dv_paint = DataValidation(type="list", formula1=f'"{paint_list}"', allow_blank=False)
     dv_paint.error = "Please select from the list"
     dv_paint.errorTitle = "Invalid Input"
     ws.add_data_validation(dv_paint)
-    dv_paint.add('K2:K100')
-
-    # Add border to data area
-    for row in range(2, 52):
-        for col in range(1, 15):
-            cell = ws.cell(row=row, column=col)
-            cell.border = border
-
-    # Grand Total row
-    ws['A55'] = "Grand Total:"
-    ws['A55'].font = Font(bold=True)
-    ws['N55'] = "=SUM(N2:N54)"
-    ws['N55'].font = Font(bold=True)
-
-    # Option price reference (hidden area for documentation)
-    ws['A57'] = "Option Prices (Reference):"
-    ws['A57'].font = Font(bold=True, size=10)
-    option_prices = [
-        ("HTR", "Space Heater", 50),
-        ("MOD", "Modulating Control", 200),
-        ("POS", "Position Transmitter", 150),
-        ("LMT", "Limit Switch", 80),
-        ("EXD", "Explosionproof Upgrade", 300),
-    ]
-    for i, (code, desc, price) in enumerate(option_prices, 58):
-        ws.cell(row=i, column=1, value=code)
-        ws.cell(row=i, column=2, value=desc)
-        ws.cell(row=i, column=3, value=f"${price}")
+    dv_paint.add(f'K2:K{CONFIG_LAST_ROW}')
+
+    # Grand Total right of the table, over the whole Total column (no row limit;
+    # the header text in N1 is ignored by SUM)
+    ws['P1'] = "Grand Total:"
+    ws['P1'].font = Font(bold=True)
+    ws['Q1'] = "=SUM(N:N)"
+    ws['Q1'].font = Font(bold=True)
+    ws.column_dimensions['P'].width = 24
+    ws.column_dimensions['Q'].width = 12
+
+    # Option price reference, read from DB_Options (same lookup as the Unit formula)
+    ws['P3'] = "Option Prices (DB_Options):"
+    ws['P3'].font = Font(bold=True, size=10)
+    for i, (code, desc) in enumerate(CONFIG_OPTION_REFERENCE, 4):
+        ws.cell(row=i, column=16, value=desc)
+        ws.cell(row=i, column=17, value=f'=IFERROR(VLOOKUP("{code}",DB_Options!A:C,3,FALSE),0)')
 
     ws.freeze_panes = 'A2'
 
@@ -826,6 +925,8 @@ def setup_power_options_db(ws, header_font, header_fill, border):
             # DC option
             data.append([model, 24, "DC", hz, 50])   # DC 24V
 
+    data = sort_on_key(data)
+
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = header_font
@@ -924,6 +1025,8 @@ def setup_enclosure_options_db(ws, header_font, header_fill, border):
         data.append([model, "IP67", 0])
         data.append([model, "Exd", 250])  # Explosionproof option
 
+    data = sort_on_key(data)
+
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = header_font
@@ -1147,6 +1250,8 @@ def setup_electrical_data_db(ws, header_font, header_fill, border):
         data.append(add_row(model, 440, 3, 60, i440_60, power_w, 4))
         data.append(add_row(model, 24, "DC", 60, dc24, power_w, None))
 
+    data = sort_on_key(data)
+
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = header_font
@@ -1249,6 +1354,8 @@ def setup_couplings_db(ws, header_font, header_fill, border):
         ["Standard (Part-turn)", 0, 0],       # Part-turn용 (직접 플랜지 마운트)
     ]
 
+    data = sort_on_key(data)
+
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = header_font
@@ -1281,6 +1388,8 @@ def setup_options_db(ws, header_font, header_fill, border):
         ["PAINT-SPEC", "Special Coating", 250],
     ]
 
+    data = sort_on_key(data)
+
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = header_font
@@ -1310,7 +1419,7 @@ def setup_datasheet_template(ws, header_font, border):
     ws.column_dimensions['D'].width = 15
     
     # Header area (rows 1-5) for logo/company info
-    HEADER_ROWS = 5
+    HEADER_ROWS = DATASHEET_HEADER_ROWS
     
     # Set row heights for header area
     for r in range(1, HEADER_ROWS + 1):
@@ -1327,72 +1436,39 @@ def setup_datasheet_template(ws, header_font, border):
     ws.merge_cells('A4:D4')
     ws['A4'].alignment = Alignment(horizontal='center')
 
-    # Template structure based on the example datasheet
-    # Data starts from row 6 (after 5 header rows)
-    sections = [
-        ("Item", "Units", "Line 1", "Line 2"),
-        ("Line Number", "", "1", "2"),
-        ("Tag Number", "", "", ""),
-        ("Quantity", "Each", "1", "1"),
-        ("", "", "", ""),
-        ("Valve Requirements", "Units", "", ""),
-        ("Type", "", "", ""),
-        ("Size", "", "", ""),
-        ("Class", "", "", ""),
-        ("Torque", "Nm", "", ""),
-        ("Thrust", "kN", "", ""),
-        ("Coupling Type", "", "", ""),
-        ("Coupling Dimension", "mm", "", ""),
-        ("Turns", "", "", ""),
-        ("Operating Time", "secs", "", ""),
-        ("", "", "", ""),
-        ("Equipment Offered", "Units", "", ""),
-        ("Actuator", "", "", ""),
-        ("Actuator Speed", "rpm", "", ""),
-        ("Motor Power", "kW", "", ""),
-        ("Secondary Gearbox", "", "", ""),
-        ("Gearbox Ratio", "", "", ""),
-        ("Output Flange", "", "", ""),
-        ("Actuator Weight", "kg", "", ""),
-        ("Gearbox Weight", "kg", "", ""),
-        ("Combination Weight", "kg", "", ""),
-        ("", "", "", ""),
-        ("Actuator Performance", "Units", "", ""),
-        ("Torque", "Nm", "", ""),
-        ("Thrust", "kN", "", ""),
-        ("Output Speed", "rpm", "", ""),
-        ("Operating Time", "secs", "", ""),
-        ("", "", "", ""),
-        ("Safety Factors", "", "", ""),
-        ("Requested - Torque", "", "", ""),
-        ("Requested - Thrust", "", "", ""),
-        ("Calculated - Torque", "", "", ""),
-        ("Calculated - Thrust", "", "", ""),
-        ("", "", "", ""),
-        ("Electrical Data", "", "", ""),
-        ("Voltage", "V", "", ""),
-        ("Phase", "Ø", "", ""),
-        ("Frequency", "Hz", "", ""),
-        ("Starting current", "A", "", ""),
-        ("Starting power factor", "", "", ""),
-        ("Rated load current", "A", "", ""),
-        ("Current at average load", "A", "", ""),
-        ("Power factor at average load", "", "", ""),
-        ("Motor power at average load", "kW", "", ""),
-        ("Number of poles of motor", "", "", ""),
-    ]
-
-    # Start from row 6 (after header area)
+    # Data starts from row 6 (after 5 header rows); columns C and D show two sample lines
+    samples = {"Item": ("Line 1", "Line 2"), "Line Number": ("1", "2"), "Quantity": ("1", "1")}
     START_ROW = HEADER_ROWS + 1
-    
-    for row_idx, row_data in enumerate(sections, START_ROW):
+
+    for row_idx, (item, units) in enumerate(DATASHEET_ROWS, START_ROW):
+        row_data = (item, units) + samples.get(item, ("", ""))
         for col_idx, value in enumerate(row_data, 1):
             cell = ws.cell(row=row_idx, column=col_idx, value=value)
             if col_idx == 1 and value and value not in ["", "Item"]:
-                cell.font = Font(bold=True) if "Requirements" in value or "Offered" in value or "Performance" in value or "Factors" in value or "Data" in value else None
+                cell.font = Font(bold=True) if value in DATASHEET_SECTIONS else None
             cell.border = border
 
 
+# Catalog (DB_*) sheets in workbook order with their setup functions.
+# All of them take (ws, header_font_white, header_fill, thin_border).
+DB_SHEETS = [
+    ("DB_Models", setup_models_db),
+    ("DB_PowerOptions", setup_power_options_db),
+    ("DB_EnclosureOptions", setup_enclosure_options_db),
+    ("DB_ElectricalData", setup_electrical_data_db),
+    ("DB_Gearboxes", setup_gearboxes_db),
+    ("DB_Couplings", setup_couplings_db),
+    ("DB_Options", setup_options_db),
+]
+
+# Workbook-level range names of the DB sheets: DB_Models -> tbl_Models
+DB_RANGE_PREFIX = "tbl_"
+
+
+def db_range_name(sheet_name):
+    return DB_RANGE_PREFIX + sheet_name[len("DB_"):]
+
+
 if __name__ == "__main__":
     wb = create_workbook()
     wb.save("NoahSizing.xlsx")
@@ -0,0 +1,345 @@
+"""
+Noah Actuator Sizing Tool - HTML Datasheet
+Streams the Template_Datasheet layout as HTML pages without Excel (ExportDatasheet port)
+
+Usage:
+    python datasheet_html.py NoahSizing.xlsm -o datasheet.html          # Settings sheet of the workbook
+    python datasheet_html.py results.csv --settings settings.json --per-page 6 -o datasheet.html
+    python datasheet_html.py results.csv --line TAG-101 -o preview.html  # one line (portal preview)
+
+Rows are DATASHEET_ROWS of create_workbook.py (the Template_Datasheet
+layout), one column per sized line (Model not blank), --per-page lines per
+page. Cell values follow FillDatasheetLine in modDatasheet.bas: torque and
+thrust converted to Nm / kN, turns from Lift / Pitch (0.25 for Part-turn),
+gearbox ratio and weights from DB_Gearboxes / DB_Models, electrical data
+from DB_ElectricalData for the Settings bus. A 2-stage gearbox "A + B" shows
+the product of the ratios and the sum of the weights.
+
+The page template is compiled once (escaped label cells per row) and pages
+are yielded one by one while the input is read. For CSV / JSONL input memory
+does not grow with the number of lines; an xlsx ValveList is streamed by
+xlsx_reader but its columns are held in memory (the whole sheet part
+without numpy).
+"""
+
+import sys
+import argparse
+from html import escape
+
+from catalog import load_catalog, to_float, to_int, to_str
+from create_workbook import (DATASHEET_ROWS, DATASHEET_SECTIONS, VALVELIST_RESULT_HEADERS)
+from electrical_load import electrical_index
+from sizing_engine import actuator_type_from_valve, convert_torque_to_nm, convert_thrust_to_kn
+from sizing_settings import load_settings
+from valvelist_io import detect_format, iter_numbered_results
+
+DEFAULT_PER_PAGE = 4
+GEARBOX_TRAIN_SEPARATOR = " + "
+
+# Result value index by ValveList header
+_R = {h: i for i, h in enumerate(VALVELIST_RESULT_HEADERS)}
+# DATASHEET_ROWS index of each filled item, as "R + n" in FillDatasheetLine (index = n - 1)
+_ROW = {name: n - 1 for name, n in [
+    ("item", 1), ("line_no", 2), ("tag", 3), ("qty", 4),
+    ("type", 7), ("size", 8), ("class", 9), ("torque", 10), ("thrust", 11),
+    ("coupling_type", 12), ("coupling_dim", 13), ("turns", 14), ("op_time", 15),
+    ("model", 18), ("rpm", 19), ("kw", 20), ("gearbox", 21), ("ratio", 22), ("flange", 23),
+    ("act_weight", 24), ("gb_weight", 25), ("weight", 26),
+    ("calc_torque", 29), ("calc_thrust", 30), ("output_rpm", 31), ("calc_op_time", 32),
+    ("sf_torque", 35), ("sf_thrust", 36), ("actual_sf_torque", 37), ("actual_sf_thrust", 38),
+    ("voltage", 41), ("phase", 42), ("freq", 43), ("electrical", 44)]}
+
+PAGE_CSS = """
+body { font-family: Arial, Helvetica, sans-serif; font-size: 12px; }
+.datasheet-page { page-break-after: always; margin-bottom: 24px; }
+.datasheet-page h1 { font-size: 16px; text-align: center; }
+.datasheet-page table { border-collapse: collapse; }
+.datasheet-page th, .datasheet-page td { border: 1px solid #000; padding: 2px 6px; text-align: left; }
+.datasheet-page td.value { min-width: 90px; }
+.datasheet-page tr.section th { font-weight: bold; background: #f2f2f2; }
+.datasheet-page tr.item th, .datasheet-page tr.item td { font-weight: bold; background: #d9e1f2; }
+.datasheet-page th.label { font-weight: normal; }
+"""
+
+
+# ============================================
+# Catalog Lookups
+# ============================================
+
+class DatasheetLookup:
+    """DB_Models / DB_Gearboxes / DB_ElectricalData values used by the datasheet
+
+    Built once per catalog; the first matching row wins, like the modHelpers
+    Get...ByModel functions.
+    """
+
+    def __init__(self, catalog):
+        self.thrust = {}
+        self.weights = {}           # model -> [(MotorPower_kW, Weight_kg)] in DB order
+        for m in filter(None, catalog.models):     # deleted rows are None (Catalog edits)
+            self.thrust.setdefault(m.model, m.thrust)
+            self.weights.setdefault(m.model, []).append((m.motor_power_kw, m.weight))
+        self.gearboxes = {}
+        for g in filter(None, catalog.gearboxes):
+            self.gearboxes.setdefault(g.model, (g.ratio, g.weight))
+        self.electrical = electrical_index(catalog)
+
+    def actuator_weight(self, model, motor_kw=0.0):
+        """GetActuatorWeightByModel: match MotorPower_kW within 0.01 when motor_kw > 0"""
+        for kw, weight in self.weights.get(model, ()):
+            if motor_kw <= 0 or abs(kw - motor_kw) < 0.01:
+                return weight
+        return 0.0
+
+    def gearbox(self, model):
+        """(ratio, weight) of a gearbox or "A + B" train; (0, 0) when unknown"""
+        if not model:
+            return 0.0, 0.0
+        ratio, weight = 1.0, 0.0
+        for stage in model.split(GEARBOX_TRAIN_SEPARATOR):
+            stage_ratio, stage_weight = self.gearboxes.get(stage.strip(), (0.0, 0.0))
+            ratio *= stage_ratio
+            weight += stage_weight
+        return ratio, weight
+
+
+# ============================================
+# Line Values
+# ============================================
+
+def datasheet_values(line, results, settings, lookup, position=1, column=1):
+    """Cell values of one line, aligned with DATASHEET_ROWS (None = empty cell)
+
+    line / results: ValveLine and its 13 result values (valvelist_io)
+    position: Line Number fallback when Line No. is not > 0 (valvelist_io.iter_numbered_results():
+              sheet row - header row for xlsx, like valveRow - ROW_HEADER, else the line's
+              position among the lines read)
+    column: 1-based column of the line in the datasheet ("Line n" header)
+    """
+    s = settings
+    v = [None] * len(DATASHEET_ROWS)
+    r = results
+
+    v[_ROW["item"]] = "Line %d" % column
+    line_no = to_int(line.line_no)
+    v[_ROW["line_no"]] = line_no if line_no > 0 else position
+    v[_ROW["tag"]] = line.tag
+    v[_ROW["qty"]] = 1
+
+    # Valve Requirements
+    v[_ROW["type"]] = line.valve_type
+    v[_ROW["size"]] = line.size
+    v[_ROW["class"]] = line.valve_class
+    torque_nm = convert_torque_to_nm(to_float(line.torque), s.torque_unit)
+    thrust_kn = convert_thrust_to_kn(to_float(line.thrust), s.thrust_unit)
+    v[_ROW["torque"]] = round(torque_nm, 2)
+    v[_ROW["thrust"]] = round(thrust_kn, 2)
+    v[_ROW["coupling_type"]] = line.coupling_type
+    v[_ROW["coupling_dim"]] = line.coupling_dim
+    pitch = to_float(line.pitch)
+    if pitch > 0:
+        v[_ROW["turns"]] = round(to_float(line.lift) / pitch, 2)
+    elif actuator_type_from_valve(to_str(line.valve_type)) == "Part-turn":
+        v[_ROW["turns"]] = 0.25
+    v[_ROW["op_time"]] = line.op_time
+
+    # Equipment Offered
+    model = to_str(r[_R["Model"]])
+    gb_model = to_str(r[_R["Gearbox"]])
+    calc_thrust = lookup.thrust.get(model, 0.0)
+    motor_kw = to_float(r[_R["kW"]])
+    gb_ratio, gb_weight = lookup.gearbox(gb_model)
+    act_weight = lookup.actuator_weight(model, motor_kw)
+    v[_ROW["model"]] = model
+    v[_ROW["rpm"]] = r[_R["RPM"]]
+    if motor_kw > 0:
+        v[_ROW["kw"]] = motor_kw
+    v[_ROW["gearbox"]] = gb_model
+    if gb_ratio > 0:
+        v[_ROW["ratio"]] = "%s:1" % to_str(gb_ratio)
+    v[_ROW["flange"]] = r[_R["OutputFlange"]]
+    if act_weight > 0:
+        v[_ROW["act_weight"]] = act_weight
+    if gb_weight > 0:
+        v[_ROW["gb_weight"]] = gb_weight
+    if act_weight > 0 or gb_weight > 0:
+        v[_ROW["weight"]] = act_weight + gb_weight
+
+    # Actuator Performance
+    v[_ROW["calc_torque"]] = r[_R["CalcTorque"]]
+    if calc_thrust > 0:
+        v[_ROW["calc_thrust"]] = round(calc_thrust, 2)
+    act_rpm = to_float(r[_R["RPM"]])
+    output_rpm = act_rpm / gb_ratio if gb_ratio > 0 else act_rpm
+    if output_rpm > 0:
+        v[_ROW["output_rpm"]] = round(output_rpm, 2)
+    v[_ROW["calc_op_time"]] = r[_R["CalcOpTime"]]
+
+    # Safety Factors
+    v[_ROW["sf_torque"]] = s.safety_factor
+    v[_ROW["sf_thrust"]] = s.safety_factor
+    calc_torque = to_float(r[_R["CalcTorque"]])
+    if torque_nm > 0:
+        v[_ROW["actual_sf_torque"]] = round(calc_torque / torque_nm, 2)
+    if thrust_kn > 0 and calc_thrust > 0:
+        v[_ROW["actual_sf_thrust"]] = round(calc_thrust / thrust_kn, 2)
+
+    # Electrical Data
+    v[_ROW["voltage"]] = s.voltage
+    v[_ROW["phase"]] = s.phase
+    v[_ROW["freq"]] = "%s Hz" % s.frequency
+    data = lookup.electrical.get((model, s.voltage, s.phase, s.frequency))
+    if data is not None:
+        start = _ROW["electrical"]
+        v[start:start + 7] = [data.starting_current, data.starting_pf, data.rated_current,
+                              data.avg_current, data.avg_pf, data.avg_power_kw, data.poles]
+    return v
+
+
+def sized_lines(pairs):
+    """Yield (position, ValveLine, results) for sized lines
+
+    pairs: (position, ValveLine, results) from valvelist_io.iter_numbered_results(),
+    or (ValveLine, results), numbered here by position among the lines read
+    """
+    for n, item in enumerate(pairs, 1):
+        position, line, results = item if len(item) == 3 else (n,) + tuple(item)
+        if to_str(results[_R["Model"]]).strip():
+            yield position, line, results
+
+
+# ============================================
+# HTML Rendering
+# ============================================
+
+def _cell(value):
+    return escape(to_str(value))
+
+
+class DatasheetTemplate:
+    """Page template compiled once from DATASHEET_ROWS"""
+
+    def __init__(self, title="ACTUATOR DATASHEET"):
+        self.title = escape(title)
+        self.rows = []              # (row open + label cells, kind)
+        for item, units in DATASHEET_ROWS:
+            if item == "Item":
+                kind = "item"
+            elif item in DATASHEET_SECTIONS:
+                kind = "section"
+            elif not item:
+                kind = "spacer"
+            else:
+                kind = "data"
+            label = "label" if kind == "data" else ""
+            self.rows.append(('<tr class="%s"><th class="%s">%s</th><td>%s</td>' % (
+                kind, label, escape(item), escape(units)), kind))
+
+    def document_start(self):
+        return ('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+                '<title>%s</title>\n<style>%s</style>\n</head>\n<body>\n' % (self.title, PAGE_CSS))
+
+    def document_end(self):
+        return "</body>\n</html>\n"
+
+    def page(self, columns):
+        """HTML of one page; columns: lists of values from datasheet_values()"""
+        out = ['<section class="datasheet-page">\n<h1>%s</h1>\n<table>\n' % self.title]
+        for i, (prefix, kind) in enumerate(self.rows):
+            if kind == "spacer" or kind == "section":
+                cells = "<td></td>" * len(columns)
+            else:
+                cells = "".join('<td class="value">%s</td>' % _cell(c[i]) for c in columns)
+            out.append(prefix + cells + "</tr>\n")
+        out.append("</table>\n</section>\n")
+        return "".join(out)
+
+
+def render_pages(pairs, settings, lookup, per_page=DEFAULT_PER_PAGE, template=None):
+    """Yield the HTML document in chunks: head, one chunk per page, tail
+
+    pairs: iterable of (ValveLine, 13 result values) or (position, ValveLine,
+    results) as in sized_lines(), read lazily
+    """
+    if per_page < 1:
+        raise ValueError("per_page must be >= 1")
+    template = template or DatasheetTemplate()
+    yield template.document_start()
+    columns = []
+    for column, (position, line, results) in enumerate(sized_lines(pairs), 1):
+        columns.append(datasheet_values(line, results, settings, lookup, position, column))
+        if len(columns) == per_page:
+            yield template.page(columns)
+            columns = []
+    if columns:
+        yield template.page(columns)
+    yield template.document_end()
+
+
+def find_line(pairs, key):
+    """(position, ValveLine, results) of the first sized line whose Tag or Line No. is key"""
+    key = to_str(key).strip()
+    for position, line, results in sized_lines(pairs):
+        if to_str(line.tag).strip() == key or to_str(line.line_no).strip() == key:
+            return position, line, results
+    return None
+
+
+def render_line(pairs, key, settings, lookup, template=None):
+    """Complete HTML document of one line (portal preview); ValueError if not found"""
+    found = find_line(pairs, key)
+    if found is None:
+        raise ValueError("No sized line with Tag or Line No. %s" % key)
+    position, line, results = found
+    template = template or DatasheetTemplate()
+    return "".join([template.document_start(),
+                    template.page([datasheet_values(line, results, settings, lookup, position)]),
+                    template.document_end()])
+
+
+# ============================================
+# Main
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render actuator datasheets as HTML")
+    parser.add_argument("input", help="Sized ValveList (xlsx/xlsm, CSV, JSONL, Arrow, Parquet)")
+    parser.add_argument("--settings", help="Settings workbook or JSON (default: Settings sheet of a "
+                                           "workbook input, otherwise create_workbook.py defaults)")
+    parser.add_argument("--catalog", help="Workbook, catalog directory or SQLite database "
+                                          "(default: create_workbook.py data)")
+    parser.add_argument("--per-page", type=int, default=DEFAULT_PER_PAGE,
+                        help="Lines per page (default %d)" % DEFAULT_PER_PAGE)
+    parser.add_argument("--line", help="Render only the line with this Tag or Line No.")
+    parser.add_argument("-o", "--output", help="HTML file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = None
+    try:
+        if args.settings:
+            settings = load_settings(args.settings)
+        elif detect_format(args.input) == "xlsx":
+            settings = load_settings(args.input)
+        else:
+            settings = load_settings()
+        lookup = DatasheetLookup(load_catalog(args.catalog))
+        pairs = iter_numbered_results(args.input)
+        if args.line:
+            chunks = [render_line(pairs, args.line, settings, lookup)]
+        else:
+            chunks = render_pages(pairs, settings, lookup, args.per_page)
+
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        for chunk in chunks:
+            out.write(chunk)
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Noah Actuator Sizing Tool - Electrical Load
+Per-bus current and power totals of the sized actuators of a project (DB_ElectricalData)
+
+Usage:
+    python electrical_load.py NoahSizing.xlsm                          # bus from the Settings sheet
+    python electrical_load.py results.csv --settings settings.json -o load.csv
+    python electrical_load.py area1.xlsm area2.xlsm --by-model --simultaneous 3 --start-factor 7
+
+A bus is the Voltage / Phase / Freq of the settings a file was sized with:
+--settings for every input, otherwise the Settings sheet of a workbook
+input (create_workbook.py defaults for CSV / JSONL / Arrow / Parquet).
+
+Each sized line (Model not blank) is joined with DB_ElectricalData on
+(Model, Voltage, Phase, Freq), like GetActuatorElectricalData in
+modDatasheet.bas (first matching row). The files are read once; lines are
+counted per (bus, model) and the join runs once per distinct model, so a
+50k-line project costs one pass plus a few hundred lookups.
+
+Per bus:
+    RatedCurrent_A / AvgCurrent_A / AvgPower_kW / StartingCurrent_A   sums over all actuators
+    PeakCurrent_A     worst case of N simultaneous starts (--simultaneous, default 1):
+                      all actuators at rated current, plus the N largest
+                      (StartingCurrent - RatedCurrent) steps
+    NoElectricalData  sized actuators without a DB_ElectricalData row for the bus
+    NoStartingData    actuators without StartingCurrent_A (counted at rated current)
+    StartEstimated    StartingCurrent_A taken as --start-factor x RatedCurrent_A
+"""
+
+import csv
+import sys
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+
+from catalog import load_catalog, to_int, to_str
+from sizing_settings import load_settings
+from valvelist_io import detect_format, iter_line_results
+
+LOAD_HEADERS = ["Voltage", "Phase", "Freq", "Model", "Actuators", "NoElectricalData",
+                "RatedCurrent_A", "AvgCurrent_A", "AvgPower_kW", "StartingCurrent_A",
+                "NoStartingData", "StartEstimated", "PeakCurrent_A"]
+
+
+@dataclass
+class ElectricalData:
+    """DB_ElectricalData values of one Model + Voltage + Phase + Freq (None = blank cell)"""
+    starting_current: float = None
+    starting_pf: float = None
+    rated_current: float = None
+    avg_current: float = None
+    avg_pf: float = None
+    avg_power_kw: float = None
+    poles: float = None
+
+
+@dataclass
+class BusLoad:
+    voltage: int
+    phase: int
+    freq: int
+    model: str = ""                  # "" = bus total
+    actuators: int = 0
+    no_data: int = 0
+    rated_current: float = 0.0
+    avg_current: float = 0.0
+    avg_power_kw: float = 0.0
+    starting_current: float = 0.0
+    no_starting_data: int = 0
+    start_estimated: int = 0
+    peak_current: float = 0.0
+    models: list = field(default_factory=list)    # per-model BusLoad rows
+
+
+# ============================================
+# DB_ElectricalData
+# ============================================
+
+def _number(value):
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def electrical_index(catalog):
+    """{(Model, Voltage, Phase, Freq): ElectricalData}; the first row of a key wins"""
+    index = {}
+    for row in catalog.tables.get("DB_ElectricalData", []):
+        row = tuple(row) + (None,) * (11 - len(row))
+        model = to_str(row[0])
+        if not model:
+            continue
+        # GetCellInt: "DC" phase compares as 0
+        key = (model, to_int(row[1]), to_int(row[2]), to_int(row[3]))
+        if key not in index:
+            index[key] = ElectricalData(*[_number(v) for v in row[4:11]])
+    return index
+
+
+# ============================================
+# Aggregation
+# ============================================
+
+def bus_of(settings):
+    return settings.voltage, settings.phase, settings.frequency
+
+
+def count_models(pairs):
+    """Counter of Model over sized lines of (ValveLine, 13 result values) pairs"""
+    counts = Counter()
+    for _, results in pairs:
+        model = to_str(results[0]).strip()
+        if model:
+            counts[model] += 1
+    return counts
+
+
+def _model_load(bus, model, count, data, start_factor):
+    load = BusLoad(*bus, model=model, actuators=count)
+    if data is None:
+        load.no_data = count
+        return load, 0.0
+    rated = data.rated_current or 0.0
+    start = data.starting_current
+    if start is None and start_factor and data.rated_current is not None:
+        start = rated * start_factor
+        load.start_estimated = count
+    if start is None:
+        load.no_starting_data = count
+        start = rated
+    load.rated_current = rated * count
+    load.avg_current = (data.avg_current or 0.0) * count
+    load.avg_power_kw = (data.avg_power_kw or 0.0) * count
+    load.starting_current = start * count
+    return load, max(start - rated, 0.0)
+
+
+def aggregate_load(bus_counts, catalog, simultaneous=1, start_factor=None):
+    """BusLoad per bus (sorted) from {bus: Counter of Model}
+
+    simultaneous: number of actuators assumed to start at the same time
+    start_factor: StartingCurrent = factor x RatedCurrent when the catalog has none
+    """
+    index = electrical_index(catalog)
+    loads = []
+    for bus in sorted(bus_counts):
+        total = BusLoad(*bus)
+        steps = []                   # (start step, actuator count) per model
+        for model in sorted(bus_counts[bus]):
+            count = bus_counts[bus][model]
+            load, step = _model_load(bus, model, count, index.get((model,) + bus), start_factor)
+            load.peak_current = load.rated_current + step * min(count, simultaneous)
+            total.models.append(load)
+            steps.append((step, count))
+            for name in ("actuators", "no_data", "rated_current", "avg_current", "avg_power_kw",
+                         "starting_current", "no_starting_data", "start_estimated"):
+                setattr(total, name, getattr(total, name) + getattr(load, name))
+
+        # Worst case: the N largest starting steps on top of every rated current
+        remaining = simultaneous
+        total.peak_current = total.rated_current
+        for step, count in sorted(steps, reverse=True):
+            if remaining <= 0:
+                break
+            used = min(count, remaining)
+            total.peak_current += step * used
+            remaining -= used
+        loads.append(total)
+    return loads
+
+
+def project_load(inputs, catalog, settings_path=None, simultaneous=1, start_factor=None):
+    """Read sized files and aggregate per bus (see module docstring for the bus of a file)"""
+    bus_counts = {}
+    for path in inputs:
+        if settings_path:
+            settings = load_settings(settings_path)
+        elif detect_format(path) == "xlsx":
+            settings = load_settings(path)
+        else:
+            settings = load_settings()
+        bus_counts.setdefault(bus_of(settings), Counter()).update(count_models(iter_line_results(path)))
+    return aggregate_load(bus_counts, catalog, simultaneous, start_factor)
+
+
+# ============================================
+# Main
+# ============================================
+
+def _load_row(load):
+    return [load.voltage, load.phase, load.freq, load.model, load.actuators, load.no_data,
+            round(load.rated_current, 3), round(load.avg_current, 3), round(load.avg_power_kw, 3),
+            round(load.starting_current, 3), load.no_starting_data, load.start_estimated,
+            round(load.peak_current, 3)]
+
+
+def write_load(f, loads, by_model=False):
+    writer = csv.writer(f)
+    writer.writerow(LOAD_HEADERS)
+    for load in loads:
+        writer.writerow(_load_row(load))
+        if by_model:
+            for model_load in load.models:
+                writer.writerow(_load_row(model_load))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-bus electrical load of the sized actuators")
+    parser.add_argument("inputs", nargs="+", help="Sized ValveList files (xlsx/xlsm, CSV, JSONL, Arrow, Parquet)")
+    parser.add_argument("--settings", help="Settings for every input (workbook or JSON); defines the bus")
+    parser.add_argument("--catalog", help="Workbook, catalog directory or SQLite database (default: create_workbook.py data)")
+    parser.add_argument("--simultaneous", type=int, default=1, help="Actuators starting at the same time (default 1)")
+    parser.add_argument("--start-factor", type=float,
+                        help="Estimate missing StartingCurrent_A as factor x RatedCurrent_A (e.g. 7)")
+    parser.add_argument("--by-model", action="store_true", help="Add one row per model under each bus")
+    parser.add_argument("-o", "--output", help="CSV file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.simultaneous < 0:
+        print("--simultaneous must be >= 0", file=sys.stderr)
+        return 2
+    try:
+        loads = project_load(args.inputs, load_catalog(args.catalog), args.settings,
+                             args.simultaneous, args.start_factor)
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as f:
+                write_load(f, loads, args.by_model)
+        else:
+            write_load(sys.stdout, loads, args.by_model)
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
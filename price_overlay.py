@@ -0,0 +1,138 @@
+"""
+Noah Actuator Sizing Tool - Price Overlays
+Customer / distributor price lists applied over one shared catalog
+
+Usage:
+    python sizing_cli.py lines.csv --price-list customer_a.json -o results.csv
+    python catalog_coverage.py --price-list distributor.json --bus 380/3/50
+
+A price list holds only the prices that differ from the catalog:
+
+    {
+        "name": "CustomerA",
+        "price_factor": 0.95,
+        "DB_Models": {"NA006": 1450, "SA05": 2100},
+        "DB_PowerOptions": [["NA006", 380, 3, 50, 120]],
+        "DB_EnclosureOptions": [["NA006", "IP67", 0]],
+        "DB_Gearboxes": {"SB-VS10": 190}
+    }
+
+DB_Models / DB_Gearboxes map Model to BasePrice / Price; the option tables
+list rows in sheet column order (Model, Voltage, Phase, Freq, PriceAdder and
+Model, Enclosure, PriceAdder). Every catalog price without an entry is
+multiplied by price_factor and rounded, like a build_parallel.py variant
+(default 1 = unchanged); listed prices are used as given. Technical data
+and option availability always come from the catalog.
+
+SizingEngine.with_prices(overlay) returns an engine that ranks with these
+prices and shares the resolved actuators, filters and gearbox index of the
+catalog engine, so a batch mixing customers holds one catalog in memory.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+from catalog import to_float, to_int, to_str
+
+OVERLAY_KEYS = {"name", "price_factor", "DB_Models", "DB_PowerOptions", "DB_EnclosureOptions",
+                "DB_Gearboxes"}
+
+
+@dataclass
+class PriceOverlay:
+    """Sparse prices by catalog key; missing keys fall back to price_factor x catalog price"""
+    name: str = ""
+    price_factor: float = 1
+    base_prices: dict = field(default_factory=dict)         # Model -> BasePrice
+    power_adders: dict = field(default_factory=dict)        # (Model, Voltage, Phase, Freq) -> PriceAdder
+    enclosure_adders: dict = field(default_factory=dict)    # (Model, Enclosure) -> PriceAdder
+    gearbox_prices: dict = field(default_factory=dict)      # Gearbox Model -> Price
+
+    def scale(self, price):
+        """A catalog price as seen through the overlay (no explicit entry)"""
+        if self.price_factor == 1:
+            return price
+        return round(price * self.price_factor)
+
+    def actuator_price(self, m, s, catalog):
+        """ResolveActuator price of ModelRecord m under settings s, or None when not resolvable"""
+        power = self.power_adders.get((m.model, s.voltage, s.phase, s.frequency))
+        if power is None:
+            power = catalog.power_adder(m.model, s.voltage, s.phase, s.frequency)
+            if power is None:
+                return None
+            power = self.scale(power)
+        option = catalog.enclosure_option(m.model, s.enclosure)
+        if option is None:
+            return None
+        enclosure = self.enclosure_adders.get((m.model, option[0]))
+        if enclosure is None:
+            enclosure = self.scale(option[1])
+        base = self.base_prices.get(m.model)
+        if base is None:
+            base = self.scale(m.base_price)
+        return base + power + enclosure
+
+    def gearbox_price(self, gb):
+        price = self.gearbox_prices.get(gb.model)
+        return self.scale(gb.price) if price is None else price
+
+    def fingerprint(self):
+        """Everything that affects a price, as a stable tuple (cache keys)"""
+        return (float(self.price_factor), sorted(self.base_prices.items()),
+                sorted(self.power_adders.items()), sorted(self.enclosure_adders.items()),
+                sorted(self.gearbox_prices.items()))
+
+    def unknown_entries(self, catalog):
+        """Entries whose key is not in the catalog (ignored when pricing)"""
+        models = {m.model for _, m in catalog.model_rows()}
+        gearboxes = {gb.model for _, gb in catalog.valid_gearboxes()}
+        unknown = ["DB_Models " + model for model in self.base_prices if model not in models]
+        unknown += ["DB_PowerOptions %s %d/%d/%d" % key for key in self.power_adders
+                    if catalog.power_adder(*key) is None]
+        for model, enclosure in self.enclosure_adders:
+            # Only the option HasEnclosureOption picks for an Enclosure setting is ever priced
+            options = [catalog.enclosure_option(model, setting) for setting in ("Waterproof", "Explosionproof")]
+            if enclosure not in [option[0] for option in options if option is not None]:
+                unknown.append("DB_EnclosureOptions %s %s" % (model, enclosure))
+        unknown += ["DB_Gearboxes " + model for model in self.gearbox_prices if model not in gearboxes]
+        return unknown
+
+
+def overlay_from_values(values):
+    """PriceOverlay from the JSON structure of the module docstring"""
+    if not isinstance(values, dict):
+        raise ValueError("Price list must be a JSON object")
+    unknown = sorted(set(values) - OVERLAY_KEYS)
+    if unknown:
+        raise ValueError("Unknown price list key: %s" % ", ".join(unknown))
+    factor = to_float(values.get("price_factor", 1))
+    if factor <= 0:
+        raise ValueError("price_factor must be > 0")
+    overlay = PriceOverlay(to_str(values.get("name", "")), factor)
+    try:
+        for model, price in values.get("DB_Models", {}).items():
+            overlay.base_prices[to_str(model)] = to_float(price)
+        for model, voltage, phase, freq, price in values.get("DB_PowerOptions", []):
+            key = (to_str(model), to_int(voltage), to_int(phase), to_int(freq))
+            overlay.power_adders[key] = to_float(price)
+        for model, enclosure, price in values.get("DB_EnclosureOptions", []):
+            overlay.enclosure_adders[(to_str(model), to_str(enclosure))] = to_float(price)
+        for model, price in values.get("DB_Gearboxes", {}).items():
+            overlay.gearbox_prices[to_str(model)] = to_float(price)
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError("Invalid price list: DB_Models / DB_Gearboxes are {Model: price}, "
+                         "option tables are lists of rows")
+    return overlay
+
+
+def load_price_overlay(path):
+    with open(path, encoding="utf-8") as f:
+        try:
+            values = json.load(f)
+        except ValueError as e:
+            raise ValueError("%s: %s" % (path, e))
+    overlay = overlay_from_values(values)
+    if not overlay.name:
+        overlay.name = path
+    return overlay
@@ -0,0 +1,158 @@
+"""
+Noah Actuator Sizing Tool - In-place Catalog Refresh
+Updates the DB_* sheets of existing NoahSizing.xlsm files without a rebuild
+
+Only DB sheets whose catalog content hash changed are rewritten. ValveList,
+Configuration, Settings, Template_Datasheet, the VBA modules, frmAlternatives
+and the ValveList buttons are left untouched, because the workbook is edited
+at the zip-part level instead of being re-saved through openpyxl. The
+tbl_<sheet> range names read by modCache.bas are set to the new row counts
+(and added to workbooks generated before they existed).
+
+Usage:
+    python refresh_catalog.py NoahSizing.xlsm [more.xlsm ...]
+    python refresh_catalog.py --source NoahSizing.xlsx --output-dir out/ *.xlsm
+    python refresh_catalog.py --dry-run NoahSizing.xlsm
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+
+from create_workbook import create_workbook, DB_SHEETS, db_range_name
+from xlsx_package import (read_package, write_package, workbook_sheets, shared_strings,
+                          iter_sheet_rows, sheet_content_hash, sheet_pr, sheet_extent,
+                          range_ref, defined_names, set_defined_names,
+                          StyleSheet, transplant_sheet)
+
+DB_SHEET_NAMES = [name for name, _ in DB_SHEETS]
+
+
+class CatalogSource:
+    """DB_* sheet parts and content hashes of the new catalog version"""
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.styles = StyleSheet(parts["xl/styles.xml"])
+        self.strings = shared_strings(parts)
+        self.sheets = {}    # sheet name -> part name
+        self.hashes = {}    # sheet name -> content hash
+        self.ranges = {}    # sheet name -> reference of its tbl_ range name
+
+        for name, state, part in workbook_sheets(parts):
+            if name in DB_SHEET_NAMES:
+                rows = list(iter_sheet_rows(parts[part], self.strings))
+                self.sheets[name] = part
+                self.hashes[name] = sheet_content_hash(values for _, values in rows)
+                self.ranges[name] = range_ref(name, *sheet_extent(rows))
+
+        missing = [name for name in DB_SHEET_NAMES if name not in self.sheets]
+        if missing:
+            raise ValueError("Catalog source is missing sheets: " + ", ".join(missing))
+
+
+def load_source(path=None):
+    """Load the new catalog from a workbook file, or generate it with create_workbook()"""
+    if path:
+        return CatalogSource(read_package(path))
+    buf = io.BytesIO()
+    create_workbook().save(buf)
+    return CatalogSource(read_package(buf.getvalue()))
+
+
+def refresh_workbook(path, source, output=None, dry_run=False):
+    """Refresh the DB_* sheets of one workbook
+
+    Returns (changed sheet names, missing sheet names); "range names" is
+    listed as changed when only the tbl_ range names had to be updated.
+    The file is written (atomically) only when something changed.
+    """
+    parts = read_package(path)
+    strings = shared_strings(parts)
+    styles = None
+    changed = []
+    missing = []
+
+    sheets = {name: part for name, _, part in workbook_sheets(parts)}
+
+    for name in DB_SHEET_NAMES:
+        part = sheets.get(name)
+        if part is None or part not in parts:
+            # Adding sheets needs workbook.xml/rels/content-type edits; rebuild instead
+            missing.append(name)
+            continue
+
+        current = sheet_content_hash(values for _, values in iter_sheet_rows(parts[part], strings))
+        if current == source.hashes[name]:
+            continue
+
+        changed.append(name)
+        if dry_run:
+            continue
+        if styles is None:
+            styles = StyleSheet(parts["xl/styles.xml"])
+        parts[part] = transplant_sheet(
+            source.parts[source.sheets[name]], source.styles, styles,
+            src_strings=source.strings, keep_sheet_pr=sheet_pr(parts[part]))
+
+    names = {db_range_name(name): source.ranges[name] for name in DB_SHEET_NAMES if name not in missing}
+    current = defined_names(parts["xl/workbook.xml"])
+    names_changed = any(current.get(key) != ref for key, ref in names.items())
+    if names_changed and not changed:
+        changed.append("range names")
+
+    if changed and not dry_run:
+        if styles is not None:
+            parts["xl/styles.xml"] = styles.to_bytes()
+        if names_changed:
+            parts["xl/workbook.xml"] = set_defined_names(parts["xl/workbook.xml"], names)
+        dest = output or path
+        tmp = dest + ".tmp"
+        write_package(parts, tmp)
+        os.replace(tmp, dest)
+
+    return changed, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh DB_* catalog sheets of existing NoahSizing workbooks")
+    parser.add_argument("workbooks", nargs="+", help="NoahSizing.xlsm files to update")
+    parser.add_argument("--source", help="Workbook with the new catalog (default: generate with create_workbook)")
+    parser.add_argument("--output-dir", help="Write refreshed copies here instead of updating in place")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which sheets would change")
+    args = parser.parse_args(argv)
+
+    source = load_source(args.source)
+    failed = 0
+
+    for path in args.workbooks:
+        start = time.perf_counter()
+        output = None
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            output = os.path.join(args.output_dir, os.path.basename(path))
+        try:
+            changed, missing = refresh_workbook(path, source, output, args.dry_run)
+        except Exception as e:
+            print("%s: ERROR %s" % (path, e), file=sys.stderr)
+            failed += 1
+            continue
+
+        elapsed = time.perf_counter() - start
+        if changed:
+            verb = "would update" if args.dry_run else "updated"
+            print("%s: %s %s (%.2fs)" % (path, verb, ", ".join(changed), elapsed))
+        else:
+            print("%s: catalog up to date (%.2fs)" % (path, elapsed))
+        if missing:
+            print("%s: missing sheets %s - regenerate this workbook" % (path, ", ".join(missing)),
+                  file=sys.stderr)
+            failed += 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
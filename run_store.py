@@ -0,0 +1,426 @@
+"""
+Noah Actuator Sizing Tool - Run Store
+Append-only history of sizing runs (Parquet per run + SQLite index) with bulk replay
+
+Usage:
+    python sizing_cli.py lines.csv --run-store quotes/ --project P-1024 -o results.csv
+    python run_store.py add quotes/ Plant_A_rev3.xlsm --project P-1024 --date 2025-03-14
+    python run_store.py runs quotes/ --project P-1024
+    python run_store.py query quotes/ --tag FV-101 --since 2025-01-01 -o history.csv
+    python run_store.py replay quotes/ --catalog NoahSizing_2026.xlsx --since 2025-01-01 --jobs 8 -o replay.csv
+
+Store layout (needs pyarrow):
+    runs.sqlite     index: one row per run (project, date, Settings, Settings
+                    fingerprint hash, catalog hash, gearbox stages, counts) and
+                    the distinct Tags / Models of each run
+    runs/*.parquet  one zstd Parquet file per run: the 12 ValveList input
+                    columns (numbers as float64) and the 13 result columns;
+                    failed lines keep the no-match reason in Status
+
+Runs are only ever added: the Parquet file is written first, then its index
+row is committed, so a crashed run leaves no entry. Queries select runs in the
+index (project / date range, Tag / Model through the key table) and read only
+those files, filtered column-wise.
+
+Replay re-sizes the lines of the selected runs with another catalog, with the
+Settings and gearbox stages each run was sized with. Runs with the same
+Settings are sized together, every distinct requirement only once
+(sizing_cache.line_key), in worker processes (--jobs), then each line is
+compared with its recorded result (valvelist_diff change kinds).
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import argparse
+from dataclasses import dataclass, asdict
+
+from arrow_io import ArrowResultWriter, read_table, write_table, pa
+from catalog import load_catalog, to_str
+from create_workbook import VALVELIST_RESULT_HEADERS
+from price_overlay import load_price_overlay
+from sizing_cache import catalog_hash, settings_fingerprint, key_prefix, line_key
+from sizing_cli import iter_results
+from sizing_settings import load_settings, settings_from_values
+from valvelist_diff import normalize, compare_line
+from valvelist_io import ValveLine, OUTPUT_HEADERS, detect_format, iter_line_results
+
+INDEX_FILE = "runs.sqlite"
+RUN_DIR = "runs"
+BUSY_TIMEOUT = 30.0
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    "project TEXT NOT NULL, created TEXT NOT NULL, source TEXT NOT NULL, settings TEXT NOT NULL, "
+    "settings_hash TEXT NOT NULL, catalog_hash TEXT NOT NULL, gearbox_stages INTEGER NOT NULL, "
+    "lines INTEGER NOT NULL, failed INTEGER NOT NULL, file TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_project ON runs (project, created)",
+    "CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created)",
+    "CREATE TABLE IF NOT EXISTS run_keys (kind TEXT NOT NULL, value TEXT NOT NULL, "
+    "run_id INTEGER NOT NULL, PRIMARY KEY (kind, value, run_id)) WITHOUT ROWID",
+]
+
+RUN_HEADERS = ["RunId", "Project", "Date", "Source", "Lines", "Failed", "CatalogHash", "SettingsHash"]
+QUERY_HEADERS = ["RunId", "Project", "Date"] + OUTPUT_HEADERS
+REPLAY_HEADERS = ["RunId", "Project", "Date", "Line No.", "Tag", "Change",
+                  "Old Model", "New Model", "Old Gearbox", "New Gearbox",
+                  "Old Price", "New Price", "Old Status", "New Status"]
+
+_MODEL = VALVELIST_RESULT_HEADERS.index("Model")
+_GEARBOX = VALVELIST_RESULT_HEADERS.index("Gearbox")
+_PRICE = VALVELIST_RESULT_HEADERS.index("Price")
+_STATUS = VALVELIST_RESULT_HEADERS.index("Status")
+
+
+@dataclass
+class RunInfo:
+    run_id: int
+    project: str
+    created: str                 # "YYYY-MM-DD HH:MM:SS"
+    source: str
+    settings: str                # JSON of SizingSettings
+    settings_hash: str
+    catalog_hash: str
+    gearbox_stages: int
+    lines: int
+    failed: int
+    file: str                    # relative to the store directory
+
+    def sizing_settings(self):
+        return settings_from_values(json.loads(self.settings))
+
+
+def settings_hash(settings):
+    return hashlib.sha256(repr(settings_fingerprint(settings)).encode("utf-8")).hexdigest()
+
+
+# ============================================
+# Store
+# ============================================
+
+class RunStore:
+    """Directory of run files plus the SQLite index (created if missing)"""
+
+    def __init__(self, path, timeout=BUSY_TIMEOUT):
+        if pa is None:
+            raise ImportError("pyarrow is required for the run store (pip install pyarrow)")
+        self.path = path
+        os.makedirs(os.path.join(path, RUN_DIR), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(path, INDEX_FILE), timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------- writing --------
+
+    def open_run(self, project, settings, catalog_key, gearbox_stages=1, source="", created=None):
+        """RunRecorder for one run; nothing is visible until its close()"""
+        return RunRecorder(self, project, settings, catalog_key, gearbox_stages, source, created)
+
+    def _commit_run(self, info, tags, models):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute(
+                "INSERT INTO runs (project, created, source, settings, settings_hash, catalog_hash, "
+                "gearbox_stages, lines, failed, file) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (info.project, info.created, info.source, info.settings, info.settings_hash,
+                 info.catalog_hash, info.gearbox_stages, info.lines, info.failed, info.file))
+            info.run_id = cur.lastrowid
+            keys = [("tag", tag, info.run_id) for tag in tags]
+            keys += [("model", model, info.run_id) for model in models]
+            conn.executemany("INSERT OR IGNORE INTO run_keys (kind, value, run_id) VALUES (?, ?, ?)", keys)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return info
+
+    # -------- queries --------
+
+    def select_runs(self, project=None, tag=None, model=None, since=None, until=None):
+        """RunInfo of the matching runs, oldest first (since / until: date prefixes, inclusive)"""
+        where, params = [], []
+        if project is not None:
+            where.append("project = ?")
+            params.append(project)
+        if since:
+            where.append("created >= ?")
+            params.append(since)
+        if until:
+            where.append("substr(created, 1, ?) <= ?")
+            params += [len(until), until]
+        for kind, value in (("tag", tag), ("model", model)):
+            if value is not None:
+                where.append("run_id IN (SELECT run_id FROM run_keys WHERE kind = ? AND value = ?)")
+                params += [kind, value]
+        sql = "SELECT * FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return [RunInfo(*row) for row in self.conn.execute(sql + " ORDER BY created, run_id", params)]
+
+    def read_run(self, info, tag=None, model=None):
+        """pyarrow Table of a run's lines (OUTPUT_HEADERS), optionally one Tag / Model"""
+        import pyarrow.compute as pc
+        table = read_table(os.path.join(self.path, info.file), "parquet")
+        if tag is not None:
+            table = table.filter(pc.equal(pc.utf8_trim_whitespace(table.column("Tag")), tag))
+        if model is not None:
+            table = table.filter(pc.equal(table.column("Model"), model))
+        return table
+
+    def query(self, project=None, tag=None, model=None, since=None, until=None):
+        """Yield (RunInfo, filtered Table) for each matching run"""
+        for info in self.select_runs(project, tag, model, since, until):
+            yield info, self.read_run(info, tag, model)
+
+
+class RunRecorder:
+    """Streams one run into its Parquet file; close() adds it to the index"""
+
+    def __init__(self, store, project, settings, catalog_key, gearbox_stages, source, created):
+        self.store = store
+        self.info = RunInfo(
+            None, project, created or time.strftime("%Y-%m-%d %H:%M:%S"), source,
+            json.dumps(asdict(settings), sort_keys=True), settings_hash(settings), catalog_key,
+            gearbox_stages, 0, 0, os.path.join(RUN_DIR, uuid.uuid4().hex + ".parquet"))
+        self.tmp = os.path.join(store.path, self.info.file + ".part")
+        self.writer = ArrowResultWriter(self.tmp, "parquet")
+        self.tags = set()
+        self.models = set()
+
+    def write(self, line, result_row):
+        """One sized line: ValveLine and its 13 result values (extra values are ignored)"""
+        row = list(result_row[:len(VALVELIST_RESULT_HEADERS)])
+        self.writer.write(line, row)
+        self.writer.flush()
+        self.info.lines += 1
+        tag = to_str(line.tag).strip()
+        if tag:
+            self.tags.add(tag)
+        if row[_MODEL] != "":
+            self.models.add(row[_MODEL])
+        else:
+            self.info.failed += 1
+
+    def close(self):
+        """Finish the file and commit the run; returns its RunInfo"""
+        self.writer.close()
+        os.replace(self.tmp, os.path.join(self.store.path, self.info.file))
+        return self.store._commit_run(self.info, self.tags, self.models)
+
+    def abort(self):
+        self.writer.close()
+        os.remove(self.tmp)
+
+
+# ============================================
+# Replay
+# ============================================
+
+def _table_pairs(table):
+    """(ValveLine, 13 result values) of a run table"""
+    table = table.select(OUTPUT_HEADERS)
+    columns = [table.column(h).to_pylist() for h in OUTPUT_HEADERS]
+    n_inputs = len(OUTPUT_HEADERS) - len(VALVELIST_RESULT_HEADERS)
+    for row in zip(*columns):
+        results = ["" if v is None else v for v in row[n_inputs:]]
+        yield ValveLine(*row[:n_inputs]), results
+
+
+def replay(store, runs, catalog_path=None, jobs=1, overlay=None):
+    """Yield (RunInfo, ValveLine, recorded result values, replayed result values)
+
+    Runs are grouped by (Settings, gearbox stages); each group is sized in
+    one pass over its distinct requirements with the catalog at catalog_path
+    (and the price list overlay, if any).
+    """
+    groups = {}
+    for info in runs:
+        groups.setdefault((info.settings, info.gearbox_stages), []).append(info)
+
+    for (settings_json, stages), infos in groups.items():
+        settings = infos[0].sizing_settings()
+        prefix = key_prefix("", settings, stages)
+        unique = {}
+        unique_lines = []
+        run_keys = []
+        for info in infos:
+            keys = []
+            for line, _ in _table_pairs(store.read_run(info)):
+                key = line_key(prefix, line, settings)
+                if key not in unique:
+                    unique[key] = len(unique_lines)
+                    unique_lines.append(line)
+                keys.append(unique[key])
+            run_keys.append(keys)
+
+        rows = []
+        for _, chunk_rows in iter_results(iter(unique_lines), catalog_path, settings, jobs,
+                                          gearbox_stages=stages, overlay=overlay):
+            rows.extend(chunk_rows)
+
+        for info, keys in zip(infos, run_keys):
+            for (line, old), index in zip(_table_pairs(store.read_run(info)), keys):
+                yield info, line, old, rows[index]
+
+
+def replay_change(line, old, new):
+    """valvelist_diff change kinds of a replayed line ("" when unchanged)"""
+    inputs = tuple(normalize(v) for v in line.values())
+    change = compare_line("", (inputs, tuple(normalize(v) for v in old)),
+                          (inputs, tuple(normalize(v) for v in new)))
+    return "" if change is None else ";".join(change.kinds)
+
+
+# ============================================
+# Main
+# ============================================
+
+def _add_filters(p):
+    p.add_argument("--project")
+    p.add_argument("--tag")
+    p.add_argument("--model", help="Selected actuator model")
+    p.add_argument("--since", help="First date (YYYY-MM-DD[ HH:MM:SS])")
+    p.add_argument("--until", help="Last date, inclusive")
+
+
+def _open_output(path):
+    return open(path, "w", newline="", encoding="utf-8") if path else sys.stdout
+
+
+def add_file(store, path, project, settings_path=None, catalog_path=None, created=None):
+    """Record an already sized file (any valvelist_io format) as a run"""
+    is_workbook = detect_format(path) == "xlsx"
+    settings = load_settings(settings_path or (path if is_workbook else None))
+    catalog = load_catalog(catalog_path or (path if is_workbook else None))
+    recorder = store.open_run(project, settings, catalog_hash(catalog), source=path, created=created)
+    try:
+        for line, results in iter_line_results(path):
+            recorder.write(line, results)
+    except BaseException:
+        recorder.abort()
+        raise
+    return recorder.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Append-only store of sizing runs with query and replay")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_add = sub.add_parser("add", help="Record a sized ValveList file as a run")
+    p_add.add_argument("store")
+    p_add.add_argument("input", help="Sized workbook, CSV, JSONL, Arrow or Parquet file")
+    p_add.add_argument("--project", required=True)
+    p_add.add_argument("--date", help="Run date (default: now), e.g. the quote date")
+    p_add.add_argument("--settings", help="Settings used (default: the workbook's Settings sheet)")
+    p_add.add_argument("--catalog", help="Catalog used (default: the workbook's DB_* sheets)")
+
+    p_runs = sub.add_parser("runs", help="List runs")
+    p_runs.add_argument("store")
+    _add_filters(p_runs)
+
+    p_query = sub.add_parser("query", help="Recorded lines of the matching runs")
+    p_query.add_argument("store")
+    _add_filters(p_query)
+    p_query.add_argument("-o", "--output", help="CSV or .parquet file (default: CSV on stdout)")
+
+    p_replay = sub.add_parser("replay", help="Re-size the matching runs with another catalog")
+    p_replay.add_argument("store")
+    _add_filters(p_replay)
+    p_replay.add_argument("--catalog", help="Workbook, catalog directory or SQLite database (default: create_workbook.py data)")
+    p_replay.add_argument("--price-list", help="Customer price list JSON applied over the new catalog")
+    p_replay.add_argument("--jobs", type=int, default=1, help="Worker processes (default 1, 0 = CPU count)")
+    p_replay.add_argument("--changed-only", action="store_true", help="Report only lines whose result changed")
+    p_replay.add_argument("-o", "--output", help="CSV report (default: stdout)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    out = store = None
+    try:
+        store = RunStore(args.store)
+        if args.command == "add":
+            info = add_file(store, args.input, args.project, args.settings, args.catalog, args.date)
+            print("Run %d: %s, %d lines (%d failed)" % (info.run_id, info.project, info.lines, info.failed))
+            return 0
+
+        filters = (args.project, args.tag, args.model, args.since, args.until)
+        if args.command == "runs":
+            writer = csv.writer(sys.stdout)
+            writer.writerow(RUN_HEADERS)
+            for info in store.select_runs(*filters):
+                writer.writerow([info.run_id, info.project, info.created, info.source, info.lines,
+                                 info.failed, info.catalog_hash[:12], info.settings_hash[:12]])
+            return 0
+
+        if args.command == "query":
+            count = 0
+            if args.output and detect_format(args.output) == "parquet":
+                tables = []
+                for info, table in store.query(*filters):
+                    n = table.num_rows
+                    tables.append(table.select(OUTPUT_HEADERS)
+                                  .add_column(0, "Date", pa.array([info.created] * n, pa.string()))
+                                  .add_column(0, "Project", pa.array([info.project] * n, pa.string()))
+                                  .add_column(0, "RunId", pa.array([info.run_id] * n, pa.int64())))
+                    count += n
+                if tables:
+                    write_table(pa.concat_tables(tables), args.output, "parquet")
+            else:
+                out = _open_output(args.output)
+                writer = csv.writer(out)
+                writer.writerow(QUERY_HEADERS)
+                for info, table in store.query(*filters):
+                    head = [info.run_id, info.project, info.created]
+                    for line, results in _table_pairs(table):
+                        writer.writerow(head + line.values() + results)
+                        count += 1
+            print("%d lines" % count, file=sys.stderr)
+            return 0
+
+        overlay = load_price_overlay(args.price_list) if args.price_list else None
+        runs = store.select_runs(*filters)
+        out = _open_output(args.output)
+        writer = csv.writer(out)
+        writer.writerow(REPLAY_HEADERS)
+        count = changed = 0
+        for info, line, old, new in replay(store, runs, args.catalog, args.jobs if args.jobs > 0 else None,
+                                           overlay):
+            change = replay_change(line, old, new)
+            count += 1
+            if change:
+                changed += 1
+            elif args.changed_only:
+                continue
+            writer.writerow([info.run_id, info.project, info.created, line.line_no, line.tag, change,
+                             old[_MODEL], new[_MODEL], old[_GEARBOX], new[_GEARBOX],
+                             old[_PRICE], new[_PRICE], old[_STATUS], new[_STATUS]])
+        print("Replayed %d runs, %d lines, %d changed (%.1fs)" % (
+            len(runs), count, changed, time.perf_counter() - start), file=sys.stderr)
+    except (ImportError, OSError, ValueError, sqlite3.Error) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if store is not None:
+            store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
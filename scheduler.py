@@ -0,0 +1,502 @@
+"""
+Noah Actuator Sizing Tool - Sizing Job Scheduler
+Priority classes in front of one shared sizing engine: interactive quotes before bulk re-sizing
+
+Usage:
+    python scheduler.py big_project.csv                             # latency report: idle vs under bulk load
+    python scheduler.py big_project.csv --bulk-lines 100000 --rate 20 --bulk-submitters 2
+    python scheduler.py lines.csv --catalog catalog.db --chunk-size 32 --interactive-workers 1
+
+Two priority classes share the engine of one process:
+    interactive   one line: size_line() (SizingSelected) or alternatives() (ShowAlternatives)
+    bulk          a whole project, cut into chunks of chunk_size lines
+
+Bulk jobs are queued as chunks, so a running batch holds a worker for one
+chunk at a time and interactive work is picked up at the next chunk boundary.
+Workers always take interactive work first; after bulk_every interactive
+tasks in a row a waiting bulk chunk is taken so batches keep moving under a
+stream of quotes. interactive_workers threads only ever take interactive
+work, so a quote does not wait for a chunk to finish at all.
+
+Within a class, submitters (users, projects, nightly jobs) are served round
+robin one task (one chunk) at a time: two batches of different submitters
+progress at the same rate, and a client sending many quotes does not delay
+the first quote of another.
+
+Per class, queue time (submit, or the previous chunk of the job, to start)
+and service time (start to finish) are recorded; metrics() gives count,
+mean, p50, p95, p99 and max in milliseconds.
+"""
+
+import sys
+import time
+import random
+import itertools
+import threading
+import argparse
+from collections import deque, OrderedDict
+from concurrent.futures import Future, CancelledError
+
+from catalog import load_catalog
+from sizing_engine import SizingEngine, SizingResult
+from sizing_settings import load_settings
+from valvelist_io import iter_lines
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+PRIORITY_CLASSES = (INTERACTIVE, BULK)
+
+CHUNK_SIZE = 64             # bulk lines per task (a few ms with the batch kernel)
+BULK_EVERY = 16             # interactive tasks in a row before a waiting bulk chunk runs (0 = never)
+METRICS_WINDOW = 10000      # latest tasks per class kept for percentiles
+
+
+# ============================================
+# Interactive requests
+# ============================================
+
+def alternatives(engine, line, settings):
+    """FindAllAlternatives: every single-stage combination that fits the line, best first
+
+    Returns [SizingResult] in FindBestActuator rank order; when nothing fits,
+    the one failed size_line() result with its Status reason.
+    """
+    prepared = engine.line_requirements(line, settings)
+    if isinstance(prepared, SizingResult):
+        return [prepared]
+    s, req = prepared
+    combos = sorted(engine.feasible_combinations(req, s), key=lambda c: c[0])
+    if not combos:
+        return [engine.size_line(line, settings)]
+    return [engine.combination_result(c[4], req, s) for c in combos]
+
+
+# ============================================
+# Metrics
+# ============================================
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class ClassMetrics:
+    """Queue and service times of one priority class"""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.count = 0
+        self.lines = 0
+        self.queue_total = 0.0
+        self.service_total = 0.0
+        self.queue_times = deque(maxlen=window)
+        self.service_times = deque(maxlen=window)
+
+    def record(self, queued, service, lines=1):
+        self.count += 1
+        self.lines += lines
+        self.queue_total += queued
+        self.service_total += service
+        self.queue_times.append(queued)
+        self.service_times.append(service)
+
+    def summary(self):
+        """count, lines and queue_/service_ mean, p50, p95, p99, max (ms)"""
+        out = {"count": self.count, "lines": self.lines}
+        for name, total, times in (("queue", self.queue_total, self.queue_times),
+                                   ("service", self.service_total, self.service_times)):
+            ordered = sorted(times)
+            out[name + "_mean"] = total / self.count * 1000 if self.count else 0.0
+            for pct in (50, 95, 99):
+                out["%s_p%d" % (name, pct)] = _percentile(ordered, pct) * 1000
+            out[name + "_max"] = ordered[-1] * 1000 if ordered else 0.0
+        return out
+
+
+# ============================================
+# Queues
+# ============================================
+
+class _Task:
+    """One interactive request"""
+
+    def __init__(self, func, args, future, submitted):
+        self.func = func
+        self.args = args
+        self.future = future
+        self.ready = submitted
+
+
+class BulkJob:
+    """A project sized chunk by chunk; result() gives SizingResult per line in order"""
+
+    def __init__(self, lines, settings, submitter, chunk_size, sizer):
+        self.lines = lines
+        self.settings = settings
+        self.submitter = submitter
+        self.chunk_size = chunk_size
+        self.sizer = sizer
+        self.results = [None] * len(lines)
+        self.future = Future()
+        self.future.set_running_or_notify_cancel()
+        self.ready = time.perf_counter()
+        self.next_start = 0
+        self.pending = 0                        # chunks taken but not finished
+        self.done_lines = 0
+        self.submitted = self.ready
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def done(self):
+        return self.future.done()
+
+    def progress(self):
+        """(lines sized, lines total)"""
+        return self.done_lines, len(self.lines)
+
+    def has_chunks(self):
+        return self.next_start < len(self.lines) and not self.future.done()
+
+
+class _ClassQueue:
+    """Round robin over submitters; each submitter's entries are served in order"""
+
+    def __init__(self):
+        self.by_submitter = OrderedDict()       # submitter -> deque of _Task / BulkJob
+        self.turns = deque()                    # submitters with queued work, next first
+
+    def __bool__(self):
+        return bool(self.turns)
+
+    def push(self, submitter, entry):
+        entries = self.by_submitter.get(submitter)
+        if entries is None:
+            entries = self.by_submitter[submitter] = deque()
+            self.turns.append(submitter)
+        entries.append(entry)
+
+    def pop(self):
+        """Next entry; a BulkJob stays queued while it has chunks left"""
+        submitter = self.turns.popleft()
+        entries = self.by_submitter[submitter]
+        entry = entries[0]
+        if not isinstance(entry, BulkJob) or entry.next_start + entry.chunk_size >= len(entry.lines):
+            entries.popleft()
+        if entries:
+            self.turns.append(submitter)
+        else:
+            del self.by_submitter[submitter]
+        return entry
+
+    def drain(self):
+        entries = [e for q in self.by_submitter.values() for e in q]
+        self.by_submitter.clear()
+        self.turns.clear()
+        return entries
+
+
+# ============================================
+# Scheduler
+# ============================================
+
+class SizingScheduler:
+    """Interactive and bulk sizing on worker threads sharing one engine"""
+
+    def __init__(self, engine, settings, workers=1, interactive_workers=1,
+                 chunk_size=CHUNK_SIZE, bulk_every=BULK_EVERY, batch=True):
+        if workers < 1 or interactive_workers < 0:
+            raise ValueError("workers must be >= 1 and interactive_workers >= 0")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        self.engine = engine
+        self.settings = settings
+        self.chunk_size = chunk_size
+        self.bulk_every = bulk_every
+        self.batch = batch
+        self._queues = {INTERACTIVE: _ClassQueue(), BULK: _ClassQueue()}
+        self._metrics = {name: ClassMetrics() for name in PRIORITY_CLASSES}
+        self._streak = 0                        # interactive tasks taken since the last bulk chunk
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = []
+        for i in range(workers + interactive_workers):
+            classes = PRIORITY_CLASSES if i < workers else (INTERACTIVE,)
+            thread = threading.Thread(target=self._worker, args=(classes,), daemon=True,
+                                      name="sizing-%s-%d" % ("any" if i < workers else INTERACTIVE, i))
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------- Submit --------
+
+    def submit_line(self, line, submitter="", settings=None):
+        """Future of size_line() for one line (SizingSelected)"""
+        return self._submit(self.engine.size_line, (line, settings or self.settings), submitter)
+
+    def submit_alternatives(self, line, submitter="", settings=None):
+        """Future of alternatives() for one line (ShowAlternatives)"""
+        return self._submit(alternatives, (self.engine, line, settings or self.settings), submitter)
+
+    def submit_batch(self, lines, submitter="", settings=None):
+        """BulkJob sizing every line in chunks at bulk priority"""
+        settings = settings or self.settings
+        job = BulkJob(list(lines), settings, submitter, self.chunk_size, self._bulk_sizer(settings))
+        if not job.lines:
+            job.future.set_result([])
+            return job
+        with self._cond:
+            self._check_open()
+            self._queues[BULK].push(submitter, job)
+            self._cond.notify()
+        return job
+
+    def _submit(self, func, args, submitter):
+        future = Future()
+        with self._cond:
+            self._check_open()
+            self._queues[INTERACTIVE].push(submitter, _Task(func, args, future, time.perf_counter()))
+            self._cond.notify()
+        return future
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("scheduler is closed")
+
+    def _bulk_sizer(self, settings):
+        if self.batch:
+            try:
+                from sizing_batch import BatchSizer
+                return BatchSizer(self.engine, settings).size_lines
+            except ImportError:
+                pass
+        return lambda lines: [self.engine.size_line(line, settings) for line in lines]
+
+    # -------- Workers --------
+
+    def _take(self, classes):
+        """(class, entry, chunk start) of the next task for a worker, or None; holds _cond"""
+        interactive, bulk = self._queues[INTERACTIVE], self._queues[BULK]
+        take_bulk = BULK in classes and bulk and (
+            not interactive or (self.bulk_every and self._streak >= self.bulk_every))
+        if take_bulk:
+            self._streak = 0
+            job = bulk.pop()
+            start = job.next_start
+            job.next_start += job.chunk_size
+            job.pending += 1
+            return BULK, job, start
+        if interactive:
+            if bulk:
+                self._streak += 1
+            return INTERACTIVE, interactive.pop(), None
+        return None
+
+    def _worker(self, classes):
+        while True:
+            with self._cond:
+                taken = self._take(classes)
+                while taken is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    taken = self._take(classes)
+            name, entry, start = taken
+            if name == INTERACTIVE:
+                self._run_task(entry)
+            else:
+                self._run_chunk(entry, start)
+
+    def _run_task(self, task):
+        began = time.perf_counter()
+        if not task.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = task.func(*task.args)
+        except Exception as e:
+            task.future.set_exception(e)
+        else:
+            task.future.set_result(result)
+        finished = time.perf_counter()
+        with self._cond:
+            self._metrics[INTERACTIVE].record(began - task.ready, finished - began)
+
+    def _run_chunk(self, job, start):
+        began = time.perf_counter()
+        chunk = job.lines[start:start + job.chunk_size]
+        error = None
+        if not job.future.done():
+            try:
+                job.results[start:start + len(chunk)] = job.sizer(chunk)
+            except Exception as e:
+                error = e
+        finished = time.perf_counter()
+        with self._cond:
+            self._metrics[BULK].record(began - job.ready, finished - began, len(chunk))
+            job.ready = finished
+            job.pending -= 1
+            job.done_lines += len(chunk)
+            if job.future.done():
+                return
+            if error is not None:
+                job.future.set_exception(error)
+            elif not job.has_chunks() and job.pending == 0:
+                job.future.set_result(job.results)
+
+    # -------- Metrics / shutdown --------
+
+    def metrics(self):
+        """{class: ClassMetrics.summary()}"""
+        with self._cond:
+            return {name: m.summary() for name, m in self._metrics.items()}
+
+    def reset_metrics(self):
+        with self._cond:
+            self._metrics = {name: ClassMetrics() for name in PRIORITY_CLASSES}
+
+    def queued(self):
+        """{class: queued interactive requests / bulk lines not yet started}"""
+        with self._cond:
+            queues = self._queues
+            return {INTERACTIVE: sum(len(q) for q in queues[INTERACTIVE].by_submitter.values()),
+                    BULK: sum(len(job.lines) - job.next_start
+                              for q in queues[BULK].by_submitter.values() for job in q)}
+
+    def close(self, wait=True, cancel=False):
+        """Stop the workers after the queued work
+
+        cancel=True drops it: queued requests are cancelled and bulk jobs with
+        chunks left raise CancelledError from result(); chunks already running
+        finish but their results are discarded.
+        """
+        with self._cond:
+            self._closed = True
+            if cancel:
+                for name in PRIORITY_CLASSES:
+                    for entry in self._queues[name].drain():
+                        if isinstance(entry, BulkJob):
+                            # a bulk future is RUNNING from submit on, so cancel() would not complete it
+                            if not entry.future.done():
+                                entry.future.set_exception(CancelledError())
+                        else:
+                            entry.future.cancel()
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+
+# ============================================
+# Main
+# ============================================
+
+REPORT_FIELDS = ["count", "lines", "queue_p50", "queue_p95", "queue_p99", "queue_max",
+                 "service_p50", "service_p95", "service_max"]
+
+
+def print_report(label, metrics, classes=PRIORITY_CLASSES):
+    for name in classes:
+        m = metrics[name]
+        print("%-8s %-12s %7d %8d %9.2f %9.2f %9.2f %9.2f %9.2f %9.2f %9.2f" % (
+            (label, name) + tuple(m[f] for f in REPORT_FIELDS)))
+
+
+def probe(scheduler, lines, rate, share, until, rng):
+    """Submit interactive requests at rate/s while until() is False, wait for them"""
+    futures = []
+    interval = 1.0 / rate
+    next_at = time.perf_counter()
+    for n in itertools.count():
+        if until(n):
+            break
+        line = rng.choice(lines)
+        submitter = "user%d" % (n % 3)
+        if rng.random() < share:
+            futures.append(scheduler.submit_alternatives(line, submitter))
+        else:
+            futures.append(scheduler.submit_line(line, submitter))
+        next_at += interval
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+    for future in futures:
+        future.result()
+    return len(futures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Interactive latency while bulk sizing runs")
+    parser.add_argument("input", help="ValveList workbook, CSV, JSONL or Arrow/Parquet file")
+    parser.add_argument("--settings", help="Workbook (Settings sheet) or JSON file with settings")
+    parser.add_argument("--catalog", help="Workbook, catalog directory or SQLite database (default: create_workbook.py data)")
+    parser.add_argument("--bulk-lines", type=int, default=0,
+                        help="Lines in the bulk run, input repeated as needed (default: the input once)")
+    parser.add_argument("--bulk-submitters", type=int, default=1, help="Split the bulk run across N submitters")
+    parser.add_argument("--rate", type=float, default=20.0, help="Interactive requests per second")
+    parser.add_argument("--alternatives-share", type=float, default=0.2,
+                        help="Fraction of interactive requests that are ShowAlternatives")
+    parser.add_argument("--idle-requests", type=int, default=100, help="Interactive requests measured without load")
+    parser.add_argument("--workers", type=int, default=1, help="Worker threads taking any class")
+    parser.add_argument("--interactive-workers", type=int, default=1, help="Worker threads reserved for interactive work")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Bulk lines per task")
+    parser.add_argument("--bulk-every", type=int, default=BULK_EVERY,
+                        help="Interactive tasks in a row before a waiting bulk chunk runs (0 = strict priority)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the interactive stream")
+    args = parser.parse_args(argv)
+
+    try:
+        settings = load_settings(args.settings)
+        lines = list(iter_lines(args.input))
+        if not lines:
+            raise ValueError("no lines in %s" % args.input)
+        if args.rate <= 0 or args.bulk_submitters < 1:
+            raise ValueError("--rate and --bulk-submitters must be positive")
+        catalog = load_catalog(args.catalog)
+        if hasattr(catalog, "in_memory"):
+            catalog = catalog.in_memory()       # SQLite connections stay in their thread
+        engine = SizingEngine(catalog)
+        scheduler = SizingScheduler(engine, settings, args.workers, args.interactive_workers,
+                                    args.chunk_size, args.bulk_every)
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+
+    total = args.bulk_lines or len(lines)
+    bulk = list(itertools.islice(itertools.cycle(lines), total))
+    rng = random.Random(args.seed)
+    with scheduler:
+        # Warm the engine caches so both phases measure steady state
+        scheduler.submit_batch(lines[:args.chunk_size], "warmup").result()
+        probe(scheduler, lines, args.rate, args.alternatives_share, lambda n: n >= 20, rng)
+        scheduler.reset_metrics()
+
+        probe(scheduler, lines, args.rate, args.alternatives_share, lambda n: n >= args.idle_requests, rng)
+        idle = scheduler.metrics()
+        scheduler.reset_metrics()
+
+        start = time.perf_counter()
+        share = -(-total // args.bulk_submitters)
+        jobs = [scheduler.submit_batch(bulk[i:i + share], "batch%d" % (i // share))
+                for i in range(0, total, share)]
+        count = probe(scheduler, lines, args.rate, args.alternatives_share,
+                      lambda n: all(job.done() for job in jobs), rng)
+        for job in jobs:
+            job.result()
+        elapsed = time.perf_counter() - start
+        loaded = scheduler.metrics()
+
+    print("bulk: %d lines in %.2fs (%.0f lines/s), %d submitter(s), chunk %d; "
+          "interactive: %d requests at %.0f/s" % (total, elapsed, total / elapsed, len(jobs),
+                                                  args.chunk_size, count, args.rate))
+    print("%-8s %-12s %7s %8s %9s %9s %9s %9s %9s %9s %9s" % (
+        ("phase", "class", "tasks", "lines", "queue p50", "p95", "p99", "max", "serv p50", "p95", "max")))
+    print_report("idle", idle, (INTERACTIVE,))
+    print_report("loaded", loaded)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Noah Actuator Sizing Tool - Batch Sizing Kernel
+FindBestActuator for a chunk of lines at once with numpy, on a thread pool
+
+Usage:
+    python sizing_cli.py big_project.csv --threads 4 -o results.csv
+    python bench_threads.py big_project.csv --threads 1,2,4,8       # speedup curve
+
+The lines of a chunk are normalized by SizeLine (line_requirements) into
+arrays of torque, thrust, Op. Time, turns and stem dimension. Per Actuator
+Type the single-stage combinations of SizingEngine.combinations() are laid
+out once as arrays in FindBestActuator rank order (cheapest, then smallest
+torque margin, direct before geared at equal price, then sheet row), so the
+pick of every line is the first combination that passes the torque, thrust,
+stem and Op. Time checks: one boolean (lines x combinations) matrix and an
+argmax. The result fields come from SizingEngine.combination_result().
+
+Lines without a pick, and every line of a two-stage engine, go through
+SizingEngine.size_line() so the failure Status texts stay those of the VBA
+engine. Results are identical to sizing each line on its own.
+
+BatchSizer.size_lines() is thread-safe, so a ThreadPoolExecutor shares one
+engine (catalog, indexes, caches) across threads instead of loading it in
+every worker process. Only the matrix checks release the GIL; normalizing
+the lines and building the result rows is Python work, so extra threads
+save the catalog load and process start-up rather than adding CPU
+parallelism (bench_threads.py measures the curve).
+"""
+
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sizing_engine import MAX_PRICE, SizingResult, split_combination_id
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for threaded batch sizing (pip install numpy)")
+
+
+class ComboArrays:
+    """Single-stage combinations of one settings profile as rank-ordered arrays"""
+
+    def __init__(self, engine, s):
+        act_type = s.actuator_type
+        combos = sorted((c for c in engine.combinations(0, 0, s) if c[0][0] < MAX_PRICE),
+                        key=lambda c: c[0])
+        resolved = engine.resolved(s)
+        self.ids = [c[4] for c in combos]
+        self.torque = np.array([c[1] for c in combos], dtype=float)
+        self.thrust = np.array([c[2] for c in combos], dtype=float)
+        rpm, ratio, stem = [], [], []
+        for cid in self.ids:
+            act_row, gb_row = split_combination_id(cid)
+            act = resolved[act_row]
+            gb = None if gb_row is None else engine.catalog.gearbox(gb_row)
+            rpm.append(act.rpm)
+            ratio.append(1 if gb is None else gb.ratio)
+            stem.append(act.max_stem_dim if gb is None else gb.max_stem_dim)
+        self.rpm = np.array(rpm, dtype=float)
+        self.ratio = np.array(ratio, dtype=float)
+        self.max_stem = np.array(stem, dtype=float)
+        # Part-turn / Linear Op. Time does not depend on the line (turns = 0 above)
+        self.op_time = np.array([c[3] for c in combos], dtype=float)
+        self.multi_turn = act_type == "Multi-turn"
+        self.check_torque = act_type != "Linear"
+
+    def calc_op_times(self, turns):
+        """CalculateOpTime of every combination (columns) for every line (rows)"""
+        if not self.multi_turn:
+            return np.broadcast_to(self.op_time, (len(turns), len(self.ids)))
+        running = (self.rpm > 0) & (turns[:, None] > 0)
+        rpm = np.where(self.rpm > 0, self.rpm, 1.0)
+        return np.where(running, (turns[:, None] * self.ratio * 60) / rpm, 0.0)
+
+    def picks(self, torque, thrust, op_time, turns, stem, min_pct, max_pct):
+        """Index of the FindBestActuator pick per line, -1 where nothing fits"""
+        if not self.ids:
+            return np.full(len(torque), -1, dtype=np.intp)
+        fits = (thrust[:, None] <= 0) | (self.thrust >= thrust[:, None])
+        if self.check_torque:
+            fits &= self.torque >= torque[:, None]
+        fits &= (stem[:, None] <= 0) | (self.max_stem <= 0) | (stem[:, None] <= self.max_stem)
+        calc = self.calc_op_times(turns)
+        low = op_time * (1 + min_pct / 100)
+        high = op_time * (1 + max_pct / 100)
+        low, high = np.minimum(low, high)[:, None], np.maximum(low, high)[:, None]
+        fits &= (op_time[:, None] <= 0) | ((low <= calc) & (calc <= high))
+        pick = fits.argmax(axis=1)
+        return np.where(fits[np.arange(len(pick)), pick], pick, -1)
+
+
+class BatchSizer:
+    """size_line() for chunks of lines; thread-safe, one per (engine, settings)"""
+
+    def __init__(self, engine, settings):
+        _require_numpy()
+        self.engine = engine
+        self.settings = settings
+        self._arrays = {}                       # (actuator type, catalog revision) -> ComboArrays
+        self._lock = threading.Lock()
+
+    def arrays(self, s):
+        """ComboArrays of s, rebuilt after a catalog edit (SizingEngine.edit)"""
+        key = (s.actuator_type, getattr(self.engine.catalog, "revision", 0))
+        arrays = self._arrays.get(key)
+        if arrays is None:
+            with self._lock:
+                arrays = self._arrays.get(key)
+                if arrays is None:
+                    arrays = self._arrays[key] = ComboArrays(self.engine, s)
+        return arrays
+
+    def size_lines(self, lines):
+        """SizingResult per line, in order"""
+        engine, settings = self.engine, self.settings
+        results = [None] * len(lines)
+        if engine.gearbox_stages > 1:
+            return [engine.size_line(line, settings) for line in lines]
+
+        groups = {}                             # actuator type -> [(index, s, req)]
+        for i, line in enumerate(lines):
+            prepared = engine.line_requirements(line, settings)
+            if isinstance(prepared, SizingResult):
+                results[i] = prepared
+            else:
+                groups.setdefault(prepared[0].actuator_type, []).append((i,) + prepared)
+
+        for members in groups.values():
+            s = members[0][1]
+            reqs = [req for _, _, req in members]
+            arrays = self.arrays(s)
+            picks = arrays.picks(
+                np.array([r.torque for r in reqs], dtype=float), np.array([r.thrust for r in reqs], dtype=float),
+                np.array([r.op_time for r in reqs], dtype=float), np.array([r.turns for r in reqs], dtype=float),
+                np.array([r.stem_dim for r in reqs], dtype=float), s.op_time_min_pct, s.op_time_max_pct)
+            ids = arrays.ids
+            for (i, s, req), pick in zip(members, picks.tolist()):
+                if pick < 0:
+                    results[i] = engine.size_line(lines[i], settings)
+                else:
+                    results[i] = engine.combination_result(ids[pick], req, s)
+        return results
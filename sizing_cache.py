@@ -0,0 +1,273 @@
+"""
+Noah Actuator Sizing Tool - Sizing Cache
+Persistent SizingResult cache shared across runs, projects and users
+
+Usage:
+    python sizing_cli.py lines.csv --cache sizing_cache.db -o results.csv
+    python sizing_cache.py stats sizing_cache.db
+    python sizing_cache.py clear sizing_cache.db
+
+A result depends only on the catalog content, the settings and the line
+fields the engine reads (Valve Type -> Actuator Type, Torque, Thrust, Op.
+Time, Lift / Pitch, coupling), so the key is a digest of
+
+    CACHE_VERSION + catalog content hash + settings fingerprint + gearbox stages
+    (+ price list) + line requirements
+
+Line No., Tag No., Size and Class are not part of the key. Any catalog
+change (price, row order, ...) gives a new catalog hash, so stale entries
+are never returned; they age out through eviction.
+
+The cache is one SQLite file in WAL mode: any number of processes on one
+host can read while one writes, and writers wait for each other
+(busy timeout). Each entry keeps a last-used time; when the file holds more
+than max_entries results the least recently used ones are deleted.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from dataclasses import astuple, fields, replace
+
+from catalog import DB_SHEET_NAMES, to_float, to_str
+from sizing_engine import SizingResult, actuator_type_from_valve
+
+# Bump when the engine selection rules or SizingResult change
+CACHE_VERSION = 1
+
+DEFAULT_MAX_ENTRIES = 1000000
+EVICT_TO = 0.9              # fraction of max_entries kept after an eviction
+BUSY_TIMEOUT = 30.0         # seconds a writer waits for another writer
+SQL_BATCH = 500             # keys per SELECT ... IN (...)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS results (key BLOB PRIMARY KEY, result TEXT NOT NULL, "
+    "used REAL NOT NULL) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_results_used ON results (used)",
+]
+
+# Settings fields left out of the fingerprint: lines_to_add does not affect a
+# result, actuator_type is part of the line key (after the Valve Type override)
+IGNORED_SETTINGS = {"lines_to_add", "actuator_type"}
+
+
+# ============================================
+# Keys
+# ============================================
+
+def _normalize(value):
+    """Numbers as float (440 and 440.0 give the same key), everything else as text"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return to_str(value)
+
+
+def catalog_hash(catalog):
+    """Content hash of the DB_* tables (hex)"""
+    digest = hashlib.sha256()
+    tables = catalog.tables
+    for name in DB_SHEET_NAMES:
+        if name in tables:
+            digest.update(repr((name, [tuple(_normalize(v) for v in row)
+                                       for row in tables[name]])).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings):
+    """Settings values that affect a result, normalized"""
+    return tuple((f.name, _normalize(getattr(settings, f.name)))
+                 for f in fields(settings) if f.name not in IGNORED_SETTINGS)
+
+
+def key_prefix(catalog_key, settings, gearbox_stages=1, overlay=None):
+    """Key part shared by every line of one run (catalog hash from catalog_hash(),
+    gearbox_stages as given to SizingEngine, overlay as given to with_prices())"""
+    prefix = (CACHE_VERSION, catalog_key, settings_fingerprint(settings), gearbox_stages)
+    if overlay is not None:
+        prefix += (overlay.fingerprint(),)
+    return repr(prefix).encode("utf-8")
+
+
+def line_key(prefix, line, settings):
+    """16-byte key of one ValveLine: the inputs SizingEngine.line_requirements() reads"""
+    derived = actuator_type_from_valve(to_str(line.valve_type).strip())
+    lift = to_float(line.lift)
+    pitch = to_float(line.pitch)
+    requirements = (
+        derived or settings.actuator_type,
+        to_float(line.torque),
+        to_float(line.thrust),
+        to_float(line.op_time),
+        lift / pitch if pitch > 0 else 0.0,
+        to_str(line.coupling_type).strip(),
+        to_float(line.coupling_dim),
+    )
+    return hashlib.blake2b(prefix + repr(requirements).encode("utf-8"), digest_size=16).digest()
+
+
+def _dump_result(result):
+    return json.dumps(astuple(result), separators=(",", ":"))
+
+
+def _load_result(text):
+    return SizingResult(*json.loads(text))
+
+
+# ============================================
+# Cache
+# ============================================
+
+class SizingCache:
+    """SizingResult store keyed by line_key(); safe for concurrent processes"""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, timeout=BUSY_TIMEOUT):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be > 0")
+        self.path = path
+        self.max_entries = max_entries
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self._count = self._row_count()
+        self.hits = 0
+        self.misses = 0
+
+    def _row_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __len__(self):
+        return self._row_count()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------- lookups --------
+
+    def get_many(self, keys):
+        """{key: SizingResult} for the keys found (one query per SQL_BATCH keys)"""
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), SQL_BATCH):
+            batch = keys[start:start + SQL_BATCH]
+            sql = "SELECT key, result FROM results WHERE key IN (%s)" % ",".join("?" * len(batch))
+            for key, text in self.conn.execute(sql, batch):
+                found[key] = _load_result(text)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    # -------- writes --------
+
+    def put_many(self, items, touched=()):
+        """Store (key, SizingResult) pairs and mark touched keys (cache hits) as used"""
+        items = list(items)
+        touched = list(touched)
+        if not items and not touched:
+            return
+        now = time.time()
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany("INSERT OR REPLACE INTO results (key, result, used) VALUES (?, ?, ?)",
+                             [(key, _dump_result(result), now) for key, result in items])
+            self._count += conn.total_changes - before
+            for start in range(0, len(touched), SQL_BATCH):
+                batch = touched[start:start + SQL_BATCH]
+                conn.execute("UPDATE results SET used = ? WHERE key IN (%s)" % ",".join("?" * len(batch)),
+                             [now] + batch)
+            if self._count > self.max_entries:
+                self._evict()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def put(self, key, result):
+        self.put_many([(key, result)])
+
+    def _evict(self):
+        # _count also grows on replaced keys and other processes' inserts: recount first
+        self._count = self._row_count()
+        excess = self._count - int(self.max_entries * EVICT_TO)
+        if self._count > self.max_entries and excess > 0:
+            self.conn.execute("DELETE FROM results WHERE key IN "
+                              "(SELECT key FROM results ORDER BY used LIMIT ?)", (excess,))
+            self._count -= excess
+
+    def clear(self):
+        self.conn.execute("DELETE FROM results")
+        self._count = 0
+
+    # -------- sizing --------
+
+    def size_lines(self, engine, lines, settings, prefix):
+        """SizingResults for lines; only cache misses go through engine.size_line()
+
+        prefix: key_prefix(catalog_hash(engine.catalog), settings, overlay=engine.overlay)
+        """
+        keys = [line_key(prefix, line, settings) for line in lines]
+        found = self.get_many(set(keys))
+        results = []
+        new = {}
+        for key, line in zip(keys, lines):
+            result = found.get(key) or new.get(key)
+            if result is None:
+                result = engine.size_line(line, settings)
+                new[key] = result
+                self.misses += 1
+            else:
+                self.hits += 1
+            # Callers may modify results (e.g. the Excel writer), never share instances
+            results.append(replace(result))
+        self.put_many(new.items(), touched=found)
+        return results
+
+
+# ============================================
+# Main
+# ============================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear a sizing result cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_stats = sub.add_parser("stats", help="Entry count and file size")
+    p_stats.add_argument("cache")
+    p_clear = sub.add_parser("clear", help="Delete all entries")
+    p_clear.add_argument("cache")
+    args = parser.parse_args(argv)
+
+    try:
+        if not os.path.exists(args.cache):
+            raise OSError("Cache not found: %s" % args.cache)
+        with SizingCache(args.cache) as cache:
+            if args.command == "stats":
+                size = sum(os.path.getsize(p) for p in (args.cache, args.cache + "-wal")
+                           if os.path.exists(p))
+                print("%s: %d results, %.1f MB" % (args.cache, len(cache), size / 1e6))
+            else:
+                cache.clear()
+                cache.conn.execute("VACUUM")
+                print("Cleared: %s" % args.cache)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Noah Actuator Sizing Tool - Batch Sizing CLI
+Sizes ValveList lines from xlsx/xlsm, CSV or JSONL files without Excel
+
+Usage:
+    python sizing_cli.py lines.csv                                  # CSV results on stdout
+    python sizing_cli.py NoahSizing.xlsm --settings NoahSizing.xlsm -o results.jsonl
+    python sizing_cli.py lines.jsonl --enclosure Explosionproof --voltage 440 --jobs 4
+    python sizing_cli.py big_project.csv --threads 4 -o results.csv   # one process (sizing_batch.py)
+    erp_export | python sizing_cli.py - --input-format jsonl --output-format jsonl
+    python sizing_cli.py lines.parquet -o results.parquet           # Arrow/Parquet (pyarrow)
+    python sizing_cli.py lines.csv --price-list customer_a.json     # customer prices (price_overlay.py)
+    python sizing_cli.py lines.csv --run-store quotes/ --project P-1024   # record the run (run_store.py)
+
+Settings: --settings (workbook Settings sheet or JSON file), otherwise the
+create_workbook.py defaults; single-field flags (--safety-factor, ...) override.
+Catalog: --catalog workbook, Arrow/Parquet catalog directory (arrow_io.py) or
+SQLite database (catalog_sqlite.py), otherwise generated from create_workbook.py.
+
+Results are written in input order as soon as each chunk is sized; progress
+and throughput go to stderr.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+from collections import deque
+from dataclasses import fields
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from catalog import load_catalog
+from price_overlay import load_price_overlay
+from sizing_engine import SizingEngine, MARGIN_HEADERS, result_values, margin_values
+from sizing_settings import SizingSettings, load_settings, settings_from_values, validate_settings
+from valvelist_io import iter_lines, detect_format, open_writer
+
+FORMATS_IN = ["xlsx", "csv", "jsonl", "arrow", "parquet"]
+FORMATS_OUT = ["csv", "jsonl", "arrow", "parquet"]
+BINARY_FORMATS = ("arrow", "parquet")
+
+CHUNK_SIZE = 256            # lines per worker task
+PROGRESS_INTERVAL = 1.0     # seconds between progress lines
+
+# Settings fields that can be given as flags (--safety-factor 1.5, ...)
+SETTING_FLAGS = [f.name for f in fields(SizingSettings) if f.name != "lines_to_add"]
+
+
+# ============================================
+# Workers
+# ============================================
+
+_engine = None
+_settings = None
+_margins = False
+_cache = None
+_cache_prefix = None
+_batch = None
+
+
+def _init_worker(catalog_path, settings, margins=False, cache_path=None, cache_size=None,
+                 gearbox_stages=1, overlay=None, batch=False):
+    global _engine, _settings, _margins, _cache, _cache_prefix, _batch
+    catalog = load_catalog(catalog_path)
+    if batch and hasattr(catalog, "in_memory"):
+        catalog = catalog.in_memory()           # SQLite connections stay in their thread
+    _engine = SizingEngine(catalog, gearbox_stages).with_prices(overlay)
+    _settings = settings
+    _margins = margins
+    _batch = None
+    if batch:
+        from sizing_batch import BatchSizer
+        _batch = BatchSizer(_engine, settings)
+    _cache = _cache_prefix = None
+    if cache_path:
+        from sizing_cache import SizingCache, DEFAULT_MAX_ENTRIES, catalog_hash, key_prefix
+        _cache = SizingCache(cache_path, cache_size or DEFAULT_MAX_ENTRIES)
+        _cache_prefix = key_prefix(catalog_hash(_engine.catalog), settings, gearbox_stages, overlay)
+
+
+def size_chunk(lines):
+    """Worker: size a chunk of lines, return the 13 result values (+ margins) per line"""
+    if _cache is not None:
+        results = _cache.size_lines(_engine, lines, _settings, _cache_prefix)
+    elif _batch is not None:
+        results = _batch.size_lines(lines)
+    else:
+        results = [_engine.size_line(line, _settings) for line in lines]
+    rows = []
+    for line, result in zip(lines, results):
+        row = result_values(result)
+        if _margins:
+            row += margin_values(_engine.selection_margins(line, _settings, result))
+        rows.append(row)
+    return rows
+
+
+def iter_chunks(lines, size):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_results(lines, catalog_path, settings, jobs=1, chunk_size=CHUNK_SIZE, margins=False,
+                 cache_path=None, cache_size=None, gearbox_stages=1, overlay=None, threads=None):
+    """Yield (chunk of lines, chunk of result rows) in input order
+
+    overlay: price_overlay.PriceOverlay to rank with (None = catalog prices)
+    threads: size chunks with sizing_batch.BatchSizer on this many threads of
+    this process (one shared engine; jobs and cache_path are not used)
+    """
+    init_args = (catalog_path, settings, margins, cache_path, cache_size, gearbox_stages, overlay)
+    if threads is not None:
+        _init_worker(catalog_path, settings, margins, None, None, gearbox_stages, overlay, batch=True)
+        workers = threads
+        pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+    else:
+        if jobs == 1:
+            _init_worker(*init_args)
+        workers = jobs
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                   initargs=init_args) if jobs != 1 else None
+    if pool is None:
+        for chunk in iter_chunks(lines, chunk_size):
+            yield chunk, size_chunk(chunk)
+        return
+
+    with pool:
+        # Bounded window keeps memory flat for arbitrarily long inputs
+        window = deque()
+        max_pending = (workers or os.cpu_count() or 1) * 4
+        for chunk in iter_chunks(lines, chunk_size):
+            window.append((chunk, pool.submit(size_chunk, chunk)))
+            if len(window) >= max_pending:
+                chunk, future = window.popleft()
+                yield chunk, future.result()
+        while window:
+            chunk, future = window.popleft()
+            yield chunk, future.result()
+
+
+# ============================================
+# Progress
+# ============================================
+
+class Progress:
+    """Lines/s reporting on stderr"""
+
+    def __init__(self, stream=sys.stderr, interval=PROGRESS_INTERVAL, enabled=True):
+        self.stream = stream
+        self.interval = interval
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.done = 0
+        self.ok = 0
+
+    def update(self, rows):
+        self.done += len(rows)
+        self.ok += sum(1 for r in rows if r[0] != "")
+        now = time.perf_counter()
+        if self.enabled and now - self.last >= self.interval:
+            self.last = now
+            print("sized %d lines (%.0f lines/s)" % (self.done, self.done / (now - self.start)),
+                  file=self.stream, flush=True)
+
+    def finish(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0
+        print("Sizing completed: %d lines, success %d, failed %d (%.2fs, %.0f lines/s)" % (
+            self.done, self.ok, self.done - self.ok, elapsed, rate), file=self.stream, flush=True)
+
+
+# ============================================
+# Main
+# ============================================
+
+def build_settings(args):
+    settings = load_settings(args.settings)
+    overrides = {name: getattr(args, name) for name in SETTING_FLAGS if getattr(args, name) is not None}
+    if overrides:
+        settings = settings_from_values(overrides, base=settings)
+    return settings
+
+
+def open_run_recorder(args, settings, overlay=None):
+    """run_store.RunRecorder for this run; a price list is part of the catalog hash"""
+    from run_store import RunStore
+    from sizing_cache import catalog_hash
+    catalog_key = catalog_hash(load_catalog(args.catalog))
+    if overlay is not None:
+        catalog_key = hashlib.sha256(repr((catalog_key, overlay.fingerprint())).encode("utf-8")).hexdigest()
+    project = args.project or os.path.splitext(os.path.basename(args.input))[0]
+    return RunStore(args.run_store).open_run(project, settings, catalog_key, args.gearbox_stages,
+                                             source=args.input)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Size ValveList lines from xlsx/CSV/JSONL files")
+    parser.add_argument("input", help="ValveList workbook, CSV or JSONL file ('-' = stdin)")
+    parser.add_argument("-o", "--output", help="Result file (default: stdout)")
+    parser.add_argument("--input-format", choices=FORMATS_IN, help="Default: from extension")
+    parser.add_argument("--output-format", choices=FORMATS_OUT, help="Default: from extension, else csv")
+    parser.add_argument("--settings", help="Workbook (Settings sheet) or JSON file with settings")
+    parser.add_argument("--catalog", help="Workbook, catalog directory or SQLite database (default: create_workbook.py data)")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (default 1, 0 = CPU count)")
+    parser.add_argument("--threads", type=int,
+                        help="Size with the numpy batch kernel on this many threads of one process "
+                             "(0 = CPU count; not with --jobs / --cache)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Lines per worker task")
+    parser.add_argument("--margins", action="store_true",
+                        help="Add selection margin columns (" + ", ".join(MARGIN_HEADERS) + ")")
+    parser.add_argument("--gearbox-stages", type=int, choices=[1, 2], default=1,
+                        help="2 = also try actuator + two-stage gearbox trains (not in the VBA engine)")
+    parser.add_argument("--price-list", help="Customer price list JSON applied over the catalog prices")
+    parser.add_argument("--cache", help="Persistent result cache (SQLite file, created if missing)")
+    parser.add_argument("--cache-size", type=int, help="Maximum cached results (default 1,000,000)")
+    parser.add_argument("--run-store", help="Record the run in this run store directory (run_store.py)")
+    parser.add_argument("--project", help="Project of the recorded run (default: input file name)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="No progress lines (summary only)")
+    for name in SETTING_FLAGS:
+        parser.add_argument("--" + name.replace("_", "-"), dest=name, help="Override setting " + name)
+    args = parser.parse_args(argv)
+
+    try:
+        settings = build_settings(args)
+    except (OSError, ValueError) as e:
+        print("Settings error: %s" % e, file=sys.stderr)
+        return 2
+    errors = validate_settings(settings)
+    if errors:
+        print("Invalid settings:\n  " + "\n  ".join(errors), file=sys.stderr)
+        return 2
+
+    if args.margins and args.gearbox_stages > 1:
+        print("--margins covers direct and single-stage gearbox selections only", file=sys.stderr)
+        return 2
+
+    out_format = args.output_format or detect_format(args.output, default="csv")
+    if out_format not in FORMATS_OUT:
+        out_format = "csv"
+    if out_format in BINARY_FORMATS and not args.output:
+        print("%s output needs -o/--output" % out_format, file=sys.stderr)
+        return 2
+    if args.threads is not None and (args.jobs != 1 or args.cache):
+        print("--threads cannot be combined with --jobs or --cache", file=sys.stderr)
+        return 2
+
+    progress = Progress(enabled=not args.quiet)
+    jobs = args.jobs if args.jobs > 0 else None
+    threads = None
+    if args.threads is not None:
+        threads = args.threads if args.threads > 0 else os.cpu_count() or 1
+
+    extra_headers = MARGIN_HEADERS if args.margins else []
+    out = recorder = None
+    try:
+        overlay = load_price_overlay(args.price_list) if args.price_list else None
+        if args.run_store:
+            recorder = open_run_recorder(args, settings, overlay)
+        if out_format in BINARY_FORMATS:
+            from arrow_io import ArrowResultWriter
+            writer = ArrowResultWriter(args.output, out_format, extra_headers=extra_headers)
+        else:
+            out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+            writer = open_writer(out, out_format, extra_headers)
+        lines = iter_lines(args.input, args.input_format)
+        for chunk, rows in iter_results(lines, args.catalog, settings, jobs, args.chunk_size,
+                                        args.margins, args.cache, args.cache_size, args.gearbox_stages,
+                                        overlay, threads):
+            for line, row in zip(chunk, rows):
+                writer.write(line, row)
+                if recorder is not None:
+                    recorder.write(line, row)
+            writer.flush()
+            progress.update(rows)
+        writer.close()
+        if recorder is not None:
+            info, recorder = recorder.close(), None
+            print("Recorded run %d (%s)" % (info.run_id, info.project), file=sys.stderr)
+    except (ImportError, OSError, ValueError, sqlite3.Error) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if recorder is not None:
+            recorder.abort()
+
+    progress.finish()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1254 @@
+"""
+Noah Actuator Sizing Tool - Sizing Engine (Python)
+Port of the modSizing.bas / modHelpers.bas selection logic for batch sizing
+outside Excel
+
+Selection rules, filter order, counters and Status texts follow the VBA engine:
+- Phase 1: direct actuator, cheapest wins (tie: smallest torque margin)
+- Phase 2: actuator + gearbox, gearboxes picked by ratio-range query
+  (cheapest wins, tie: first actuator row, then first gearbox row)
+- Direct is kept when its price <= the gearbox combination
+- Linear actuators never use a gearbox
+- Optional (gearbox_stages=2, not in VBA): actuator + two-stage gearbox train,
+  used only when strictly cheaper than the direct / single-stage pick
+
+One difference: SizeLine in VBA overrides s.ActuatorType from the ValveType
+of a row and the change leaks into the following rows of SizingAll. Here every
+line gets its own copy of the settings, so results do not depend on line order.
+"""
+
+import copy
+import weakref
+from bisect import bisect_left, insort
+from types import SimpleNamespace
+from dataclasses import dataclass, replace
+
+from catalog import (ActuatorRecord, Catalog, CATALOG_EDITS, bitmap_rows, gearbox_is_valid,
+                     match_model_range, model_row_matches, to_float, to_str)
+
+MAX_PRICE = 9.9e99      # Used as "infinity" for price comparison
+
+# Unit conversion constants
+LBF_FT_TO_NM = 1.35582
+KGF_M_TO_NM = 9.80665
+LBF_TO_KN = 0.00444822
+KGF_TO_KN = 0.00980665
+
+# GetRatioRange bound widening (exact checks follow)
+RATIO_EPS = 0.000001
+
+# Extra result columns of selection_margins (input units, blank = no limit / not applicable)
+MARGIN_HEADERS = ["Torque -", "Torque +", "Thrust -", "Thrust +",
+                  "OpTime -", "OpTime +", "SF -", "SF +"]
+
+
+@dataclass
+class SizingResult:
+    success: bool = False
+    actuator_model: str = ""
+    gearbox_model: str = ""
+    rpm: float = 0.0
+    ratio: float = 0.0
+    output_flange: str = ""
+    calc_torque: float = 0.0
+    calc_thrust: float = 0.0      # Multi-turn only
+    calc_op_time: float = 0.0
+    actual_sf: float = 0.0        # CalcTorque / ReqTorque (without SF)
+    max_stem_dim: float = 0.0
+    motor_power_kw: float = 0.0
+    total_price: float = 0.0
+    status: str = ""
+
+
+@dataclass
+class LineRequirements:
+    """Converted line requirements (torque Nm and thrust kN include the safety factor)"""
+    torque: float
+    thrust: float
+    op_time: float
+    turns: float
+    stem_dim: float
+
+
+# ============================================
+# Helper Functions (modHelpers equivalents)
+# ============================================
+
+def convert_torque_to_nm(value, unit):
+    if unit == "lbf.ft":
+        return value * LBF_FT_TO_NM
+    if unit == "kgf.m":
+        return value * KGF_M_TO_NM
+    return value
+
+
+def convert_thrust_to_kn(value, unit):
+    if unit == "lbf":
+        return value * LBF_TO_KN
+    if unit == "kgf":
+        return value * KGF_TO_KN
+    return value
+
+
+def actuator_type_from_valve(valve_type):
+    """GetActuatorTypeFromValve: "" for unknown valve types"""
+    if valve_type in ("Ball", "Butterfly", "Plug"):
+        return "Part-turn"
+    if valve_type in ("Gate", "Globe"):
+        return "Multi-turn"
+    if valve_type == "Linear":
+        return "Linear"
+    return ""
+
+
+def calculate_op_time(rpm, turns, act_type, gb_ratio=1, act_op_time=0, act_speed=0, act_stroke=0):
+    """CalculateOpTime: operating time in seconds
+
+    Multi-turn: (Turns * Ratio * 60) / RPM
+    Part-turn:  OpTime_sec * Ratio (fallback (Ratio * 60) / (4 * RPM))
+    Linear:     Stroke / Speed
+    """
+    if act_type == "Multi-turn":
+        if rpm > 0 and turns > 0:
+            return (turns * gb_ratio * 60) / rpm
+        return 0.0
+    if act_type == "Linear":
+        if act_speed > 0 and act_stroke > 0:
+            return act_stroke / act_speed
+        return 0.0
+    if act_op_time > 0:
+        return act_op_time * gb_ratio
+    if rpm > 0:
+        return (gb_ratio * 60) / (4 * rpm)
+    return 0.0
+
+
+def op_time_window(req_time, min_pct, max_pct):
+    """(minTime, maxTime) accepted by CheckOpTimeRange"""
+    min_time = req_time * (1 + min_pct / 100)
+    max_time = req_time * (1 + max_pct / 100)
+    if min_time > max_time:
+        min_time, max_time = max_time, min_time
+    return min_time, max_time
+
+
+def check_op_time_range(calc_time, req_time, min_pct, max_pct):
+    min_time, max_time = op_time_window(req_time, min_pct, max_pct)
+    return min_time <= calc_time <= max_time
+
+
+def passes_model_filters(m, s, req_thrust):
+    """PassesModelFilters: base specs before resolving power/enclosure options
+
+    The engine evaluates these checks as ModelFilterBitmaps.settings_mask()
+    (plus the per-line thrust check); this row-by-row form is the reference.
+    """
+    if m.act_type != s.actuator_type:
+        return False
+    if not match_model_range(m.series, s.model_range):
+        return False
+    if m.freq != s.frequency:
+        return False
+    # Phase > 0 only for MS series (torque depends on phase)
+    if m.phase > 0 and m.phase != s.phase:
+        return False
+    if s.actuator_type in ("Multi-turn", "Linear") and req_thrust > 0:
+        if m.thrust < req_thrust:
+            return False
+    # Fail-safe (Spring Return = SR series only)
+    if "SR" in s.failsafe and m.series != "SR":
+        return False
+    if s.duty_cycle != "Any":
+        if "S2" in s.duty_cycle:
+            if "S2" not in m.duty_cycle:
+                return False
+        elif "S4" in s.duty_cycle:
+            if "S4" not in m.duty_cycle:
+                return False
+    # Operation Mode (SA series ControlType)
+    if m.series == "SA":
+        if s.operation_mode == "On-Off":
+            if m.control_type != "ONOFF":
+                return False
+        elif "High-Speed" in s.operation_mode:
+            if m.control_type != "SCP":
+                return False
+        elif s.operation_mode == "Modulating":
+            if m.control_type == "ONOFF":
+                return False
+    return True
+
+
+def try_match_gearbox(act, gb, req_torque, req_stem_dim):
+    """TryMatchGearbox: output torque if compatible, else None"""
+    if not gb.model.strip() or gb.ratio <= 0:
+        return None
+    if gb.input_flange != act.output_flange:
+        return None
+    if act.torque > gb.input_torque_max:
+        return None
+    output_torque = act.torque * gb.ratio * gb.efficiency
+    if output_torque < req_torque or output_torque > gb.output_torque_max:
+        return None
+    if req_stem_dim > 0 and gb.max_stem_dim > 0 and req_stem_dim > gb.max_stem_dim:
+        return None
+    return output_torque
+
+
+def _num(value):
+    # VBA string concatenation of a Double (CStr)
+    return to_str(float(value))
+
+
+def build_no_match_reason(total_act, type_count, series_count, power_count, enclosure_count,
+                          thrust_count, torque_count, op_time_count, gb_flange_count,
+                          gb_input_torque_count, gb_output_torque_count, gb_op_time_count,
+                          req_torque, req_thrust, req_op_time, s, has_gearbox_data):
+    """BuildNoMatchReason: first failing filter stage as Status text"""
+    needs_thrust = (s.actuator_type == "Multi-turn" and req_thrust > 0)
+
+    if total_act == 0:
+        return "DB_Actuators is empty."
+    if type_count == 0:
+        return "No models match Actuator Type: " + s.actuator_type
+    if series_count == 0:
+        return "No models match Model Range: " + s.model_range
+    if power_count == 0:
+        return "No models match %dV %dph %dHz" % (s.voltage, s.phase, s.frequency)
+    if enclosure_count == 0:
+        return "No models match Enclosure: " + s.enclosure
+    if needs_thrust and thrust_count == 0:
+        return "No models meet Thrust >= " + _num(round(req_thrust, 2)) + " kN"
+
+    if torque_count == 0:
+        torque_text = _num(round(req_torque, 2))
+        if not has_gearbox_data:
+            return "No direct actuators meet Torque >= " + torque_text + " Nm. DB_Gearboxes is empty."
+        if gb_flange_count == 0:
+            return ("No direct actuators meet Torque >= " + torque_text +
+                    " Nm. No compatible gearboxes (flange mismatch).")
+        if gb_input_torque_count == 0:
+            return ("No direct actuators meet Torque >= " + torque_text +
+                    " Nm. Gearboxes exceed input torque limit.")
+        if gb_output_torque_count == 0:
+            return "No models or gearbox combinations meet Torque >= " + torque_text + " Nm"
+
+    if req_op_time > 0 and op_time_count == 0 and gb_op_time_count == 0:
+        return "No actuators meet Op Time range (%s~%s sec)" % (
+            _num(round(req_op_time * (1 + s.op_time_min_pct / 100), 1)),
+            _num(round(req_op_time * (1 + s.op_time_max_pct / 100), 1)))
+
+    return "No suitable model found."
+
+
+def result_values(result, error=""):
+    """WriteResult: the 13 ValveList result column values (Model ... Status)"""
+    if not result.success:
+        return [""] * 12 + [error or result.status]
+    return [
+        result.actuator_model,
+        result.gearbox_model,
+        result.rpm,
+        _num(result.ratio) + ":1" if result.ratio > 0 else "",
+        result.output_flange,
+        round(result.calc_torque, 2),
+        round(result.calc_thrust, 2) if result.calc_thrust > 0 else "",
+        round(result.calc_op_time, 2),
+        round(result.actual_sf, 2) if result.actual_sf > 0 else "",
+        result.max_stem_dim if result.max_stem_dim > 0 else "",
+        result.motor_power_kw if result.motor_power_kw > 0 else "",
+        result.total_price,
+        result.status,
+    ]
+
+
+@dataclass
+class SelectionMargins:
+    """How far each requirement can move before the selected combination changes
+
+    Values are distances from the line value to the breakpoint (input units
+    for torque/thrust, seconds, SF); None = no breakpoint or not applicable.
+    """
+    torque_down: float = None
+    torque_up: float = None
+    thrust_down: float = None
+    thrust_up: float = None
+    op_time_down: float = None
+    op_time_up: float = None
+    sf_down: float = None
+    sf_up: float = None
+
+
+def margin_values(margins):
+    """The MARGIN_HEADERS column values (blank for None)"""
+    if margins is None:
+        return [""] * len(MARGIN_HEADERS)
+    values = [margins.torque_down, margins.torque_up, margins.thrust_down, margins.thrust_up,
+              margins.op_time_down, margins.op_time_up, margins.sf_down, margins.sf_up]
+    return ["" if v is None else round(v, 2) for v in values]
+
+
+# Combination ids: actuator row * GEARBOX_ID_STRIDE + gearbox row + 1 (0 = direct)
+GEARBOX_ID_STRIDE = 1 << 16
+
+
+def combination_id(act_row, gb_row=None):
+    return act_row * GEARBOX_ID_STRIDE + (0 if gb_row is None else gb_row + 1)
+
+
+def split_combination_id(cid):
+    """(actuator row, gearbox row or None)"""
+    act_row, gb_part = divmod(cid, GEARBOX_ID_STRIDE)
+    return act_row, (gb_part - 1 if gb_part else None)
+
+
+def combination_fits(c, req_torque, req_thrust, req_op_time, s):
+    """Torque, thrust and Op. Time checks of a SizingEngine.combinations() entry"""
+    if s.actuator_type != "Linear" and c[1] < req_torque:
+        return False
+    if req_thrust > 0 and c[2] < req_thrust:
+        return False
+    if req_op_time > 0 and not check_op_time_range(c[3], req_op_time, s.op_time_min_pct, s.op_time_max_pct):
+        return False
+    return True
+
+
+def op_time_interval(calc_time, min_pct, max_pct):
+    """Required Op. Time values (lo, hi) whose CheckOpTimeRange window holds calc_time, or None"""
+    low = min(1 + min_pct / 100, 1 + max_pct / 100)
+    high = max(1 + min_pct / 100, 1 + max_pct / 100)
+    if high <= 0:
+        return (0.0, MAX_PRICE) if calc_time == 0 and low <= 0 else None
+    return calc_time / high, (calc_time / low if low > 0 else MAX_PRICE)
+
+
+def _replace_rows(acts, rows, added, sort_key):
+    """Replace the actuators of some model rows in a sorted candidate list"""
+    if any(act.row in rows for act in acts):
+        acts[:] = [act for act in acts if act.row not in rows]
+    for act in added:
+        insort(acts, act, key=sort_key)
+
+
+# ============================================
+# Engine
+# ============================================
+
+class SizingEngine:
+    """Sizing engine bound to one catalog
+
+    Resolved actuators (power + enclosure join) and model filters depend only
+    on the settings, so they are cached per settings combination; the filters
+    are ANDs of catalog bitmaps (catalog.ModelFilterBitmaps) and only models
+    that can resolve are joined. The gearbox table is indexed by ratio once.
+    Prices are ranked from per-row price vectors, so with_prices() can apply a
+    customer price list without copying any of it. edit() applies a single-row
+    catalog edit and updates these indexes in place instead of rebuilding them.
+    """
+
+    def __init__(self, catalog, gearbox_stages=1):
+        if gearbox_stages not in (1, 2):
+            raise ValueError("gearbox_stages must be 1 or 2")
+        self.catalog = catalog
+        self.gearbox_stages = gearbox_stages
+        self.has_models_sheet = catalog.has_sheet("DB_Models")
+        self.has_gearbox_sheet = catalog.has_sheet("DB_Gearboxes")
+        self.has_coupling_sheet = catalog.has_sheet("DB_Couplings")
+        self.has_gearbox_data = catalog.has_gearbox_data()
+
+        # Ratio index (LoadGearboxesByRatio): valid gearboxes sorted by ratio,
+        # split by input flange since only InputFlange = act.OutputFlange can match
+        self.gb_sorted = catalog.valid_gearboxes()
+        self.gb_by_flange = {}
+        for row, gb in self.gb_sorted:
+            self.gb_by_flange.setdefault(gb.input_flange, []).append((row, gb))
+        self.gb_ratios = {flange: [gb.ratio for _, gb in entries]
+                          for flange, entries in self.gb_by_flange.items()}
+        self.max_eff = {flange: max(gb.efficiency for _, gb in entries)
+                        for flange, entries in self.gb_by_flange.items()}
+        self.max_eff_all = max(self.max_eff.values(), default=0.0)
+
+        self.filters = catalog.model_filters()
+        self._model_rows = {}
+        self._resolved = {}
+        self._direct = {}
+        self._geared = {}
+
+        # Ranking prices: the catalog's, or a price overlay's (with_prices)
+        self.overlay = None
+        self._price_gearboxes()
+        self._act_prices = {}
+        self._geared_by_price = {}
+        self._views = weakref.WeakSet([self])   # this engine and its with_prices() views
+
+    # -------- prices --------
+
+    def with_prices(self, overlay):
+        """Engine ranking with a price_overlay.PriceOverlay (None = catalog prices)
+
+        The returned engine shares the catalog, gearbox index, filters and the
+        resolved actuator caches with this one; only the price vectors are its own.
+        """
+        if overlay is None and self.overlay is None:
+            return self
+        view = copy.copy(self)
+        view.overlay = overlay
+        view._price_gearboxes()
+        view._act_prices = {}
+        view._geared_by_price = {}
+        view._views.add(view)
+        return view
+
+    def _price_gearboxes(self):
+        if self.overlay is None:
+            self.gb_prices = {row: gb.price for row, gb in self.gb_sorted}
+        else:
+            self.gb_prices = {row: self.overlay.gearbox_price(gb) for row, gb in self.gb_sorted}
+        # Two-stage bound: cheapest gearbox per input flange
+        self.min_gb_price = {flange: min(self.gb_prices[row] for row, _ in entries)
+                             for flange, entries in self.gb_by_flange.items()}
+
+    def actuator_prices(self, s):
+        """{row: price} of the resolved() actuators of s"""
+        key = (s.actuator_type, s.model_range, s.voltage, s.phase, s.frequency, s.enclosure)
+        prices = self._act_prices.get(key)
+        if prices is None:
+            acts = self.resolved(s)
+            if self.overlay is None:
+                prices = {row: act.price for row, act in acts.items() if act is not None}
+            else:
+                prices = {row: self.overlay.actuator_price(m, s, self.catalog)
+                          for row, m in self.model_rows(s.actuator_type, s.model_range)
+                          if acts[row] is not None}
+            self._act_prices[key] = prices
+        return prices
+
+    # -------- cached settings-dependent lists --------
+
+    def model_rows(self, act_type, model_range="All", freq=None, phase=None):
+        """catalog.model_rows(), cached per filter combination"""
+        key = (act_type, model_range, freq, phase)
+        rows = self._model_rows.get(key)
+        if rows is None:
+            rows = self.catalog.model_rows(act_type, model_range, freq, phase)
+            self._model_rows[key] = rows
+        return rows
+
+    def resolved(self, s):
+        """ResolveActuator for the models of s.ActuatorType and Model Range:
+        {row: ActuatorRecord or None} in sheet order"""
+        key = (s.actuator_type, s.model_range, s.voltage, s.phase, s.frequency, s.enclosure)
+        acts = self._resolved.get(key)
+        if acts is None:
+            ok = self.filters.resolvable_mask(s)
+            acts = {row: self._resolve(row, m, s) if ok >> row & 1 else None
+                    for row, m in self.model_rows(s.actuator_type, s.model_range)}
+            self._resolved[key] = acts
+        return acts
+
+    def _resolve(self, row, m, s):
+        power_adder = self.catalog.power_adder(m.model, s.voltage, s.phase, s.frequency)
+        if power_adder is None:
+            return None
+        enclosure = self.catalog.enclosure_option(m.model, s.enclosure)
+        if enclosure is None:
+            return None
+        actual_enclosure, enclosure_adder = enclosure
+        return ActuatorRecord(
+            model=m.model, series=m.series, act_type=m.act_type, motor_power_kw=m.motor_power_kw,
+            torque=m.torque, thrust=m.thrust, rpm=m.rpm, op_time=m.op_time,
+            speed=m.speed, stroke=m.stroke, voltage=s.voltage, phase=s.phase, freq=s.frequency,
+            enclosure=actual_enclosure, output_flange=m.output_flange,
+            max_stem_dim=m.max_stem_dim, weight=m.weight,
+            price=m.base_price + power_adder + enclosure_adder, row=row)
+
+    def direct_candidates(self, s):
+        """Phase 1 actuators: PassesModelFilters (thrust excluded) + ResolveActuator"""
+        key = (s.actuator_type, s.model_range, s.frequency, s.phase, s.failsafe, s.duty_cycle,
+               s.operation_mode, s.voltage, s.enclosure)
+        acts = self._direct.get(key)
+        if acts is None:
+            resolved = self.resolved(s)
+            rows = bitmap_rows(self.filters.settings_mask(s) & self.filters.resolvable_mask(s))
+            acts = [resolved[row] for row in rows if resolved[row] is not None]
+            self._direct[key] = acts
+        return acts
+
+    def gearbox_candidates(self, s):
+        """Phase 2 actuators: ActType + Model Range + ResolveActuator (thrust checked per line)"""
+        key = (s.actuator_type, s.model_range, s.voltage, s.phase, s.frequency, s.enclosure)
+        acts = self._geared.get(key)
+        if acts is None:
+            acts = [act for act in self.resolved(s).values() if act is not None]
+            self._geared[key] = acts
+        return acts
+
+    def gearbox_candidates_by_price(self, s):
+        """gearbox_candidates() ordered by (price, row), for the train search bound"""
+        key = (s.actuator_type, s.model_range, s.voltage, s.phase, s.frequency, s.enclosure)
+        acts = self._geared_by_price.get(key)
+        if acts is None:
+            prices = self.actuator_prices(s)
+            acts = sorted(self.gearbox_candidates(s), key=lambda act: (prices[act.row], act.row))
+            self._geared_by_price[key] = acts
+        return acts
+
+    # -------- incremental catalog edits --------
+
+    def edit(self, method, *args):
+        """Apply one Catalog single-row edit and update the indexes in place
+
+        method: a catalog.CATALOG_EDITS name, e.g. edit("update_model", row, values)
+        or edit("set_power_option", "NA006", 380, 3, 50, 120). The cached
+        resolved actuators, candidate lists, filter bitmaps, gearbox ratio
+        index and price vectors of this engine and of every with_prices() view
+        are updated for the edited rows only. Returns the catalog.CatalogEdit.
+        """
+        if method not in CATALOG_EDITS:
+            raise ValueError("Unknown catalog edit: %s" % method)
+        if not isinstance(self.catalog, Catalog):
+            raise ValueError("Catalog edits need an in-memory catalog (SqliteCatalog.in_memory())")
+        change = getattr(self.catalog, method)(*args)
+        views = list(self._views)
+        if change.kind == "gearbox":
+            self._update_gearbox_index(change.row, change.old, change.new, views)
+            return change
+        if change.kind == "model":
+            self.filters.set_row(change.row, change.old, change.new)
+            self._update_model_rows(change.row, change.new)
+            self._update_rows([change.row], views)
+        else:
+            if change.kind == "power" and change.new is None:
+                self.filters.remove_power_key(change.model, change.bus)
+            elif change.kind == "power":
+                self.filters.add_power_key(change.model, change.bus)
+            else:
+                self.filters.set_enclosures(change.model, [e for e, _ in
+                                                           self.catalog.enclosure_options.get(change.model, ())])
+            self._update_rows(bitmap_rows(self.filters.by_model.get(change.model, 0)), views,
+                              change.bus if change.kind == "power" else None)
+        return change
+
+    def _update_model_rows(self, row, m):
+        for key, rows in self._model_rows.items():
+            i = bisect_left(rows, row, key=lambda entry: entry[0])
+            if i < len(rows) and rows[i][0] == row:
+                del rows[i]
+            if m is not None and model_row_matches(m, *key):
+                rows.insert(i, (row, m))
+
+    def _update_rows(self, rows, views, bus=None):
+        """Resolved actuators, candidate lists and prices of some model rows, for every
+        cached profile (bus: only the profiles of this (Voltage, Phase, Freq))"""
+        models = self.catalog.models
+        row_set = set(rows)
+        for key, acts in self._resolved.items():
+            act_type, model_range, voltage, phase, freq, enclosure = key
+            if bus is not None and (voltage, phase, freq) != bus:
+                continue
+            matching = [row for row in rows
+                        if models[row] is not None and model_row_matches(models[row], act_type, model_range)]
+            if not matching and not any(row in acts for row in rows):
+                continue
+            s = SimpleNamespace(actuator_type=act_type, model_range=model_range, voltage=voltage,
+                                phase=phase, frequency=freq, enclosure=enclosure)
+            resolvable = self.filters.resolvable_mask(s)
+            new = {row: self._resolve(row, models[row], s) if resolvable >> row & 1 else None for row in matching}
+            last = next(reversed(acts), -1)
+            for row in rows:
+                if row not in new:
+                    acts.pop(row, None)
+            if any(row not in acts and row < last for row in new):
+                acts.update(new)
+                items = sorted(acts.items(), key=lambda item: item[0])
+                acts.clear()
+                acts.update(items)
+            else:
+                acts.update(new)
+            added = [act for act in new.values() if act is not None]
+
+            if key in self._geared:
+                _replace_rows(self._geared[key], row_set, added, lambda a: a.row)
+            for view in views:
+                prices = view._act_prices.get(key)
+                if prices is None:
+                    continue
+                for row in rows:
+                    prices.pop(row, None)
+                for act in added:
+                    prices[act.row] = (act.price if view.overlay is None
+                                       else view.overlay.actuator_price(models[act.row], s, self.catalog))
+                if key in view._geared_by_price:
+                    _replace_rows(view._geared_by_price[key], row_set, added, lambda a: (prices[a.row], a.row))
+
+        for key, acts in self._direct.items():
+            act_type, model_range, freq, phase, failsafe, duty_cycle, operation_mode, voltage, enclosure = key
+            if bus is not None and (voltage, phase, freq) != bus:
+                continue
+            s = SimpleNamespace(actuator_type=act_type, model_range=model_range, voltage=voltage, phase=phase,
+                                frequency=freq, enclosure=enclosure, failsafe=failsafe, duty_cycle=duty_cycle,
+                                operation_mode=operation_mode)
+            mask = self.filters.settings_mask(s) & self.filters.resolvable_mask(s)
+            resolved = self.resolved(s)
+            added = [resolved[row] for row in rows if mask >> row & 1 and resolved.get(row) is not None]
+            _replace_rows(acts, row_set, added, lambda a: a.row)
+
+    def _update_gearbox_index(self, row, old, new, views):
+        flanges = set()
+        for gb, add in ((old, False), (new, True)):
+            if not gearbox_is_valid(gb):
+                continue
+            flange = gb.input_flange
+            flanges.add(flange)
+            sort_key = (flange, gb.ratio, row)
+            if add:
+                insort(self.gb_sorted, (row, gb), key=lambda e: (e[1].input_flange, e[1].ratio, e[0]))
+                entries = self.gb_by_flange.setdefault(flange, [])
+                i = bisect_left(entries, (gb.ratio, row), key=lambda e: (e[1].ratio, e[0]))
+                entries.insert(i, (row, gb))
+                self.gb_ratios.setdefault(flange, []).insert(i, gb.ratio)
+            else:
+                i = bisect_left(self.gb_sorted, sort_key, key=lambda e: (e[1].input_flange, e[1].ratio, e[0]))
+                del self.gb_sorted[i]
+                entries = self.gb_by_flange[flange]
+                i = bisect_left(entries, (gb.ratio, row), key=lambda e: (e[1].ratio, e[0]))
+                del entries[i]
+                del self.gb_ratios[flange][i]
+        for flange in flanges:
+            entries = self.gb_by_flange.get(flange)
+            if entries:
+                self.max_eff[flange] = max(gb.efficiency for _, gb in entries)
+            else:
+                self.gb_by_flange.pop(flange, None)
+                self.gb_ratios.pop(flange, None)
+                self.max_eff.pop(flange, None)
+        max_eff_all = max(self.max_eff.values(), default=0.0)
+        has_data = self.catalog.has_gearbox_data()
+        for view in views:
+            view.max_eff_all = max_eff_all
+            view.has_gearbox_data = has_data
+            view.gb_prices.pop(row, None)
+            if gearbox_is_valid(new):
+                view.gb_prices[row] = new.price if view.overlay is None else view.overlay.gearbox_price(new)
+            for flange in flanges:
+                entries = self.gb_by_flange.get(flange)
+                if entries:
+                    view.min_gb_price[flange] = min(view.gb_prices[r] for r, _ in entries)
+                else:
+                    view.min_gb_price.pop(flange, None)
+
+    # -------- SizeLine --------
+
+    def line_requirements(self, line, settings):
+        """SizeLine input handling: (settings copy, LineRequirements) or a failed SizingResult"""
+        s = replace(settings)
+
+        # Override ActuatorType based on ValveType
+        derived = actuator_type_from_valve(to_str(line.valve_type).strip())
+        if derived:
+            s.actuator_type = derived
+
+        req_torque = to_float(line.torque)
+        req_thrust = to_float(line.thrust)
+        req_op_time = to_float(line.op_time)
+        req_lift = to_float(line.lift)
+        req_pitch = to_float(line.pitch)
+        req_turns = req_lift / req_pitch if req_pitch > 0 else 0.0
+
+        coupling_type = to_str(line.coupling_type).strip()
+        coupling_dim = to_float(line.coupling_dim)
+
+        if coupling_type:
+            if not self.has_coupling_sheet:
+                return SizingResult(status="DB_Couplings sheet not found.")
+            limits = self.catalog.coupling_limits(coupling_type)
+            if limits is None:
+                return SizingResult(status="Unknown coupling type: " + coupling_type)
+            min_dim, max_dim = limits
+            if min_dim > 0 or max_dim > 0:
+                if coupling_dim <= 0:
+                    return SizingResult(status="Coupling dimension required for " + coupling_type)
+                if coupling_dim < min_dim or coupling_dim > max_dim:
+                    return SizingResult(status="Coupling dimension out of range (%s-%s mm)" % (
+                        _num(min_dim), _num(max_dim)))
+
+        req_torque = convert_torque_to_nm(req_torque, s.torque_unit) * s.safety_factor
+        req_thrust = convert_thrust_to_kn(req_thrust, s.thrust_unit) * s.safety_factor
+
+        if s.actuator_type == "Linear":
+            if req_thrust <= 0:
+                return SizingResult(status="No thrust specified for Linear actuator")
+        elif req_torque <= 0:
+            return SizingResult(status="No torque specified")
+
+        return s, LineRequirements(req_torque, req_thrust, req_op_time, req_turns, coupling_dim)
+
+    def size_line(self, line, settings):
+        """Size one ValveList line (SizeLine without the sheet write)"""
+        prepared = self.line_requirements(line, settings)
+        if isinstance(prepared, SizingResult):
+            return prepared
+        s, req = prepared
+
+        result = self.find_best_actuator(req.torque, req.thrust, req.op_time, req.turns, req.stem_dim, s)
+
+        # Actual SF: CalcTorque / (reqTorque without SF)
+        if result.success and req.torque > 0 and s.safety_factor > 0:
+            result.actual_sf = result.calc_torque / (req.torque / s.safety_factor)
+        return result
+
+    # -------- FindBestActuator --------
+
+    def find_best_actuator(self, req_torque, req_thrust, req_op_time, req_turns, req_stem_dim, s):
+        if not self.has_models_sheet:
+            return SizingResult(status="DB_Models sheet not found.")
+        if not self.catalog.model_count():
+            return SizingResult(status="DB_Models is empty.")
+
+        act_type = s.actuator_type
+        check_thrust = act_type in ("Multi-turn", "Linear") and req_thrust > 0
+        best = None
+        best_op_time = 0.0
+        min_price = MAX_PRICE
+        min_margin = MAX_PRICE
+        count_torque = 0
+        count_op_time = 0
+        prices = self.actuator_prices(s)
+
+        # Phase 1: direct match (no gearbox)
+        for act in self.direct_candidates(s):
+            if check_thrust and act.thrust < req_thrust:
+                continue
+            if act_type != "Linear" and act.torque < req_torque:
+                continue
+            count_torque += 1
+
+            if req_stem_dim > 0 and act.max_stem_dim > 0 and req_stem_dim > act.max_stem_dim:
+                continue
+
+            calc_op_time = calculate_op_time(act.rpm, req_turns, act_type, 1, act.op_time, act.speed, act.stroke)
+            if req_op_time > 0 and not check_op_time_range(calc_op_time, req_op_time,
+                                                           s.op_time_min_pct, s.op_time_max_pct):
+                continue
+            count_op_time += 1
+
+            margin = act.torque - req_torque
+            price = prices[act.row]
+            if price < min_price or (price == min_price and margin < min_margin):
+                min_price = price
+                min_margin = margin
+                best = act
+                best_op_time = calc_op_time
+
+        result = None
+        if best is not None:
+            result = SizingResult(
+                success=True, actuator_model=best.model, rpm=best.rpm, ratio=0.0,
+                output_flange=best.output_flange, calc_torque=best.torque, calc_thrust=best.thrust,
+                calc_op_time=best_op_time, max_stem_dim=best.max_stem_dim,
+                motor_power_kw=best.motor_power_kw, total_price=min_price, status="OK")
+
+        # Phase 2: actuator + gearbox (Linear actuators are direct only)
+        if act_type == "Linear":
+            return result or SizingResult(status="No suitable Linear actuator found.")
+
+        geared = self.find_actuator_with_gearbox(req_torque, req_thrust, req_op_time, req_turns,
+                                                 req_stem_dim, s, count_torque, count_op_time,
+                                                 need_reason=(result is None))
+
+        if result is not None and geared.success:
+            result = result if result.total_price <= geared.total_price else geared
+        else:
+            result = result or geared
+
+        if self.gearbox_stages >= 2:
+            train = self.find_gearbox_train(req_torque, req_thrust, req_op_time, req_turns, req_stem_dim, s,
+                                            result.total_price if result.success else MAX_PRICE)
+            if train is not None:
+                return train
+        return result
+
+    # -------- FindActuatorWithGearbox --------
+
+    def ratio_range(self, act, req_torque, time_window, req_turns, s, max_eff):
+        """GetRatioRange: (ratio_min, ratio_max) that can satisfy torque and Op. Time, or None
+
+        time_window: op_time_window() of the line, None when no Op. Time is required
+        max_eff: highest efficiency among the gearboxes that will be searched
+        """
+        ratio_min = 0.0
+        ratio_max = MAX_PRICE
+
+        if act.torque <= 0 or max_eff <= 0:
+            if req_torque > 0:
+                return None
+        else:
+            ratio_min = req_torque / (act.torque * max_eff)
+
+        if time_window is not None:
+            k = calculate_op_time(act.rpm, req_turns, s.actuator_type, 1, act.op_time, act.speed, act.stroke)
+            min_time, max_time = time_window
+            if k > 0:
+                ratio_min = max(ratio_min, min_time / k)
+                ratio_max = max_time / k
+            elif min_time > 0 or max_time < 0:
+                return None
+
+        ratio_min *= (1 - RATIO_EPS)
+        ratio_max *= (1 + RATIO_EPS)
+        if ratio_min > ratio_max:
+            return None
+        return ratio_min, ratio_max
+
+    def find_actuator_with_gearbox(self, req_torque, req_thrust, req_op_time, req_turns, req_stem_dim,
+                                   s, count_direct_torque, count_direct_op_time, need_reason=True):
+        """Cheapest actuator + gearbox combination
+
+        need_reason=False skips the BuildNoMatchReason counters when the caller
+        already has a direct match (the Status text would be discarded).
+        """
+        if not self.has_models_sheet:
+            return SizingResult(status="DB_Models sheet not found.")
+        if not self.has_gearbox_sheet:
+            return SizingResult(status="DB_Gearboxes sheet not found.")
+
+        check_thrust = s.actuator_type == "Multi-turn" and req_thrust > 0
+        check_stem = req_stem_dim > 0
+        time_window = None
+        if req_op_time > 0:
+            time_window = op_time_window(req_op_time, s.op_time_min_pct, s.op_time_max_pct)
+
+        best = None
+        min_price = MAX_PRICE
+        best_key = None
+        acts = []
+        prices = self.actuator_prices(s)
+        gb_prices = self.gb_prices
+
+        if self.gb_sorted:
+            for act in self.gearbox_candidates(s):
+                if check_thrust and act.thrust < req_thrust:
+                    continue
+                acts.append(act)
+
+                entries = self.gb_by_flange.get(act.output_flange)
+                if not entries:
+                    continue
+                bounds = self.ratio_range(act, req_torque, time_window, req_turns, s,
+                                          self.max_eff[act.output_flange])
+                if bounds is None:
+                    continue
+                ratio_min, ratio_max = bounds
+                ratios = self.gb_ratios[act.output_flange]
+
+                # Same checks as TryMatchGearbox (validity and flange are given by the index)
+                for p in range(bisect_left(ratios, ratio_min), len(entries)):
+                    gb_row, gb = entries[p]
+                    if gb.ratio > ratio_max:
+                        break
+                    if act.torque > gb.input_torque_max:
+                        continue
+                    output_torque = act.torque * gb.ratio * gb.efficiency
+                    if output_torque < req_torque or output_torque > gb.output_torque_max:
+                        continue
+                    if check_stem and gb.max_stem_dim > 0 and req_stem_dim > gb.max_stem_dim:
+                        continue
+                    calc_op_time = calculate_op_time(act.rpm, req_turns, s.actuator_type, gb.ratio,
+                                                     act.op_time, act.speed, act.stroke)
+                    if req_op_time > 0 and not check_op_time_range(calc_op_time, req_op_time,
+                                                                   s.op_time_min_pct, s.op_time_max_pct):
+                        continue
+
+                    total_price = prices[act.row] + gb_prices[gb_row]
+                    if total_price < min_price or (total_price == min_price and best_key[0] == act.row
+                                                   and gb_row < best_key[1]):
+                        min_price = total_price
+                        best = (act, gb, output_torque, calc_op_time)
+                        best_key = (act.row, gb_row)
+
+        if best is not None:
+            act, gb, output_torque, calc_op_time = best
+            return SizingResult(
+                success=True, actuator_model=act.model, gearbox_model=gb.model, rpm=act.rpm,
+                ratio=gb.ratio, output_flange=gb.output_flange, calc_torque=output_torque,
+                calc_op_time=calc_op_time, calc_thrust=act.thrust, max_stem_dim=gb.max_stem_dim,
+                motor_power_kw=act.motor_power_kw, total_price=min_price, status="OK (with gearbox)")
+
+        if not need_reason:
+            return SizingResult(status="No suitable model found.")
+        return SizingResult(status=self._gearbox_no_match_reason(
+            acts, req_torque, req_thrust, req_op_time, s, count_direct_torque, count_direct_op_time))
+
+    # -------- Two-stage gearbox trains --------
+
+    def find_gearbox_train(self, req_torque, req_thrust, req_op_time, req_turns, req_stem_dim, s,
+                           max_price=MAX_PRICE):
+        """Cheapest actuator + gearbox + gearbox train priced below max_price, or None
+
+        Stage 1 input flange = actuator output flange, stage 2 input flange =
+        stage 1 output flange; each stage checks its input/output torque limits,
+        the last stage the stem diameter, and Op. Time uses the product of the
+        ratios. Branch-and-bound: actuators are visited by price and every
+        branch whose cheapest completion is not below the best price so far is
+        cut; stage 2 is searched by bisect inside the ratio interval left by
+        torque and Op. Time. Equal price: first actuator row, then first
+        stage 1 row, then first stage 2 row.
+        """
+        if not self.gb_sorted or s.actuator_type == "Linear":
+            return None
+
+        check_thrust = s.actuator_type == "Multi-turn" and req_thrust > 0
+        check_stem = req_stem_dim > 0
+        time_window = None
+        if req_op_time > 0:
+            time_window = op_time_window(req_op_time, s.op_time_min_pct, s.op_time_max_pct)
+        min_stage_price = min(self.min_gb_price.values())
+        prices = self.actuator_prices(s)
+        gb_prices = self.gb_prices
+
+        best = None
+        best_price = max_price
+        best_key = (-1,)               # incumbent (direct / single stage) wins price ties
+
+        for act in self.gearbox_candidates_by_price(s):
+            act_price = prices[act.row]
+            if act_price + 2 * min_stage_price > best_price:
+                break
+            if check_thrust and act.thrust < req_thrust:
+                continue
+            entries1 = self.gb_by_flange.get(act.output_flange)
+            if not entries1:
+                continue
+            bounds = self.ratio_range(act, req_torque, time_window, req_turns, s,
+                                      self.max_eff[act.output_flange] * self.max_eff_all)
+            if bounds is None:
+                continue
+            total_min, total_max = bounds
+
+            for gb1_row, gb1 in entries1:
+                if act.torque > gb1.input_torque_max:
+                    continue
+                torque1 = act.torque * gb1.ratio * gb1.efficiency
+                if torque1 > gb1.output_torque_max:
+                    continue
+                entries2 = self.gb_by_flange.get(gb1.output_flange)
+                if not entries2:
+                    continue
+                price1 = act_price + gb_prices[gb1_row]
+                if price1 + self.min_gb_price[gb1.output_flange] > best_price:
+                    continue
+
+                # Stage 2 ratio interval: total ratio bounds and the torque still missing
+                # (no torque out of stage 1 or no efficiency on stage 2: skip, as ratio_range)
+                max_eff2 = self.max_eff[gb1.output_flange]
+                ratio_min = total_min / gb1.ratio
+                if torque1 <= 0 or max_eff2 <= 0:
+                    if req_torque > 0:
+                        continue
+                else:
+                    ratio_min = max(ratio_min, req_torque / (torque1 * max_eff2) * (1 - RATIO_EPS))
+                ratio_max = total_max / gb1.ratio
+                ratios2 = self.gb_ratios[gb1.output_flange]
+                for p in range(bisect_left(ratios2, ratio_min), len(entries2)):
+                    gb2_row, gb2 = entries2[p]
+                    if gb2.ratio > ratio_max:
+                        break
+                    total_price = price1 + gb_prices[gb2_row]
+                    if total_price > best_price or torque1 > gb2.input_torque_max:
+                        continue
+                    output_torque = torque1 * gb2.ratio * gb2.efficiency
+                    if output_torque < req_torque or output_torque > gb2.output_torque_max:
+                        continue
+                    if check_stem and gb2.max_stem_dim > 0 and req_stem_dim > gb2.max_stem_dim:
+                        continue
+                    ratio = gb1.ratio * gb2.ratio
+                    calc_op_time = calculate_op_time(act.rpm, req_turns, s.actuator_type, ratio,
+                                                     act.op_time, act.speed, act.stroke)
+                    if req_op_time > 0 and not check_op_time_range(calc_op_time, req_op_time,
+                                                                   s.op_time_min_pct, s.op_time_max_pct):
+                        continue
+                    key = (act.row, gb1_row, gb2_row)
+                    if (total_price, key) < (best_price, best_key):
+                        best_price = total_price
+                        best_key = key
+                        best = (act, gb1, gb2, ratio, output_torque, calc_op_time)
+
+        if best is None:
+            return None
+        act, gb1, gb2, ratio, output_torque, calc_op_time = best
+        return SizingResult(
+            success=True, actuator_model=act.model, gearbox_model=gb1.model + " + " + gb2.model,
+            rpm=act.rpm, ratio=ratio, output_flange=gb2.output_flange, calc_torque=output_torque,
+            calc_op_time=calc_op_time, calc_thrust=act.thrust, max_stem_dim=gb2.max_stem_dim,
+            motor_power_kw=act.motor_power_kw, total_price=best_price,
+            status="OK (with 2-stage gearbox)")
+
+    def _gearbox_no_match_reason(self, acts, req_torque, req_thrust, req_op_time, s,
+                                 count_direct_torque, count_direct_op_time):
+        # Model counters, same order as the FindActuatorWithGearbox filter chain
+        count_thrust = count_power = count_enclosure = 0
+        total = self.catalog.model_count()
+        count_type = len(self.model_rows(s.actuator_type))
+        series_rows = self.model_rows(s.actuator_type, s.model_range)
+        count_series = len(series_rows)
+        resolved = self.resolved(s)
+        power = self.filters.power_mask(s)
+        for row, m in series_rows:
+            if s.actuator_type == "Multi-turn" and req_thrust > 0 and m.thrust < req_thrust:
+                continue
+            count_thrust += 1
+            if resolved[row] is None:
+                if power >> row & 1:
+                    count_power += 1
+                continue
+            count_power += 1
+            count_enclosure += 1
+
+        # Partial gearbox matches over all pairs (no pair passed every check)
+        count_flange = count_input = count_output = 0
+        for act in acts:
+            for _, gb in self.gb_sorted:
+                if gb.input_flange != act.output_flange:
+                    continue
+                count_flange += 1
+                if act.torque > gb.input_torque_max:
+                    continue
+                count_input += 1
+                output = act.torque * gb.ratio * gb.efficiency
+                if req_torque <= output <= gb.output_torque_max:
+                    count_output += 1
+
+        return build_no_match_reason(
+            total, count_type, count_series, count_power, count_enclosure, count_thrust,
+            count_direct_torque, count_direct_op_time, count_flange, count_input, count_output, 0,
+            req_torque, req_thrust, req_op_time, s, self.has_gearbox_data)
+
+    # -------- Selection margins --------
+
+    def combinations(self, req_stem_dim, req_turns, s, max_price=MAX_PRICE):
+        """Combinations priced <= max_price that pass every check except torque,
+        thrust and Op. Time
+
+        Returns [(rank, torque cap Nm, thrust cap kN, calc Op. Time, combination id)];
+        the lowest rank among feasible combinations is the FindBestActuator pick:
+        direct (price, 0, torque, row) - cheapest, then smallest torque margin
+        geared (price, 1, actuator row, gearbox row) - direct wins price ties
+        """
+        act_type = s.actuator_type
+        thrust_direct = act_type in ("Multi-turn", "Linear")
+        prices = self.actuator_prices(s)
+        candidates = []
+        for act in self.direct_candidates(s):
+            price = prices[act.row]
+            if price > max_price:
+                continue
+            if req_stem_dim > 0 and act.max_stem_dim > 0 and req_stem_dim > act.max_stem_dim:
+                continue
+            calc_op_time = calculate_op_time(act.rpm, req_turns, act_type, 1, act.op_time, act.speed, act.stroke)
+            candidates.append(((price, 0, act.torque, act.row, 0),
+                               act.torque if act_type != "Linear" else MAX_PRICE,
+                               act.thrust if thrust_direct else MAX_PRICE, calc_op_time,
+                               combination_id(act.row)))
+
+        if act_type == "Linear" or not self.has_gearbox_sheet:
+            return candidates
+        thrust_geared = act_type == "Multi-turn"
+        for act in self.gearbox_candidates(s):
+            price = prices[act.row]
+            if price > max_price:
+                continue
+            for gb_row, gb in self.gb_by_flange.get(act.output_flange, ()):
+                total_price = price + self.gb_prices[gb_row]
+                if total_price > max_price or act.torque > gb.input_torque_max:
+                    continue
+                output_torque = act.torque * gb.ratio * gb.efficiency
+                if output_torque > gb.output_torque_max:
+                    continue
+                if req_stem_dim > 0 and gb.max_stem_dim > 0 and req_stem_dim > gb.max_stem_dim:
+                    continue
+                calc_op_time = calculate_op_time(act.rpm, req_turns, act_type, gb.ratio,
+                                                 act.op_time, act.speed, act.stroke)
+                candidates.append(((total_price, 1, act.row, gb_row), output_torque,
+                                   act.thrust if thrust_geared else MAX_PRICE, calc_op_time,
+                                   combination_id(act.row, gb_row)))
+        return candidates
+
+    def feasible_combinations(self, req, s, max_price=MAX_PRICE):
+        """combinations() that meet the line's torque, thrust and Op. Time"""
+        return [c for c in self.combinations(req.stem_dim, req.turns, s, max_price)
+                if combination_fits(c, req.torque, req.thrust, req.op_time, s)]
+
+    def combination_result(self, cid, req, s):
+        """SizingResult of one combination (same fields as FindBestActuator)"""
+        act_row, gb_row = split_combination_id(cid)
+        act = self.resolved(s)[act_row]
+        price = self.actuator_prices(s)[act_row]
+        if gb_row is None:
+            result = SizingResult(
+                success=True, actuator_model=act.model, rpm=act.rpm, ratio=0.0,
+                output_flange=act.output_flange, calc_torque=act.torque, calc_thrust=act.thrust,
+                calc_op_time=calculate_op_time(act.rpm, req.turns, s.actuator_type, 1,
+                                               act.op_time, act.speed, act.stroke),
+                max_stem_dim=act.max_stem_dim, motor_power_kw=act.motor_power_kw,
+                total_price=price, status="OK")
+        else:
+            gb = self.catalog.gearbox(gb_row)
+            result = SizingResult(
+                success=True, actuator_model=act.model, gearbox_model=gb.model, rpm=act.rpm,
+                ratio=gb.ratio, output_flange=gb.output_flange,
+                calc_torque=act.torque * gb.ratio * gb.efficiency,
+                calc_op_time=calculate_op_time(act.rpm, req.turns, s.actuator_type, gb.ratio,
+                                               act.op_time, act.speed, act.stroke),
+                calc_thrust=act.thrust, max_stem_dim=gb.max_stem_dim,
+                motor_power_kw=act.motor_power_kw, total_price=price + self.gb_prices[gb_row],
+                status="OK (with gearbox)")
+        if req.torque > 0 and s.safety_factor > 0:
+            result.actual_sf = result.calc_torque / (req.torque / s.safety_factor)
+        return result
+
+    def selection_margins(self, line, settings, result):
+        """SelectionMargins of a sized line (None when sizing failed)
+
+        Every combination is feasible on an interval of each requirement
+        (torque and thrust: up to its capacity, Op. Time: the values whose
+        window holds its operating time). The pick stays until the requirement
+        leaves its own interval or enters the interval of a better-ranked
+        combination, so the margins are the distances to those breakpoints.
+        """
+        if not result.success:
+            return None
+        prepared = self.line_requirements(line, settings)
+        if isinstance(prepared, SizingResult):
+            return None
+        s, req = prepared
+        min_pct, max_pct = s.op_time_min_pct, s.op_time_max_pct
+
+        candidates = self.combinations(req.stem_dim, req.turns, s, result.total_price)
+
+        def torque_ok(c, torque):
+            return s.actuator_type == "Linear" or c[1] >= torque
+
+        def thrust_ok(c, thrust):
+            return thrust <= 0 or c[2] >= thrust
+
+        def op_time_ok(c, op_time):
+            return op_time <= 0 or check_op_time_range(c[3], op_time, min_pct, max_pct)
+
+        feasible = [c for c in candidates if combination_fits(c, req.torque, req.thrust, req.op_time, s)]
+        if not feasible:
+            return None
+        best = min(feasible, key=lambda c: c[0])
+        margins = SelectionMargins()
+
+        def cap_limits(cap_of, others, value):
+            # Capacity-type requirement: down to the best better-ranked capacity, up to our own
+            better = [cap_of(c) for c in others if c[0] < best[0]]
+            down = value - max(better, default=0.0)
+            up = cap_of(best) - value if cap_of(best) < MAX_PRICE else None
+            return down, up
+
+        # Torque (Nm with SF -> input unit without SF)
+        if s.actuator_type != "Linear":
+            torque_scale = convert_torque_to_nm(1, s.torque_unit) * s.safety_factor
+            others = [c for c in candidates if thrust_ok(c, req.thrust) and op_time_ok(c, req.op_time)]
+            down, up = cap_limits(lambda c: c[1], others, req.torque)
+            margins.torque_down = down / torque_scale
+            margins.torque_up = None if up is None else up / torque_scale
+
+        # Thrust (kN with SF -> input unit without SF), not checked for Part-turn
+        if s.actuator_type != "Part-turn":
+            thrust_scale = convert_thrust_to_kn(1, s.thrust_unit) * s.safety_factor
+            others = [c for c in candidates if torque_ok(c, req.torque) and op_time_ok(c, req.op_time)]
+            down, up = cap_limits(lambda c: c[2], others, req.thrust)
+            margins.thrust_down = down / thrust_scale
+            margins.thrust_up = None if up is None else up / thrust_scale
+
+        # Safety factor scales torque and thrust together (SF < 1 is not accepted)
+        base_torque = req.torque / s.safety_factor if s.actuator_type != "Linear" else 0.0
+        base_thrust = req.thrust / s.safety_factor
+
+        def sf_cap(c):
+            cap = MAX_PRICE
+            if base_torque > 0:
+                cap = min(cap, c[1] / base_torque)
+            if base_thrust > 0 and c[2] < MAX_PRICE:
+                cap = min(cap, c[2] / base_thrust)
+            return cap
+
+        others = [c for c in candidates if op_time_ok(c, req.op_time)]
+        down, up = cap_limits(sf_cap, others, s.safety_factor)
+        margins.sf_down = min(down, s.safety_factor - 1)
+        margins.sf_up = up
+
+        # Op. Time: interval-type requirement (only when the line has one)
+        if req.op_time > 0:
+            others = [c for c in candidates if torque_ok(c, req.torque) and thrust_ok(c, req.thrust)]
+            low, high = op_time_interval(best[3], min_pct, max_pct)
+            for c in others:
+                if c[0] >= best[0]:
+                    continue
+                interval = op_time_interval(c[3], min_pct, max_pct)
+                if interval is None:
+                    continue
+                if interval[0] > req.op_time:
+                    high = min(high, interval[0])
+                elif interval[1] < req.op_time:
+                    low = max(low, interval[1])
+            margins.op_time_down = req.op_time - low
+            margins.op_time_up = high - req.op_time if high < MAX_PRICE else None
+
+        return margins
+
+
+# ============================================
+# Index Check
+# ============================================
+
+def check_indexes(engine):
+    """Names of the indexes of engine that differ from a full rebuild ([] = all equal)
+
+    Rebuilds the records of the catalog tables (catalog.Catalog) and a fresh
+    engine with the same price overlay, then compares every structure edit()
+    maintains, for every cached Settings profile.
+    """
+    catalog = engine.catalog
+    problems = []
+
+    def compare(name, incremental, rebuilt):
+        if incremental != rebuilt:
+            problems.append(name)
+
+    rebuilt = Catalog(catalog.tables)
+    compare("models", [m for m in catalog.models if m is not None], rebuilt.models)
+    compare("model_count", catalog.model_count(), rebuilt.model_count())
+    compare("power_options", catalog.power_options, rebuilt.power_options)
+    compare("enclosure_options", catalog.enclosure_options, rebuilt.enclosure_options)
+    compare("gearboxes", [gb for gb in catalog.gearboxes if gb is not None], rebuilt.gearboxes)
+
+    fresh = SizingEngine(catalog, engine.gearbox_stages).with_prices(engine.overlay)
+    for name in ("has_gearbox_data", "gb_sorted", "gb_by_flange", "gb_ratios", "max_eff", "max_eff_all",
+                 "gb_prices", "min_gb_price"):
+        compare(name, getattr(engine, name), getattr(fresh, name))
+    for name, value in vars(fresh.filters).items():
+        if name != "_profiles":
+            compare("filters." + name, getattr(engine.filters, name), value)
+
+    for key, rows in engine._model_rows.items():
+        compare("model_rows %r" % (key,), rows, fresh.model_rows(*key))
+    for key in engine._resolved:
+        s = SimpleNamespace(**dict(zip(("actuator_type", "model_range", "voltage", "phase", "frequency",
+                                        "enclosure"), key)))
+        compare("resolved %r" % (key,), list(engine._resolved[key].items()), list(fresh.resolved(s).items()))
+        if key in engine._geared:
+            compare("gearbox_candidates %r" % (key,), engine._geared[key], fresh.gearbox_candidates(s))
+        if key in engine._act_prices:
+            compare("actuator_prices %r" % (key,), engine._act_prices[key], fresh.actuator_prices(s))
+        if key in engine._geared_by_price:
+            compare("gearbox_candidates_by_price %r" % (key,), engine._geared_by_price[key],
+                    fresh.gearbox_candidates_by_price(s))
+    for key, acts in engine._direct.items():
+        s = SimpleNamespace(**dict(zip(("actuator_type", "model_range", "frequency", "phase", "failsafe",
+                                        "duty_cycle", "operation_mode", "voltage", "enclosure"), key)))
+        compare("filters.profile_mask %r" % (key,), engine.filters.profile_mask(s), fresh.filters.profile_mask(s))
+        compare("direct_candidates %r" % (key,), acts, fresh.direct_candidates(s))
+    return problems
@@ -0,0 +1,162 @@
+"""
+Noah Actuator Sizing Tool - Settings
+Python counterpart of modSettings.bas (Settings sheet rows 4-19, column B)
+
+Settings come from a workbook's Settings sheet, a JSON file, or the default
+values that create_workbook.py writes into a new workbook.
+"""
+
+import json
+from dataclasses import dataclass, fields, replace
+
+from openpyxl import Workbook
+
+from catalog import to_float, to_int, to_str
+from create_workbook import create_styles, setup_settings_sheet
+from xlsx_package import read_package, workbook_sheets, shared_strings, iter_sheet_rows
+
+
+@dataclass
+class SizingSettings:
+    """Settings structure (defaults are the LoadSettings fallbacks)"""
+    torque_unit: str = "Nm"
+    thrust_unit: str = "kN"
+    enclosure: str = ""
+    safety_factor: float = 1.25
+    actuator_type: str = ""
+    operation_mode: str = ""
+    failsafe: str = "None"
+    duty_cycle: str = "Any"
+    voltage: int = 0
+    phase: int = 0
+    frequency: int = 0
+    op_time_min_pct: float = -50
+    op_time_max_pct: float = 50
+    coupling_type: str = "Thrust Base - Threaded"
+    model_range: str = "All"
+    lines_to_add: int = 10
+
+
+# Settings sheet row of each field (column A label, column B value)
+SETTINGS_ROWS = {
+    "torque_unit": 4,
+    "thrust_unit": 5,
+    "enclosure": 6,
+    "safety_factor": 7,
+    "actuator_type": 8,
+    "operation_mode": 9,
+    "failsafe": 10,
+    "duty_cycle": 11,
+    "voltage": 12,
+    "phase": 13,
+    "frequency": 14,
+    "op_time_min_pct": 15,
+    "op_time_max_pct": 16,
+    "coupling_type": 17,
+    "model_range": 18,
+    "lines_to_add": 19,
+}
+
+_CONVERTERS = {float: to_float, int: to_int, str: lambda v: to_str(v).strip()}
+
+
+def settings_from_values(values, base=None):
+    """Build settings from {field name: raw value}; unknown keys raise ValueError
+
+    Values are converted like LoadSettings (GetCellString / GetCellDouble /
+    GetCellInt) and the LoadSettings defaults are applied afterwards.
+    """
+    s = replace(base) if base else SizingSettings()
+    types = {f.name: f.type for f in fields(SizingSettings)}
+    for key, value in values.items():
+        if key not in types:
+            raise ValueError("Unknown setting: %s" % key)
+        setattr(s, key, _CONVERTERS[types[key]](value))
+    return apply_defaults(s)
+
+
+def apply_defaults(s):
+    """LoadSettings 'Validate and set defaults' block"""
+    if s.safety_factor < 1:
+        s.safety_factor = 1.25
+    if s.torque_unit == "":
+        s.torque_unit = "Nm"
+    if s.thrust_unit == "":
+        s.thrust_unit = "kN"
+    if s.failsafe == "":
+        s.failsafe = "None"
+    if s.duty_cycle == "":
+        s.duty_cycle = "Any"
+    if s.coupling_type == "":
+        s.coupling_type = "Thrust Base - Threaded"
+    if s.model_range == "":
+        s.model_range = "All"
+    if s.lines_to_add < 1:
+        s.lines_to_add = 10
+    return s
+
+
+def validate_settings(s):
+    """ValidateSettings: list of warning messages (empty = valid)"""
+    errors = []
+    if s.torque_unit == "":
+        errors.append("Torque unit is not selected.")
+    if s.thrust_unit == "":
+        errors.append("Thrust unit is not selected.")
+    if s.safety_factor < 1:
+        errors.append("Safety factor should be >= 1.0")
+    if s.voltage <= 0:
+        errors.append("Voltage is not selected.")
+    if s.phase <= 0:
+        errors.append("Phase is not selected.")
+    if s.frequency <= 0:
+        errors.append("Frequency is not selected.")
+    if s.actuator_type == "":
+        errors.append("Actuator type is not selected.")
+    if s.enclosure == "":
+        errors.append("Enclosure is not selected.")
+    return errors
+
+
+# ============================================
+# Loading
+# ============================================
+
+def _values_from_column_b(rows):
+    by_row = {rownum: values for rownum, values in rows}
+    values = {}
+    for key, row in SETTINGS_ROWS.items():
+        cells = by_row.get(row, [])
+        values[key] = cells[1] if len(cells) > 1 else None
+    return values
+
+
+def default_settings():
+    """Settings a new workbook starts with (create_workbook.py defaults)"""
+    ws = Workbook().active
+    header_font, _, _, thin_border = create_styles()
+    setup_settings_sheet(ws, header_font, thin_border)
+    rows = ((r[0].row, [c.value for c in r]) for r in ws.iter_rows(min_col=1, max_col=2))
+    return settings_from_values(_values_from_column_b(rows))
+
+
+def load_settings(path=None):
+    """Load settings from a workbook (.xlsx/.xlsm Settings sheet) or JSON file
+
+    JSON files hold {field name: value} (e.g. {"enclosure": "Explosionproof"});
+    missing fields keep the create_workbook.py defaults.
+    """
+    if path is None:
+        return default_settings()
+
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return settings_from_values(json.load(f), base=default_settings())
+
+    parts = read_package(path)
+    sheets = {name: part for name, _, part in workbook_sheets(parts)}
+    if "Settings" not in sheets:
+        raise ValueError("%s has no Settings sheet" % path)
+    rows = iter_sheet_rows(parts[sheets["Settings"]], shared_strings(parts))
+    # LoadSettings starts from its own fallbacks, not the new-workbook values
+    return settings_from_values(_values_from_column_b(rows))
@@ -0,0 +1,254 @@
+"""
+Noah Actuator Sizing Tool - Sizing Store
+Sized project lines with their feasible combinations, re-ranked after price updates
+
+Feasibility (torque, thrust, Op. Time, flange, filters) does not depend on
+prices, so each stored line keeps the ids of every feasible actuator /
+actuator + gearbox combination. A reverse index maps actuator rows and
+gearbox rows to the lines that can use them. After a price revision only
+the lines touching a re-priced SKU are re-ranked, without any feasibility
+checks.
+
+Usage:
+    python sizing_store.py build lines.csv project.store --settings NoahSizing.xlsm
+    python sizing_store.py reprice project.store --catalog NoahSizing_2025Q3.xlsx -o changed.csv
+"""
+
+import sys
+import pickle
+import argparse
+from array import array
+from dataclasses import dataclass, replace
+
+from catalog import Catalog, load_catalog
+from sizing_engine import SizingEngine, SizingResult, result_values, split_combination_id
+from sizing_settings import load_settings, validate_settings
+from valvelist_io import iter_lines, open_writer
+
+STORE_VERSION = 1
+
+
+@dataclass
+class StoredLine:
+    """One sized line: inputs, requirements and feasible combination ids"""
+    line: object                 # ValveLine
+    settings: object             # SizingSettings as used for the line (ActuatorType overridden)
+    requirements: object         # LineRequirements, None when the inputs were rejected
+    result: SizingResult
+    feasible: array              # combination ids (sizing_engine.combination_id)
+
+
+# ============================================
+# Price Changes
+# ============================================
+
+def _structure(catalog):
+    """Everything the engine uses except prices"""
+    return (
+        [m and replace(m, base_price=0) for m in catalog.models],
+        [gb and replace(gb, price=0) for gb in catalog.gearboxes],
+        sorted(catalog.power_options),
+        {model: [enclosure for enclosure, _ in options]
+         for model, options in catalog.enclosure_options.items()},
+        catalog.couplings,
+        sorted(catalog.tables),
+    )
+
+
+def price_changes(old, new):
+    """(actuator rows, gearbox rows) whose price differs between two catalogs
+
+    Raises ValueError when anything other than prices changed; feasibility
+    may differ then and the lines have to be re-sized.
+    """
+    if _structure(old) != _structure(new):
+        raise ValueError("Catalog changed beyond prices; re-size the lines")
+
+    changed_models = set()
+    for key, adder in old.power_options.items():
+        if new.power_options[key] != adder:
+            changed_models.add(key[0])
+    for model, options in old.enclosure_options.items():
+        if [adder for _, adder in options] != [adder for _, adder in new.enclosure_options[model]]:
+            changed_models.add(model)
+
+    act_rows = {row for row, (m_old, m_new) in enumerate(zip(old.models, new.models))
+                if m_old is not None and (m_old.base_price != m_new.base_price or m_old.model in changed_models)}
+    gb_rows = {row for row, (g_old, g_new) in enumerate(zip(old.gearboxes, new.gearboxes))
+               if g_old is not None and g_old.price != g_new.price}
+    return act_rows, gb_rows
+
+
+# ============================================
+# Store
+# ============================================
+
+class SizingStore:
+    """Sized lines keyed by a caller-chosen key (e.g. (project, line no.))"""
+
+    def __init__(self, catalog):
+        self.engine = SizingEngine(catalog)
+        self.lines = {}
+        self.by_actuator = {}        # actuator row -> set of line keys
+        self.by_gearbox = {}         # gearbox row -> set of line keys
+
+    # -------- lines --------
+
+    def add(self, key, line, settings):
+        """Size a line (full feasibility check) and index its combinations"""
+        if key in self.lines:
+            self.remove(key)
+        engine = self.engine
+        result = engine.size_line(line, settings)
+        prepared = engine.line_requirements(line, settings)
+        if isinstance(prepared, SizingResult):
+            stored = StoredLine(line, settings, None, result, array("q"))
+        else:
+            s, req = prepared
+            feasible = array("q", [c[4] for c in engine.feasible_combinations(req, s)])
+            stored = StoredLine(line, s, req, result, feasible)
+        self.lines[key] = stored
+        self._index(key, stored)
+        return result
+
+    def remove(self, key):
+        stored = self.lines.pop(key)
+        for act_row, gb_row in map(split_combination_id, stored.feasible):
+            self.by_actuator[act_row].discard(key)
+            if gb_row is not None:
+                self.by_gearbox[gb_row].discard(key)
+
+    def _index(self, key, stored):
+        for act_row, gb_row in map(split_combination_id, stored.feasible):
+            self.by_actuator.setdefault(act_row, set()).add(key)
+            if gb_row is not None:
+                self.by_gearbox.setdefault(gb_row, set()).add(key)
+
+    def result(self, key):
+        return self.lines[key].result
+
+    def affected_lines(self, act_rows=(), gb_rows=()):
+        """Keys of lines with a feasible combination using any of the rows"""
+        keys = set()
+        for row in act_rows:
+            keys |= self.by_actuator.get(row, set())
+        for row in gb_rows:
+            keys |= self.by_gearbox.get(row, set())
+        return keys
+
+    # -------- re-ranking --------
+
+    def _rank(self, cid, s):
+        # Same order as SizingEngine.combinations()
+        act_row, gb_row = split_combination_id(cid)
+        price = self.engine.actuator_prices(s)[act_row]
+        if gb_row is None:
+            return (price, 0, self.engine.resolved(s)[act_row].torque, act_row, 0)
+        return (price + self.engine.gb_prices[gb_row], 1, act_row, gb_row)
+
+    def rerank(self, key):
+        """Pick the cheapest stored combination with the current prices"""
+        stored = self.lines[key]
+        if not stored.feasible:
+            return stored.result
+        s = stored.settings
+        best = min(stored.feasible, key=lambda cid: self._rank(cid, s))
+        stored.result = self.engine.combination_result(best, stored.requirements, s)
+        return stored.result
+
+    def reprice(self, catalog):
+        """Switch to a re-priced catalog; re-rank only the affected lines
+
+        Returns {key: (old result, new result)} for the re-ranked lines.
+        """
+        act_rows, gb_rows = price_changes(self.engine.catalog, catalog)
+        self.engine = SizingEngine(catalog)
+        changes = {}
+        for key in self.affected_lines(act_rows, gb_rows):
+            old = self.lines[key].result
+            changes[key] = (old, self.rerank(key))
+        return changes
+
+    # -------- persistence --------
+
+    def save(self, path):
+        # StoredLine as a plain tuple: the class is __main__.StoredLine when run as a script
+        lines = {key: (st.line, st.settings, st.requirements, st.result, st.feasible)
+                 for key, st in self.lines.items()}
+        state = {"version": STORE_VERSION, "tables": self.engine.catalog.tables, "lines": lines}
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Load a store saved with save() (trusted files only - pickle)"""
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != STORE_VERSION:
+            raise ValueError("%s: unsupported store version" % path)
+        store = cls(Catalog(state["tables"]))
+        store.lines = {key: StoredLine(*values) for key, values in state["lines"].items()}
+        for key, stored in store.lines.items():
+            store._index(key, stored)
+        return store
+
+
+# ============================================
+# Main
+# ============================================
+
+def _result_changed(old, new):
+    return result_values(old) != result_values(new)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep sized lines for fast re-ranking after price updates")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Size lines and save the store")
+    p_build.add_argument("input", help="ValveList workbook, CSV, JSONL, Arrow or Parquet file")
+    p_build.add_argument("store")
+    p_build.add_argument("--settings", help="Workbook (Settings sheet) or JSON file with settings")
+    p_build.add_argument("--catalog", help="Workbook, Arrow/Parquet catalog directory or SQLite database")
+
+    p_price = sub.add_parser("reprice", help="Apply a re-priced catalog to a store")
+    p_price.add_argument("store")
+    p_price.add_argument("--catalog", help="Re-priced workbook, catalog directory or SQLite database (default: create_workbook.py data)")
+    p_price.add_argument("-o", "--output", help="CSV of lines whose result changed")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            settings = load_settings(args.settings)
+            errors = validate_settings(settings)
+            if errors:
+                print("Invalid settings:\n  " + "\n  ".join(errors), file=sys.stderr)
+                return 2
+            store = SizingStore(load_catalog(args.catalog))
+            for number, line in enumerate(iter_lines(args.input)):
+                store.add(number, line, settings)
+            store.save(args.store)
+            feasible = sum(len(stored.feasible) for stored in store.lines.values())
+            print("Stored %d lines (%d feasible combinations)" % (len(store.lines), feasible))
+            return 0
+
+        store = SizingStore.load(args.store)
+        changes = store.reprice(load_catalog(args.catalog))
+        changed = [key for key, (old, new) in changes.items() if _result_changed(old, new)]
+        store.save(args.store)
+        print("Re-ranked %d of %d lines, %d results changed" % (len(changes), len(store.lines), len(changed)))
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as f:
+                writer = open_writer(f, "csv")
+                for key in sorted(changed):
+                    stored = store.lines[key]
+                    writer.write(stored.line, result_values(stored.result))
+                writer.close()
+    except (OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""build_parallel.py --variants: one workbook per variant"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from build_parallel import main  # noqa: E402
+
+
+def test_unnamed_variants_get_own_outputs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "variants.json").write_text(json.dumps([{"price_factor": 1.0}, {"price_factor": 1.1}]))
+    assert main(["--variants", "variants.json", "--jobs", "1"]) == 0
+    assert sorted(p.name for p in tmp_path.glob("*.xlsx")) == ["NoahSizing_1.xlsx", "NoahSizing_2.xlsx"]
+
+
+def test_duplicate_outputs_rejected(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "variants.json").write_text(json.dumps([{"name": "A"}, {"output": "NoahSizing_A.xlsx"}]))
+    assert main(["--variants", "variants.json", "--jobs", "1"]) == 1
+    assert "Duplicate variant output" in capsys.readouterr().err
+    assert not list(tmp_path.glob("*.xlsx"))
@@ -0,0 +1,105 @@
+"""SizingEngine.edit(): random catalog edits against a full rebuild of the indexes and results"""
+
+import os
+import random
+import sys
+from dataclasses import replace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from catalog import Catalog, generate_tables  # noqa: E402
+from price_overlay import PriceOverlay  # noqa: E402
+from sizing_engine import SizingEngine, check_indexes  # noqa: E402
+from sizing_settings import load_settings  # noqa: E402
+from valvelist_io import ValveLine  # noqa: E402
+
+EDIT_COUNT = 60
+POWER_OPTIONS = [(380, 3, 50), (220, 1, 50), (440, 3, 60), (24, 0, 50), (999, 3, 50)]
+
+
+def _lines(rnd, count):
+    lines = []
+    for i in range(count):
+        valve_type = rnd.choice(["Gate", "Globe", "Ball", "Butterfly", "Plug", "Linear"])
+        part_turn = valve_type in ("Ball", "Butterfly", "Plug")
+        lines.append(ValveLine(
+            line_no=i + 1, tag="TAG-%d" % i, valve_type=valve_type, size='4"', valve_class=150,
+            torque=rnd.choice([50, 300, 1200, 2000, 6000]), thrust=rnd.choice([5, 20, 60]),
+            coupling_type="Standard (Part-turn)" if part_turn else "Thrust Base - Threaded",
+            coupling_dim=40, lift=rnd.choice([60, 100, 250]), pitch=rnd.choice([4, 6]),
+            op_time=rnd.choice([None, 30, 120])))
+    return lines
+
+
+def _profiles(base):
+    return [replace(base, voltage=v, phase=ph, frequency=f, enclosure=enc)
+            for v, ph, f in POWER_OPTIONS[:4] for enc in ("Waterproof", "Explosionproof")]
+
+
+def _live(records):
+    return [i for i, r in enumerate(records) if r is not None]
+
+
+def _random_edit(rnd, catalog, tables, models):
+    op = rnd.choice(["insert_model", "update_model", "delete_model", "set_power_option",
+                     "delete_power_option", "set_enclosure_option", "delete_enclosure_option",
+                     "insert_gearbox", "update_gearbox", "delete_gearbox"])
+    if op in ("insert_model", "update_model"):
+        values = list(rnd.choice(tables["DB_Models"]))
+        values[8] = (values[8] or 0) * rnd.choice([0.5, 1, 1.3])
+        values[15] = (values[15] or 0) + rnd.choice([-100, 0, 100])
+        if rnd.random() < 0.3:
+            values[0] = rnd.choice(["NEW1", "NEW2", values[0]])
+        args = (values,) if op == "insert_model" else (rnd.choice(_live(catalog.models)), values)
+    elif op == "delete_model":
+        args = (rnd.choice(_live(catalog.models)),)
+    elif op == "set_power_option":
+        args = (rnd.choice(models),) + rnd.choice(POWER_OPTIONS) + (rnd.choice([0, 50, 200]),)
+    elif op == "delete_power_option":
+        if not catalog.power_options:
+            return None
+        args = rnd.choice(list(catalog.power_options))
+    elif op == "set_enclosure_option":
+        args = (rnd.choice(models), rnd.choice(["IP67", "IP68", "Exd", "Exde"]), rnd.choice([0, 80]))
+    elif op == "delete_enclosure_option":
+        pairs = [(m, enc) for m, opts in catalog.enclosure_options.items() for enc, _ in opts]
+        if not pairs:
+            return None
+        args = rnd.choice(pairs)
+    elif op in ("insert_gearbox", "update_gearbox"):
+        values = list(rnd.choice(tables["DB_Gearboxes"]))
+        values[1] = values[1] * rnd.choice([0.5, 1, 2])
+        values[9] = values[9] + rnd.choice([-50, 0, 50])
+        if rnd.random() < 0.2:
+            values[5] = rnd.choice(["F10", "F14", "F25", "F99"])
+        args = (values,) if op == "insert_gearbox" else (rnd.choice(_live(catalog.gearboxes)), values)
+    else:
+        args = (rnd.choice(_live(catalog.gearboxes)),)
+    return op, args
+
+
+def test_random_edits_match_fresh_engine():
+    rnd = random.Random(0)
+    tables = generate_tables()
+    catalog = Catalog({name: list(rows) for name, rows in tables.items()})
+    engine = SizingEngine(catalog)
+    view = engine.with_prices(PriceOverlay("test", 0.9, {"NA006": 123}, gearbox_prices={"SB-VS10": 99}))
+    profiles = _profiles(load_settings(None))
+    lines = _lines(rnd, 80)
+    models = sorted({row[0] for row in tables["DB_Models"]}) + ["NEW1", "NEW2"]
+
+    def size_all(e):
+        return [e.size_line(line, s) for s in profiles for line in lines]
+
+    size_all(engine)
+    size_all(view)
+    for step in range(EDIT_COUNT):
+        edit = _random_edit(rnd, catalog, tables, models)
+        if edit is None:
+            continue
+        op, args = edit
+        rnd.choice([engine, view]).edit(op, *args)
+        assert check_indexes(engine) == [], (step, op, args)
+        assert check_indexes(view) == [], (step, op, args)
+        if step % 10 == 9:
+            assert size_all(engine) == size_all(SizingEngine(Catalog(catalog.tables))), (step, op)
@@ -0,0 +1,48 @@
+"""read_configuration on the Configuration layouts of old and current workbooks"""
+
+import os
+import sys
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from configuration import read_configuration  # noqa: E402
+from create_workbook import CONFIG_HEADERS  # noqa: E402
+
+
+def _old_layout(path, line_count):
+    """Configuration sheet as generated before the Grand Total moved to Q1"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Configuration"
+    ws.append(CONFIG_HEADERS)
+    for i in range(line_count):
+        ws.append([i + 1, "TAG-%d" % (i + 1), "NA006", None, 1000,
+                   "No", "No", "No", "No", "No", "None", 1])
+    ws["A55"] = "Grand Total:"
+    ws["N55"] = "=SUM(N2:N54)"
+    ws["A57"] = "Option Prices (Reference):"
+    for row, (code, desc, price) in enumerate([("HTR", "Space Heater", 50), ("MOD", "Modulating Control", 200),
+                                               ("POS", "Position Transmitter", 150), ("LMT", "Limit Switch", 80),
+                                               ("EXD", "Explosionproof Upgrade", 300)], 58):
+        ws.cell(row=row, column=1, value=code)
+        ws.cell(row=row, column=2, value=desc)
+        ws.cell(row=row, column=3, value=price)
+    wb.save(path)
+
+
+def test_old_layout_footer_is_not_read_as_lines(tmp_path):
+    path = str(tmp_path / "old.xlsx")
+    _old_layout(path, 3)
+    lines = read_configuration(path)
+    assert [line.tag for line in lines] == ["TAG-1", "TAG-2", "TAG-3"]
+
+
+def test_old_layout_full_block_stops_at_grand_total(tmp_path):
+    # 53 lines fill rows 2-54, so "Grand Total:" directly follows the last line
+    path = str(tmp_path / "old_full.xlsx")
+    _old_layout(path, 53)
+    lines = read_configuration(path)
+    assert len(lines) == 53
+    assert all(line.model == "NA006" for line in lines)
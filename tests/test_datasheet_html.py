@@ -0,0 +1,42 @@
+"""Line Number fallback of the HTML datasheet (FillDatasheetLine: valveRow - ROW_HEADER)"""
+
+import os
+import sys
+
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from catalog import load_catalog  # noqa: E402
+from create_workbook import DATASHEET_ROWS, VALVELIST_INPUT_HEADERS, VALVELIST_RESULT_HEADERS  # noqa: E402
+from datasheet_html import DatasheetLookup, datasheet_values, sized_lines  # noqa: E402
+from sizing_settings import load_settings  # noqa: E402
+from valvelist_io import iter_numbered_results  # noqa: E402
+
+LINE_NUMBER = [item for item, _ in DATASHEET_ROWS].index("Line Number")
+
+
+def test_line_number_fallback_uses_sheet_row(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "ValveList"
+    headers = VALVELIST_INPUT_HEADERS + VALVELIST_RESULT_HEADERS
+    ws.append(["ValveList"])
+    ws.append([])
+    ws.append(headers)
+    model = 1 + headers.index("Model")
+    ws.cell(row=4, column=1, value=7)
+    ws.cell(row=4, column=model, value="NA006")
+    # rows 5-6 blank, then a line without a usable Line No.
+    ws.cell(row=7, column=1, value=0)
+    ws.cell(row=7, column=model, value="NA006")
+    ws.cell(row=8, column=1, value="n/a")
+    ws.cell(row=8, column=model, value="NA006")
+    path = str(tmp_path / "sized.xlsx")
+    wb.save(path)
+
+    lookup = DatasheetLookup(load_catalog())
+    settings = load_settings(None)
+    numbers = [datasheet_values(line, results, settings, lookup, position)[LINE_NUMBER]
+               for position, line, results in sized_lines(iter_numbered_results(path))]
+    assert numbers == [7, 4, 5]
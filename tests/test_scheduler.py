@@ -0,0 +1,52 @@
+"""SizingScheduler.close(cancel=True) with a bulk job in progress"""
+
+import os
+import sys
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from catalog import Catalog, generate_tables  # noqa: E402
+from scheduler import SizingScheduler  # noqa: E402
+from sizing_engine import SizingEngine  # noqa: E402
+from sizing_settings import load_settings  # noqa: E402
+from valvelist_io import ValveLine  # noqa: E402
+
+
+class _GatedEngine(SizingEngine):
+    """size_line() waits for release once a line has started"""
+
+    def __init__(self, catalog):
+        super().__init__(catalog)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def size_line(self, line, settings):
+        self.started.set()
+        self.release.wait()
+        return super().size_line(line, settings)
+
+
+def _lines(count):
+    return [ValveLine(line_no=i + 1, tag="TAG-%d" % i, valve_type="Ball", size='4"', valve_class=150,
+                      torque=300, thrust=0, coupling_type="Standard (Part-turn)", coupling_dim=40)
+            for i in range(count)]
+
+
+def test_cancel_running_bulk_job():
+    engine = _GatedEngine(Catalog(generate_tables()))
+    scheduler = SizingScheduler(engine, load_settings(None), workers=1, interactive_workers=0,
+                                chunk_size=2, batch=False)
+    job = scheduler.submit_batch(_lines(10), submitter="nightly")
+    assert engine.started.wait(5)
+    quote = scheduler.submit_line(_lines(1)[0], submitter="user")
+    scheduler.close(wait=False, cancel=True)
+    engine.release.set()
+    with pytest.raises(CancelledError):
+        job.result(timeout=5)
+    assert job.done()
+    assert quote.cancelled()
+    scheduler.close()
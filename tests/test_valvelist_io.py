@@ -0,0 +1,40 @@
+"""iter_xlsx_rows(): xlsx_reader column reads against the xlsx_package row reads"""
+
+import os
+import random
+import sys
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+pytest.importorskip("numpy")
+
+from create_workbook import VALVELIST_INPUT_HEADERS, VALVELIST_RESULT_HEADERS  # noqa: E402
+from valvelist_io import iter_xlsx_rows, _iter_package_rows  # noqa: E402
+
+CELL_VALUES = [None, "", 50, 2000.5, "abc", " 12 ", True, "=1+2", '4"', 0, -3, "Gate", 1e-7, "a&b<c>"]
+
+
+def test_records_match_package_read(tmp_path):
+    rnd = random.Random(0)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "ValveList"
+    ws.append(["ValveList"])
+    ws.append([])
+    ws.append(VALVELIST_INPUT_HEADERS + VALVELIST_RESULT_HEADERS)
+    for row in range(4, 1500):
+        if rnd.random() < 0.05:
+            continue
+        for col in range(1, 26):
+            if rnd.random() < 0.5:
+                ws.cell(row=row, column=col, value=rnd.choice(CELL_VALUES))
+    path = str(tmp_path / "valvelist.xlsx")
+    wb.save(path)
+
+    expected = [(n, r) for n, r in _iter_package_rows(path) if any(v is not None for v in r.values())]
+    rows = list(iter_xlsx_rows(path))
+    assert [(n, list(r.items())) for n, r in rows] == [(n, list(r.items())) for n, r in expected]
+    assert [[type(v) for v in r.values()] for _, r in rows] == [[type(v) for v in r.values()] for _, r in expected]
@@ -0,0 +1,239 @@
+"""
+Noah Actuator Sizing Tool - ValveList Diff
+Line-by-line comparison of two sizing runs of the same project
+
+Usage:
+    python valvelist_diff.py rev_A.xlsm rev_B.xlsm                     # CSV change report on stdout
+    python valvelist_diff.py old.csv new.parquet --key line -o changes.csv
+    python valvelist_diff.py old.jsonl new.jsonl --format jsonl --only failed,result
+
+Inputs are sized ValveList files in any valvelist_io format (xlsx/xlsm,
+CSV / JSONL from sizing_cli.py, Arrow / Parquet). Lines are matched by Tag
+(default) or Line No. The old file is loaded into a hash table of
+normalized values; the new file is streamed and every change is written as
+soon as it is found, removed lines at the end. Memory grows with the old
+file only.
+
+Change kinds (a line can have several):
+    new       only in the new file
+    removed   only in the old file
+    input     one of the 12 input columns changed
+    result    one of the 13 result columns changed
+    failed    sized before, no selection now (Status flipped to a failure)
+    sized     no selection before, sized now
+
+Values are compared as text after normalization: blank cells are "" and
+numbers compare by value (12, 12.0 and "12.0" are equal). Duplicate keys
+(e.g. blank Tags) are matched by occurrence: the 2nd "TAG-1" of the old file
+pairs with the 2nd "TAG-1" of the new file.
+"""
+
+import csv
+import sys
+import json
+import math
+import time
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field
+
+from catalog import to_str
+from create_workbook import VALVELIST_INPUT_HEADERS, VALVELIST_RESULT_HEADERS
+from valvelist_io import iter_line_results
+
+KEY_COLUMNS = {"tag": VALVELIST_INPUT_HEADERS.index("Tag"),
+               "line": VALVELIST_INPUT_HEADERS.index("Line No.")}
+CHANGE_KINDS = ["new", "removed", "input", "result", "failed", "sized"]
+REPORT_HEADERS = ["Key", "Change", "Column", "Old", "New"]
+MEMO_SIZE = 65536           # normalized text cells kept per file
+
+
+@dataclass
+class LineChange:
+    key: str
+    kinds: list
+    columns: list = field(default_factory=list)      # [(header, old value, new value)]
+
+
+# ============================================
+# Comparison
+# ============================================
+
+def normalize(value):
+    """Cell value as comparison text ("" for blank, numbers by value)"""
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return to_str(float(value))
+    text = str(value).strip()
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return to_str(number) if math.isfinite(number) else text
+
+
+def _normalize_text(value, memo):
+    text = normalize(value)
+    if type(value) is str:
+        if len(memo) >= MEMO_SIZE:
+            memo.clear()
+        memo[value] = text
+    return text
+
+
+def _keyed_rows(pairs, key_index):
+    """Yield (key text, normalized inputs, normalized results); duplicates get " #n" """
+    seen = {}
+    # Text cells repeat a lot (types, units, statuses): memoize them, bounded.
+    # Only str keys are stored, so 1 / 1.0 / True never hit a cached entry.
+    memo = {}
+    for line, results in pairs:
+        inputs = tuple(memo[v] if v in memo else _normalize_text(v, memo) for v in line.values())
+        outputs = tuple(memo[v] if v in memo else _normalize_text(v, memo) for v in results)
+        name = inputs[key_index]
+        count = seen.get(name, 0) + 1
+        seen[name] = count
+        yield (name if count == 1 else "%s #%d" % (name, count)), inputs, outputs
+
+
+def _is_sized(outputs):
+    # Failed lines have every result column blank except Status
+    return outputs[0] != ""
+
+
+def compare_line(key, old, new):
+    """LineChange for one matched line, None when nothing changed"""
+    old_inputs, old_outputs = old
+    new_inputs, new_outputs = new
+    if old_inputs == new_inputs and old_outputs == new_outputs:
+        return None
+    kinds = []
+    columns = [(h, a, b) for h, a, b in zip(VALVELIST_INPUT_HEADERS, old_inputs, new_inputs) if a != b]
+    if columns:
+        kinds.append("input")
+    changed_results = [(h, a, b) for h, a, b in zip(VALVELIST_RESULT_HEADERS, old_outputs, new_outputs)
+                       if a != b]
+    if changed_results:
+        kinds.append("result")
+        was_sized, is_sized = _is_sized(old_outputs), _is_sized(new_outputs)
+        if was_sized and not is_sized:
+            kinds.append("failed")
+        elif is_sized and not was_sized:
+            kinds.append("sized")
+    return LineChange(key, kinds, columns + changed_results)
+
+
+def diff_runs(old_pairs, new_pairs, key="tag"):
+    """Yield LineChange for every new, removed or changed line
+
+    old_pairs / new_pairs: iterables of (ValveLine, 13 result values), e.g.
+    valvelist_io.iter_line_results(); old_pairs is read completely first,
+    new_pairs is streamed. Removed lines come last, in old file order.
+    """
+    key_index = KEY_COLUMNS[key]
+    old = {}
+    for name, inputs, outputs in _keyed_rows(old_pairs, key_index):
+        old[name] = (inputs, outputs)
+
+    for name, inputs, outputs in _keyed_rows(new_pairs, key_index):
+        previous = old.pop(name, None)
+        if previous is None:
+            yield LineChange(name, ["new"])
+            continue
+        change = compare_line(name, previous, (inputs, outputs))
+        if change is not None:
+            yield change
+
+    for name in old:
+        yield LineChange(name, ["removed"])
+
+
+# ============================================
+# Report Writers
+# ============================================
+
+class CsvChangeWriter:
+    """One row per changed column (Key, Change, Column, Old, New); new/removed lines get one row"""
+
+    def __init__(self, f):
+        self.f = f
+        self.writer = csv.writer(f)
+        self.writer.writerow(REPORT_HEADERS)
+
+    def write(self, change):
+        kinds = ";".join(change.kinds)
+        if not change.columns:
+            self.writer.writerow([change.key, kinds, "", "", ""])
+        for header, old, new in change.columns:
+            self.writer.writerow([change.key, kinds, header, old, new])
+
+    def close(self):
+        self.f.flush()
+
+
+class JsonlChangeWriter:
+    """One JSON object per changed line: {"Key", "Change": [...], "Columns": {header: [old, new]}}"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, change):
+        record = {"Key": change.key, "Change": change.kinds,
+                  "Columns": {header: [old, new] for header, old, new in change.columns}}
+        self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.f.flush()
+
+
+# ============================================
+# Main
+# ============================================
+
+def _parse_kinds(text):
+    kinds = [k.strip() for k in text.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in CHANGE_KINDS]
+    if unknown:
+        raise ValueError("Unknown change kind: %s (use %s)" % (", ".join(unknown), ", ".join(CHANGE_KINDS)))
+    return set(kinds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two sizing runs of the same project")
+    parser.add_argument("old", help="Earlier sized ValveList (xlsx/xlsm, CSV, JSONL, Arrow, Parquet)")
+    parser.add_argument("new", help="Later sized ValveList")
+    parser.add_argument("--key", choices=sorted(KEY_COLUMNS), default="tag", help="Match lines by Tag or Line No.")
+    parser.add_argument("--only", help="Report only these change kinds (" + ",".join(CHANGE_KINDS) + ")")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv", help="Report format")
+    parser.add_argument("-o", "--output", help="Report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = Counter()
+    out = None
+    try:
+        only = _parse_kinds(args.only) if args.only else None
+        out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+        writer = JsonlChangeWriter(out) if args.format == "jsonl" else CsvChangeWriter(out)
+        for change in diff_runs(iter_line_results(args.old), iter_line_results(args.new), args.key):
+            counts.update(change.kinds)
+            counts["lines"] += 1
+            if only is None or only.intersection(change.kinds):
+                writer.write(change)
+        writer.close()
+    except (ImportError, OSError, ValueError) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+
+    print("Changed lines: %d (%s) in %.2fs" % (
+        counts["lines"], ", ".join("%s %d" % (k, counts[k]) for k in CHANGE_KINDS),
+        time.perf_counter() - start), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Noah Actuator Sizing Tool - ValveList Input / Output
+Reads valve lines from xlsx/xlsm, CSV or JSONL and streams sizing results
+
+All formats use the ValveList column headers of create_workbook.py
+(VALVELIST_INPUT_HEADERS / VALVELIST_RESULT_HEADERS):
+- xlsx/xlsm: ValveList sheet, header on row 3, data from row 4
+- CSV: header line with the column names
+- JSONL: one object per line keyed by column name
+- Arrow IPC / Parquet: one column per header (arrow_io.py, needs pyarrow)
+Lines without a Line No. are skipped, like SizingAll does.
+"""
+
+import csv
+import sys
+import json
+from dataclasses import dataclass
+
+from catalog import to_str
+from create_workbook import VALVELIST_INPUT_HEADERS, VALVELIST_RESULT_HEADERS
+from xlsx_package import read_package, workbook_sheets, shared_strings, iter_sheet_rows
+
+VALVELIST_HEADER_ROW = 3
+VALVELIST_DATA_ROW = 4
+
+OUTPUT_HEADERS = VALVELIST_INPUT_HEADERS + VALVELIST_RESULT_HEADERS
+
+# Numeric ValveList columns (everything else is text)
+NUMBER_COLUMNS = {"Torque", "Thrust", "CouplingDim", "Lift(mm)", "Pitch(mm)", "Op.Time(sec)",
+                  "RPM", "CalcTorque", "CalcThrust", "CalcOpTime", "ActualSF", "MaxStemDim",
+                  "kW", "Price"}
+
+# ValveLine field for each input header
+_FIELDS = ["line_no", "tag", "valve_type", "size", "valve_class", "torque", "thrust",
+           "coupling_type", "coupling_dim", "lift", "pitch", "op_time"]
+
+
+@dataclass
+class ValveLine:
+    """One ValveList input row (raw cell values, converted by the engine)"""
+    line_no: object = None
+    tag: object = None
+    valve_type: object = None
+    size: object = None
+    valve_class: object = None
+    torque: object = None
+    thrust: object = None
+    coupling_type: object = None
+    coupling_dim: object = None
+    lift: object = None
+    pitch: object = None
+    op_time: object = None
+
+    @classmethod
+    def from_mapping(cls, values):
+        """Build from {column header: value}; unknown headers are ignored"""
+        return cls(**{f: values.get(h) for h, f in zip(VALVELIST_INPUT_HEADERS, _FIELDS)})
+
+    def values(self):
+        """Input column values in ValveList order"""
+        return [getattr(self, f) for f in _FIELDS]
+
+
+def _has_line_no(line):
+    return to_str(line.line_no).strip() != ""
+
+
+# ============================================
+# Readers
+# ============================================
+
+def iter_xlsx_rows(path):
+    """Yield (sheet row, {column header: value}) for each data row of the ValveList sheet
+
+    The sheet XML is streamed column-wise by xlsx_reader when numpy is
+    installed, else the workbook package is read whole with xlsx_package.
+    """
+    try:
+        from xlsx_reader import iter_valvelist_rows
+        return iter_valvelist_rows(path)
+    except ImportError:
+        return _iter_package_rows(path)
+
+
+def iter_xlsx_records(path):
+    """Yield {column header: value} for each data row of the ValveList sheet"""
+    for _, record in iter_xlsx_rows(path):
+        yield record
+
+
+def _iter_package_rows(path):
+    parts = read_package(path)
+    sheets = {name: part for name, _, part in workbook_sheets(parts)}
+    if "ValveList" not in sheets:
+        raise ValueError("%s has no ValveList sheet" % path)
+
+    columns = None
+    for rownum, values in iter_sheet_rows(parts[sheets["ValveList"]], shared_strings(parts)):
+        if rownum == VALVELIST_HEADER_ROW:
+            columns = {to_str(v).strip(): i for i, v in enumerate(values) if v is not None}
+            missing = [h for h in VALVELIST_INPUT_HEADERS if h not in columns]
+            if missing:
+                raise ValueError("ValveList header is missing: " + ", ".join(missing))
+            continue
+        if rownum < VALVELIST_DATA_ROW or columns is None:
+            continue
+        yield rownum, {h: values[i] if i < len(values) else None for h, i in columns.items()}
+
+
+def iter_xlsx_lines(path):
+    """Yield ValveLine for each data row of the ValveList sheet"""
+    for record in iter_xlsx_records(path):
+        line = ValveLine.from_mapping(record)
+        if _has_line_no(line):
+            yield line
+
+
+def iter_xlsx_results(path):
+    """Yield (ValveLine, 13 result values) for each sized or unsized ValveList row"""
+    for _, line, results in _iter_xlsx_row_results(path):
+        yield line, results
+
+
+def _iter_xlsx_row_results(path):
+    for rownum, record in iter_xlsx_rows(path):
+        line = ValveLine.from_mapping(record)
+        if _has_line_no(line):
+            yield rownum, line, [record.get(h) for h in VALVELIST_RESULT_HEADERS]
+
+
+def iter_csv_lines(f):
+    """Yield ValveLine for each CSV record (header line required)"""
+    reader = csv.DictReader(f)
+    missing = [h for h in VALVELIST_INPUT_HEADERS if h not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError("CSV header is missing: " + ", ".join(missing))
+    for record in reader:
+        line = ValveLine.from_mapping({k: (v if v != "" else None) for k, v in record.items()})
+        if _has_line_no(line):
+            yield line
+
+
+def iter_jsonl_lines(f):
+    """Yield ValveLine for each JSON object line (blank lines skipped)"""
+    for number, text in enumerate(f, 1):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            raise ValueError("JSONL line %d: %s" % (number, e))
+        line = ValveLine.from_mapping(record)
+        if _has_line_no(line):
+            yield line
+
+
+def iter_csv_results(f):
+    """Yield (ValveLine, 13 result values) for each CSV record; missing result columns are "" """
+    reader = csv.DictReader(f)
+    missing = [h for h in VALVELIST_INPUT_HEADERS if h not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError("CSV header is missing: " + ", ".join(missing))
+    for record in reader:
+        line = ValveLine.from_mapping({k: (v if v != "" else None) for k, v in record.items()})
+        if _has_line_no(line):
+            yield line, [record.get(h) or "" for h in VALVELIST_RESULT_HEADERS]
+
+
+def iter_jsonl_results(f):
+    """Yield (ValveLine, 13 result values) for each JSON object line"""
+    for number, text in enumerate(f, 1):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            raise ValueError("JSONL line %d: %s" % (number, e))
+        line = ValveLine.from_mapping(record)
+        if _has_line_no(line):
+            yield line, [record.get(h, "") for h in VALVELIST_RESULT_HEADERS]
+
+
+def detect_format(path, default="csv"):
+    """File format from the extension: xlsx, csv, jsonl, arrow or parquet"""
+    lower = (path or "").lower()
+    if lower.endswith((".xlsx", ".xlsm")):
+        return "xlsx"
+    if lower.endswith((".arrow", ".feather", ".ipc")):
+        return "arrow"
+    if lower.endswith(".parquet"):
+        return "parquet"
+    if lower.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if lower.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def iter_lines(path, fmt=None):
+    """Yield ValveLine from a file ("-" = stdin for CSV/JSONL)"""
+    fmt = fmt or detect_format(path)
+    if fmt == "xlsx":
+        yield from iter_xlsx_lines(path)
+        return
+    if fmt in ("arrow", "parquet"):
+        from arrow_io import iter_arrow_lines
+        yield from iter_arrow_lines(path, fmt)
+        return
+
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+    try:
+        if fmt == "jsonl":
+            yield from iter_jsonl_lines(f)
+        else:
+            yield from iter_csv_lines(f)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def iter_numbered_results(path, fmt=None):
+    """Yield (position, ValveLine, 13 result values) from a sized file
+
+    position: sheet row minus the header row for xlsx (valveRow - ROW_HEADER
+    in the VBA), else the 1-based number of the line among the lines read.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "xlsx":
+        for rownum, line, results in _iter_xlsx_row_results(path):
+            yield rownum - VALVELIST_HEADER_ROW, line, results
+        return
+    for position, (line, results) in enumerate(iter_line_results(path, fmt), 1):
+        yield position, line, results
+
+
+def iter_line_results(path, fmt=None):
+    """Yield (ValveLine, 13 result values) from a sized file ("-" = stdin for CSV/JSONL)"""
+    fmt = fmt or detect_format(path)
+    if fmt == "xlsx":
+        yield from iter_xlsx_results(path)
+        return
+    if fmt in ("arrow", "parquet"):
+        from arrow_io import read_results
+        yield from read_results(path, fmt)
+        return
+
+    f = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8-sig")
+    try:
+        if fmt == "jsonl":
+            yield from iter_jsonl_results(f)
+        else:
+            yield from iter_csv_results(f)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+# ============================================
+# Writers
+# ============================================
+
+def _csv_value(value):
+    if isinstance(value, float):
+        return to_str(value)
+    return "" if value is None else value
+
+
+class CsvResultWriter:
+    """Write input + result columns as CSV (header first)
+
+    extra_headers: columns appended after Status (e.g. sizing_engine.MARGIN_HEADERS)
+    """
+
+    def __init__(self, f, extra_headers=()):
+        self.f = f
+        self.writer = csv.writer(f)
+        self.writer.writerow(OUTPUT_HEADERS + list(extra_headers))
+
+    def write(self, line, result_row):
+        self.writer.writerow([_csv_value(v) for v in line.values() + list(result_row)])
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.flush()
+
+
+class JsonlResultWriter:
+    """Write one JSON object per line keyed by ValveList column name"""
+
+    def __init__(self, f, extra_headers=()):
+        self.f = f
+        self.headers = OUTPUT_HEADERS + list(extra_headers)
+
+    def write(self, line, result_row):
+        record = dict(zip(self.headers, line.values() + list(result_row)))
+        self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.flush()
+
+
+def open_writer(f, fmt, extra_headers=()):
+    """Result writer for an open text stream (Arrow/Parquet: arrow_io.ArrowResultWriter)"""
+    if fmt == "jsonl":
+        return JsonlResultWriter(f, extra_headers)
+    if fmt == "csv":
+        return CsvResultWriter(f, extra_headers)
+    raise ValueError("Unsupported output format: %s" % fmt)
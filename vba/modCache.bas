@@ -0,0 +1,337 @@
+Attribute VB_Name = "modCache"
+Option Explicit
+
+' ============================================
+' Noah Actuator Sizing Tool - DB Sheet Cache
+' ============================================
+' Every DB_* sheet used for sizing is read into memory once per run: one
+' Range.Value of its tbl_<sheet> name (rows added below the name are read
+' too), then Scripting.Dictionary indexes on the lookup keys. The helpers in
+' modHelpers (ReadModelRecord, HasPowerOption, GetCouplingLimits, ...) look
+' up from here instead of reading cells. Array row n is sheet row n.
+'
+' LoadDbCache runs at the start of every sizing / alternatives run (from
+' ResetModelFilterCache) and of the relax and datasheet macros, so DB edits
+' between runs are picked up. Helpers called outside a run load the cache
+' on first use.
+
+' Workbook-level range names written by create_workbook.py: DB_Models -> tbl_Models
+Public Const DB_RANGE_PREFIX As String = "tbl_"
+
+Private gLoaded As Boolean
+
+' Sheet values (1-based, row 1 = header) and last row (0 = sheet missing)
+Private gModels As Variant, gModelsLast As Long
+Private gGearboxes As Variant, gGearboxesLast As Long
+Private gPower As Variant, gPowerLast As Long
+Private gEnclosure As Variant, gEnclosureLast As Long
+Private gElectrical As Variant, gElectricalLast As Long
+Private gCouplings As Variant, gCouplingsLast As Long
+
+' Keyed indexes (first row of a key wins, as in the old cell scans)
+Private gModelRows As Object        ' Model -> Collection of DB_Models rows
+Private gGearboxRow As Object       ' Model -> first DB_Gearboxes row
+Private gPowerRow As Object         ' Model|Voltage|Phase|Freq -> first DB_PowerOptions row
+Private gEnclosureRows As Object    ' Model -> Collection of DB_EnclosureOptions rows
+Private gElectricalRow As Object    ' Model|Voltage|Phase|Freq -> first DB_ElectricalData row
+Private gCouplingRow As Object      ' CouplingType -> first DB_Couplings row
+
+' ============================================
+' Load / Reset
+' ============================================
+
+Public Function DbRangeName(sheetName As String) As String
+    DbRangeName = DB_RANGE_PREFIX & Mid$(sheetName, Len("DB_") + 1)
+End Function
+
+Public Sub ResetDbCache()
+    gLoaded = False
+    gModels = Empty: gGearboxes = Empty: gPower = Empty
+    gEnclosure = Empty: gElectrical = Empty: gCouplings = Empty
+    Set gModelRows = Nothing
+    Set gGearboxRow = Nothing
+    Set gPowerRow = Nothing
+    Set gEnclosureRows = Nothing
+    Set gElectricalRow = Nothing
+    Set gCouplingRow = Nothing
+End Sub
+
+Public Sub LoadDbCache()
+    Dim i As Long
+
+    ResetDbCache
+
+    gModelsLast = ReadDbRange(SH_MODELS, 18, gModels)
+    gGearboxesLast = ReadDbRange(SH_GEARBOXES, 10, gGearboxes)
+    gPowerLast = ReadDbRange(SH_POWER_OPTIONS, 5, gPower)
+    gEnclosureLast = ReadDbRange(SH_ENCLOSURE_OPTIONS, 3, gEnclosure)
+    gElectricalLast = ReadDbRange(SH_ELECTRICAL, 11, gElectrical)
+    gCouplingsLast = ReadDbRange(SH_COUPLINGS, 3, gCouplings)
+
+    Set gModelRows = NewIndex()
+    For i = 2 To gModelsLast
+        AddRow gModelRows, CStr(gModels(i, 1)), i
+    Next i
+
+    Set gGearboxRow = NewIndex()
+    For i = 2 To gGearboxesLast
+        AddFirst gGearboxRow, CStr(gGearboxes(i, 1)), i
+    Next i
+
+    Set gPowerRow = NewIndex()
+    For i = 2 To gPowerLast
+        AddFirst gPowerRow, PowerKey(CStr(gPower(i, 1)), GetValueInt(gPower(i, 2)), _
+            GetValueInt(gPower(i, 3)), GetValueInt(gPower(i, 4))), i
+    Next i
+
+    Set gEnclosureRows = NewIndex()
+    For i = 2 To gEnclosureLast
+        AddRow gEnclosureRows, CStr(gEnclosure(i, 1)), i
+    Next i
+
+    Set gElectricalRow = NewIndex()
+    For i = 2 To gElectricalLast
+        AddFirst gElectricalRow, PowerKey(CStr(gElectrical(i, 1)), GetValueInt(gElectrical(i, 2)), _
+            GetValueInt(gElectrical(i, 3)), GetValueInt(gElectrical(i, 4))), i
+    Next i
+
+    Set gCouplingRow = NewIndex()
+    For i = 2 To gCouplingsLast
+        AddFirst gCouplingRow, CStr(gCouplings(i, 1)), i
+    Next i
+
+    gLoaded = True
+End Sub
+
+Private Sub EnsureDbCache()
+    If Not gLoaded Then LoadDbCache
+End Sub
+
+Private Function ReadDbRange(sheetName As String, minCols As Long, ByRef data As Variant) As Long
+    ' One Range.Value read from A1; returns the last row (1 = header only, 0 = sheet missing)
+    Dim ws As Worksheet
+    Dim rng As Range
+    Dim lastRow As Long, lastCol As Long
+
+    ReadDbRange = 0
+    If Not SheetExists(sheetName) Then Exit Function
+    Set ws = ThisWorkbook.Worksheets(sheetName)
+
+    ' The tbl_ name sets the block; rows added below it since the workbook
+    ' was generated extend it to the last used row of column A
+    lastRow = GetLastRow(ws, 1)
+    lastCol = minCols
+    On Error Resume Next
+    Set rng = ThisWorkbook.Names(DbRangeName(sheetName)).RefersToRange
+    On Error GoTo 0
+    If Not rng Is Nothing Then
+        If rng.Worksheet.Name = sheetName And rng.Row = 1 And rng.Column = 1 Then
+            If rng.Rows.Count > lastRow Then lastRow = rng.Rows.Count
+            If rng.Columns.Count > lastCol Then lastCol = rng.Columns.Count
+        End If
+    End If
+
+    ' At least two rows, so .Value is always a 2-D array
+    If lastRow < 2 Then
+        data = ws.Range(ws.Cells(1, 1), ws.Cells(2, lastCol)).Value
+    Else
+        data = ws.Range(ws.Cells(1, 1), ws.Cells(lastRow, lastCol)).Value
+    End If
+    ReadDbRange = lastRow
+End Function
+
+Private Function NewIndex() As Object
+    Dim index As Object
+    Set index = CreateObject("Scripting.Dictionary")
+    index.CompareMode = vbBinaryCompare         ' Model names compare like "=" did
+    Set NewIndex = index
+End Function
+
+Private Sub AddFirst(index As Object, key As String, rowNum As Long)
+    If Not index.Exists(key) Then index.Add key, rowNum
+End Sub
+
+Private Sub AddRow(index As Object, key As String, rowNum As Long)
+    If Not index.Exists(key) Then index.Add key, New Collection
+    index(key).Add rowNum
+End Sub
+
+Private Function PowerKey(modelName As String, voltage As Integer, phase As Integer, freq As Integer) As String
+    PowerKey = modelName & "|" & voltage & "|" & phase & "|" & freq
+End Function
+
+' ============================================
+' Record Readers (DB_Models / DB_Gearboxes rows)
+' ============================================
+
+Public Function CachedModelRecord(rowNum As Long, ByRef m As ModelRecord) As Boolean
+    ' False when the row is outside the cached block (caller reads the cells)
+    EnsureDbCache
+    If rowNum < 2 Or rowNum > gModelsLast Then Exit Function
+
+    With m
+        .Model = CStr(gModels(rowNum, 1))
+        .Series = CStr(gModels(rowNum, 2))
+        .ActType = CStr(gModels(rowNum, 3))
+        .MotorPower_kW = GetValueDouble(gModels(rowNum, 4))
+        .ControlType = CStr(gModels(rowNum, 5))
+        .Phase = GetValueInt(gModels(rowNum, 6))
+        .Freq = GetValueInt(gModels(rowNum, 7))
+        .RPM = GetValueDouble(gModels(rowNum, 8))
+        .Torque = GetValueDouble(gModels(rowNum, 9))
+        .Thrust = GetValueDouble(gModels(rowNum, 10))
+        .OpTime = GetValueDouble(gModels(rowNum, 11))
+        .DutyCycle = CStr(gModels(rowNum, 12))
+        .OutputFlange = CStr(gModels(rowNum, 13))
+        .MaxStemDim = GetValueDouble(gModels(rowNum, 14))
+        .Weight = GetValueDouble(gModels(rowNum, 15))
+        .BasePrice = GetValueDouble(gModels(rowNum, 16))
+        .Speed = GetValueDouble(gModels(rowNum, 17))
+        .Stroke = GetValueDouble(gModels(rowNum, 18))
+    End With
+    CachedModelRecord = True
+End Function
+
+Public Function CachedGearboxRecord(rowNum As Long, ByRef gb As GearboxRecord) As Boolean
+    EnsureDbCache
+    If rowNum < 2 Or rowNum > gGearboxesLast Then Exit Function
+
+    With gb
+        .Model = CStr(gGearboxes(rowNum, 1))
+        .Ratio = GetValueDouble(gGearboxes(rowNum, 2))
+        .InputTorqueMax = GetValueDouble(gGearboxes(rowNum, 3))
+        .OutputTorqueMax = GetValueDouble(gGearboxes(rowNum, 4))
+        .Efficiency = GetValueDouble(gGearboxes(rowNum, 5))
+        .InputFlange = CStr(gGearboxes(rowNum, 6))
+        .OutputFlange = CStr(gGearboxes(rowNum, 7))
+        .MaxStemDim = GetValueDouble(gGearboxes(rowNum, 8))
+        .Weight = GetValueDouble(gGearboxes(rowNum, 9))
+        .Price = GetValueDouble(gGearboxes(rowNum, 10))
+    End With
+    CachedGearboxRecord = True
+End Function
+
+' ============================================
+' Keyed Lookups
+' ============================================
+
+Public Function DbSheetCached(sheetName As String) As Boolean
+    ' Same answer as SheetExists for the cached DB sheets
+    EnsureDbCache
+    Select Case sheetName
+        Case SH_MODELS: DbSheetCached = (gModelsLast > 0)
+        Case SH_GEARBOXES: DbSheetCached = (gGearboxesLast > 0)
+        Case SH_POWER_OPTIONS: DbSheetCached = (gPowerLast > 0)
+        Case SH_ENCLOSURE_OPTIONS: DbSheetCached = (gEnclosureLast > 0)
+        Case SH_ELECTRICAL: DbSheetCached = (gElectricalLast > 0)
+        Case SH_COUPLINGS: DbSheetCached = (gCouplingsLast > 0)
+        Case Else: DbSheetCached = False
+    End Select
+End Function
+
+Public Function LookupPowerOption(modelName As String, voltage As Integer, _
+    phase As Integer, freq As Integer, ByRef priceAdder As Double) As Boolean
+
+    Dim key As String
+
+    EnsureDbCache
+    key = PowerKey(modelName, voltage, phase, freq)
+    If gPowerRow.Exists(key) Then
+        priceAdder = GetValueDouble(gPower(gPowerRow(key), 5))
+        LookupPowerOption = True
+    End If
+End Function
+
+Public Function LookupEnclosureOption(modelName As String, settingEnclosure As String, _
+    ByRef actualEnclosure As String, ByRef priceAdder As Double) As Boolean
+
+    Dim r As Variant
+    Dim dbEnclosure As String
+
+    EnsureDbCache
+    If Not gEnclosureRows.Exists(modelName) Then Exit Function
+
+    For Each r In gEnclosureRows(modelName)
+        dbEnclosure = CStr(gEnclosure(r, 2))
+        If MatchEnclosure(dbEnclosure, settingEnclosure) Then
+            actualEnclosure = dbEnclosure
+            priceAdder = GetValueDouble(gEnclosure(r, 3))
+            LookupEnclosureOption = True
+            Exit Function
+        End If
+    Next r
+End Function
+
+Public Function DbEnclosureValues() As Collection
+    ' Distinct DB_EnclosureOptions Enclosure values in sheet order
+    Dim values As Object
+    Dim i As Long
+
+    EnsureDbCache
+    Set values = NewIndex()
+    Set DbEnclosureValues = New Collection
+    For i = 2 To gEnclosureLast
+        If Trim$(CStr(gEnclosure(i, 1))) <> "" And Not values.Exists(CStr(gEnclosure(i, 2))) Then
+            values.Add CStr(gEnclosure(i, 2)), i
+            DbEnclosureValues.Add CStr(gEnclosure(i, 2))
+        End If
+    Next i
+End Function
+
+Public Function LookupCoupling(couplingType As String, ByRef minDim As Double, ByRef maxDim As Double) As Boolean
+    Dim r As Long
+
+    EnsureDbCache
+    If Not gCouplingRow.Exists(couplingType) Then Exit Function
+
+    r = gCouplingRow(couplingType)
+    minDim = GetValueDouble(gCouplings(r, 2))
+    maxDim = GetValueDouble(gCouplings(r, 3))
+    LookupCoupling = True
+End Function
+
+Public Function LookupModelValue(actModel As String, col As Long, Optional motorKW As Double = 0) As Double
+    ' Column value of the first DB_Models row of the model; with motorKW,
+    ' the first row whose MotorPower_kW (column 4) matches within 0.01
+    Dim r As Variant
+
+    EnsureDbCache
+    If Not gModelRows.Exists(actModel) Then Exit Function
+
+    For Each r In gModelRows(actModel)
+        If motorKW <= 0 Then
+            LookupModelValue = GetValueDouble(gModels(r, col))
+            Exit Function
+        ElseIf Abs(GetValueDouble(gModels(r, 4)) - motorKW) < 0.01 Then
+            LookupModelValue = GetValueDouble(gModels(r, col))
+            Exit Function
+        End If
+    Next r
+End Function
+
+Public Function LookupGearboxValue(gbModel As String, col As Long) As Double
+    ' Column value of the first DB_Gearboxes row of the model
+    EnsureDbCache
+    If gGearboxRow.Exists(gbModel) Then
+        LookupGearboxValue = GetValueDouble(gGearboxes(gGearboxRow(gbModel), col))
+    End If
+End Function
+
+Public Function LookupElectricalData(actModel As String, voltage As Integer, _
+    phase As Integer, freq As Integer) As Variant
+    ' Columns 5-11 of the first matching DB_ElectricalData row as an array (0 To 6),
+    ' Empty when there is no such row
+    Dim key As String
+    Dim values(0 To 6) As Variant
+    Dim r As Long, i As Long
+
+    EnsureDbCache
+    key = PowerKey(actModel, voltage, phase, freq)
+    If Not gElectricalRow.Exists(key) Then Exit Function
+
+    r = gElectricalRow(key)
+    For i = 0 To 6
+        values(i) = gElectrical(r, 5 + i)
+    Next i
+    LookupElectricalData = values
+End Function
@@ -34,6 +34,7 @@ Public Sub ExportDatasheet()
     
     Set wsValve = ThisWorkbook.Worksheets(SH_VALVELIST)
     Set wsTemplate = ThisWorkbook.Worksheets(SH_TEMPLATE)
+    LoadDbCache     ' DB sheets may have changed since the last run
 
     ' Count valid lines (with sizing results)
     lastRow = GetLastRow(wsValve, COL_LINENO)
@@ -335,9 +336,9 @@ Private Function GetActuatorElectricalData(actModel As String, s As SizingSettin
     ' Columns: 5=StartingCurrent, 6=StartingPF, 7=RatedCurrent,
     '          8=AvgCurrent, 9=AvgPF, 10=AvgPower, 11=MotorPoles
 
-    Dim wsElec As Worksheet
-    Dim i As Long, lastRow As Long
+    Dim i As Long
     Dim result(0 To 6) As Variant
+    Dim found As Variant
 
     ' Initialize with empty
     For i = 0 To 6
@@ -350,31 +351,18 @@ Private Function GetActuatorElectricalData(actModel As String, s As SizingSettin
     End If
 
     On Error Resume Next
-    If Not SheetExists(SH_ELECTRICAL) Then
+    If Not DbSheetCached(SH_ELECTRICAL) Then
         GetActuatorElectricalData = result
         Exit Function
     End If
 
-    Set wsElec = ThisWorkbook.Worksheets(SH_ELECTRICAL)
-    lastRow = GetLastRow(wsElec, 1)
-
-    For i = 2 To lastRow
-        If CStr(wsElec.Cells(i, 1).value) = actModel Then
-            ' Match voltage, phase, frequency
-            If GetCellInt(wsElec.Cells(i, 2)) = s.Voltage And _
-               GetCellInt(wsElec.Cells(i, 3)) = s.Phase And _
-               GetCellInt(wsElec.Cells(i, 4)) = s.Frequency Then
-                result(0) = wsElec.Cells(i, 5).value   ' StartingCurrent_A
-                result(1) = wsElec.Cells(i, 6).value   ' StartingPF
-                result(2) = wsElec.Cells(i, 7).value   ' RatedCurrent_A
-                result(3) = wsElec.Cells(i, 8).value   ' AvgCurrent_A
-                result(4) = wsElec.Cells(i, 9).value   ' AvgPF
-                result(5) = wsElec.Cells(i, 10).value  ' AvgPower_kW
-                result(6) = wsElec.Cells(i, 11).value  ' MotorPoles
-                Exit For
-            End If
-        End If
-    Next i
+    ' First matching row from the DB cache (modCache)
+    found = LookupElectricalData(actModel, s.Voltage, s.Phase, s.Frequency)
+    If Not IsEmpty(found) Then
+        For i = 0 To 6
+            result(i) = found(i)
+        Next i
+    End If
 
     GetActuatorElectricalData = result
 End Function
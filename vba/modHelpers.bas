@@ -275,6 +275,74 @@ Public Function PassesModelFilters(m As ModelRecord, s As SizingSettings, _
     PassesModelFilters = True
 End Function
 
+' ============================================
+' Model Filter Cache (per sizing run)
+' ============================================
+' The PassesModelFilters checks (except thrust) and the power/enclosure
+' availability of ResolveActuator depend only on Settings and the DB sheets,
+' not on the line. They are evaluated once per DB_Models row and Settings
+' profile, and TryResolveActuator skips rejected rows without reading them.
+' One mask per profile: the ValveType override of ActuatorType only switches
+' between a few masks. Reset at the start of every sizing / alternatives run,
+' together with the DB sheet cache, so DB edits between runs are picked up.
+
+Private gFilterMasks As Collection
+
+Public Sub ResetModelFilterCache()
+    Set gFilterMasks = New Collection
+    LoadDbCache     ' Re-read the DB sheets once for the run (modCache)
+End Sub
+
+Private Function FilterProfileKey(s As SizingSettings) As String
+    FilterProfileKey = s.ActuatorType & "|" & s.ModelRange & "|" & s.Frequency & "|" & s.Phase & "|" & _
+        s.Failsafe & "|" & s.DutyCycle & "|" & s.OperationMode & "|" & s.Voltage & "|" & s.Enclosure
+End Function
+
+Private Function BuildModelFilterMask(wsModels As Worksheet, s As SizingSettings) As Variant
+    ' mask(row) = True when the row passes PassesModelFilters(m, s, 0) and ResolveActuator
+    Dim mask() As Boolean
+    Dim lastRow As Long, i As Long
+    Dim m As ModelRecord
+    Dim act As ActuatorRecord
+
+    lastRow = GetLastRow(wsModels, 1)
+    ReDim mask(1 To lastRow)
+    For i = 2 To lastRow
+        m = ReadModelRecord(wsModels, i)
+        If Trim$(m.Model) <> "" Then
+            If PassesModelFilters(m, s, 0) Then
+                mask(i) = ResolveActuator(m, s, act)
+            End If
+        End If
+    Next i
+    BuildModelFilterMask = mask
+End Function
+
+Public Function ModelRowMayPass(wsModels As Worksheet, rowNum As Long, s As SizingSettings) As Boolean
+    ' False only when the row cannot pass the Settings filters for any line
+    Dim key As String
+    Dim mask As Variant
+
+    If gFilterMasks Is Nothing Then Set gFilterMasks = New Collection
+    key = FilterProfileKey(s)
+
+    On Error Resume Next
+    mask = gFilterMasks(key)
+    If Err.Number <> 0 Then
+        Err.Clear
+        On Error GoTo 0
+        mask = BuildModelFilterMask(wsModels, s)
+        gFilterMasks.Add mask, key
+    End If
+    On Error GoTo 0
+
+    If rowNum > UBound(mask) Then
+        ModelRowMayPass = True      ' Row added after the mask was built: check it fully
+    Else
+        ModelRowMayPass = mask(rowNum)
+    End If
+End Function
+
 ' ============================================
 ' Enclosure Matching
 ' ============================================
@@ -292,6 +360,18 @@ Public Function MatchEnclosure(dbEnclosure As String, settingEnclosure As String
     End If
 End Function
 
+Public Function EnclosureSetting(dbEnclosure As String) As String
+    ' Settings Enclosure value that MatchEnclosure accepts for a DB enclosure
+    ' ("" when only a blank / other setting would select it)
+    If MatchEnclosure(dbEnclosure, "Waterproof") Then
+        EnclosureSetting = "Waterproof"
+    ElseIf MatchEnclosure(dbEnclosure, "Explosionproof") Then
+        EnclosureSetting = "Explosionproof"
+    Else
+        EnclosureSetting = ""
+    End If
+End Function
+
 Public Function MatchModelRange(dbSeries As String, settingModelRange As String) As Boolean
     ' Filter by model series (NA, SA, etc.)
     ' "All" means no filtering
@@ -328,18 +408,27 @@ End Function
 ' ============================================
 
 Public Function GetCellDouble(cell As Range) As Double
-    If IsNumeric(cell.value) And cell.value <> "" Then
-        GetCellDouble = CDbl(cell.value)
+    GetCellDouble = GetValueDouble(cell.value)
+End Function
+
+Public Function GetCellInt(cell As Range) As Integer
+    GetCellInt = GetValueInt(cell.value)
+End Function
+
+' Same conversions for values of a Range.Value array (modCache)
+Public Function GetValueDouble(value As Variant) As Double
+    If IsNumeric(value) And value <> "" Then
+        GetValueDouble = CDbl(value)
     Else
-        GetCellDouble = 0
+        GetValueDouble = 0
     End If
 End Function
 
-Public Function GetCellInt(cell As Range) As Integer
-    If IsNumeric(cell.value) And cell.value <> "" Then
-        GetCellInt = CInt(cell.value)
+Public Function GetValueInt(value As Variant) As Integer
+    If IsNumeric(value) And value <> "" Then
+        GetValueInt = CInt(value)
     Else
-        GetCellInt = 0
+        GetValueInt = 0
     End If
 End Function
 
@@ -358,6 +447,14 @@ End Function
 Public Function ReadModelRecord(ws As Worksheet, rowNum As Long) As ModelRecord
     Dim m As ModelRecord
 
+    ' DB_Models rows come from the per-run DB cache (modCache)
+    If ws.Name = SH_MODELS Then
+        If CachedModelRecord(rowNum, m) Then
+            ReadModelRecord = m
+            Exit Function
+        End If
+    End If
+
     ' DB_Models columns (flat structure - 18 columns):
     ' 1:Model, 2:Series, 3:ActType, 4:MotorPower_kW, 5:ControlType, 6:Phase,
     ' 7:Freq, 8:RPM, 9:Torque_Nm, 10:Thrust_kN, 11:OpTime_sec,
@@ -395,28 +492,13 @@ End Function
 Public Function HasPowerOption(modelName As String, voltage As Integer, _
     phase As Integer, freq As Integer, ByRef priceAdder As Double) As Boolean
 
-    Dim ws As Worksheet
-    Dim i As Long, lastRow As Long
-
+    ' First DB_PowerOptions row of Model + Voltage/Phase/Freq (modCache index)
     priceAdder = 0
     HasPowerOption = False
 
-    If Not SheetExists(SH_POWER_OPTIONS) Then Exit Function
+    If Not DbSheetCached(SH_POWER_OPTIONS) Then Exit Function
 
-    Set ws = ThisWorkbook.Worksheets(SH_POWER_OPTIONS)
-    lastRow = GetLastRow(ws, 1)
-
-    For i = 2 To lastRow
-        If CStr(ws.Cells(i, 1).value) = modelName Then
-            If GetCellInt(ws.Cells(i, 2)) = voltage And _
-               GetCellInt(ws.Cells(i, 3)) = phase And _
-               GetCellInt(ws.Cells(i, 4)) = freq Then
-                priceAdder = GetCellDouble(ws.Cells(i, 5))
-                HasPowerOption = True
-                Exit Function
-            End If
-        End If
-    Next i
+    HasPowerOption = LookupPowerOption(modelName, voltage, phase, freq, priceAdder)
 End Function
 
 ' ============================================
@@ -426,30 +508,14 @@ End Function
 Public Function HasEnclosureOption(modelName As String, settingEnclosure As String, _
     ByRef actualEnclosure As String, ByRef priceAdder As Double) As Boolean
 
-    Dim ws As Worksheet
-    Dim i As Long, lastRow As Long
-    Dim dbEnclosure As String
-
+    ' First DB_EnclosureOptions row of the model that matches the Settings enclosure
     actualEnclosure = ""
     priceAdder = 0
     HasEnclosureOption = False
 
-    If Not SheetExists(SH_ENCLOSURE_OPTIONS) Then Exit Function
-
-    Set ws = ThisWorkbook.Worksheets(SH_ENCLOSURE_OPTIONS)
-    lastRow = GetLastRow(ws, 1)
+    If Not DbSheetCached(SH_ENCLOSURE_OPTIONS) Then Exit Function
 
-    For i = 2 To lastRow
-        If CStr(ws.Cells(i, 1).value) = modelName Then
-            dbEnclosure = CStr(ws.Cells(i, 2).value)
-            If MatchEnclosure(dbEnclosure, settingEnclosure) Then
-                actualEnclosure = dbEnclosure
-                priceAdder = GetCellDouble(ws.Cells(i, 3))
-                HasEnclosureOption = True
-                Exit Function
-            End If
-        End If
-    Next i
+    HasEnclosureOption = LookupEnclosureOption(modelName, settingEnclosure, actualEnclosure, priceAdder)
 End Function
 
 ' ============================================
@@ -502,6 +568,13 @@ End Function
 
 Public Function ReadGearboxRecord(ws As Worksheet, rowNum As Long) As GearboxRecord
     Dim gb As GearboxRecord
+
+    If ws.Name = SH_GEARBOXES Then
+        If CachedGearboxRecord(rowNum, gb) Then
+            ReadGearboxRecord = gb
+            Exit Function
+        End If
+    End If
     
     With gb
         .Model = CStr(ws.Cells(rowNum, 1).value)
@@ -524,10 +597,6 @@ End Function
 ' ============================================
 
 Public Function GetCouplingLimits(couplingType As String, ByRef minDim As Double, ByRef maxDim As Double) As Boolean
-    Dim ws As Worksheet
-    Dim i As Long
-    Dim lastRow As Long
-
     minDim = 0
     maxDim = 0
 
@@ -536,26 +605,40 @@ Public Function GetCouplingLimits(couplingType As String, ByRef minDim As Double
         Exit Function
     End If
 
-    If Not SheetExists(SH_COUPLINGS) Then
+    If Not DbSheetCached(SH_COUPLINGS) Then
         minDim = -1
         maxDim = -1
         GetCouplingLimits = False
         Exit Function
     End If
 
-    Set ws = ThisWorkbook.Worksheets(SH_COUPLINGS)
-    lastRow = GetLastRow(ws, 1)
+    GetCouplingLimits = LookupCoupling(couplingType, minDim, maxDim)
+End Function
 
-    For i = 2 To lastRow
-        If CStr(ws.Cells(i, 1).value) = couplingType Then
-            minDim = GetCellDouble(ws.Cells(i, 2))
-            maxDim = GetCellDouble(ws.Cells(i, 3))
-            GetCouplingLimits = True
-            Exit Function
+Public Function CheckCoupling(couplingType As String, couplingDim As Double) As String
+    ' Coupling type / dimension check of SizeLine (also used by RelaxSelectedLine)
+    ' Returns the Status text of a failed check, "" when the coupling is OK
+    Dim minDim As Double, maxDim As Double
+
+    CheckCoupling = ""
+    If couplingType = "" Then Exit Function
+
+    If Not GetCouplingLimits(couplingType, minDim, maxDim) Then
+        If minDim < 0 Then
+            CheckCoupling = "DB_Couplings sheet not found."
+        Else
+            CheckCoupling = "Unknown coupling type: " & couplingType
         End If
-    Next i
+        Exit Function
+    End If
 
-    GetCouplingLimits = False
+    If minDim > 0 Or maxDim > 0 Then
+        If couplingDim <= 0 Then
+            CheckCoupling = "Coupling dimension required for " & couplingType
+        ElseIf couplingDim < minDim Or couplingDim > maxDim Then
+            CheckCoupling = "Coupling dimension out of range (" & minDim & "-" & maxDim & " mm)"
+        End If
+    End If
 End Function
 
 ' ============================================
@@ -664,48 +747,26 @@ End Function
 Public Function GetActuatorThrustByModel(actModel As String) As Double
     ' Get actuator thrust from DB_Models by model name
     ' Column 10 = Thrust_kN (DB_Models 18-column structure)
-    Dim wsModels As Worksheet
-    Dim i As Long, lastRow As Long
-
     GetActuatorThrustByModel = 0
 
     If actModel = "" Then Exit Function
 
     On Error Resume Next
-    If Not SheetExists(SH_MODELS) Then Exit Function
+    If Not DbSheetCached(SH_MODELS) Then Exit Function
 
-    Set wsModels = ThisWorkbook.Worksheets(SH_MODELS)
-    lastRow = GetLastRow(wsModels, 1)
-
-    For i = 2 To lastRow
-        If CStr(wsModels.Cells(i, 1).value) = actModel Then
-            GetActuatorThrustByModel = GetCellDouble(wsModels.Cells(i, 10))  ' Thrust_kN column
-            Exit Function
-        End If
-    Next i
+    GetActuatorThrustByModel = LookupModelValue(actModel, 10)  ' Thrust_kN column
 End Function
 
 Public Function GetGearboxRatioByModel(gbModel As String) As Double
     ' Get gearbox ratio from DB_Gearboxes by model name
-    Dim wsGb As Worksheet
-    Dim i As Long, lastRow As Long
-
     GetGearboxRatioByModel = 0
 
     If gbModel = "" Then Exit Function
 
     On Error Resume Next
-    If Not SheetExists(SH_GEARBOXES) Then Exit Function
-
-    Set wsGb = ThisWorkbook.Worksheets(SH_GEARBOXES)
-    lastRow = GetLastRow(wsGb, 1)
+    If Not DbSheetCached(SH_GEARBOXES) Then Exit Function
 
-    For i = 2 To lastRow
-        If CStr(wsGb.Cells(i, 1).value) = gbModel Then
-            GetGearboxRatioByModel = GetCellDouble(wsGb.Cells(i, 2))  ' Ratio column
-            Exit Function
-        End If
-    Next i
+    GetGearboxRatioByModel = LookupGearboxValue(gbModel, 2)  ' Ratio column
 End Function
 
 Public Function GetActuatorWeightByModel(actModel As String, Optional motorKW As Double = 0) As Double
@@ -714,60 +775,27 @@ Public Function GetActuatorWeightByModel(actModel As String, Optional motorKW As
     '
     ' For MA series, same model has different weights by kW. If motorKW is provided,
     ' it will match both Model and MotorPower_kW. Otherwise, returns first match.
-    Dim wsModels As Worksheet
-    Dim i As Long, lastRow As Long
-    Dim dbKW As Double
-
     GetActuatorWeightByModel = 0
 
     If actModel = "" Then Exit Function
 
     On Error Resume Next
-    If Not SheetExists(SH_MODELS) Then Exit Function
-
-    Set wsModels = ThisWorkbook.Worksheets(SH_MODELS)
-    lastRow = GetLastRow(wsModels, 1)
+    If Not DbSheetCached(SH_MODELS) Then Exit Function
 
-    For i = 2 To lastRow
-        If CStr(wsModels.Cells(i, 1).value) = actModel Then
-            ' If motorKW provided, also match MotorPower_kW (column 4)
-            If motorKW > 0 Then
-                dbKW = GetCellDouble(wsModels.Cells(i, 4))
-                If Abs(dbKW - motorKW) < 0.01 Then  ' kW match within tolerance
-                    GetActuatorWeightByModel = GetCellDouble(wsModels.Cells(i, 15))  ' Weight_kg column
-                    Exit Function
-                End If
-            Else
-                ' No kW specified, return first match
-                GetActuatorWeightByModel = GetCellDouble(wsModels.Cells(i, 15))  ' Weight_kg column
-                Exit Function
-            End If
-        End If
-    Next i
+    GetActuatorWeightByModel = LookupModelValue(actModel, 15, motorKW)  ' Weight_kg column
 End Function
 
 Public Function GetGearboxWeightByModel(gbModel As String) As Double
     ' Get gearbox weight from DB_Gearboxes by model name
     ' Column 9 = Weight_kg
-    Dim wsGb As Worksheet
-    Dim i As Long, lastRow As Long
-
     GetGearboxWeightByModel = 0
 
     If gbModel = "" Then Exit Function
 
     On Error Resume Next
-    If Not SheetExists(SH_GEARBOXES) Then Exit Function
+    If Not DbSheetCached(SH_GEARBOXES) Then Exit Function
 
-    Set wsGb = ThisWorkbook.Worksheets(SH_GEARBOXES)
-    lastRow = GetLastRow(wsGb, 1)
-
-    For i = 2 To lastRow
-        If CStr(wsGb.Cells(i, 1).value) = gbModel Then
-            GetGearboxWeightByModel = GetCellDouble(wsGb.Cells(i, 9))  ' Weight_kg column
-            Exit Function
-        End If
-    Next i
+    GetGearboxWeightByModel = LookupGearboxValue(gbModel, 9)  ' Weight_kg column
 End Function
 
 ' ============================================
@@ -929,6 +957,9 @@ Public Function TryResolveActuator(wsModels As Worksheet, rowNum As Long, _
 
     TryResolveActuator = False
 
+    ' Rows rejected by the Settings filters for this run (cached mask)
+    If Not ModelRowMayPass(wsModels, rowNum, s) Then Exit Function
+
     ' Read model record
     m = ReadModelRecord(wsModels, rowNum)
     If Trim$(m.Model) = "" Then Exit Function
@@ -96,6 +96,10 @@ Public Sub btn_Alternative()
     ShowAlternatives
 End Sub
 
+Public Sub btn_RelaxConstraints()
+    RelaxSelectedLine
+End Sub
+
 Public Sub btn_ExportDatasheet()
     ExportDatasheet
 End Sub
@@ -161,56 +165,71 @@ Public Sub btn_ToConfiguration()
     
     Application.ScreenUpdating = False
     
-    ' Clear existing Configuration data (keep header)
+    ' Clear existing Configuration data (keep header). Grand Total and the option
+    ' price reference sit right of the table (columns P-Q), so the data block
+    ' has no fixed last row.
     Dim lastRowConfig As Long
     lastRowConfig = GetLastRow(wsConfig, CFG_COL_LINE)
     If lastRowConfig >= 2 Then
-        wsConfig.Range(wsConfig.Cells(2, 1), wsConfig.Cells(lastRowConfig, CFG_COL_TOTAL)).ClearContents
+        With wsConfig.Range(wsConfig.Cells(2, 1), wsConfig.Cells(lastRowConfig, CFG_COL_TOTAL))
+            .ClearContents
+            .Borders.LineStyle = xlNone
+        End With
     End If
     
-    ' Copy data from ValveList to Configuration
-    configRow = 2
-    copiedCount = 0
+    ' Read ValveList once, build the Configuration block in memory,
+    ' then write values and formulas with one assignment each
+    Dim src As Variant
+    Dim block() As Variant
+    Dim srcRows As Long
+    src = wsValve.Range(wsValve.Cells(ROW_DATA_START, 1), wsValve.Cells(lastRowValve, COL_PRICE)).Value
+    srcRows = lastRowValve - ROW_DATA_START + 1
+    ReDim block(1 To srcRows, 1 To CFG_COL_QTY)
     
-    For i = ROW_DATA_START To lastRowValve
-        If Trim(wsValve.Cells(i, COL_MODEL).value) <> "" Then
-            ' Copy basic info
-            wsConfig.Cells(configRow, CFG_COL_LINE).value = wsValve.Cells(i, COL_LINENO).value
-            wsConfig.Cells(configRow, CFG_COL_TAG).value = wsValve.Cells(i, COL_TAG).value
-            wsConfig.Cells(configRow, CFG_COL_MODEL).value = wsValve.Cells(i, COL_MODEL).value
-            wsConfig.Cells(configRow, CFG_COL_GEARBOX).value = wsValve.Cells(i, COL_GEARBOX).value
-            wsConfig.Cells(configRow, CFG_COL_BASEPRICE).value = wsValve.Cells(i, COL_PRICE).value
-            
-            ' Set default values for options
-            wsConfig.Cells(configRow, CFG_COL_HTR).value = "No"
-            wsConfig.Cells(configRow, CFG_COL_MOD).value = "No"
-            wsConfig.Cells(configRow, CFG_COL_POS).value = "No"
-            wsConfig.Cells(configRow, CFG_COL_LMT).value = "No"
-            wsConfig.Cells(configRow, CFG_COL_EXD).value = "No"
-            wsConfig.Cells(configRow, CFG_COL_PAINTING).value = "None"
-            wsConfig.Cells(configRow, CFG_COL_QTY).value = 1
-            
-            ' Set Unit Price formula
-            wsConfig.Cells(configRow, CFG_COL_UNITPRICE).Formula = _
-                "=" & wsConfig.Cells(configRow, CFG_COL_BASEPRICE).Address(False, False) & _
-                "+IF(" & wsConfig.Cells(configRow, CFG_COL_HTR).Address(False, False) & "=""Yes"",IFERROR(VLOOKUP(""OPT-HTR"",DB_Options!A:C,3,FALSE),0),0)" & _
-                "+IF(" & wsConfig.Cells(configRow, CFG_COL_MOD).Address(False, False) & "=""Yes"",IFERROR(VLOOKUP(""OPT-MOD"",DB_Options!A:C,3,FALSE),0),0)" & _
-                "+IF(" & wsConfig.Cells(configRow, CFG_COL_POS).Address(False, False) & "=""Yes"",IFERROR(VLOOKUP(""OPT-POS"",DB_Options!A:C,3,FALSE),0),0)" & _
-                "+IF(" & wsConfig.Cells(configRow, CFG_COL_LMT).Address(False, False) & "=""Yes"",IFERROR(VLOOKUP(""OPT-LMT"",DB_Options!A:C,3,FALSE),0),0)" & _
-                "+IF(" & wsConfig.Cells(configRow, CFG_COL_EXD).Address(False, False) & "=""Yes"",IFERROR(VLOOKUP(""OPT-EXD"",DB_Options!A:C,3,FALSE),0),0)" & _
-                "+IFERROR(VLOOKUP(" & wsConfig.Cells(configRow, CFG_COL_PAINTING).Address(False, False) & _
-                ",DB_Options!A:C,3,FALSE),0)"
-            
-            ' Set Total Price formula
-            wsConfig.Cells(configRow, CFG_COL_TOTAL).Formula = _
-                "=" & wsConfig.Cells(configRow, CFG_COL_UNITPRICE).Address(False, False) & "*" & _
-                wsConfig.Cells(configRow, CFG_COL_QTY).Address(False, False)
-            
-            configRow = configRow + 1
+    copiedCount = 0
+    For i = 1 To srcRows
+        If Trim(CStr(src(i, COL_MODEL))) <> "" Then
             copiedCount = copiedCount + 1
+            ' Basic info
+            block(copiedCount, CFG_COL_LINE) = src(i, COL_LINENO)
+            block(copiedCount, CFG_COL_TAG) = src(i, COL_TAG)
+            block(copiedCount, CFG_COL_MODEL) = src(i, COL_MODEL)
+            block(copiedCount, CFG_COL_GEARBOX) = src(i, COL_GEARBOX)
+            block(copiedCount, CFG_COL_BASEPRICE) = src(i, COL_PRICE)
+            ' Default option values
+            block(copiedCount, CFG_COL_HTR) = "No"
+            block(copiedCount, CFG_COL_MOD) = "No"
+            block(copiedCount, CFG_COL_POS) = "No"
+            block(copiedCount, CFG_COL_LMT) = "No"
+            block(copiedCount, CFG_COL_EXD) = "No"
+            block(copiedCount, CFG_COL_PAINTING) = "None"
+            block(copiedCount, CFG_COL_QTY) = 1
         End If
     Next i
     
+    configRow = 1 + copiedCount    ' last written row
+    wsConfig.Range(wsConfig.Cells(2, 1), wsConfig.Cells(configRow, CFG_COL_QTY)).Value = block
+    
+    ' Unit / Total formulas: written for row 2, Excel adjusts the relative
+    ' references for every row of the range
+    wsConfig.Range(wsConfig.Cells(2, CFG_COL_UNITPRICE), wsConfig.Cells(configRow, CFG_COL_UNITPRICE)).Formula = _
+        "=" & wsConfig.Cells(2, CFG_COL_BASEPRICE).Address(False, False) & _
+        ConfigOptionTerm(wsConfig, CFG_COL_HTR, "OPT-HTR") & _
+        ConfigOptionTerm(wsConfig, CFG_COL_MOD, "OPT-MOD") & _
+        ConfigOptionTerm(wsConfig, CFG_COL_POS, "OPT-POS") & _
+        ConfigOptionTerm(wsConfig, CFG_COL_LMT, "OPT-LMT") & _
+        ConfigOptionTerm(wsConfig, CFG_COL_EXD, "OPT-EXD") & _
+        "+IFERROR(VLOOKUP(" & wsConfig.Cells(2, CFG_COL_PAINTING).Address(False, False) & _
+        ",DB_Options!A:C,3,FALSE),0)"
+    wsConfig.Range(wsConfig.Cells(2, CFG_COL_TOTAL), wsConfig.Cells(configRow, CFG_COL_TOTAL)).Formula = _
+        "=" & wsConfig.Cells(2, CFG_COL_UNITPRICE).Address(False, False) & "*" & _
+        wsConfig.Cells(2, CFG_COL_QTY).Address(False, False)
+    
+    With wsConfig.Range(wsConfig.Cells(2, 1), wsConfig.Cells(configRow, CFG_COL_TOTAL)).Borders
+        .LineStyle = xlContinuous
+        .Weight = xlThin
+    End With
+    
     Application.ScreenUpdating = True
     
     ' Activate Configuration sheet
@@ -226,6 +245,12 @@ ErrorHandler:
     ShowError "Error copying to Configuration: " & Err.Description
 End Sub
 
+Private Function ConfigOptionTerm(wsConfig As Worksheet, col As Integer, optionCode As String) As String
+    ' "+IF(F2="Yes",<DB_Options price of optionCode>,0)" for the row 2 Unit formula
+    ConfigOptionTerm = "+IF(" & wsConfig.Cells(2, col).Address(False, False) & "=""Yes"",IFERROR(VLOOKUP(""" & _
+        optionCode & """,DB_Options!A:C,3,FALSE),0),0)"
+End Function
+
 ' ============================================
 ' Clear Results
 ' ============================================
@@ -490,6 +515,7 @@ Public Function FindAllAlternatives(reqTorque As Double, reqThrust As Double, _
 
     On Error GoTo ErrorHandler
     failReason = ""
+    ResetModelFilterCache     ' DB sheets may have changed since the last run
 
     ' Check if sheets exist
     If Not SheetExists(SH_MODELS) Or Not SheetExists(SH_GEARBOXES) Then
@@ -0,0 +1,453 @@
+Attribute VB_Name = "modRelax"
+Option Explicit
+
+' ============================================
+' Noah Actuator Sizing Tool - Constraint Relaxation
+' Finds the smallest Settings change that makes a failed line feasible
+' ============================================
+
+' Feasible candidate for the selected line (direct actuator or actuator + gearbox)
+' Everything that does not depend on the relaxed settings is checked once when
+' the cache is built; only SF, Op. Time window, Model Range and Enclosure remain.
+Private Type RelaxCandidate
+    ActuatorModel As String
+    GearboxModel As String
+    Series As String
+    Enclosure As String       ' Settings value: Waterproof / Explosionproof
+    Torque As Double          ' Direct: actuator torque, Gearbox: T x Ratio x Eff
+    Thrust As Double
+    CheckTorque As Boolean    ' False for Linear (thrust only)
+    CheckThrust As Boolean    ' Direct: Multi-turn/Linear, Gearbox: Multi-turn
+    OpTime As Double
+    Price As Double
+End Type
+
+Private Const SF_FLOOR As Double = 1              ' LoadSettings resets SF < 1 to default
+Private Const OPTIME_PCT_FLOOR As Double = -100   ' Op. Time Min % cannot go below 0 sec
+Private Const OPTIME_PCT_CEILING As Double = 1000 ' Op. Time Max % search limit
+
+' Candidate cache (built once per line, reused for every feasibility probe)
+Private mCand() As RelaxCandidate
+Private mCount As Long
+Private mReqTorque As Double    ' Nm, without safety factor
+Private mReqThrust As Double    ' kN, without safety factor
+Private mReqOpTime As Double
+Private mEnclosures As Collection   ' Settings Enclosure values offered by DB_EnclosureOptions
+
+' ============================================
+' Relax Constraints for Selected Line
+' ============================================
+
+Public Sub RelaxSelectedLine()
+    Dim ws As Worksheet
+    Dim selectedRow As Long
+    Dim s As SizingSettings
+
+    On Error GoTo ErrorHandler
+
+    If Not SheetExists(SH_VALVELIST) Then
+        ShowError "ValveList sheet not found."
+        Exit Sub
+    End If
+
+    Set ws = ThisWorkbook.Worksheets(SH_VALVELIST)
+
+    ' Get selected row
+    If TypeName(Selection) = "Range" Then
+        If Not Selection.Parent Is ws Then
+            ShowWarning "Please select a row in ValveList."
+            Exit Sub
+        End If
+        selectedRow = Selection.Row
+    Else
+        ShowWarning "Please select a row in ValveList."
+        Exit Sub
+    End If
+
+    If selectedRow < ROW_DATA_START Then
+        ShowWarning "Please select a data row (not header)."
+        Exit Sub
+    End If
+
+    If ws.Cells(selectedRow, COL_LINENO).value = "" Then
+        ShowWarning "Selected row has no data."
+        Exit Sub
+    End If
+
+    s = LoadSettings()
+    If Not ValidateSettings(s) Then
+        Exit Sub
+    End If
+    LoadDbCache     ' DB sheets may have changed since the last run
+
+    ' Override ActuatorType based on ValveType (same as SizeLine)
+    Dim valveType As String
+    Dim derivedActType As String
+    valveType = GetCellString(ws.Cells(selectedRow, COL_VALVETYPE))
+    If valveType <> "" Then
+        derivedActType = GetActuatorTypeFromValve(valveType)
+        If derivedActType <> "" Then
+            s.ActuatorType = derivedActType
+        End If
+    End If
+
+    ' Read requirements (unit converted, safety factor NOT applied)
+    Dim reqTurns As Double, reqPitch As Double
+    Dim reqStemDim As Double
+
+    mReqTorque = ConvertTorqueToNm(GetCellDouble(ws.Cells(selectedRow, COL_TORQUE)), s.TorqueUnit)
+    mReqThrust = ConvertThrustToKN(GetCellDouble(ws.Cells(selectedRow, COL_THRUST)), s.ThrustUnit)
+    mReqOpTime = GetCellDouble(ws.Cells(selectedRow, COL_OPTIME))
+    reqPitch = GetCellDouble(ws.Cells(selectedRow, COL_PITCH))
+    reqStemDim = GetCellDouble(ws.Cells(selectedRow, COL_COUPLINGDIM))
+
+    If reqPitch > 0 Then
+        reqTurns = GetCellDouble(ws.Cells(selectedRow, COL_LIFT)) / reqPitch
+    Else
+        reqTurns = 0
+    End If
+
+    If s.ActuatorType = "Linear" Then
+        If mReqThrust <= 0 Then
+            ShowWarning "No thrust specified for Linear actuator."
+            Exit Sub
+        End If
+    ElseIf mReqTorque <= 0 Then
+        ShowWarning "No torque specified."
+        Exit Sub
+    End If
+
+    ' Same coupling check as SizeLine: no Settings change can fix it
+    Dim couplingError As String
+    couplingError = CheckCoupling(GetCellString(ws.Cells(selectedRow, COL_COUPLINGTYPE)), reqStemDim)
+    If couplingError <> "" Then
+        ShowWarning "Line " & (selectedRow - ROW_HEADER) & " is blocked by the coupling: " & _
+            couplingError & vbCrLf & _
+            "Relaxing SF, Op. Time, Model Range or Enclosure cannot help; " & _
+            "correct CouplingType / CouplingDim on the ValveList."
+        Exit Sub
+    End If
+
+    Set mEnclosures = CatalogEnclosures()
+
+    Application.StatusBar = "Building candidate list..."
+    BuildCandidates s, reqTurns, reqStemDim
+    ClearProgress
+
+    If mCount = 0 Then
+        ShowWarning "Line " & (selectedRow - ROW_HEADER) & ": no " & s.ActuatorType & _
+            " actuator matches " & s.Voltage & "V " & s.Phase & "ph " & s.Frequency & "Hz, " & _
+            "stem dimension and fixed filters." & vbCrLf & _
+            "Relaxing SF, Op. Time, Model Range or Enclosure cannot help."
+        Exit Sub
+    End If
+
+    ShowInfo BuildRelaxReport(s, selectedRow - ROW_HEADER)
+    Exit Sub
+
+ErrorHandler:
+    ClearProgress
+    ShowError "Error during relaxation search: " & Err.Description
+End Sub
+
+' ============================================
+' Candidate Cache
+' ============================================
+
+Private Sub BuildCandidates(s As SizingSettings, reqTurns As Double, reqStemDim As Double)
+    ' Collect every direct actuator and actuator + gearbox pair that passes the
+    ' filters the relaxation does not touch (type, power, duty, stem, flange, ...)
+
+    Dim wsModels As Worksheet, wsGb As Worksheet
+    Dim i As Long, j As Long
+    Dim modelsLastRow As Long, gbCount As Long
+    Dim m As ModelRecord
+    Dim gbs() As GearboxRecord
+    Dim gb As GearboxRecord
+    Dim anyRange As SizingSettings
+    Dim enc As Variant
+    Dim enclosure As String
+    Dim powerAdder As Double, enclosureAdder As Double
+    Dim actualEnclosure As String
+    Dim directOK As Boolean
+    Dim outputTorque As Double
+
+    mCount = 0
+    ReDim mCand(1 To 64)
+
+    If Not SheetExists(SH_MODELS) Then Exit Sub
+    Set wsModels = ThisWorkbook.Worksheets(SH_MODELS)
+    modelsLastRow = GetLastRow(wsModels, 1)
+
+    ' Gearboxes are read once for all actuators (Linear never uses a gearbox)
+    gbCount = 0
+    If s.ActuatorType <> "Linear" And SheetExists(SH_GEARBOXES) Then
+        Set wsGb = ThisWorkbook.Worksheets(SH_GEARBOXES)
+        If GetLastRow(wsGb, 1) >= 2 Then
+            ReDim gbs(1 To GetLastRow(wsGb, 1) - 1)
+            For j = 2 To GetLastRow(wsGb, 1)
+                gb = ReadGearboxRecord(wsGb, j)
+                If Trim$(gb.Model) <> "" And gb.Ratio > 0 Then
+                    If Not (reqStemDim > 0 And gb.MaxStemDim > 0 And reqStemDim > gb.MaxStemDim) Then
+                        gbCount = gbCount + 1
+                        gbs(gbCount) = gb
+                    End If
+                End If
+            Next j
+        End If
+    End If
+
+    ' Model Range and thrust are relaxed/checked later, not here
+    anyRange = s
+    anyRange.ModelRange = "All"
+
+    For i = 2 To modelsLastRow
+        m = ReadModelRecord(wsModels, i)
+        If Trim$(m.Model) = "" Then GoTo NextModel
+        If m.ActType <> s.ActuatorType Then GoTo NextModel
+
+        If Not HasPowerOption(m.Model, s.Voltage, s.Phase, s.Frequency, powerAdder) Then GoTo NextModel
+
+        ' Direct phase applies PassesModelFilters; gearbox phase only type/series/thrust
+        directOK = PassesModelFilters(m, anyRange, 0)
+        If reqStemDim > 0 And m.MaxStemDim > 0 Then
+            If reqStemDim > m.MaxStemDim Then directOK = False
+        End If
+
+        For Each enc In mEnclosures
+            enclosure = CStr(enc)
+            If Not HasEnclosureOption(m.Model, enclosure, actualEnclosure, enclosureAdder) Then GoTo NextEnclosure
+
+            If directOK Then
+                AddCandidate m, "", enclosure, m.Torque, _
+                    CalculateOpTime(m.RPM, reqTurns, s.ActuatorType, 1, m.OpTime, m.Speed, m.Stroke), _
+                    m.BasePrice + powerAdder + enclosureAdder, _
+                    (s.ActuatorType <> "Linear"), _
+                    (s.ActuatorType = "Multi-turn" Or s.ActuatorType = "Linear")
+            End If
+
+            For j = 1 To gbCount
+                gb = gbs(j)
+                If gb.InputFlange <> m.OutputFlange Then GoTo NextGb
+                If m.Torque > gb.InputTorqueMax Then GoTo NextGb
+                outputTorque = m.Torque * gb.Ratio * gb.Efficiency
+                If outputTorque > gb.OutputTorqueMax Then GoTo NextGb
+
+                AddCandidate m, gb.Model, enclosure, outputTorque, _
+                    CalculateOpTime(m.RPM, reqTurns, s.ActuatorType, gb.Ratio, m.OpTime, m.Speed, m.Stroke), _
+                    m.BasePrice + powerAdder + enclosureAdder + gb.Price, _
+                    True, (s.ActuatorType = "Multi-turn")
+NextGb:
+            Next j
+NextEnclosure:
+        Next enc
+NextModel:
+    Next i
+End Sub
+
+Private Function CatalogEnclosures() As Collection
+    ' Settings Enclosure values (Waterproof, Explosionproof, ...) that select at
+    ' least one DB_EnclosureOptions row, so the list follows the catalog
+    Dim seen As String
+    Dim dbEnc As Variant
+    Dim setting As String
+
+    Set CatalogEnclosures = New Collection
+    seen = "|"
+    For Each dbEnc In DbEnclosureValues()
+        setting = EnclosureSetting(CStr(dbEnc))
+        If setting <> "" And InStr(seen, "|" & setting & "|") = 0 Then
+            CatalogEnclosures.Add setting
+            seen = seen & setting & "|"
+        End If
+    Next dbEnc
+End Function
+
+Private Sub AddCandidate(m As ModelRecord, gbModel As String, enclosure As String, _
+    torque As Double, opTime As Double, price As Double, _
+    checkTorque As Boolean, checkThrust As Boolean)
+
+    mCount = mCount + 1
+    If mCount > UBound(mCand) Then
+        ReDim Preserve mCand(1 To UBound(mCand) * 2)
+    End If
+
+    With mCand(mCount)
+        .ActuatorModel = m.Model
+        .GearboxModel = gbModel
+        .Series = m.Series
+        .Enclosure = enclosure
+        .Torque = torque
+        .Thrust = m.Thrust
+        .CheckTorque = checkTorque
+        .CheckThrust = checkThrust
+        .OpTime = opTime
+        .Price = price
+    End With
+End Sub
+
+' ============================================
+' Feasibility Probe
+' ============================================
+
+Private Function BestCandidate(sf As Double, minPct As Double, maxPct As Double, _
+    modelRange As String, enclosure As String) As Long
+    ' Returns index of the cheapest feasible candidate (0 = infeasible)
+    ' Tie-breaker: direct actuator before gearbox (same as FindBestActuator)
+
+    Dim i As Long
+    Dim best As Long
+    Dim reqTorque As Double, reqThrust As Double
+
+    reqTorque = mReqTorque * sf
+    reqThrust = mReqThrust * sf
+    best = 0
+
+    For i = 1 To mCount
+        With mCand(i)
+            If .Enclosure <> enclosure Then GoTo NextCand
+            If Not MatchModelRange(.Series, modelRange) Then GoTo NextCand
+            If .CheckTorque And .Torque < reqTorque Then GoTo NextCand
+            If .CheckThrust And reqThrust > 0 And .Thrust < reqThrust Then GoTo NextCand
+            If mReqOpTime > 0 Then
+                If Not CheckOpTimeRange(.OpTime, mReqOpTime, minPct, maxPct) Then GoTo NextCand
+            End If
+
+            If best = 0 Then
+                best = i
+            ElseIf .Price < mCand(best).Price Then
+                best = i
+            ElseIf .Price = mCand(best).Price And .GearboxModel = "" And mCand(best).GearboxModel <> "" Then
+                best = i
+            End If
+        End With
+NextCand:
+    Next i
+
+    BestCandidate = best
+End Function
+
+' ============================================
+' Relaxation Search
+' ============================================
+
+Private Function BuildRelaxReport(s As SizingSettings, lineNo As Long) As String
+    Dim report As String
+    Dim idx As Long
+    Dim minPct As Double, maxPct As Double
+    Dim lo As Long, hi As Long, mid As Long
+    Dim enc As Variant
+
+    ' Normalize window the same way CheckOpTimeRange does
+    minPct = s.OpTimeMinPct
+    maxPct = s.OpTimeMaxPct
+    If minPct > maxPct Then
+        minPct = s.OpTimeMaxPct
+        maxPct = s.OpTimeMinPct
+    End If
+
+    idx = BestCandidate(s.SafetyFactor, minPct, maxPct, s.ModelRange, s.Enclosure)
+    If idx > 0 Then
+        BuildRelaxReport = "Line " & lineNo & " already fits the current settings: " & _
+            CandidateText(idx) & vbCrLf & "Run Sizing Selected to update the result."
+        Exit Function
+    End If
+
+    report = "Line " & lineNo & " - minimal relaxation per constraint:" & vbCrLf
+
+    ' 1. Safety factor: largest SF (0.01 steps) >= SF_FLOOR that is feasible
+    lo = CLng(SF_FLOOR * 100)
+    hi = Int(s.SafetyFactor * 100 + 0.5) - 1
+    If hi >= lo And BestCandidate(lo / 100, minPct, maxPct, s.ModelRange, s.Enclosure) > 0 Then
+        Do While lo < hi
+            mid = (lo + hi + 1) \ 2
+            If BestCandidate(mid / 100, minPct, maxPct, s.ModelRange, s.Enclosure) > 0 Then
+                lo = mid
+            Else
+                hi = mid - 1
+            End If
+        Loop
+        idx = BestCandidate(lo / 100, minPct, maxPct, s.ModelRange, s.Enclosure)
+        report = report & "- Safety Factor: " & s.SafetyFactor & " -> " & Format(lo / 100, "0.00") & _
+            "  (" & CandidateText(idx) & ")" & vbCrLf
+    ElseIf hi < lo Then
+        report = report & "- Safety Factor: already at minimum " & Format(SF_FLOOR, "0.00") & vbCrLf
+    Else
+        report = report & "- Safety Factor: no fit even at " & Format(SF_FLOOR, "0.00") & vbCrLf
+    End If
+
+    ' 2-3. Op. Time window: widen one side at a time (1% steps)
+    If mReqOpTime > 0 Then
+        ' Op. Time Max %: smallest value above current that is feasible
+        lo = Int(maxPct) + 1
+        hi = CLng(OPTIME_PCT_CEILING)
+        If lo <= hi And BestCandidate(s.SafetyFactor, minPct, CDbl(hi), s.ModelRange, s.Enclosure) > 0 Then
+            Do While lo < hi
+                mid = (lo + hi) \ 2
+                If BestCandidate(s.SafetyFactor, minPct, CDbl(mid), s.ModelRange, s.Enclosure) > 0 Then
+                    hi = mid
+                Else
+                    lo = mid + 1
+                End If
+            Loop
+            idx = BestCandidate(s.SafetyFactor, minPct, CDbl(hi), s.ModelRange, s.Enclosure)
+            report = report & "- Op. Time Max %: " & maxPct & " -> " & hi & _
+                "  (" & CandidateText(idx) & ")" & vbCrLf
+        Else
+            report = report & "- Op. Time Max %: no fit up to " & OPTIME_PCT_CEILING & vbCrLf
+        End If
+
+        ' Op. Time Min %: largest value below current that is feasible
+        lo = CLng(OPTIME_PCT_FLOOR)
+        hi = -Int(-minPct) - 1
+        If lo <= hi And BestCandidate(s.SafetyFactor, CDbl(lo), maxPct, s.ModelRange, s.Enclosure) > 0 Then
+            Do While lo < hi
+                mid = lo + (hi - lo + 1) \ 2
+                If BestCandidate(s.SafetyFactor, CDbl(mid), maxPct, s.ModelRange, s.Enclosure) > 0 Then
+                    lo = mid
+                Else
+                    hi = mid - 1
+                End If
+            Loop
+            idx = BestCandidate(s.SafetyFactor, CDbl(lo), maxPct, s.ModelRange, s.Enclosure)
+            report = report & "- Op. Time Min %: " & minPct & " -> " & lo & _
+                "  (" & CandidateText(idx) & ")" & vbCrLf
+        Else
+            report = report & "- Op. Time Min %: no fit down to " & OPTIME_PCT_FLOOR & vbCrLf
+        End If
+    End If
+
+    ' 4. Model range: switch to the series of the cheapest model under "All"
+    If s.ModelRange <> "All" Then
+        idx = BestCandidate(s.SafetyFactor, minPct, maxPct, "All", s.Enclosure)
+        If idx > 0 Then
+            report = report & "- Model Range: " & s.ModelRange & " -> " & mCand(idx).Series & _
+                "  (" & CandidateText(idx) & ")" & vbCrLf
+        Else
+            report = report & "- Model Range: no fit in any series" & vbCrLf
+        End If
+    End If
+
+    ' 5. Enclosure: the other enclosure classes of the catalog
+    For Each enc In mEnclosures
+        If CStr(enc) <> s.Enclosure Then
+            idx = BestCandidate(s.SafetyFactor, minPct, maxPct, s.ModelRange, CStr(enc))
+            If idx > 0 Then
+                report = report & "- Enclosure: " & s.Enclosure & " -> " & enc & _
+                    "  (" & CandidateText(idx) & ")" & vbCrLf
+            Else
+                report = report & "- Enclosure: no fit with " & enc & vbCrLf
+            End If
+        End If
+    Next enc
+
+    BuildRelaxReport = report & vbCrLf & _
+        "Change one value on the Settings sheet and run Sizing Selected."
+End Function
+
+Private Function CandidateText(idx As Long) As String
+    With mCand(idx)
+        CandidateText = .ActuatorModel & IIf(.GearboxModel <> "", " + " & .GearboxModel, "") & _
+            ", " & Format(.Price, "#,##0")
+    End With
+End Function
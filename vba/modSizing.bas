@@ -58,6 +58,7 @@ Public Sub SizingAll()
     If Not ValidateSettings(s) Then
         Exit Sub
     End If
+    ResetModelFilterCache
 
     Application.ScreenUpdating = False
     Application.EnableEvents = False
@@ -147,6 +148,7 @@ Public Sub SizingSelected()
     If Not ValidateSettings(s) Then
         Exit Sub
     End If
+    ResetModelFilterCache
 
     If SizeLine(selectedRow, s) Then
         ShowInfo "Sizing completed for line " & (selectedRow - ROW_HEADER)
@@ -201,36 +203,16 @@ Public Function SizeLine(rowNum As Long, s As SizingSettings) As Boolean
 
     Dim couplingType As String
     Dim couplingDim As Double
-    Dim minDim As Double, maxDim As Double
+    Dim couplingError As String
 
     couplingType = GetCellString(ws.Cells(rowNum, COL_COUPLINGTYPE))
     couplingDim = GetCellDouble(ws.Cells(rowNum, COL_COUPLINGDIM))
 
-    If couplingType <> "" Then
-        If Not GetCouplingLimits(couplingType, minDim, maxDim) Then
-            If minDim < 0 Then
-                WriteResult ws, rowNum, result, "DB_Couplings sheet not found."
-            Else
-                WriteResult ws, rowNum, result, "Unknown coupling type: " & couplingType
-            End If
-            SizeLine = False
-            Exit Function
-        End If
-
-        If minDim > 0 Or maxDim > 0 Then
-            If couplingDim <= 0 Then
-                WriteResult ws, rowNum, result, "Coupling dimension required for " & couplingType
-                SizeLine = False
-                Exit Function
-            End If
-
-            If couplingDim < minDim Or couplingDim > maxDim Then
-                WriteResult ws, rowNum, result, "Coupling dimension out of range (" & _
-                    minDim & "-" & maxDim & " mm)"
-                SizeLine = False
-                Exit Function
-            End If
-        End If
+    couplingError = CheckCoupling(couplingType, couplingDim)
+    If couplingError <> "" Then
+        WriteResult ws, rowNum, result, couplingError
+        SizeLine = False
+        Exit Function
     End If
 
     ' Convert units to Nm/kN
@@ -412,7 +394,7 @@ Private Function FindActuatorWithGearbox(reqTorque As Double, reqThrust As Doubl
 
     Dim wsModels As Worksheet, wsGb As Worksheet
     Dim result As SizingResult
-    Dim i As Long, j As Long
+    Dim i As Long, j As Long, p As Long
     Dim modelsLastRow As Long, gbLastRow As Long
     Dim m As ModelRecord
     Dim act As ActuatorRecord
@@ -426,6 +408,16 @@ Private Function FindActuatorWithGearbox(reqTorque As Double, reqThrust As Doubl
     Dim totalPrice As Double
     Dim bestCalcTorque As Double
     Dim bestCalcOpTime As Double
+    Dim bestActRow As Long, bestGbIdx As Long
+    ' Gearboxes loaded once, ordered by ratio (see LoadGearboxesByRatio)
+    Dim gbs() As GearboxRecord
+    Dim gbOrder() As Long
+    Dim gbCount As Long
+    Dim maxEff As Double
+    Dim ratioMin As Double, ratioMax As Double
+    ' Resolved actuators (kept for the no-match counters)
+    Dim acts() As ActuatorRecord
+    Dim actCount As Long
     ' Counters for error tracking
     Dim totalModels As Long
     Dim countType As Long, countSeries As Long
@@ -457,8 +449,14 @@ Private Function FindActuatorWithGearbox(reqTorque As Double, reqThrust As Doubl
     gbLastRow = GetLastRow(wsGb, 1)
     hasGearboxData = (gbLastRow >= 2)
 
+    If hasGearboxData Then
+        gbCount = LoadGearboxesByRatio(wsGb, gbLastRow, gbs, gbOrder, maxEff)
+    End If
+
     found = False
     minPrice = MAX_PRICE
+    actCount = 0
+    ReDim acts(1 To modelsLastRow)
 
     For i = 2 To modelsLastRow
         m = ReadModelRecord(wsModels, i)
@@ -489,58 +487,51 @@ Private Function FindActuatorWithGearbox(reqTorque As Double, reqThrust As Doubl
         countPower = countPower + 1
         countEnclosure = countEnclosure + 1
 
-        If Not hasGearboxData Then GoTo NextAct2
+        If gbCount = 0 Then GoTo NextAct2
+        actCount = actCount + 1
+        acts(actCount) = act
+
+        ' Ratio interval allowed by output torque and Op. Time window
+        If Not GetRatioRange(act, reqTorque, reqOpTime, reqTurns, s, maxEff, ratioMin, ratioMax) Then GoTo NextAct2
 
-        ' Now find compatible gearbox
-        For j = 2 To gbLastRow
-            gb = ReadGearboxRecord(wsGb, j)
+        ' Only gearboxes inside [ratioMin, ratioMax] are checked
+        For p = FirstRatioAtLeast(gbs, gbOrder, gbCount, ratioMin) To gbCount
+            j = gbOrder(p)
+            gb = gbs(j)
+            If gb.Ratio > ratioMax Then Exit For
 
             ' Use common helper for gearbox matching (flange, torque limits, stem dim)
-            If Not TryMatchGearbox(act, gb, reqTorque, reqStemDim, outputTorque) Then
-                ' Track partial matches for error messages
-                If gb.InputFlange = act.OutputFlange Then
-                    countGbFlange = countGbFlange + 1
-                    If act.Torque <= gb.InputTorqueMax Then
-                        countGbInputTorque = countGbInputTorque + 1
-                        tempOutput = act.Torque * gb.Ratio * gb.Efficiency
-                        If tempOutput >= reqTorque And tempOutput <= gb.OutputTorqueMax Then
-                            countGbOutputTorque = countGbOutputTorque + 1
-                        End If
-                    End If
-                End If
-                GoTo NextGb
-            End If
-            countGbFlange = countGbFlange + 1
-            countGbInputTorque = countGbInputTorque + 1
-            countGbOutputTorque = countGbOutputTorque + 1
+            If Not TryMatchGearbox(act, gb, reqTorque, reqStemDim, outputTorque) Then GoTo NextGb
 
             ' Calculate operating time with gearbox ratio
             ' Part-turn: pass act.OpTime from DB
             ' Note: Linear doesn't use gearbox, so this function won't be called for Linear
             calcOpTime = CalculateOpTime(act.RPM, reqTurns, s.ActuatorType, gb.Ratio, act.OpTime, act.Speed, act.Stroke)
 
-            ' Check operating time range
+            ' Check operating time range (exact check, the ratio range is only a pre-filter)
             If reqOpTime > 0 Then
                 If Not CheckOpTimeRange(calcOpTime, reqOpTime, s.OpTimeMinPct, s.OpTimeMaxPct) Then
                     GoTo NextGb
                 End If
             End If
-            countGbOpTime = countGbOpTime + 1
 
             ' Found a match - check if it's the cheapest
+            ' Equal price: first actuator row, then first gearbox row wins (same as a row-order scan)
             totalPrice = act.Price + gb.Price
 
-            If totalPrice < minPrice Then
+            If totalPrice < minPrice Or (totalPrice = minPrice And i = bestActRow And j < bestGbIdx) Then
                 minPrice = totalPrice
                 bestAct = act
                 bestGb = gb
+                bestActRow = i
+                bestGbIdx = j
                 found = True
                 bestCalcTorque = outputTorque
                 bestCalcOpTime = calcOpTime
             End If
 
 NextGb:
-        Next j
+        Next p
 
 NextAct2:
     Next i
@@ -560,6 +551,24 @@ NextAct2:
         result.TotalPrice = minPrice
         result.Status = "OK (with gearbox)"
     Else
+        ' No match: count partial gearbox matches over all pairs for the error message
+        ' (any pair passing every check would have been found, so countGbOpTime stays 0)
+        For i = 1 To actCount
+            For j = 1 To gbCount
+                gb = gbs(j)
+                If gb.InputFlange = acts(i).OutputFlange Then
+                    countGbFlange = countGbFlange + 1
+                    If acts(i).Torque <= gb.InputTorqueMax Then
+                        countGbInputTorque = countGbInputTorque + 1
+                        tempOutput = acts(i).Torque * gb.Ratio * gb.Efficiency
+                        If tempOutput >= reqTorque And tempOutput <= gb.OutputTorqueMax Then
+                            countGbOutputTorque = countGbOutputTorque + 1
+                        End If
+                    End If
+                End If
+            Next j
+        Next i
+
         result.Success = False
         result.Status = BuildNoMatchReason( _
             totalModels, countType, countSeries, countPower, countEnclosure, _
@@ -571,6 +580,122 @@ NextAct2:
     FindActuatorWithGearbox = result
 End Function
 
+' ============================================
+' Gearbox Ratio Index
+' ============================================
+
+Private Function LoadGearboxesByRatio(wsGb As Worksheet, gbLastRow As Long, _
+    ByRef gbs() As GearboxRecord, ByRef gbOrder() As Long, ByRef maxEff As Double) As Long
+    ' Read valid gearboxes once and build an index sorted by ratio
+    ' gbs() keeps DB row order (used for tie-breaking), gbOrder() holds indices into gbs()
+    ' Returns the number of gearboxes
+
+    Dim j As Long, k As Long, n As Long
+    Dim gb As GearboxRecord
+    Dim idx As Long
+
+    n = 0
+    maxEff = 0
+    ReDim gbs(1 To gbLastRow)
+    ReDim gbOrder(1 To gbLastRow)
+
+    For j = 2 To gbLastRow
+        gb = ReadGearboxRecord(wsGb, j)
+        ' Same validity check as TryMatchGearbox
+        If Trim$(gb.Model) <> "" And gb.Ratio > 0 Then
+            n = n + 1
+            gbs(n) = gb
+            If gb.Efficiency > maxEff Then maxEff = gb.Efficiency
+
+            ' Insertion sort by ratio (stable: equal ratios stay in row order)
+            k = n - 1
+            Do While k >= 1
+                If gbs(gbOrder(k)).Ratio <= gb.Ratio Then Exit Do
+                gbOrder(k + 1) = gbOrder(k)
+                k = k - 1
+            Loop
+            gbOrder(k + 1) = n
+        End If
+    Next j
+
+    LoadGearboxesByRatio = n
+End Function
+
+Private Function FirstRatioAtLeast(gbs() As GearboxRecord, gbOrder() As Long, _
+    gbCount As Long, ratio As Double) As Long
+    ' Binary search: first position in gbOrder() with gbs().Ratio >= ratio
+    ' Returns gbCount + 1 if all ratios are smaller
+
+    Dim lo As Long, hi As Long, mid As Long
+
+    lo = 1
+    hi = gbCount + 1
+    Do While lo < hi
+        mid = (lo + hi) \ 2
+        If gbs(gbOrder(mid)).Ratio < ratio Then
+            lo = mid + 1
+        Else
+            hi = mid
+        End If
+    Loop
+
+    FirstRatioAtLeast = lo
+End Function
+
+Private Function GetRatioRange(act As ActuatorRecord, reqTorque As Double, reqOpTime As Double, _
+    reqTurns As Double, s As SizingSettings, maxEff As Double, _
+    ByRef ratioMin As Double, ByRef ratioMax As Double) As Boolean
+    ' Gearbox ratio interval that can satisfy torque and Op. Time for this actuator
+    ' Returns False if no ratio can work
+    '
+    ' Op. Time is linear in ratio: calcOpTime = k * ratio
+    '   Multi-turn: k = Turns * 60 / RPM
+    '   Part-turn:  k = OpTime (DB), fallback 60 / (4 * RPM)
+    ' so [minTime, maxTime] maps to [minTime / k, maxTime / k].
+    ' Output torque T * ratio * Eff >= reqTorque gives ratio >= reqTorque / (T * maxEff).
+    ' The bounds are widened by RATIO_EPS; exact checks follow in the caller.
+
+    Const RATIO_EPS As Double = 0.000001
+    Dim k As Double
+    Dim minTime As Double, maxTime As Double, temp As Double
+
+    GetRatioRange = False
+    ratioMin = 0
+    ratioMax = MAX_PRICE
+
+    ' Torque lower bound
+    If act.Torque <= 0 Or maxEff <= 0 Then
+        If reqTorque > 0 Then Exit Function
+    Else
+        ratioMin = reqTorque / (act.Torque * maxEff)
+    End If
+
+    ' Op. Time window
+    If reqOpTime > 0 Then
+        k = CalculateOpTime(act.RPM, reqTurns, s.ActuatorType, 1, act.OpTime, act.Speed, act.Stroke)
+
+        minTime = reqOpTime * (1 + s.OpTimeMinPct / 100)
+        maxTime = reqOpTime * (1 + s.OpTimeMaxPct / 100)
+        If minTime > maxTime Then
+            temp = minTime
+            minTime = maxTime
+            maxTime = temp
+        End If
+
+        If k > 0 Then
+            If minTime / k > ratioMin Then ratioMin = minTime / k
+            ratioMax = maxTime / k
+        ElseIf minTime > 0 Or maxTime < 0 Then
+            ' Op. Time is 0 for every ratio (no RPM/turns data) and 0 is outside the window
+            Exit Function
+        End If
+    End If
+
+    ratioMin = ratioMin * (1 - RATIO_EPS)
+    ratioMax = ratioMax * (1 + RATIO_EPS)
+    GetRatioRange = (ratioMin <= ratioMax)
+End Function
+
 ' ============================================
 ' Helper Functions
 ' ============================================
@@ -0,0 +1,527 @@
+"""
+Noah Actuator Sizing Tool - xlsx/xlsm Package Helpers
+Low-level access to the zip parts of a workbook (sheet XML, styles, strings)
+
+Used when a workbook has to be changed without a full openpyxl round trip,
+which would drop the VBA project, form-control buttons and the UserForm.
+"""
+
+import io
+import re
+import zipfile
+import hashlib
+import posixpath
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# First id Excel uses for custom number formats (0-163 are built-in)
+FIRST_CUSTOM_NUMFMT = 164
+
+
+# ============================================
+# Package Read / Write
+# ============================================
+
+def read_package(src):
+    """Read all zip parts of a workbook into an ordered dict {part name: bytes}
+
+    src: file path or raw bytes
+    """
+    if isinstance(src, (bytes, bytearray)):
+        src = io.BytesIO(src)
+    parts = {}
+    with zipfile.ZipFile(src) as zf:
+        for name in zf.namelist():
+            parts[name] = zf.read(name)
+    return parts
+
+
+def write_package(parts, dest):
+    """Write parts back to a zip package ([Content_Types].xml first)"""
+    names = list(parts)
+    if "[Content_Types].xml" in names:
+        names.remove("[Content_Types].xml")
+        names.insert(0, "[Content_Types].xml")
+    with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in names:
+            zf.writestr(name, parts[name])
+
+
+def _resolve_target(base_dir, target):
+    # Relationship targets are either absolute ("/xl/worksheets/sheet1.xml",
+    # openpyxl) or relative to the source part ("worksheets/sheet1.xml", Excel)
+    if target.startswith("/"):
+        return target[1:]
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def workbook_sheets(parts):
+    """Return [(sheet name, state, part name), ...] in workbook order"""
+    wb = ET.fromstring(parts["xl/workbook.xml"])
+    rels = ET.fromstring(parts["xl/_rels/workbook.xml.rels"])
+    targets = {r.get("Id"): _resolve_target("xl", r.get("Target"))
+               for r in rels.iter("{%s}Relationship" % NS_PKG_REL)}
+
+    sheets = []
+    for sh in wb.iter("{%s}sheet" % NS_MAIN):
+        rid = sh.get("{%s}id" % NS_REL)
+        sheets.append((sh.get("name"), sh.get("state", "visible"), targets.get(rid)))
+    return sheets
+
+
+def shared_strings(parts):
+    """Return the shared string table as a list (empty if the part is absent)"""
+    data = parts.get("xl/sharedStrings.xml")
+    if not data:
+        return []
+    strings = []
+    tag_t = "{%s}t" % NS_MAIN
+    tag_r = "{%s}r" % NS_MAIN
+    for si in ET.fromstring(data).iter("{%s}si" % NS_MAIN):
+        # Plain text is <si><t>, rich text is <si><r><t>; phonetic runs (<rPh>) are skipped
+        t = si.find(tag_t)
+        if t is not None:
+            strings.append(t.text or "")
+        else:
+            strings.append("".join(r.findtext(tag_t, "") for r in si.findall(tag_r)))
+    return strings
+
+
+# ============================================
+# Sheet Values
+# ============================================
+
+def column_index(ref):
+    """Convert a cell reference ("AB12") to a 1-based column index (28)"""
+    col = 0
+    for ch in ref:
+        if "A" <= ch <= "Z":
+            col = col * 26 + (ord(ch) - 64)
+        else:
+            break
+    return col
+
+
+def iter_sheet_rows(sheet_xml, strings):
+    """Yield (row number, [values...]) for every row of a sheet XML part
+
+    Values are str, float, bool or None, positioned by column (index 0 = column A).
+    """
+    tag_row = "{%s}row" % NS_MAIN
+    tag_c = "{%s}c" % NS_MAIN
+    tag_v = "{%s}v" % NS_MAIN
+    tag_t = "{%s}t" % NS_MAIN
+
+    for event, elem in ET.iterparse(io.BytesIO(sheet_xml), events=("end",)):
+        if elem.tag != tag_row:
+            continue
+        values = []
+        for c in elem.iter(tag_c):
+            col = column_index(c.get("r", "")) or (len(values) + 1)
+            while len(values) < col - 1:
+                values.append(None)
+            values.append(_cell_value(c, strings, tag_v, tag_t))
+        yield int(elem.get("r", 0)), values
+        elem.clear()
+
+
+def _cell_value(c, strings, tag_v, tag_t):
+    t = c.get("t", "n")
+    if t == "inlineStr":
+        return "".join(x.text or "" for x in c.iter(tag_t))
+    v = c.find(tag_v)
+    if v is None or v.text is None:
+        return None
+    if t == "s":
+        return strings[int(v.text)]
+    if t in ("str", "e"):
+        return v.text
+    if t == "b":
+        return v.text == "1"
+    return float(v.text)
+
+
+def normalize_value(value):
+    """Normalize a cell value so openpyxl- and Excel-saved files compare equal"""
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return "b:%d" % value
+    if isinstance(value, (int, float)):
+        # Excel may re-save 0.85 as 0.84999999999999998
+        return "n:" + format(float(value), ".12g")
+    return "s:" + str(value)
+
+
+def sheet_content_hash(rows):
+    """SHA-256 over normalized cell values (row layout kept, empty rows ignored)
+
+    rows: iterable of value lists, e.g. iter_sheet_rows() values or
+    openpyxl ws.iter_rows(values_only=True)
+    """
+    h = hashlib.sha256()
+    for values in rows:
+        norm = [normalize_value(v) for v in values]
+        while norm and norm[-1] == "":
+            norm.pop()
+        if not norm:
+            continue
+        h.update("\x1f".join(norm).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+# ============================================
+# Styles (xl/styles.xml)
+# ============================================
+
+def _local(tag):
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+def _canonical(el):
+    # Order-independent, namespace-free representation used for deduplication
+    attrs = tuple(sorted((k, v) for k, v in el.attrib.items() if "}" not in k))
+    children = tuple(sorted(_canonical(ch) for ch in el))
+    return (_local(el.tag), attrs, children)
+
+
+def _to_xml(el):
+    # Serialize without namespace prefixes (main namespace is the default one)
+    attrs = "".join(' %s="%s"' % (k, escape(v, {'"': "&quot;"}))
+                    for k, v in el.attrib.items() if "}" not in k)
+    children = "".join(_to_xml(ch) for ch in el)
+    tag = _local(el.tag)
+    if children:
+        return "<%s%s>%s</%s>" % (tag, attrs, children, tag)
+    return "<%s%s/>" % (tag, attrs)
+
+
+class StyleSheet:
+    """Editable view of xl/styles.xml
+
+    Styles from another package are imported with import_xf(); new fonts,
+    fills, borders, number formats and cell formats are appended to the
+    original XML text so everything already in the file (including any
+    mc:Ignorable extension namespaces written by Excel) is kept verbatim.
+    """
+
+    SECTIONS = ("numFmts", "fonts", "fills", "borders", "cellXfs")
+
+    def __init__(self, xml_bytes):
+        self.text = xml_bytes.decode("utf-8")
+        root = ET.fromstring(xml_bytes)
+
+        self.items = {}
+        for section in self.SECTIONS:
+            node = root.find("{%s}%s" % (NS_MAIN, section))
+            self.items[section] = list(node) if node is not None else []
+        self.added = {section: [] for section in self.SECTIONS}
+        self.keys = {section: {} for section in self.SECTIONS}
+        for section in ("fonts", "fills", "borders", "cellXfs"):
+            for i, el in enumerate(self.items[section]):
+                self.keys[section].setdefault(_canonical(el), i)
+
+        self.numfmt_codes = {}     # id -> format code
+        self.numfmt_ids = {}       # format code -> id
+        for el in self.items["numFmts"]:
+            fid = int(el.get("numFmtId"))
+            self.numfmt_codes[fid] = el.get("formatCode")
+            self.numfmt_ids.setdefault(el.get("formatCode"), fid)
+
+    def _add(self, section, el):
+        key = _canonical(el)
+        idx = self.keys[section].get(key)
+        if idx is None:
+            idx = len(self.items[section])
+            self.items[section].append(el)
+            self.added[section].append(el)
+            self.keys[section][key] = idx
+        return idx
+
+    def _import_numfmt(self, other, fid):
+        if fid < FIRST_CUSTOM_NUMFMT or fid not in other.numfmt_codes:
+            return fid
+        code = other.numfmt_codes[fid]
+        if code in self.numfmt_ids:
+            return self.numfmt_ids[code]
+        new_id = max([FIRST_CUSTOM_NUMFMT - 1] + list(self.numfmt_codes)) + 1
+        el = ET.Element("numFmt", {"numFmtId": str(new_id), "formatCode": code})
+        self.items["numFmts"].append(el)
+        self.added["numFmts"].append(el)
+        self.numfmt_codes[new_id] = code
+        self.numfmt_ids[code] = new_id
+        return new_id
+
+    def import_xf(self, other, xf_index):
+        """Copy cell format xf_index of StyleSheet other into this one
+
+        Returns the index to use for the "s" attribute in this package.
+        """
+        src = other.items["cellXfs"][xf_index]
+        xf = ET.Element("xf", dict((k, v) for k, v in src.attrib.items() if "}" not in k))
+        for ch in src:
+            xf.append(ch)
+
+        for attr, section in (("fontId", "fonts"), ("fillId", "fills"), ("borderId", "borders")):
+            if attr in xf.attrib:
+                xf.set(attr, str(self._add(section, other.items[section][int(xf.get(attr))])))
+        if "numFmtId" in xf.attrib:
+            xf.set("numFmtId", str(self._import_numfmt(other, int(xf.get("numFmtId")))))
+        # Cell styles (cellStyleXfs) are not transplanted; use the Normal style
+        xf.set("xfId", "0")
+        return self._add("cellXfs", xf)
+
+    def to_bytes(self):
+        text = self.text
+        for section in self.SECTIONS:
+            added = self.added[section]
+            if not added:
+                continue
+            snippet = "".join(_to_xml(el) for el in added)
+            count = len(self.items[section])
+
+            open_re = re.compile(r"<(?:\w+:)?%s\b[^>]*?(/?)>" % section)
+            m = open_re.search(text)
+            if m is None:
+                # Only numFmts may be missing entirely; it must come first
+                start = re.search(r"<(?:\w+:)?styleSheet\b[^>]*>", text).end()
+                text = text[:start] + '<numFmts count="%d">%s</numFmts>' % (count, snippet) + text[start:]
+                continue
+
+            tag_open = m.group(0)
+            new_open = re.sub(r'\bcount="\d+"', 'count="%d"' % count, tag_open)
+            if 'count="' not in new_open:
+                new_open = new_open.replace("<%s" % section, '<%s count="%d"' % (section, count), 1)
+            if m.group(1) == "/":
+                # Self-closing (empty) section
+                new_open = new_open[:-2].rstrip() + ">"
+                text = text[:m.start()] + new_open + snippet + "</%s>" % section + text[m.end():]
+            else:
+                close = re.compile(r"</(?:\w+:)?%s>" % section).search(text, m.end())
+                text = text[:m.start()] + new_open + text[m.end():close.start()] + snippet + text[close.start():]
+        return text.encode("utf-8")
+
+
+# ============================================
+# Sheet Transplant
+# ============================================
+
+_RE_CELL_STYLE = re.compile(r'(<(?:c|row)\b[^>]*?\bs=")(\d+)(")')
+_RE_COL_STYLE = re.compile(r'(<col\b[^>]*?\bstyle=")(\d+)(")')
+_RE_SHARED_CELL = re.compile(r'<c\b([^>]*?)\bt="s"([^>]*)>\s*<v>(\d+)</v>\s*</c>')
+_RE_SHEET_PR = re.compile(r"<sheetPr\b[^>]*/>|<sheetPr\b.*?</sheetPr>", re.S)
+_RE_WORKSHEET_OPEN = re.compile(r"<worksheet\b[^>]*>")
+
+
+def sheet_pr(sheet_xml):
+    """Return the raw <sheetPr> element of a sheet part ('' if none)
+
+    Excel keeps the VBA code name (codeName="Sheet4") here, which links the
+    sheet to its document module in vbaProject.bin.
+    """
+    m = _RE_SHEET_PR.search(sheet_xml.decode("utf-8"))
+    return m.group(0) if m else ""
+
+
+def transplant_sheet(sheet_xml, src_styles, dst_styles, src_strings=None, keep_sheet_pr=None):
+    """Rewrite a sheet part from one package so it is valid in another
+
+    - Cell/row/column style indices are imported into dst_styles
+    - Shared-string cells become inline strings (dst sharedStrings untouched)
+    - keep_sheet_pr replaces the sheet's own <sheetPr> (keeps VBA code name)
+    """
+    text = sheet_xml.decode("utf-8")
+    xf_map = {}
+
+    def remap(m):
+        old = int(m.group(2))
+        if old not in xf_map:
+            xf_map[old] = dst_styles.import_xf(src_styles, old)
+        return "%s%d%s" % (m.group(1), xf_map[old], m.group(3))
+
+    text = _RE_CELL_STYLE.sub(remap, text)
+    text = _RE_COL_STYLE.sub(remap, text)
+
+    if src_strings:
+        def inline(m):
+            s = escape(src_strings[int(m.group(3))])
+            return '<c%st="inlineStr"%s><is><t xml:space="preserve">%s</t></is></c>' % (
+                m.group(1), m.group(2), s)
+        text = _RE_SHARED_CELL.sub(inline, text)
+
+    if keep_sheet_pr is not None:
+        if _RE_SHEET_PR.search(text):
+            text = _RE_SHEET_PR.sub(lambda m: keep_sheet_pr, text, count=1)
+        elif keep_sheet_pr:
+            start = _RE_WORKSHEET_OPEN.search(text).end()
+            text = text[:start] + keep_sheet_pr + text[start:]
+
+    return text.encode("utf-8")
+
+
+# ============================================
+# Bulk Rows
+# ============================================
+
+_RE_ROW = re.compile(r"<row\b([^>]*?)\br=\"(\d+)\"([^>]*?)(?:/>|>(.*?)</row>)", re.S)
+_RE_CELL = re.compile(r"<c\b[^>]*?\br=\"([A-Z]+)\d+\"[^>]*?(?:/>|>.*?</c>)", re.S)
+_RE_SHEET_DATA = re.compile(r"<sheetData\s*/>|<sheetData>(.*?)</sheetData>", re.S)
+_RE_DIMENSION = re.compile(r'<dimension ref="([^"]*)"\s*/>')
+
+
+def column_letter(col):
+    """1 -> A, 27 -> AA"""
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def cell_xml(ref, value, xf=None):
+    """<c> element text: numbers, inline strings, formulas ("=..."), blank for None"""
+    s = ' s="%d"' % xf if xf is not None else ""
+    if value is None:
+        return '<c r="%s"%s/>' % (ref, s)
+    if isinstance(value, bool):
+        return '<c r="%s"%s t="b"><v>%d</v></c>' % (ref, s, value)
+    if isinstance(value, (int, float)):
+        return '<c r="%s"%s><v>%r</v></c>' % (ref, s, value)
+    text = str(value)
+    if text.startswith("="):
+        return '<c r="%s"%s><f>%s</f></c>' % (ref, s, escape(text[1:]))
+    return '<c r="%s"%s t="inlineStr"><is><t xml:space="preserve">%s</t></is></c>' % (ref, s, escape(text))
+
+
+def merge_rows(sheet_xml, rows):
+    """Write rows ({row number: [<c> text, ...]}, from cell_xml) into a sheet part
+
+    Cells of a row already in the sheet are replaced by reference, the others
+    kept; rows are built as text, so large blocks cost one pass. The
+    <dimension> is widened to the new last row.
+    """
+    text = sheet_xml.decode("utf-8")
+    m = _RE_SHEET_DATA.search(text)
+    existing = {}
+    for r in _RE_ROW.finditer(m.group(1) or ""):
+        existing[int(r.group(2))] = r
+
+    out = []
+    for rownum in sorted(set(existing) | set(rows)):
+        r = existing.get(rownum)
+        cells = rows.get(rownum)
+        if cells is None:
+            out.append(r.group(0))
+            continue
+        if r is not None:
+            merged = {column_index(c.group(1)): c.group(0) for c in _RE_CELL.finditer(r.group(4) or "")}
+            merged.update((column_index(_RE_CELL.match(c).group(1)), c) for c in cells)
+            cells = [merged[k] for k in sorted(merged)]
+            attrs = r.group(1) + 'r="%d"' % rownum + r.group(3)
+        else:
+            attrs = 'r="%d"' % rownum
+        out.append("<row %s>%s</row>" % (attrs.strip(), "".join(cells)))
+
+    text = text[:m.start()] + "<sheetData>%s</sheetData>" % "".join(out) + text[m.end():]
+    dim = _RE_DIMENSION.search(text)
+    if dim is not None and rows:
+        first, _, last = dim.group(1).partition(":")
+        last = last or first
+        last_row = max(max(rows), int(last.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ") or 1))
+        ref = "%s:%s%d" % (first, last.rstrip("0123456789"), last_row)
+        text = text[:dim.start()] + '<dimension ref="%s"/>' % ref + text[dim.end():]
+    return text.encode("utf-8")
+
+
+_RE_CALC_PR = re.compile(r"<calcPr\b[^>]*?/>")
+_RE_WORKBOOK_CLOSE = re.compile(r"</workbook>")
+
+
+def set_full_calc_on_load(workbook_xml):
+    """Set fullCalcOnLoad in xl/workbook.xml so Excel recalculates formulas
+    written without cached values (transplanted sheets) when the file opens"""
+    text = workbook_xml.decode("utf-8")
+    m = _RE_CALC_PR.search(text)
+    if m is None:
+        text = _RE_WORKBOOK_CLOSE.sub('<calcPr fullCalcOnLoad="1"/></workbook>', text, count=1)
+    elif "fullCalcOnLoad=" in m.group(0):
+        text = text.replace(m.group(0), re.sub(r'fullCalcOnLoad="[^"]*"', 'fullCalcOnLoad="1"', m.group(0)))
+    else:
+        text = text.replace(m.group(0), m.group(0)[:-2].rstrip() + ' fullCalcOnLoad="1"/>')
+    return text.encode("utf-8")
+
+
+# ============================================
+# Defined Names (xl/workbook.xml)
+# ============================================
+
+_RE_DEFINED_NAMES = re.compile(r"<definedNames>(.*?)</definedNames>|<definedNames\s*/>", re.S)
+_RE_DEFINED_NAME = re.compile(r'<definedName\b([^>]*)>(.*?)</definedName>', re.S)
+_RE_NAME_ATTR = re.compile(r'\bname="([^"]*)"')
+
+
+def range_ref(sheet_name, last_row, last_col):
+    """Absolute reference of the block from A1: 'DB_Models'!$A$1:$R$120"""
+    return "'%s'!$A$1:$%s$%d" % (sheet_name.replace("'", "''"), column_letter(max(last_col, 1)),
+                                 max(last_row, 1))
+
+
+def sheet_extent(rows):
+    """(last row, last column) of iter_sheet_rows() output, trailing blanks ignored"""
+    last_row = last_col = 1
+    for rownum, values in rows:
+        while values and values[-1] in (None, ""):
+            values = values[:-1]
+        if values:
+            last_row = max(last_row, rownum)
+            last_col = max(last_col, len(values))
+    return last_row, last_col
+
+
+def defined_names(workbook_xml):
+    """{name: reference} of the workbook-level defined names (sheet-scoped names are skipped)"""
+    text = workbook_xml.decode("utf-8")
+    names = {}
+    m = _RE_DEFINED_NAMES.search(text)
+    if m and m.group(1):
+        for attrs, ref in _RE_DEFINED_NAME.findall(m.group(1)):
+            name = _RE_NAME_ATTR.search(attrs)
+            if name and "localSheetId=" not in attrs:
+                names[name.group(1)] = ref.replace("&apos;", "'").replace("&amp;", "&")
+    return names
+
+
+def set_defined_names(workbook_xml, names):
+    """Add or replace workbook-level defined names {name: reference} in xl/workbook.xml
+
+    Other defined names (print areas, user names) are kept as they are.
+    """
+    if not names:
+        return workbook_xml
+    text = workbook_xml.decode("utf-8")
+    entries = "".join('<definedName name="%s">%s</definedName>' % (escape(name), escape(ref))
+                      for name, ref in names.items())
+
+    def keep(m):
+        attrs = m.group(1)
+        name = _RE_NAME_ATTR.search(attrs)
+        if name and name.group(1) in names and "localSheetId=" not in attrs:
+            return ""
+        return m.group(0)
+
+    m = _RE_DEFINED_NAMES.search(text)
+    if m is not None:
+        body = _RE_DEFINED_NAME.sub(keep, m.group(1) or "")
+        text = text[:m.start()] + "<definedNames>%s%s</definedNames>" % (body, entries) + text[m.end():]
+    else:
+        # definedNames follows sheets (and the optional functionGroups/externalReferences)
+        anchor = max(text.find("</sheets>") + len("</sheets>"),
+                     text.find("</functionGroups>") + len("</functionGroups>"),
+                     text.find("</externalReferences>") + len("</externalReferences>"))
+        text = text[:anchor] + "<definedNames>%s</definedNames>" % entries + text[anchor:]
+    return text.encode("utf-8")
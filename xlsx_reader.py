@@ -0,0 +1,658 @@
+"""
+Noah Actuator Sizing Tool - Fast xlsx Column Reader
+Typed NumPy columns of the ValveList and DB_* sheets straight from the sheet XML
+
+Usage:
+    python xlsx_reader.py NoahSizing.xlsm                               # load times, all known sheets
+    python xlsx_reader.py big_project.xlsx --sheet ValveList --openpyxl # + openpyxl read-only mode
+    python xlsx_reader.py catalog.xlsx --sheet DB_Models --check        # compare with xlsx_package reads
+
+The workbook zip is opened once and a sheet part is streamed in blocks of
+BLOCK_BYTES, each cut at its last </row>. One regular expression, limited to
+the column letters that are wanted, pulls (column, row, type, value) out of
+a block, and the matches are grouped per column with NumPy: plain numbers
+are parsed with one astype(float64) and shared-string cells become index
+arrays. No cell or element objects are built. The sharedStrings part is read
+on first use and only the indexes that occur are decoded. Other cells
+(formulas, rich inline text, booleans, errors) are converted one by one with
+the xlsx_package.iter_sheet_rows() rules.
+
+Known layouts:
+    ValveList   header on row 3 (VALVELIST_INPUT_HEADERS, result headers when
+                present), data from row 4, rows without a Line No. skipped
+                like SizingAll. NUMBER_COLUMNS are float64 with NaN for blank
+                cells (text through GetCellDouble), other columns str.
+    DB_*        header on row 1, data from row 2 up to the last row with a
+                value, blank rows kept (the VBA loops run to GetLastRow).
+                Columns are taken by position and converted with the
+                catalog_sqlite.SCHEMAS rules: to_float -> float64, to_int ->
+                int64, to_str -> str, others keep the cell value.
+
+str columns are object arrays. Sheets whose cells are not written as
+<c r="A1" ...> (namespace prefixes, cells without a reference) are read with
+iter_sheet_rows() instead, with the same results.
+
+valvelist_io.iter_xlsx_rows() reads the ValveList through
+iter_valvelist_rows(): the cells as stored (iter_sheet_rows() values), one
+dict per row with its sheet row number, so the xlsx input of sizing_cli.py and the other tools
+takes the streamed path.
+"""
+
+import gc
+import re
+import sys
+import html
+import time
+import zipfile
+import argparse
+from contextlib import contextmanager
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from catalog import DB_SHEET_NAMES, to_float, to_str
+from catalog_sqlite import SCHEMAS
+from create_workbook import VALVELIST_INPUT_HEADERS, VALVELIST_RESULT_HEADERS
+from valvelist_io import VALVELIST_HEADER_ROW, VALVELIST_DATA_ROW, NUMBER_COLUMNS
+from xlsx_package import workbook_sheets, column_letter, iter_sheet_rows
+
+BLOCK_BYTES = 1 << 22           # sheet XML read per block
+
+VALVELIST_HEADERS = VALVELIST_INPUT_HEADERS + VALVELIST_RESULT_HEADERS
+
+# Column kinds
+FLOAT = "float"                 # GetCellDouble, blank = 0
+NUMBER = "number"               # ValveList numbers, blank = NaN
+INT = "int"                     # GetCellInt
+TEXT = "text"                   # CStr
+RAW = "raw"                     # cell value as stored (float, str, bool or None)
+
+_KIND_OF_CONVERTER = {"to_float": FLOAT, "to_int": INT, "to_str": TEXT}
+
+# Plain cells (<c r="B7" s="1" t="s"><v>42</v></c>, <c r="B7" t="inlineStr"><is><t>x</t></is></c>)
+# fill groups 3-4; any other cell fills groups 5-6 with its attributes and content
+_CELL = (rb'<c r="(%s)(\d+)"(?:(?: s="\d+")?(?: t="(\w+)")?>(?:<(?:v|is><t)>([^<]*)</(?:v|t></is)>)?</c>'
+         rb'|((?:\s+[\w:]+="[^"]*")*)\s*(?:/>|>(.*?)</c>))')
+_VALUE = re.compile(rb"<v>([^<]*)</v>")
+_TEXT = re.compile(rb"<t(?:\s[^>]*)?>([^<]*)</t>")
+_PHONETIC = re.compile(rb"<rPh\b.*?</rPh>", re.S)
+_SI = re.compile(rb"<si>|<si\s[^>]*>")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for xlsx column reads (pip install numpy)")
+
+
+@contextmanager
+def _gc_paused():
+    # findall() creates a tuple per cell; cyclic GC passes over millions of them add nothing
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _cell_pattern(letters=None):
+    """Cell regex for the given column letters (bytes), any column when None"""
+    alternation = b"|".join(sorted(letters, key=len, reverse=True)) if letters else rb"[A-Z]{1,3}"
+    return re.compile(_CELL % alternation, re.S)
+
+
+def _text(raw):
+    """XML character data: entities resolved, line ends normalized like an XML parser"""
+    text = raw.decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if "&" in text:
+        text = html.unescape(text)
+    return text
+
+
+class _NotFastLayout(Exception):
+    """Sheet XML not written as <c r="..."> cells; read it with iter_sheet_rows()"""
+
+
+# ============================================
+# Shared Strings
+# ============================================
+
+class SharedStrings:
+    """sharedStrings part, decoded per index on first use"""
+
+    def __init__(self, zf, part="xl/sharedStrings.xml"):
+        self._zf = zf
+        self._part = part
+        self._data = None
+        self._starts = None
+        self._cache = {}
+
+    def _load(self):
+        try:
+            self._data = self._zf.read(self._part)
+        except KeyError:
+            self._data = b""
+        self._starts = [m.end() for m in _SI.finditer(self._data)]
+
+    def __len__(self):
+        if self._data is None:
+            self._load()
+        return len(self._starts)
+
+    def _decode(self, index):
+        start = self._starts[index]
+        si = self._data[start:self._data.find(b"</si>", start)]
+        if si[:3] == b"<t>" and si[-4:] == b"</t>" and b"<" not in si[3:-4]:
+            return _text(si[3:-4])
+        # Plain text is <si><t>, rich text is <si><r><t>; phonetic runs (<rPh>) are skipped
+        if b"<r>" in si or b"<r " in si:
+            return "".join(_text(t) for t in _TEXT.findall(_PHONETIC.sub(b"", si)))
+        found = _TEXT.search(si)
+        return _text(found.group(1)) if found else ""
+
+    def __getitem__(self, index):
+        text = self._cache.get(index)
+        if text is None:
+            if self._data is None:
+                self._load()
+            if not 0 <= index < len(self._starts):
+                raise IndexError("shared string %d out of range" % index)
+            text = self._cache[index] = self._decode(index)
+        return text
+
+    def take(self, indexes):
+        """Object array of the strings at an int array of indexes"""
+        unique, inverse = np.unique(indexes, return_inverse=True)
+        table = np.empty(len(unique), dtype=object)
+        table[:] = [self[i] for i in unique.tolist()]
+        return table[inverse]
+
+
+# ============================================
+# Cells
+# ============================================
+
+def _cell_value(t, raw, strings):
+    """Value of a plain <v> cell of type t, as iter_sheet_rows() returns it"""
+    if t == b"s":
+        return strings[int(raw)]
+    if t == b"b":
+        return raw == b"1"
+    if t in (b"str", b"e", b"d", b"inlineStr"):
+        return _text(raw)
+    return float(raw)
+
+
+def _any_cell_value(attrs, body, strings):
+    """Value of a cell in any form (formula, inline string, ...), None when blank"""
+    i = attrs.find(b' t="')
+    t = attrs[i + 4:attrs.index(b'"', i + 4)] if i >= 0 else b"n"
+    if t == b"inlineStr":
+        return "".join(_text(x) for x in _TEXT.findall(body))
+    found = _VALUE.search(body)
+    if found is None:
+        return None
+    return _cell_value(t, found.group(1), strings)
+
+
+class _Column:
+    """Cells of one column: number and shared-string arrays per block, other values one by one"""
+
+    def __init__(self, keep_empty=False):
+        self.keep_empty = keep_empty                        # "" cells kept instead of blank
+        self.num_rows, self.numbers = [], []
+        self.sst_rows, self.sst_indexes = [], []
+        self.text_rows, self.texts = [], []                 # plain inline strings
+        self.other_rows, self.other = [], []
+
+    def last_row(self):
+        last = [int(r[-1].max()) for r in (self.num_rows, self.sst_rows, self.text_rows) if r]
+        last += [max(self.other_rows)] if self.other_rows else []
+        return max(last) if last else 0
+
+    def add(self, row, value):
+        if value is not None and (value != "" or self.keep_empty):
+            self.other_rows.append(row)
+            self.other.append(value)
+
+
+def _bytes_array(values, width=None):
+    width = width or max(1, max(map(len, values)))
+    return np.fromiter(values, dtype="S%d" % width, count=len(values))
+
+
+def _scan_block(block, pattern, columns, strings, min_row, keep_empty=False):
+    """Add the cells of one block of whole rows to columns {letters: _Column}
+
+    keep_empty: empty inline strings are read as "" (iter_sheet_rows()), not skipped
+    """
+    found = pattern.findall(block)
+    if not found:
+        return
+    letters, rows, types, values, attrs, bodies = zip(*found)
+    count = len(found)
+    letters, types, values = _bytes_array(letters, 3), _bytes_array(types, 9), _bytes_array(values)
+    rows = np.fromiter(map(int, rows), dtype=np.int64, count=count)
+    has_body = np.fromiter(map(bool, bodies), dtype=bool, count=count)
+    wanted = rows >= min_row
+    plain = wanted & ~has_body & (values != b"")
+    number = plain & ((types == b"") | (types == b"n"))
+    shared = plain & (types == b"s")
+    inline = plain & (types == b"inlineStr")
+    other = wanted & ~number & ~shared & ~inline & (has_body | (values != b""))
+    empty_text = np.zeros(count, dtype=bool)
+    if keep_empty:
+        empty_text = wanted & ~has_body & (values == b"") & (
+            (types == b"inlineStr") | (np.char.find(_bytes_array(attrs), b'"inlineStr"') >= 0))
+        other |= empty_text
+    for key, col in columns.items():
+        at = letters == key
+        mask = at & number
+        if mask.any():
+            col.num_rows.append(rows[mask])
+            col.numbers.append(values[mask].astype(np.float64))
+        mask = at & shared
+        if mask.any():
+            col.sst_rows.append(rows[mask])
+            col.sst_indexes.append(values[mask].astype(np.int64))
+        mask = at & inline
+        if mask.any():
+            unique, inverse = np.unique(values[mask], return_inverse=True)
+            texts = np.empty(len(unique), dtype=object)
+            texts[:] = [_text(v) for v in unique.tolist()]
+            col.text_rows.append(rows[mask])
+            col.texts.append(texts[inverse])
+        for i in np.flatnonzero(at & other).tolist():
+            if empty_text[i]:
+                value = ""
+            elif bodies[i]:
+                value = _any_cell_value(attrs[i], bodies[i], strings)
+            else:
+                value = _cell_value(types[i] or b"n", values[i], strings)
+            col.add(int(rows[i]), value)
+
+
+def _sheet_blocks(stream):
+    """Yield the <sheetData> content of a sheet XML stream in blocks of whole rows"""
+    buffer = b""
+    started = False
+    while True:
+        data = stream.read(BLOCK_BYTES)
+        buffer += data
+        if not started:
+            start = buffer.find(b"<sheetData")
+            if start < 0:
+                if b":sheetData" in buffer:
+                    raise _NotFastLayout()
+                if not data:
+                    return
+                continue
+            buffer = buffer[start:]
+            started = True
+        end = buffer.find(b"</sheetData>")
+        if end >= 0:
+            yield buffer[:end]
+            return
+        if not data:
+            yield buffer
+            return
+        cut = buffer.rfind(b"</row>")
+        if cut >= 0:
+            cut += len(b"</row>")
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+
+
+def _check_fast_layout(block):
+    if block.count(b'<c r="') != block.count(b"<c ") + block.count(b"<c>"):
+        raise _NotFastLayout()
+
+
+# ============================================
+# Workbook
+# ============================================
+
+class XlsxColumnReader:
+    """One workbook; sheets read column-wise without openpyxl"""
+
+    def __init__(self, path):
+        _require_numpy()
+        self.path = path
+        self._zf = zipfile.ZipFile(path)
+        parts = {name: self._zf.read(name) for name in ("xl/workbook.xml", "xl/_rels/workbook.xml.rels")}
+        self.sheets = {name: part for name, _, part in workbook_sheets(parts)}
+        self.strings = SharedStrings(self._zf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zf.close()
+
+    def _part(self, sheet):
+        part = self.sheets.get(sheet)
+        if part is None or part not in self._zf.namelist():
+            raise ValueError("%s has no %s sheet" % (self.path, sheet))
+        return part
+
+    def _slow_rows(self, sheet):
+        strings = [self.strings[i] for i in range(len(self.strings))]
+        return iter_sheet_rows(self._zf.read(self._part(sheet)), strings)
+
+    # -------- Cells --------
+
+    def header(self, sheet, header_row):
+        """{column letters (bytes): header text} of one row"""
+        pattern = _cell_pattern()
+        try:
+            with self._zf.open(self._part(sheet)) as stream:
+                for block in _sheet_blocks(stream):
+                    _check_fast_layout(block)
+                    cells = {}
+                    for letters, row, t, raw, attrs, body in pattern.findall(block):
+                        row = int(row)
+                        if row > header_row:
+                            return cells
+                        if row == header_row:
+                            value = _any_cell_value(attrs, body, self.strings) if body else (
+                                _cell_value(t or b"n", raw, self.strings) if raw else None)
+                            if to_str(value).strip():
+                                cells[letters] = to_str(value).strip()
+                    if cells:
+                        return cells
+            return {}
+        except _NotFastLayout:
+            for rownum, values in self._slow_rows(sheet):
+                if rownum == header_row:
+                    return {column_letter(i + 1).encode("ascii"): to_str(v).strip()
+                            for i, v in enumerate(values) if to_str(v).strip()}
+            return {}
+
+    def cells(self, sheet, letters, min_row, keep_empty=False):
+        """{column letters: _Column} with the cells from min_row on (keep_empty: "" cells kept)"""
+        columns = {l: _Column(keep_empty) for l in letters}
+        if not columns:
+            return columns
+        pattern = _cell_pattern(letters)
+        try:
+            with self._zf.open(self._part(sheet)) as stream, _gc_paused():
+                for block in _sheet_blocks(stream):
+                    _check_fast_layout(block)
+                    _scan_block(block, pattern, columns, self.strings, min_row, keep_empty)
+        except _NotFastLayout:
+            columns = {l: _Column(keep_empty) for l in letters}
+            positions = [(col, int(_column_number(l)) - 1) for l, col in columns.items()]
+            for rownum, values in self._slow_rows(sheet):
+                if rownum >= min_row:
+                    for col, i in positions:
+                        if i < len(values):
+                            col.add(rownum, values[i])
+        return columns
+
+    def read(self, sheet, letters, kinds, data_row, keep_empty=False):
+        """{key: array} for letters {key: column letters} and kinds {key: kind}, rows data_row..last"""
+        columns = self.cells(sheet, set(letters.values()), data_row, keep_empty)
+        last = max([col.last_row() for col in columns.values()] + [data_row - 1])
+        size = last - data_row + 1
+        return {key: _convert(columns[l], kinds[key], size, data_row, self.strings)
+                for key, l in letters.items()}
+
+    # -------- Known layouts --------
+
+    def valvelist(self, headers=None):
+        """ValveList columns {header: array} of the rows with a Line No."""
+        headers = list(headers or VALVELIST_HEADERS)
+        if "Line No." not in headers:
+            headers.insert(0, "Line No.")
+        by_name = {h: l for l, h in self.header("ValveList", VALVELIST_HEADER_ROW).items()}
+        missing = [h for h in headers if h in VALVELIST_INPUT_HEADERS and h not in by_name]
+        if missing:
+            raise ValueError("ValveList header is missing: " + ", ".join(missing))
+        letters = {h: by_name[h] for h in headers if h in by_name}
+        kinds = {h: NUMBER if h in NUMBER_COLUMNS else TEXT for h in letters}
+        columns = self.read("ValveList", letters, kinds, VALVELIST_DATA_ROW)
+        line_no = columns["Line No."]
+        keep = np.fromiter((v.strip() != "" for v in line_no), dtype=bool, count=len(line_no))
+        if keep.all():
+            return columns
+        return {h: values[keep] for h, values in columns.items()}
+
+    def valvelist_rows(self):
+        """Yield (sheet row, {header: value}) per ValveList data row, cells as iter_sheet_rows() gives them
+
+        Same rows as valvelist_io.iter_xlsx_rows() on the package read, except
+        rows without any value, which carry no Line No. either.
+        """
+        by_name = {h: l for l, h in self.header("ValveList", VALVELIST_HEADER_ROW).items()}
+        if not by_name:
+            return
+        missing = [h for h in VALVELIST_INPUT_HEADERS if h not in by_name]
+        if missing:
+            raise ValueError("ValveList header is missing: " + ", ".join(missing))
+        columns = self.read("ValveList", by_name, dict.fromkeys(by_name, RAW), VALVELIST_DATA_ROW, keep_empty=True)
+        names = list(columns)
+        for row, values in enumerate(zip(*[columns[h].tolist() for h in names]), VALVELIST_DATA_ROW):
+            if any(v is not None for v in values):
+                yield row, dict(zip(names, values))
+
+    def db_sheet(self, sheet, headers=None):
+        """DB_* sheet columns {header: array} converted with the SCHEMAS rules
+
+        SCHEMAS sheets are read by column position like the catalog (keys are
+        the SCHEMAS names); other sheets by their row 1 header.
+        """
+        if sheet in SCHEMAS:
+            letters = {name: column_letter(i + 1).encode("ascii") for i, (name, _) in enumerate(SCHEMAS[sheet])}
+            kinds = {name: _KIND_OF_CONVERTER.get(getattr(conv, "__name__", ""), RAW)
+                     for name, conv in SCHEMAS[sheet]}
+        else:
+            letters = {h: l for l, h in self.header(sheet, 1).items()}
+            kinds = dict.fromkeys(letters, RAW)
+        if headers is not None:
+            unknown = [h for h in headers if h not in letters]
+            if unknown:
+                raise ValueError("%s has no column: %s" % (sheet, ", ".join(unknown)))
+            letters = {h: letters[h] for h in headers}
+        return self.read(sheet, letters, kinds, 2)
+
+    def catalog(self, sheet_names=DB_SHEET_NAMES):
+        """{sheet name: db_sheet()} for the DB_* sheets of the workbook"""
+        return {name: self.db_sheet(name) for name in sheet_names if name in self.sheets}
+
+
+def _column_number(letters):
+    number = 0
+    for ch in letters.decode("ascii"):
+        number = number * 26 + ord(ch) - 64
+    return number
+
+
+# ============================================
+# Conversion
+# ============================================
+
+def _joined(arrays, dtype):
+    return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+
+def _convert(col, kind, size, first, strings):
+    """Array of one column: blank cells, then numbers, strings and other cells"""
+    num_at = _joined(col.num_rows, np.int64) - first
+    sst_at = np.concatenate([_joined(col.sst_rows, np.int64), _joined(col.text_rows, np.int64)]) - first
+    other_at = np.array(col.other_rows, dtype=np.int64) - first
+    numbers = _joined(col.numbers, np.float64)
+    texts = strings.take(_joined(col.sst_indexes, np.int64)) if col.sst_indexes else np.empty(0, dtype=object)
+    texts = np.concatenate([texts, _joined(col.texts, object)])
+
+    if kind in (FLOAT, NUMBER, INT):
+        out = np.full(size, np.nan if kind == NUMBER else 0.0)
+        out[num_at] = numbers
+        out[sst_at] = [to_float(v) for v in texts]
+        out[other_at] = [to_float(v) for v in col.other]
+        return np.rint(out).astype(np.int64) if kind == INT else out
+
+    out = np.empty(size, dtype=object)
+    if kind == TEXT:
+        out[:] = ""
+        out[num_at] = [to_str(v) for v in numbers.tolist()]
+        out[sst_at] = texts
+        out[other_at] = [to_str(v) for v in col.other]
+        return out
+    out[num_at] = numbers.tolist()
+    out[sst_at] = texts
+    out[other_at] = col.other
+    return out
+
+
+# ============================================
+# Functions
+# ============================================
+
+def read_valvelist_columns(path, headers=None):
+    """{header: array} of the ValveList sheet (rows with a Line No.)"""
+    with XlsxColumnReader(path) as reader:
+        return reader.valvelist(headers)
+
+
+def iter_valvelist_rows(path):
+    """XlsxColumnReader.valvelist_rows() of a workbook (ImportError without numpy)"""
+    reader = XlsxColumnReader(path)
+
+    def rows():
+        with reader:
+            yield from reader.valvelist_rows()
+    return rows()
+
+
+def read_db_columns(path, sheet, headers=None):
+    """{header: array} of one DB_* sheet"""
+    with XlsxColumnReader(path) as reader:
+        return reader.db_sheet(sheet, headers)
+
+
+def read_catalog_columns(path, sheet_names=DB_SHEET_NAMES):
+    """{sheet name: {header: array}} of the DB_* sheets"""
+    with XlsxColumnReader(path) as reader:
+        return reader.catalog(sheet_names)
+
+
+# ============================================
+# Main
+# ============================================
+
+def _reference_columns(path, sheet):
+    """The same columns through xlsx_package (valvelist_io / catalog.read_tables)"""
+    if sheet == "ValveList":
+        from valvelist_io import _iter_package_rows
+        records = [r for _, r in _iter_package_rows(path) if to_str(r.get("Line No.")).strip()]
+        return {h: [r.get(h) for r in records] for h in VALVELIST_HEADERS}
+    from xlsx_package import read_package, shared_strings
+    parts = read_package(path)
+    sheets = {name: part for name, _, part in workbook_sheets(parts)}
+    rows = dict(iter_sheet_rows(parts[sheets[sheet]], shared_strings(parts)))
+    names = [name for name, _ in SCHEMAS[sheet]] if sheet in SCHEMAS else \
+        [to_str(v).strip() for v in rows.get(1, [])]
+    names = [(i, h) for i, h in enumerate(names) if h]
+    # Blank rows stay in place, up to the last row with a value in these columns
+    last = max([n for n, values in rows.items() if n > 1 and any(
+        i < len(values) and values[i] not in (None, "") for i, _ in names)] + [1])
+    table = [rows.get(n, []) for n in range(2, last + 1)]
+    return {h: [r[i] if i < len(r) else None for r in table] for i, h in names}
+
+
+def check_columns(path, sheet, columns):
+    """Headers whose values differ from the xlsx_package reads ([] = identical)"""
+    reference = _reference_columns(path, sheet)
+    converters = dict(SCHEMAS.get(sheet, []))
+    bad = []
+    for h, values in columns.items():
+        ref = reference.get(h)
+        if ref is None or len(ref) != len(values):
+            bad.append(h)
+            continue
+        if sheet == "ValveList":
+            conv = ((lambda v: np.nan if v is None or v == "" else to_float(v))
+                    if h in NUMBER_COLUMNS else to_str)
+        else:
+            conv = converters.get(h) or (lambda v: None if v == "" else v)
+        expected = [conv(v) for v in ref]
+        if values.dtype.kind == "f":
+            same = np.array_equal(values, np.array(expected, dtype=float), equal_nan=True)
+        else:
+            same = values.tolist() == expected
+        if not same:
+            bad.append(h)
+    return bad
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def _openpyxl_rows(path, sheet, min_row):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return sum(1 for _ in wb[sheet].iter_rows(min_row=min_row, values_only=True))
+    finally:
+        wb.close()
+
+
+def _package_rows(path, sheet, min_row):
+    from xlsx_package import read_package, shared_strings
+    parts = read_package(path)
+    sheets = {name: part for name, _, part in workbook_sheets(parts)}
+    return sum(1 for rownum, _ in iter_sheet_rows(parts[sheets[sheet]], shared_strings(parts))
+               if rownum >= min_row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read ValveList / DB_* sheets as typed NumPy columns")
+    parser.add_argument("workbook", help="NoahSizing.xlsx / .xlsm or any workbook with these sheets")
+    parser.add_argument("--sheet", action="append", help="Sheet to read (repeatable, default: ValveList and DB_*)")
+    parser.add_argument("--openpyxl", action="store_true", help="Also time openpyxl read-only mode")
+    parser.add_argument("--check", action="store_true", help="Compare every column with the xlsx_package reads")
+    args = parser.parse_args(argv)
+
+    failed = False
+    try:
+        with XlsxColumnReader(args.workbook) as reader:
+            sheets = args.sheet or [name for name in ["ValveList"] + list(DB_SHEET_NAMES)
+                                    if name in reader.sheets]
+        # package: xlsx_package.iter_sheet_rows (valvelist_io, catalog.read_tables); seconds per sheet
+        print("%-20s %8s %8s %9s %9s %9s" % ("sheet", "rows", "columns", "columns", "package", "openpyxl"))
+        for sheet in sheets:
+            data_row = VALVELIST_DATA_ROW if sheet == "ValveList" else 2
+
+            def read():
+                with XlsxColumnReader(args.workbook) as reader:
+                    return reader.valvelist() if sheet == "ValveList" else reader.db_sheet(sheet)
+            seconds, columns = _timed(read)
+            rows = len(next(iter(columns.values()))) if columns else 0
+            package = _timed(lambda: _package_rows(args.workbook, sheet, data_row))[0]
+            line = "%-20s %8d %8d %9.3f %9.3f" % (sheet, rows, len(columns), seconds, package)
+            line += " %9.3f" % _timed(lambda: _openpyxl_rows(args.workbook, sheet, data_row))[0] \
+                if args.openpyxl else " %9s" % "-"
+            if args.check:
+                bad = check_columns(args.workbook, sheet, columns)
+                failed = failed or bool(bad)
+                line += "  " + ("OK" if not bad else "MISMATCH: " + ", ".join(bad))
+            print(line, flush=True)
+    except (ImportError, OSError, ValueError, zipfile.BadZipFile) as e:
+        print("Error: %s" % e, file=sys.stderr)
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())